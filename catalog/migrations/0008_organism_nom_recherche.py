@@ -0,0 +1,82 @@
+# Organism.nom_recherche + index trigramme pg_trgm (PostgreSQL) / table FTS5 (SQLite)
+
+import unicodedata
+
+from django.db import migrations, models
+
+# Copies figées de catalog.search : la migration ne dépend pas du code courant
+SQLITE_FTS_TABLE = 'species_espece_fts'
+_LIGATURES = str.maketrans({'œ': 'oe', 'æ': 'ae', 'ß': 'ss'})
+
+
+def search_document(*parts):
+    """Noms en minuscules, sans accents ni ligatures (lower(unaccent(...)) côté PostgreSQL)."""
+    text = unicodedata.normalize('NFKD', ' '.join(p for p in parts if p).lower().translate(_LIGATURES))
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def create_search_index(apps, schema_editor):
+    """PostgreSQL : pg_trgm + GIN gin_trgm_ops sur nom_recherche. SQLite : table FTS5. Puis remplissage."""
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute("""
+            CREATE INDEX IF NOT EXISTS species_espece_nom_trgm
+            ON species_espece USING gin (nom_recherche gin_trgm_ops)
+        """)
+        schema_editor.execute("""
+            UPDATE species_espece SET nom_recherche = lower(unaccent(concat_ws(' ',
+                nullif(nom_commun, ''), nullif(nom_latin, ''), nullif(genus, ''),
+                (SELECT string_agg(nom, ' ') FROM species_organismnom WHERE organism_id = species_espece.id)
+            )))
+        """)
+    elif connection.vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} "
+                "USING fts5(nom_recherche, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+            has_fts = True
+        except Exception:
+            has_fts = False  # SQLite compilé sans FTS5 : recherche par LIKE sur nom_recherche
+        Organism = apps.get_model('catalog', 'Organism')
+        OrganismNom = apps.get_model('catalog', 'OrganismNom')
+        noms = {}
+        for organism_id, nom in OrganismNom.objects.values_list('organism_id', 'nom'):
+            noms.setdefault(organism_id, []).append(nom)
+        for oid, nc, nl, genus in Organism.objects.values_list('id', 'nom_commun', 'nom_latin', 'genus'):
+            doc = search_document(nc, nl, genus, *noms.get(oid, ()))
+            Organism.objects.filter(pk=oid).update(nom_recherche=doc)
+            if has_fts:
+                schema_editor.execute(
+                    f"INSERT INTO {SQLITE_FTS_TABLE} (rowid, nom_recherche) VALUES (%s, %s)", [oid, doc]
+                )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS species_espece_nom_trgm")
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0007_unaccent_extension"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="organism",
+            name="nom_recherche",
+            field=models.TextField(
+                blank=True,
+                default="",
+                editable=False,
+                help_text="Noms commun, latin, genre et alternatifs en minuscules sans accents (recherche trigramme, voir catalog.search)",
+            ),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,55 @@
+# Organism.zone_rusticite_min / _max : bornes ordinales de zone_rusticite (filtre zone_usda indexé)
+
+import re
+
+from django.db import migrations, models
+
+# Copie figée de species.source_rules.zone_rusticite_bounds : pas de dépendance au code courant
+_ZONE_PATTERN = re.compile(r'^(\d+)([ab])?$', re.IGNORECASE)
+
+
+def zone_rusticite_bounds(zones):
+    """(min, max) ordinaux des zones (2 × numéro + demi-zone : 4a → 8, 4b → 9)."""
+    ordinals = []
+    for z in zones or []:
+        m = _ZONE_PATTERN.match((z.get('zone') or '').strip()) if isinstance(z, dict) else None
+        if m:
+            ordinals.append(int(m.group(1)) * 2 + (1 if (m.group(2) or '').lower() == 'b' else 0))
+    if not ordinals:
+        return None, None
+    return min(ordinals), max(ordinals)
+
+
+def backfill_zone_bounds(apps, schema_editor):
+    Organism = apps.get_model('catalog', 'Organism')
+    objs = []
+    for oid, zones in Organism.objects.exclude(zone_rusticite=[]).values_list('id', 'zone_rusticite').iterator():
+        zmin, zmax = zone_rusticite_bounds(zones)
+        if zmin is not None:
+            objs.append(Organism(pk=oid, zone_rusticite_min=zmin, zone_rusticite_max=zmax))
+    Organism.objects.bulk_update(objs, ['zone_rusticite_min', 'zone_rusticite_max'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0008_organism_nom_recherche'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organism',
+            name='zone_rusticite_max',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, help_text='Zone la plus chaude de zone_rusticite en ordinal (4a = 8, 4b = 9), recalculée au save', null=True),
+        ),
+        migrations.AddField(
+            model_name='organism',
+            name='zone_rusticite_min',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, help_text='Zone la plus froide de zone_rusticite en ordinal (4a = 8, 4b = 9), recalculée au save', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='organism',
+            index=models.Index(fields=['zone_rusticite_min'], name='species_espece_zone_min_idx'),
+        ),
+        migrations.RunPython(backfill_zone_bounds, migrations.RunPython.noop),
+    ]
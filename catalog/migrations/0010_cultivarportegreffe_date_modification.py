@@ -0,0 +1,20 @@
+# CultivarPorteGreffe.date_modification : empreinte (ETag) de la charge utile de la vue terrain
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0009_organism_zone_rusticite_bounds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cultivarportegreffe',
+            name='date_modification',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
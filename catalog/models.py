@@ -49,6 +49,14 @@ class Organism(models.Model):
     BESOIN_SOLEIL_CHOICES = [('ombre_complete', 'Ombre complète'), ('ombre', 'Ombre'), ('mi_ombre', 'Mi-ombre'), ('soleil_partiel', 'Soleil partiel'), ('plein_soleil', 'Plein soleil')]
     besoin_soleil = models.CharField(max_length=20, choices=BESOIN_SOLEIL_CHOICES, default='plein_soleil', blank=True)
     zone_rusticite = models.JSONField(default=list, blank=True, help_text="Liste de zones avec source")
+    zone_rusticite_min = models.PositiveSmallIntegerField(
+        null=True, blank=True, editable=False,
+        help_text="Zone la plus froide de zone_rusticite en ordinal (4a = 8, 4b = 9), recalculée au save",
+    )
+    zone_rusticite_max = models.PositiveSmallIntegerField(
+        null=True, blank=True, editable=False,
+        help_text="Zone la plus chaude de zone_rusticite en ordinal (4a = 8, 4b = 9), recalculée au save",
+    )
     SOL_TEXTURE_CHOICES = [('argileux', 'Argileux'), ('limoneux', 'Limoneux'), ('sablonneux', 'Sablonneux'), ('loameux', 'Loameux'), ('rocailleux', 'Rocailleux'), ('tourbeux', 'Tourbeux')]
     sol_textures = models.JSONField(default=list, blank=True, help_text="Liste des textures acceptées")
     SOL_PH_CHOICES = [('tres_acide', 'Très acide (< 5.5)'), ('acide', 'Acide (5.5-6.5)'), ('neutre', 'Neutre (6.5-7.5)'), ('alcalin', 'Alcalin (> 7.5)')]
@@ -88,23 +96,49 @@ class Organism(models.Model):
         if SearchVectorField is not None
         else models.TextField(null=True, blank=True)
     )
+    nom_recherche = models.TextField(
+        blank=True,
+        default='',
+        editable=False,
+        help_text="Noms commun, latin, genre et alternatifs en minuscules sans accents (recherche trigramme, voir catalog.search)",
+    )
 
     class Meta:
         db_table = 'species_espece'
         verbose_name = "Espèce"
         verbose_name_plural = "Espèces"
         ordering = ['nom_commun']
-        indexes = [GinIndex(fields=['search_vector'], name='species_espece_sv_gin')] if (SearchVectorField is not None and GinIndex is not None) else []
+        indexes = [
+            models.Index(fields=['zone_rusticite_min'], name='species_espece_zone_min_idx'),
+        ] + ([GinIndex(fields=['search_vector'], name='species_espece_sv_gin')] if (SearchVectorField is not None and GinIndex is not None) else [])
 
     def __str__(self):
         if self.nom_latin:
             return f"{self.nom_commun} ({self.nom_latin})"
         return self.nom_commun
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Noms tels que lus en base : un renommage invalide l'accueil des favoris (species.signals)
+        instance._loaded_names = (instance.__dict__.get('nom_commun'), instance.__dict__.get('nom_latin'))
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.slug_latin and self.nom_latin:
             self.slug_latin = _slugify_latin(self.nom_latin)
+        from species.source_rules import zone_rusticite_bounds
+        self.zone_rusticite_min, self.zone_rusticite_max = zone_rusticite_bounds(self.zone_rusticite)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'zone_rusticite' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'zone_rusticite_min', 'zone_rusticite_max'}
         super().save(*args, **kwargs)
+        # Après les post_save : les noms enregistrés deviennent la référence du prochain renommage
+        loaded = getattr(self, '_loaded_names', None) or (None, None)
+        self._loaded_names = tuple(
+            getattr(self, name) if update_fields is None or name in update_fields else value
+            for name, value in zip(('nom_commun', 'nom_latin'), loaded)
+        )
 
     def get_zones_by_source(self, source: str) -> list:
         if not self.zone_rusticite or not isinstance(self.zone_rusticite, list):
@@ -112,14 +146,8 @@ class Organism(models.Model):
         return [z.get('zone') for z in self.zone_rusticite if isinstance(z, dict) and z.get('source') == source and z.get('zone')]
 
     def get_primary_zone(self) -> str:
-        if not self.zone_rusticite or not isinstance(self.zone_rusticite, list):
-            return ''
-        zones = [z.get('zone') for z in self.zone_rusticite if isinstance(z, dict) and z.get('zone')]
-        if not zones:
-            return ''
-        from species.source_rules import zone_rusticite_order
-        zones_sorted = sorted(zones, key=zone_rusticite_order)
-        return zones_sorted[0] if zones_sorted else ''
+        from species.source_rules import primary_zone
+        return primary_zone(self.zone_rusticite)
 
 
 class OrganismNom(models.Model):
@@ -343,6 +371,8 @@ class CultivarPorteGreffe(models.Model):
         blank=True,
         help_text='Liste d\'objets ex. [{"source": "ancestrale", "age": "1.5"}]',
     )
+    # Empreinte (ETag) de la vue terrain : nom et hauteur du porte-greffe y figurent
+    date_modification = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'species_cultivarportegreffe'
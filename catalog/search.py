@@ -0,0 +1,167 @@
+"""
+Recherche d'organismes classée (API /api/organisms/?search=, saisie semi-automatique).
+
+PostgreSQL : colonne nom_recherche (noms commun, latin, genre et OrganismNom, en minuscules
+et sans accents) indexée en trigrammes (pg_trgm, GIN) + search_vector (tsvector pondéré).
+  - filtre : chaque mot contenu dans nom_recherche (LIKE servi par l'index trigramme),
+    ou requête proche à une faute de frappe près (word_similarity) ;
+  - rang : similarité trigramme + ts_rank sur une tsquery en préfixes (« pomm:* »)
+    + bonus si le nom commence par la saisie.
+SQLite (dev/tests) : table FTS5 SQLITE_FTS_TABLE, requête en préfixes classée par bm25.
+
+nom_recherche et la table FTS5 sont tenus à jour avec search_vector (catalog.search_vectors).
+"""
+import re
+import unicodedata
+
+from django.db import OperationalError, connection, transaction
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.functions import Coalesce
+
+SQLITE_FTS_TABLE = 'species_espece_fts'
+MIN_WORD_LENGTH = 2
+# Poids ts_rank des catégories D, C, B, A (A = nom commun / latin)
+RANK_WEIGHTS = [0.1, 0.2, 0.4, 1.0]
+PREFIX_BONUS = 1.0
+
+_LIGATURES = str.maketrans({'œ': 'oe', 'æ': 'ae', 'ß': 'ss'})
+
+
+def normalize_search_text(text):
+    """Minuscules, sans accents ni ligatures (équivalent Python de lower(unaccent(...)))."""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKD', text.lower().translate(_LIGATURES))
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def search_document(*parts):
+    """Texte de nom_recherche à partir des noms (None et vides ignorés)."""
+    return normalize_search_text(' '.join(p for p in parts if p))
+
+
+def _words(search):
+    words = re.findall(r'\w+', search)
+    long_words = [w for w in words if len(w) >= MIN_WORD_LENGTH]
+    return long_words or words
+
+
+def search_organisms(qs, search):
+    """
+    Filtre qs (Organism) sur search et le trie par pertinence (annotation search_rank).
+    Une requête multi-mots impose que chaque mot apparaisse dans un des noms.
+    """
+    search = (search or '').strip()
+    if not search:
+        return qs
+    if connection.vendor == 'postgresql':
+        return _search_postgresql(qs, search)
+    if connection.vendor == 'sqlite':
+        return _search_sqlite(qs, search)
+    return _search_contains(qs, search)
+
+
+def _search_postgresql(qs, search):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+
+    normalized = normalize_search_text(search)
+    words = _words(normalized)
+    if not words:
+        return qs.none()
+    contains_all = Q()
+    for w in words:
+        contains_all &= Q(nom_recherche__contains=w)
+    # search_vector est construit sur le texte accentué : tsquery sur les mots saisis (minuscules)
+    raw_words = _words(search.lower()) or words
+    tsquery = SearchQuery(' & '.join(f"'{w}':*" for w in raw_words), search_type='raw', config='simple')
+    return (
+        qs.filter(contains_all | Q(nom_recherche__trigram_word_similar=normalized))
+        .annotate(
+            search_rank=(
+                TrigramWordSimilarity(normalized, 'nom_recherche')
+                + Coalesce(SearchRank('search_vector', tsquery, weights=RANK_WEIGHTS), Value(0.0))
+                + Case(
+                    When(nom_recherche__startswith=normalized, then=Value(PREFIX_BONUS)),
+                    default=Value(0.0),
+                    output_field=FloatField(),
+                )
+            )
+        )
+        .order_by('-search_rank', 'nom_commun')
+    )
+
+
+def _search_sqlite(qs, search):
+    words = _words(normalize_search_text(search))
+    if not words:
+        return qs.none()
+    if not _sqlite_fts_available():
+        return _search_contains(qs, search)
+    match = ' '.join(f'"{w}"*' for w in words)
+    table = SQLITE_FTS_TABLE
+    # Jointure sur la table FTS5 (rowid = id) : bm25 n'est calculé que dans la requête MATCH ;
+    # plus petit = plus pertinent
+    return (
+        qs.extra(
+            tables=[table],
+            where=[f'{table}.rowid = species_espece.id', f'{table} MATCH %s'],
+            params=[match],
+            select={'search_rank': f'-bm25({table})'},
+        )
+        .order_by('-search_rank', 'nom_commun')
+    )
+
+
+def _sqlite_fts_available():
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT 1 FROM {SQLITE_FTS_TABLE} LIMIT 1')
+    except OperationalError:
+        return False
+    return True
+
+
+def _search_contains(qs, search):
+    q = Q()
+    for w in _words(normalize_search_text(search)):
+        q &= Q(nom_recherche__contains=w)
+    return qs.filter(q)
+
+
+def refresh_sqlite_search_index(organism_ids=None):
+    """
+    Recalcule nom_recherche et la table FTS5 (SQLite) pour organism_ids (tous si None).
+    Retourne le nombre d'organismes traités.
+    """
+    from .models import Organism, OrganismNom
+
+    orgs = Organism.objects.all() if organism_ids is None else Organism.objects.filter(pk__in=organism_ids)
+    rows = list(orgs.values_list('id', 'nom_commun', 'nom_latin', 'genus'))
+    if not rows:
+        return 0
+    ids = [r[0] for r in rows]
+    noms = {}
+    for organism_id, nom in OrganismNom.objects.filter(organism_id__in=ids).values_list('organism_id', 'nom'):
+        noms.setdefault(organism_id, []).append(nom)
+    documents = [(oid, search_document(nc, nl, genus, *noms.get(oid, ()))) for oid, nc, nl, genus in rows]
+
+    # Une transaction : appelé au commit (autocommit), chaque ligne serait sinon validée à part
+    with transaction.atomic(), connection.cursor() as cursor:
+        # executemany : bulk_update (CASE WHEN par ligne) domine le temps des flush d'import
+        cursor.executemany(
+            f'UPDATE {Organism._meta.db_table} SET nom_recherche = %s WHERE id = %s',
+            [(doc, oid) for oid, doc in documents],
+        )
+        try:
+            with transaction.atomic():
+                for i in range(0, len(ids), 500):
+                    chunk = ids[i:i + 500]
+                    cursor.execute(
+                        f'DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid IN ({", ".join(["%s"] * len(chunk))})', chunk
+                    )
+                cursor.executemany(
+                    f'INSERT INTO {SQLITE_FTS_TABLE} (rowid, nom_recherche) VALUES (%s, %s)', documents
+                )
+        except OperationalError:
+            pass  # pas de FTS5 : nom_recherche suffit à _search_contains
+    return len(documents)
@@ -0,0 +1,98 @@
+"""
+Maintenance de l'index de recherche des organismes par ensemble « dirty » :
+search_vector et nom_recherche (PostgreSQL), nom_recherche et table FTS5 (SQLite, voir catalog.search).
+
+Les saves (signaux Organism / OrganismNom) et les chemins bulk (sync Radix, imports)
+notent les ids d'organismes modifiés avec mark_search_vectors_dirty ; un seul UPDATE
+ensembliste recalcule ces ids au commit de la transaction (transaction.on_commit),
+ou à la demande via flush_dirty_search_vectors (drain en arrière-plan, fin de commande).
+Le recalcul complet reste disponible : refresh_search_vectors() / rebuild_search_vectors.
+"""
+import threading
+
+from django.db import connection, transaction
+
+# Pondération : A = nom_commun, nom_latin ; B = description, noms (OrganismNom) ; C = usages_autres
+# nom_recherche : mêmes noms + genre, en minuscules sans accents (index trigramme)
+SEARCH_VECTOR_UPDATE_SQL = """
+    UPDATE species_espece SET search_vector =
+        setweight(to_tsvector('simple', coalesce(nom_commun, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(nom_latin, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(usages_autres, '')), 'C')
+        || coalesce(
+            (SELECT setweight(to_tsvector('simple', coalesce(string_agg(nom, ' '), '')), 'B')
+             FROM species_organismnom WHERE organism_id = species_espece.id),
+            to_tsvector('')
+        ),
+        nom_recherche = lower(unaccent(concat_ws(' ',
+            nullif(nom_commun, ''), nullif(nom_latin, ''), nullif(genus, ''),
+            (SELECT string_agg(nom, ' ') FROM species_organismnom WHERE organism_id = species_espece.id)
+        )))
+"""
+FLUSH_CHUNK_SIZE = 5000
+
+_state = threading.local()
+
+
+def _pending():
+    pending = getattr(_state, 'pending', None)
+    if pending is None:
+        pending = _state.pending = set()
+    return pending
+
+
+def search_vectors_supported():
+    return connection.vendor == 'postgresql'
+
+
+def refresh_search_vectors(organism_ids=None):
+    """
+    Recalcule search_vector et nom_recherche pour organism_ids (tous si None), en requêtes
+    ensemblistes de FLUSH_CHUNK_SIZE ids. Retourne le nombre de lignes mises à jour.
+    SQLite : nom_recherche + table FTS5 ; autres moteurs : rien.
+    """
+    if connection.vendor == 'sqlite':
+        from .search import refresh_sqlite_search_index
+
+        return refresh_sqlite_search_index(organism_ids)
+    if not search_vectors_supported():
+        return 0
+    updated = 0
+    with connection.cursor() as cursor:
+        if organism_ids is None:
+            cursor.execute(SEARCH_VECTOR_UPDATE_SQL)
+            return cursor.rowcount
+        ids = sorted(set(organism_ids))
+        for i in range(0, len(ids), FLUSH_CHUNK_SIZE):
+            cursor.execute(SEARCH_VECTOR_UPDATE_SQL + ' WHERE id = ANY(%s)', [ids[i:i + FLUSH_CHUNK_SIZE]])
+            updated += cursor.rowcount
+    return updated
+
+
+def pending_search_vector_ids():
+    """Ids marqués dans ce thread et pas encore recalculés."""
+    return frozenset(_pending())
+
+
+def mark_search_vectors_dirty(organism_ids):
+    """
+    Note des organismes dont search_vector est à recalculer. Le recalcul a lieu au commit
+    de la transaction courante (immédiatement hors transaction).
+    """
+    ids = {oid for oid in organism_ids if oid is not None}
+    if not ids:
+        return
+    _pending().update(ids)
+    # Un rappel par appel : s'il est perdu (rollback de savepoint), le suivant videra tout l'ensemble
+    transaction.on_commit(flush_dirty_search_vectors)
+
+
+def flush_dirty_search_vectors():
+    """Recalcule en un UPDATE les organismes marqués dans ce thread ; retourne le nombre de lignes."""
+    pending = _pending()
+    if not pending:
+        return 0
+    ids = list(pending)
+    pending.clear()
+    return refresh_search_vectors(ids)
@@ -1,42 +1,27 @@
 """
 Signals pour le catalogue (ex: mise à jour search_vector sur Organism).
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import Organism
+from .models import Organism, OrganismNom
+from .search_vectors import mark_search_vectors_dirty
 
 
 @receiver(post_save, sender=Organism)
 def update_organism_search_vector(sender, instance, update_fields=None, **kwargs):
     """
-    Met à jour search_vector après save d'un Organism.
-    Pondération : A = nom_commun, nom_latin ; B = description, usages_autres, noms (OrganismNom).
-    Ne s'exécute pas sur bulk_create/bulk_update (pas de post_save).
+    Marque l'organisme pour recalcul de search_vector au commit (voir catalog.search_vectors).
+    Ne s'exécute pas sur bulk_create/bulk_update (pas de post_save) : ces chemins marquent eux-mêmes.
     Guard : si on ne met à jour que search_vector, ne pas reboucler.
     """
     if update_fields is not None and update_fields == frozenset({'search_vector'}):
         return
-    from django.db import connection
-    if connection.vendor != 'postgresql':
-        return
-    if not hasattr(Organism, 'search_vector') or not hasattr(instance, 'search_vector'):
-        return
-    # Inclut les noms alternatifs (OrganismNom) via sous-requête pour une seule UPDATE
-    with connection.cursor() as cursor:
-        cursor.execute(
-            """
-            UPDATE species_espece SET search_vector =
-                setweight(to_tsvector('simple', coalesce(nom_commun, '')), 'A')
-                || setweight(to_tsvector('simple', coalesce(nom_latin, '')), 'A')
-                || setweight(to_tsvector('simple', coalesce(description, '')), 'B')
-                || setweight(to_tsvector('simple', coalesce(usages_autres, '')), 'C')
-                || coalesce(
-                    (SELECT setweight(to_tsvector('simple', coalesce(string_agg(nom, ' '), '')), 'B')
-                     FROM species_organismnom WHERE organism_id = species_espece.id),
-                    to_tsvector('')
-                )
-            WHERE id = %s
-            """,
-            [instance.pk],
-        )
+    mark_search_vectors_dirty([instance.pk])
+
+
+@receiver(post_save, sender=OrganismNom)
+@receiver(post_delete, sender=OrganismNom)
+def mark_organism_dirty_on_nom_change(sender, instance, **kwargs):
+    """Les noms alternatifs font partie du search_vector du parent."""
+    mark_search_vectors_dirty([instance.organism_id])
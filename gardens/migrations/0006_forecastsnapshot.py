@@ -0,0 +1,29 @@
+# Generated by Django 5.2.11 on 2026-10-17 23:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gardens', '0005_zone_batiment_hauteur_and_couleur_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('issued_at', models.DateTimeField(help_text='Date/heure de récupération de la prévision')),
+                ('days', models.JSONField(blank=True, default=list, help_text='Jours prévus : [{date (ISO), temp_min, temp_max, temp_mean, precipitation_mm, rain_mm, snowfall_cm}]')),
+                ('garden', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='forecast_snapshots', to='gardens.garden')),
+            ],
+            options={
+                'verbose_name': 'Prévision météo',
+                'verbose_name_plural': 'Prévisions météo',
+                'ordering': ['-issued_at'],
+                'unique_together': {('garden', 'issued_at')},
+            },
+        ),
+    ]
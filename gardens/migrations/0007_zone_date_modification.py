@@ -0,0 +1,25 @@
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+
+def backfill_date_modification(apps, schema_editor):
+    Zone = apps.get_model('gardens', 'Zone')
+    Zone.objects.update(date_modification=F('date_creation'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gardens', '0006_forecastsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='zone',
+            name='date_modification',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_date_modification, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.11 on 2026-10-18 00:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gardens', '0007_zone_date_modification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='zone',
+            name='centroide_latitude',
+            field=models.FloatField(blank=True, help_text='Centroïde (calculé depuis boundary)', null=True),
+        ),
+        migrations.AddField(
+            model_name='zone',
+            name='centroide_longitude',
+            field=models.FloatField(blank=True, help_text='Centroïde (calculé depuis boundary)', null=True),
+        ),
+        migrations.AddField(
+            model_name='zone',
+            name='perimetre_m',
+            field=models.FloatField(blank=True, help_text='Périmètre en m (calculé depuis boundary)', null=True),
+        ),
+    ]
@@ -1,7 +1,7 @@
 """
 Jardins, météo, arrosage, préférences utilisateur.
 Models moved from species app; tables unchanged (db_table preserved).
-Zone.boundary : GeoJSON Polygon (JSONField), surface_m2 calculée avec shapely+pyproj (sans GDAL).
+Zone.boundary : GeoJSON Polygon (JSONField), surface, périmètre et centroïde calculés avec shapely+pyproj (species.geometry, sans GDAL).
 """
 from django.conf import settings
 from django.db import models
@@ -133,6 +133,29 @@ class WeatherRecord(models.Model):
         return f"{self.garden.nom} — {self.date}"
 
 
+class ForecastSnapshot(models.Model):
+    """
+    Prévision météo (Open-Meteo) émise pour un jardin à un instant donné.
+    Remplie par la commande refresh_forecasts ; les vues ne lisent que la plus récente encore fraîche.
+    """
+    garden = models.ForeignKey('gardens.Garden', on_delete=models.CASCADE, related_name='forecast_snapshots')
+    issued_at = models.DateTimeField(help_text="Date/heure de récupération de la prévision")
+    days = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Jours prévus : [{date (ISO), temp_min, temp_max, temp_mean, precipitation_mm, rain_mm, snowfall_cm}]",
+    )
+
+    class Meta:
+        verbose_name = "Prévision météo"
+        verbose_name_plural = "Prévisions météo"
+        unique_together = ['garden', 'issued_at']
+        ordering = ['-issued_at']
+
+    def __str__(self):
+        return f"{self.garden.nom} — {self.issued_at:%Y-%m-%d %H:%M}"
+
+
 class SprinklerZone(models.Model):
     """Zone d'arrosage / sprinkler pour automatisaton domotique."""
     garden = models.ForeignKey('gardens.Garden', on_delete=models.CASCADE, related_name='sprinkler_zones')
@@ -193,8 +216,8 @@ class UserPreference(models.Model):
 class Zone(models.Model):
     """
     Zone au sein d'un jardin (polygone GeoJSON, type, surface calculée en m²).
-    boundary : GeoJSON Polygon (WGS84). surface_m2 calculée via projection Québec (EPSG:32198)
-    avec shapely + pyproj (pas de GDAL requis).
+    boundary : GeoJSON Polygon (WGS84). surface, périmètre et centroïde calculés via projection
+    Québec (EPSG:32198) avec shapely + pyproj, sans GDAL (species.geometry).
     """
     TYPE_ZONE_CHOICES = [
         ('stationnement', 'Stationnement'),
@@ -218,6 +241,9 @@ class Zone(models.Model):
         help_text="Polygone GeoJSON (type Polygon, WGS84). Ex: {\"type\":\"Polygon\",\"coordinates\":[[[lng,lat],...]]}",
     )
     surface_m2 = models.FloatField(null=True, blank=True, help_text="Surface en m² (calculée depuis boundary)")
+    perimetre_m = models.FloatField(null=True, blank=True, help_text="Périmètre en m (calculé depuis boundary)")
+    centroide_latitude = models.FloatField(null=True, blank=True, help_text="Centroïde (calculé depuis boundary)")
+    centroide_longitude = models.FloatField(null=True, blank=True, help_text="Centroïde (calculé depuis boundary)")
     batiment_hauteur_m = models.FloatField(
         null=True,
         blank=True,
@@ -226,6 +252,8 @@ class Zone(models.Model):
     couleur = models.CharField(max_length=20, default='#3d5c2e')
     ordre = models.IntegerField(default=0)
     date_creation = models.DateTimeField(auto_now_add=True)
+    # Synchronisation différentielle de l'app (species.delta_sync)
+    date_modification = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         db_table = 'gardens_zone'
@@ -237,22 +265,15 @@ class Zone(models.Model):
         return f"{self.garden.nom} — {self.nom}"
 
     def save(self, *args, **kwargs):
-        if self.boundary and isinstance(self.boundary, dict):
-            try:
-                from shapely.geometry import shape
-                from shapely.ops import transform as shapely_transform
-                from pyproj import Transformer
-                geom = shape(self.boundary)
-                if geom.is_empty or geom.geom_type != 'Polygon':
-                    self.surface_m2 = None
-                else:
-                    transformer = Transformer.from_crs("EPSG:4326", "EPSG:32198", always_xy=True)
-                    projected = shapely_transform(transformer.transform, geom)
-                    self.surface_m2 = projected.area
-            except Exception:
-                self.surface_m2 = None
-        else:
-            self.surface_m2 = None
+        from species.geometry import zone_metrics
+        try:
+            metrics = zone_metrics(self.boundary)
+        except Exception:
+            metrics = {}
+        self.surface_m2 = metrics.get('surface_m2')
+        self.perimetre_m = metrics.get('perimetre_m')
+        self.centroide_latitude = metrics.get('centroide_latitude')
+        self.centroide_longitude = metrics.get('centroide_longitude')
         super().save(*args, **kwargs)
 
 
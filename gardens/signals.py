@@ -3,6 +3,7 @@ Signaux pour jardins (météo auto au create).
 """
 import logging
 
+from django.conf import settings
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
@@ -17,7 +18,7 @@ def fetch_weather_on_garden_create(sender, instance, created, **kwargs):
     Récupère automatiquement la météo lorsqu'un jardin est créé avec des coordonnées,
     ou lorsqu'un jardin existant reçoit des coordonnées pour la première fois.
     """
-    if not instance.a_coordonnees():
+    if not instance.a_coordonnees() or not getattr(settings, "WEATHER_FETCH_ON_GARDEN_SAVE", True):
         return
     has_records = instance.weather_records.exists()
     if created or not has_records:
@@ -128,12 +128,11 @@ DATABASES = {"default": env.db()}
 if DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
     INSTALLED_APPS.insert(INSTALLED_APPS.index("django.contrib.staticfiles") + 1, "django.contrib.postgres")
 
-# Cache (warnings par jardin, TTL 1 h)
-CACHES = {
-    "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-    }
-}
+# Cache (warnings par jardin, index spatial, graphe de compagnonnage, alertes météo) — partagé
+# entre workers gunicorn via CACHE_URL : redis://127.0.0.1:6379/1 (paquet redis requis) ou
+# pymemcache://127.0.0.1:11211 (pylibmc). LocMem (par processus) par défaut : avec plusieurs
+# workers, les invalidations n'atteindraient pas les autres (voir DEPLOYMENT.md, 6.4).
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -235,6 +234,13 @@ POLLINATION_DISTANCE_MAX_DEFAULT_M = float(env("POLLINATION_DISTANCE_MAX_DEFAULT
 CESIUM_ION_ACCESS_TOKEN = env("CESIUM_ION_ACCESS_TOKEN", default="")
 CESIUM_LIDAR_ASSET_ID = env("CESIUM_LIDAR_ASSET_ID", default=None)
 
+# Prévisions météo : URL Open-Meteo (surchargeable pour un serveur local de test) et
+# durée de validité d'une prévision stockée (refresh_forecasts via cron, ex. toutes les 3 h).
+OPEN_METEO_FORECAST_URL = env("OPEN_METEO_FORECAST_URL", default="https://api.open-meteo.com/v1/forecast")
+WEATHER_FORECAST_TTL_S = env.int("WEATHER_FORECAST_TTL_S", default=6 * 3600)
+# Historique météo récupéré à la création d'un jardin géolocalisé (signal gardens) ; False en test / hors ligne
+WEATHER_FETCH_ON_GARDEN_SAVE = env.bool("WEATHER_FETCH_ON_GARDEN_SAVE", default=True)
+
 # Radix Sylva — sync du cache botanique (Pass B)
 RADIX_SYLVA_API_URL = env('RADIX_SYLVA_API_URL', default='http://127.0.0.1:8001/api/v1')
 RADIX_SYLVA_SYNC_API_KEY = env('RADIX_SYLVA_SYNC_API_KEY', default='')
@@ -247,7 +253,7 @@ ADMIN_REORDER = [
     {'app': 'species', 'label': 'Mon BIOT', 'models': ('Specimen', 'Photo')},
     # Contrôles
     {'app': 'species', 'label': 'Contrôles', 'models': ('Event',)},
-    {'app': 'gardens', 'label': 'Contrôles', 'models': ('WeatherRecord', 'SprinklerZone')},
+    {'app': 'gardens', 'label': 'Contrôles', 'models': ('WeatherRecord', 'ForecastSnapshot', 'SprinklerZone')},
     # Configurations et importation de données
     {'app': 'catalog', 'label': 'Configurations et importation de données', 'models': ('UserTag', 'CompanionRelation', 'OrganismAmendment', 'SeedSupplier', 'SeedCollection', 'Amendment', 'RadixSyncState')},
     {'app': 'species', 'label': 'Configurations et importation de données', 'models': ('DataImportRun',)},
@@ -13,6 +13,7 @@ from species.auth_views import RegisterView
 from species.views import (
     cesium_terrain_view,
     companion_network_view,
+    companion_network_data_view,
     weather_dashboard_view,
     trigger_sprinkler_view,
     fetch_garden_weather_view,
@@ -38,6 +39,7 @@ urlpatterns = [
     path('api/auth/token/verify/', TokenVerifyView.as_view(), name='token_verify'),
     path('api/auth/register/', RegisterView.as_view(), name='auth_register'),
     path('admin/species/companion-network/', companion_network_view, name='companion_network'),
+    path('admin/species/companion-network/data/', companion_network_data_view, name='companion_network_data'),
     path('admin/weather/', weather_dashboard_view, name='weather_dashboard'),
     path('admin/species/garden/<int:garden_id>/geocode/', geocode_garden_view, name='geocode_garden'),
     path('admin/weather/fetch/<int:garden_id>/', fetch_garden_weather_view, name='fetch_garden_weather'),
@@ -28,6 +28,7 @@ import type {
   TokenPair,
   ApiError,
   GardenWarningsResponse,
+  GardenSyncResponse,
   SpecimenCompanions,
 } from '@/types/api';
 
@@ -482,12 +483,34 @@ export async function getEventApplyToZonePreview(
 export async function applyEventToZone(
   specimenId: number,
   eventId: number
-): Promise<{ created: number; zone: string }> {
+): Promise<{ created: number; event_ids: number[]; zone: string }> {
   const res = await fetchWithAuth(
     `${getApiBaseUrl()}${ENDPOINTS.specimens}${specimenId}/events/${eventId}/apply-to-zone/`,
     { method: 'POST' }
   );
-  return handleResponse<{ created: number; zone: string }>(res);
+  return handleResponse<{ created: number; event_ids: number[]; zone: string }>(res);
+}
+
+/** Élément d'un lot d'événements : photo_ids = photos déjà envoyées, référencées sans renvoi. */
+export interface EventBatchItem extends EventCreate {
+  specimen: number;
+  photo_ids?: number[];
+  /** Identifiant local (file hors ligne), renvoyé tel quel dans results */
+  client_id?: string;
+}
+
+export interface EventBatchResult {
+  created: number;
+  results: { index: number; client_id?: string; event_id?: number; errors?: Record<string, string[]> }[];
+}
+
+/** Plusieurs événements (spécimens différents) en un appel ; 207 si une partie seulement est créée. */
+export async function createEventsBatch(events: EventBatchItem[]): Promise<EventBatchResult> {
+  const res = await fetchWithAuth(`${getApiBaseUrl()}${ENDPOINTS.specimens}events/batch/`, {
+    method: 'POST',
+    body: JSON.stringify({ events }),
+  });
+  return handleResponse<EventBatchResult>(res);
 }
 
 // --- Specimen reminders ---
@@ -945,6 +968,13 @@ export async function getGardenWarnings(gardenId: number): Promise<GardenWarning
   return handleResponse<GardenWarningsResponse>(res);
 }
 
+/** Changements du jardin depuis cursor (instantané complet sans curseur) ; voir has_more. */
+export async function syncGarden(gardenId: number, cursor?: string | null): Promise<GardenSyncResponse> {
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+  const res = await fetchWithAuth(`${getApiBaseUrl()}${ENDPOINTS.gardens}${gardenId}/sync/${query}`);
+  return handleResponse<GardenSyncResponse>(res);
+}
+
 export async function createGarden(data: GardenCreate): Promise<GardenMinimal> {
   const res = await fetchWithAuth(`${getApiBaseUrl()}${ENDPOINTS.gardens}`, {
     method: 'POST',
@@ -1158,17 +1188,61 @@ export interface RunAdminCommandResult {
   detail?: string;
 }
 
+/** Tâche de fond côté serveur (commande mise en file, exécutée par le worker run_jobs). */
+export interface AdminJob {
+  job_id: number;
+  command: string;
+  status: 'queued' | 'running' | 'success' | 'failure' | 'cancelled';
+  status_display: string;
+  success: boolean | null;
+  finished: boolean;
+  cancel_requested: boolean;
+  output: string;
+  /** À renvoyer en ?offset= pour ne recevoir que la suite de la sortie */
+  offset: number;
+  truncated: boolean;
+}
+
+const ADMIN_JOB_POLL_MS = 2000;
+
+export async function getAdminJob(jobId: number, offset?: number): Promise<AdminJob> {
+  const query = offset != null ? `?offset=${offset}` : '';
+  const res = await fetchWithAuth(`${getApiBaseUrl()}${ENDPOINTS.admin.job(jobId)}${query}`);
+  return handleResponse<AdminJob>(res);
+}
+
+export async function cancelAdminJob(jobId: number): Promise<AdminJob> {
+  const res = await fetchWithAuth(`${getApiBaseUrl()}${ENDPOINTS.admin.jobCancel(jobId)}`, { method: 'POST' });
+  return handleResponse<AdminJob>(res);
+}
+
+/**
+ * Lance la commande (mise en file côté serveur) puis suit la tâche jusqu'à la fin.
+ * onProgress reçoit chaque état intermédiaire (statut, sortie cumulée).
+ */
 export async function runAdminCommand(
   command: string,
-  options: RunAdminCommandOptions = {}
+  options: RunAdminCommandOptions = {},
+  onProgress?: (job: AdminJob, output: string) => void
 ): Promise<RunAdminCommandResult> {
   const res = await fetchWithAuth(`${getApiBaseUrl()}${ENDPOINTS.admin.runCommand}`, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
     body: JSON.stringify({ command, options }),
   });
-  const data = await handleResponse<RunAdminCommandResult>(res);
-  return data;
+  let job = await handleResponse<AdminJob>(res);
+  let output = '';
+  while (!job.finished) {
+    await new Promise((resolve) => setTimeout(resolve, ADMIN_JOB_POLL_MS));
+    job = await getAdminJob(job.job_id, job.offset);
+    output += (job.truncated ? '\n[…]\n' : '') + job.output;
+    onProgress?.(job, output);
+  }
+  return {
+    success: job.success === true,
+    output: output.trim() || job.status_display,
+    detail: job.success ? undefined : job.status_display,
+  };
 }
 
 export interface SpeciesStats {
@@ -1217,3 +1291,37 @@ export async function getWeatherAlerts(): Promise<WeatherAlert[]> {
   const res = await fetchWithAuth(`${getApiBaseUrl()}${ENDPOINTS.weatherAlerts}`);
   return handleResponse<WeatherAlert[]>(res);
 }
+
+// --- Accueil précalculé (rappels, événements attendus, alertes météo en un appel) ---
+export interface ExpectedEvent {
+  type_periode: string;
+  type_periode_display: string;
+  mois_debut: number;
+  mois_fin: number;
+  organisme_id: number;
+  organisme_nom: string;
+  organisme_nom_latin: string;
+  source: string;
+}
+
+export interface DashboardFeed {
+  date: string;
+  month: number;
+  expected_events: ExpectedEvent[];
+  reminders: ReminderUpcoming[];
+  weather_alerts: WeatherAlert[];
+}
+
+let dashboardFeedCache: { etag: string; feed: DashboardFeed } | null = null;
+
+/** Revalidé par ETag : 304 → dernière réponse gardée en mémoire. */
+export async function getDashboardFeed(): Promise<DashboardFeed> {
+  const headers: Record<string, string> = {};
+  if (dashboardFeedCache) headers['If-None-Match'] = dashboardFeedCache.etag;
+  const res = await fetchWithAuth(`${getApiBaseUrl()}${ENDPOINTS.me.dashboard}`, { headers });
+  if (res.status === 304 && dashboardFeedCache) return dashboardFeedCache.feed;
+  const feed = await handleResponse<DashboardFeed>(res);
+  const etag = res.headers.get('ETag');
+  dashboardFeedCache = etag ? { etag, feed } : null;
+  return feed;
+}
@@ -14,7 +14,7 @@ import { Ionicons } from '@expo/vector-icons';
 import { useRouter, useFocusEffect } from 'expo-router';
 import { useCallback, useState, useEffect } from 'react';
 import * as Location from 'expo-location';
-import { getSpecimens, getSpecimensNearby, getRemindersUpcoming, getWeatherAlerts, getRecentEvents, getUserPreferences, ensureValidToken, getAccessToken } from '@/api/client';
+import { getSpecimens, getSpecimensNearby, getDashboardFeed, getRecentEvents, getUserPreferences, ensureValidToken, getAccessToken } from '@/api/client';
 import { getApiBaseUrl } from '@/constants/config';
 import { ActionToolbar } from '@/components/ActionToolbar';
 import { ReminderActionModal } from '@/components/ReminderActionModal';
@@ -108,28 +108,21 @@ export default function HomeScreen() {
     }
   }, []);
 
-  const fetchReminders = useCallback(async () => {
+  // Rappels et alertes météo : un seul appel (accueil précalculé, revalidé par ETag)
+  const fetchDashboard = useCallback(async () => {
     setLoadingReminders(true);
+    setLoadingAlerts(true);
     setRemindersError(null);
     try {
-      const list = await getRemindersUpcoming();
-      setReminders(list);
+      const feed = await getDashboardFeed();
+      setReminders(feed.reminders);
+      setWeatherAlerts(feed.weather_alerts);
     } catch {
       setReminders([]);
+      setWeatherAlerts([]);
       setRemindersError('Rappels indisponibles. Vérifiez la connexion et réessayez.');
     } finally {
       setLoadingReminders(false);
-    }
-  }, []);
-
-  const fetchWeatherAlerts = useCallback(async () => {
-    setLoadingAlerts(true);
-    try {
-      const list = await getWeatherAlerts();
-      setWeatherAlerts(list);
-    } catch {
-      setWeatherAlerts([]);
-    } finally {
       setLoadingAlerts(false);
     }
   }, []);
@@ -156,14 +149,13 @@ export default function HomeScreen() {
       await Promise.allSettled([
         fetchFavoris(),
         fetchNearby(),
-        fetchReminders(),
-        fetchWeatherAlerts(),
+        fetchDashboard(),
         fetchRecentEvents(),
       ]);
     } finally {
       setRefreshing(false);
     }
-  }, [fetchFavoris, fetchNearby, fetchReminders, fetchWeatherAlerts, fetchRecentEvents]);
+  }, [fetchFavoris, fetchNearby, fetchDashboard, fetchRecentEvents]);
 
   useFocusEffect(
     useCallback(() => {
@@ -175,14 +167,13 @@ export default function HomeScreen() {
         });
         fetchFavoris();
         fetchNearby();
-        fetchReminders();
-        fetchWeatherAlerts();
+        fetchDashboard();
         fetchRecentEvents();
       });
       return () => {
         cancelled = true;
       };
-    }, [fetchFavoris, fetchNearby, fetchReminders, fetchWeatherAlerts, fetchRecentEvents])
+    }, [fetchFavoris, fetchNearby, fetchDashboard, fetchRecentEvents])
   );
 
   useEffect(() => {
@@ -315,7 +306,7 @@ export default function HomeScreen() {
         <View style={styles.remindersSection}>
           <Text style={styles.sectionTitle}>Rappels</Text>
           <Text style={styles.remindersErrorText}>{remindersError}</Text>
-          <TouchableOpacity onPress={fetchReminders} style={styles.retryButton}>
+          <TouchableOpacity onPress={fetchDashboard} style={styles.retryButton}>
             <Ionicons name="refresh-outline" size={18} color="#1a3c27" />
             <Text style={styles.retryButtonText}>Réessayer</Text>
           </TouchableOpacity>
@@ -372,7 +363,7 @@ export default function HomeScreen() {
             visible={selectedReminder != null}
             reminder={selectedReminder}
             onClose={() => setSelectedReminder(null)}
-            onAction={fetchReminders}
+            onAction={fetchDashboard}
             onOpenSpecimen={(id) => {
               setSelectedReminder(null);
               router.push(`/specimen/${id}`);
@@ -55,12 +55,15 @@ export const ENDPOINTS = {
   me: {
     profile: `${API_PREFIX}/me/`,
     preferences: `${API_PREFIX}/me/preferences/`,
+    dashboard: `${API_PREFIX}/me/dashboard/`,
     changePassword: `${API_PREFIX}/me/change-password/`,
   },
   admin: {
     users: `${API_PREFIX}/admin/users/`,
     userDetail: (id: number) => `${API_PREFIX}/admin/users/${id}/`,
     runCommand: `${API_PREFIX}/admin/run-command/`,
+    job: (id: number) => `${API_PREFIX}/admin/jobs/${id}/`,
+    jobCancel: (id: number) => `${API_PREFIX}/admin/jobs/${id}/cancel/`,
     speciesStats: `${API_PREFIX}/admin/species-stats/`,
     importVascanFile: `${API_PREFIX}/admin/import-vascan-file/`,
   },
@@ -600,6 +600,25 @@ export interface GardenWarningsResponse {
   total_count: number;
 }
 
+// --- Synchronisation différentielle (GET /api/gardens/<id>/sync/) ---
+export type GardenSyncSource = 'specimens' | 'zones' | 'events' | 'reminders' | 'photos' | 'specimen_groups';
+
+export interface GardenSyncResponse {
+  garden: number;
+  /** À renvoyer tel quel au prochain appel. */
+  cursor: string;
+  high_water_mark: string;
+  /** Instantané complet : remplacer les données locales du jardin. */
+  full: boolean;
+  /** Curseur expiré : instantané complet malgré le curseur envoyé. */
+  reset: boolean;
+  /** Rappeler tout de suite avec le nouveau curseur. */
+  has_more: boolean;
+  /** Lignes complètes (champs du modèle, ids des relations), sections non vides seulement. */
+  changes: Partial<Record<GardenSyncSource, Record<string, unknown>[]>>;
+  deleted: Partial<Record<GardenSyncSource, number[]>>;
+}
+
 // --- Compagnonnage spécimen ---
 export interface CompanionEntry {
   organisme_nom: string;
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+"""
+Benchmarks de performance, hors suite de tests, sur une base de test jetable.
+
+    python scripts/benchmarks.py                       # tous, taille par défaut
+    python scripts/benchmarks.py radix_sync --size 5000
+
+La base est celle de DATABASE_URL, comme pour manage.py test (PostgreSQL pour des chiffres
+représentatifs) : test_<nom> est créée puis détruite, chaque benchmark part d'une base vide
+(transaction annulée à la fin). Les mesures sont écrites sur la sortie standard.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# nom → (fonction, taille par défaut)
+BENCHMARKS = {}
+
+
+def benchmark(default_size):
+    def register(fn):
+        BENCHMARKS[fn.__name__] = (fn, default_size)
+        return fn
+    return register
+
+
+@benchmark(default_size=2000)
+def radix_sync(n):
+    """sync_radixsylva --full contre le stand-in local de l'API : import initial puis re-sync modifié."""
+    from species.tests import radix_sync_dataset, run_radix_sync
+
+    for label, suffix in (("initial", ""), ("re-sync", " v2")):
+        started = time.perf_counter()
+        run_radix_sync(radix_sync_dataset(n, suffix=suffix), page_size=200, no_rebuild_search=True)
+        print(f"sync_radixsylva {label} {n} organismes : {time.perf_counter() - started:.2f} s")
+
+
+def _legacy_organism_search(qs, search):
+    """Ancienne recherche (icontains sur 4 colonnes + jointure noms + distinct)."""
+    from django.db import connection
+    from django.db.models import Q
+
+    lookup = "unaccent__icontains" if connection.vendor == "postgresql" else "icontains"
+    q = Q()
+    for w in [w for w in search.split() if len(w) >= 2] or [search]:
+        q &= (
+            Q(**{f"nom_commun__{lookup}": w}) | Q(**{f"nom_latin__{lookup}": w})
+            | Q(**{f"genus__{lookup}": w}) | Q(**{f"noms__nom__{lookup}": w})
+        )
+    return qs.filter(q).distinct()
+
+
+@benchmark(default_size=20000)
+def organism_search(n):
+    """Recherche d'organismes : ancienne (icontains) contre catalog.search (classée)."""
+    import random
+
+    from catalog.models import OrganismNom
+    from catalog.search import search_organisms
+    from catalog.search_vectors import refresh_search_vectors
+    from species.models import Organism
+
+    rng = random.Random(42)
+    syllables = ["ba", "cer", "di", "fo", "gal", "hu", "li", "mar", "no", "pu", "ros", "sal", "ti", "vé", "zor"]
+
+    def word():
+        return "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+
+    organisms = Organism.objects.bulk_create([
+        Organism(nom_commun=f"{word().capitalize()} {word()}", nom_latin=f"{word().capitalize()} {word()}",
+                 genus=word().capitalize(), type_organisme="vivace")
+        for _ in range(n)
+    ], batch_size=2000)
+    OrganismNom.objects.bulk_create([
+        OrganismNom(organism=o, nom=word(), langue="en", source="bench") for o in organisms
+    ], batch_size=2000)
+    refresh_search_vectors()
+
+    base = Organism.objects.order_by("nom_commun")
+    for term in ("mar", "rosé", "galli", "sal ti"):
+        timings = {}
+        for label, fn in (("legacy", _legacy_organism_search), ("ranked", search_organisms)):
+            started = time.perf_counter()
+            for _ in range(5):
+                qs = fn(base, term)
+                qs.count()
+                list(qs[:50])
+            timings[label] = (time.perf_counter() - started) / 5 * 1000
+        print(f"recherche « {term} » sur {n} : ancienne {timings['legacy']:.1f} ms, classée {timings['ranked']:.1f} ms")
+
+
+@benchmark(default_size=20000)
+def zone_filter(n):
+    """Filtre zone_usda : ancien LIKE sur le JSON contre les bornes ordinales zone_rusticite_min / _max."""
+    import random
+
+    from species.models import Organism
+    from species.source_rules import refresh_zone_rusticite_bounds
+    from species.tests import _legacy_zone_usda_filter
+
+    rng = random.Random(7)
+    Organism.objects.bulk_create([
+        Organism(nom_commun=f"Espèce {i}", type_organisme="vivace", zone_rusticite=[
+            {"zone": f"{rng.randint(1, 11)}{rng.choice('ab')}", "source": src}
+            for src in rng.sample(["hydroquebec", "pfaf", "usda"], rng.randint(0, 3))
+        ])
+        for i in range(n)
+    ], batch_size=2000)
+    refresh_zone_rusticite_bounds()
+
+    base = Organism.objects.order_by("nom_commun")
+    for z in (3, 5, 8):
+        timings, counts = {}, {}
+        for label, fn in (
+            ("legacy", lambda qs: _legacy_zone_usda_filter(qs, z)),
+            ("range", lambda qs: qs.filter(zone_rusticite_min__lte=z * 2 + 1)),
+        ):
+            started = time.perf_counter()
+            for _ in range(5):
+                qs = fn(base)
+                counts[label] = qs.count()
+                list(qs[:50])
+            timings[label] = (time.perf_counter() - started) / 5 * 1000
+        if counts["legacy"] != counts["range"]:
+            print(f"  écart de résultats : ancien {counts['legacy']}, ordinal {counts['range']}")
+        print(f"zone_usda={z} sur {n} : ancien {timings['legacy']:.1f} ms, ordinal {timings['range']:.1f} ms")
+
+
+@benchmark(default_size=10000)
+def pfaf_import(n):
+    """Correspondance des noms (find_or_match_organism contre OrganismResolver) puis import_pfaf complet."""
+    import json
+    import tempfile
+    from io import StringIO
+
+    from django.core.management import call_command
+    from django.db import connection, transaction
+
+    from species.models import DataImportRun, Organism
+    from species.source_rules import OrganismResolver, find_or_match_organism
+
+    Organism.objects.bulk_create([
+        Organism(nom_commun=f"Plante {i}", nom_latin=f"Genus{i % 300} species{i}", slug_latin=f"genus{i % 300}-species{i}",
+                 type_organisme="vivace")
+        for i in range(n // 2)
+    ], batch_size=2000)
+    # Moitié des lignes connues (exact ou avec auteur), moitié nouvelles
+    rows = [
+        {"latin_name": f"Genus{i % 300} species{i}" + (" L." if i % 4 == 1 else ""), "common_name": f"Plante {i}"}
+        for i in range(n)
+    ]
+    known = rows[:n // 2]
+
+    def legacy(batch):
+        for r in batch:
+            find_or_match_organism(Organism, r["latin_name"], r["common_name"], create_missing=False)
+
+    def resolved(batch):
+        resolver = OrganismResolver(Organism)
+        for r in batch:
+            resolver.find_or_match(r["latin_name"], r["common_name"], create_missing=False)
+
+    for label, fn in (("find_or_match_organism", legacy), ("OrganismResolver", resolved)):
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        # Les correspondances « sans auteur » renomment la fiche : chaque variante part du même état
+        with transaction.atomic(), connection.execute_wrapper(count):
+            started = time.perf_counter()
+            fn(known)
+            elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        print(f"{label} : {len(known)} correspondances en {elapsed:.2f} s, {len(queries)} requêtes")
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(rows, f)
+    started = time.perf_counter()
+    try:
+        call_command("import_pfaf", file=f.name, stdout=StringIO())
+    finally:
+        os.unlink(f.name)
+    run = DataImportRun.objects.filter(source="pfaf").latest("started_at")
+    print(
+        f"import_pfaf {n} lignes : {time.perf_counter() - started:.1f} s, {run.stats['rows_per_s']} lignes/s, "
+        f"{Organism.objects.count()} organismes"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks Jardin Biot (base de test jetable).")
+    parser.add_argument("names", nargs="*", metavar="benchmark", help=f"parmi : {', '.join(BENCHMARKS)} (défaut : tous)")
+    parser.add_argument("--size", type=int, help="taille du jeu de données (défaut propre à chaque benchmark)")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"benchmark inconnu : {', '.join(unknown)}")
+
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jardinbiot.settings")
+    import django
+
+    django.setup()
+    from django.db import connection, transaction
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, serialize=False)
+    try:
+        for name in args.names or BENCHMARKS:
+            fn, default_size = BENCHMARKS[name]
+            print(f"== {name}")
+            with transaction.atomic():
+                fn(args.size or default_size)
+                transaction.set_rollback(True)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,7 @@ from django.utils.html import format_html
 
 from .export_utils import (
     export_organisms_csv_simple,
-    export_organisms_pdf,
+    organisms_pdf_response,
     export_specimens_csv,
     export_seed_collections_csv,
 )
@@ -25,7 +25,7 @@ from .models import (
     SpecimenFavorite, OrganismFavorite,
     Event, Reminder, Photo,
     SeedSupplier, SeedCollection, SemisBatch,
-    Garden, WeatherRecord, SprinklerZone,
+    Garden, WeatherRecord, ForecastSnapshot, SprinklerZone,
     UserPreference,
     DataImportRun,
 )
@@ -237,11 +237,7 @@ class OrganismAdmin(admin.ModelAdmin):
 
     @admin.action(description="Exporter en PDF")
     def export_organismes_pdf(self, request, queryset):
-        from django.http import HttpResponse
-        pdf_bytes = export_organisms_pdf(queryset)
-        response = HttpResponse(pdf_bytes, content_type="application/pdf")
-        response["Content-Disposition"] = 'attachment; filename="organismes.pdf"'
-        return response
+        return organisms_pdf_response(queryset)
 
     def changelist_view(self, request, extra_context=None):
         export_type = request.GET.get("export")
@@ -255,11 +251,7 @@ class OrganismAdmin(admin.ModelAdmin):
             if export_type == "csv":
                 return export_organisms_csv_simple(queryset)
             if export_type == "pdf":
-                from django.http import HttpResponse
-                pdf_bytes = export_organisms_pdf(queryset)
-                response = HttpResponse(pdf_bytes, content_type="application/pdf")
-                response["Content-Disposition"] = 'attachment; filename="organismes.pdf"'
-                return response
+                return organisms_pdf_response(queryset)
         extra_context = extra_context or {}
         extra_context["last_pfaf_run"] = DataImportRun.objects.filter(source="pfaf").order_by("-started_at").first()
         extra_context["last_hydroquebec_run"] = (
@@ -604,6 +596,18 @@ class WeatherRecordAdmin(admin.ModelAdmin):
     autocomplete_fields = ['garden']
 
 
+@admin.register(ForecastSnapshot)
+class ForecastSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['garden', 'issued_at', 'nb_jours']
+    list_filter = ['garden']
+    date_hierarchy = 'issued_at'
+    autocomplete_fields = ['garden']
+
+    def nb_jours(self, obj):
+        return len(obj.days or [])
+    nb_jours.short_description = "Jours prévus"
+
+
 class CultivarPollinatorInline(admin.TabularInline):
     model = CultivarPollinator
     extra = 0
@@ -1397,7 +1401,8 @@ class DataImportRunAdmin(admin.ModelAdmin):
     list_filter = ['source', 'status', 'trigger']
     search_fields = ['output_snippet']
     readonly_fields = [
-        'source', 'status', 'started_at', 'finished_at', 'stats', 'output_snippet', 'trigger', 'user',
+        'source', 'status', 'started_at', 'finished_at', 'stats', 'output_snippet', 'output_size', 'trigger', 'user',
+        'command_options', 'cancel_requested', 'worker', 'heartbeat_at',
     ]
     date_hierarchy = 'started_at'
     ordering = ['-started_at']
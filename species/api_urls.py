@@ -15,6 +15,7 @@ from .api_views import (
     GardenGCPViewSet,
     ZoneViewSet,
     export_garden_gcps_csv,
+    DashboardFeedView,
     ExpectedEventsView,
     RemindersUpcomingView,
     WeatherAlertsView,
@@ -25,8 +26,12 @@ from .api_views import (
     AdminUserListView,
     AdminUserDetailView,
     RunAdminCommandView,
+    AdminJobView,
+    AdminJobCancelView,
+    AdminJobEventsView,
     SpeciesStatsView,
     ImportVascanFileView,
+    photo_rendition,
 )
 
 router = DefaultRouter()
@@ -39,16 +44,21 @@ router.register(r'zones', ZoneViewSet, basename='zone')
 
 urlpatterns = [
     path('specimens/by-nfc/<str:uid>/', SpecimenByNfcView.as_view(), name='specimen-by-nfc'),
+    path('photos/<int:pk>/rendition/<str:size>/', photo_rendition, name='photo-rendition'),
     path('expected-events/', ExpectedEventsView.as_view(), name='expected-events'),
     path('reminders/upcoming/', RemindersUpcomingView.as_view(), name='reminders-upcoming'),
     path('weather-alerts/', WeatherAlertsView.as_view(), name='weather-alerts'),
     path('partners/', PartnersListView.as_view(), name='partners-list'),
     path('me/', MeView.as_view(), name='me'),
+    path('me/dashboard/', DashboardFeedView.as_view(), name='me-dashboard'),
     path('me/preferences/', UserPreferencesView.as_view(), name='user-preferences'),
     path('me/change-password/', ChangePasswordView.as_view(), name='change-password'),
     path('admin/users/', AdminUserListView.as_view(), name='admin-user-list'),
     path('admin/users/<int:pk>/', AdminUserDetailView.as_view(), name='admin-user-detail'),
     path('admin/run-command/', RunAdminCommandView.as_view(), name='admin-run-command'),
+    path('admin/jobs/<int:pk>/', AdminJobView.as_view(), name='admin-job-detail'),
+    path('admin/jobs/<int:pk>/cancel/', AdminJobCancelView.as_view(), name='admin-job-cancel'),
+    path('admin/jobs/<int:pk>/events/', AdminJobEventsView.as_view(), name='admin-job-events'),
     path('admin/species-stats/', SpeciesStatsView.as_view(), name='admin-species-stats'),
     path('admin/import-vascan-file/', ImportVascanFileView.as_view(), name='admin-import-vascan-file'),
     path(
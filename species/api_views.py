@@ -4,13 +4,13 @@ Endpoints: specimens, events, reminders, photos, organisms, gardens, NFC lookup.
 """
 import logging
 import re
-from datetime import date, timedelta
-from math import radians, sin, cos, sqrt, atan2
+from datetime import date
 
 logger = logging.getLogger(__name__)
 
 import csv
 import io
+import json
 
 import requests
 from django.conf import settings
@@ -19,18 +19,20 @@ from django.db.models import Exists, OuterRef, Q
 from django.http import HttpResponse
 from rest_framework import status, viewsets, mixins
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
 
 from catalog.models import MissingSpeciesRequest
+from catalog.search import search_organisms
 from gardens.models import GardenGCP, Partner, Zone
 from .models import (
     Cultivar,
     CultivarPorteGreffe,
+    DataImportRun,
     Organism,
-    OrganismCalendrier,
     Garden,
     Specimen,
     SpecimenFavorite,
@@ -45,6 +47,7 @@ from .models import (
 from django.db.models import Prefetch
 
 from .serializers import (
+    FavoritesContext,
     CultivarListSerializer,
     CultivarSerializer,
     OrganismMinimalSerializer,
@@ -66,6 +69,7 @@ from .serializers import (
     SpecimenGroupMemberWriteSerializer,
     EventSerializer,
     EventCreateSerializer,
+    EventBatchItemSerializer,
     EventUpdateSerializer,
     RecentEventSerializer,
     ReminderSerializer,
@@ -74,14 +78,17 @@ from .serializers import (
     PhotoSerializer,
     PhotoCreateSerializer,
 )
+from .source_rules import zone_usda_max_ordinal
+from .utils import _haversine_m
 
 
 def _invalidate_warnings_cache_for_garden(garden_id):
-    """Invalide le cache des warnings d'un jardin (après création/suppression spécimen, rappel, etc.)."""
-    if garden_id is None:
-        return
-    from django.core.cache import cache
-    cache.delete(f'warnings_{garden_id}')
+    """
+    Invalide le cache des warnings d'un jardin (après création/suppression spécimen, rappel, etc.).
+    Incrément de la version du jardin dans le cache partagé : vaut pour tous les workers.
+    """
+    from .garden_cache import invalidate_garden_cache
+    invalidate_garden_cache(garden_id)
 
 
 # --- NFC lookup (priorité : sans auth pour scan rapide en terrain ? Non, garder auth) ---
@@ -123,6 +130,12 @@ class SpecimenViewSet(viewsets.ModelViewSet):
             return SpecimenCreateUpdateSerializer
         return SpecimenDetailSerializer
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        # Favoris de l'utilisateur chargés une fois pour toute la page (is_favori)
+        context['favorites'] = FavoritesContext.for_request(self.request)
+        return context
+
     def get_queryset(self):
         qs = super().get_queryset()
         garden_id = self.request.query_params.get('garden')
@@ -245,7 +258,8 @@ class SpecimenViewSet(viewsets.ModelViewSet):
     def nearby(self, request):
         """
         Spécimens à proximité d'une position GPS.
-        Query params: lat, lng (requis), radius (mètres, défaut 500), limit (défaut 50).
+        Query params: lat, lng (requis), radius (mètres, défaut 1000), limit (défaut 50),
+        garden (optionnel : utilise l'index en grille du jardin, voir species.spatial).
         Retourne la liste triée par distance avec distance_km sur chaque item.
         """
         lat = request.query_params.get('lat')
@@ -276,30 +290,31 @@ class SpecimenViewSet(viewsets.ModelViewSet):
             except (ValueError, TypeError):
                 pass
 
-        def haversine_km(lat1, lon1, lat2, lon2):
-            R = 6371  # Rayon Terre en km
-            lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-            dlat = lat2 - lat1
-            dlon = lon2 - lon1
-            a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
-            c = 2 * atan2(sqrt(a), sqrt(1 - a))
-            return R * c
-
-        specimens = list(
-            Specimen.objects.filter(
-                latitude__isnull=False,
-                longitude__isnull=False,
-            )
-            .select_related('organisme', 'garden', 'photo_principale')
-            .prefetch_related('photos')
-        )
-        with_dist = [
-            (s, haversine_km(lat_f, lng_f, s.latitude, s.longitude))
-            for s in specimens
-        ]
-        with_dist = [(s, d) for s, d in with_dist if d * 1000 <= radius_m]
+        garden_id = request.query_params.get('garden')
+        if garden_id:
+            try:
+                garden_id = int(garden_id)
+            except (ValueError, TypeError):
+                garden_id = None
+        else:
+            garden_id = None
+
+        from .spatial import find_nearby_specimen_ids
+        nearest = find_nearby_specimen_ids(lat_f, lng_f, radius_m, limit, garden_id=garden_id)
+        # Ne charger (relations + photos) que les N plus proches
+        by_id = Specimen.objects.filter(pk__in=[sid for sid, _ in nearest]).select_related(
+            'organisme', 'cultivar', 'garden', 'photo_principale'
+        ).prefetch_related('photos', 'cultivar__porte_greffes').in_bulk()
+        with_dist = []
+        for sid, _ in nearest:
+            s = by_id.get(sid)
+            if s is None or s.latitude is None or s.longitude is None:
+                continue
+            # Distance recalculée sur la ligne fraîche (l'index en grille peut dater de quelques minutes)
+            dist_m = _haversine_m(lat_f, lng_f, s.latitude, s.longitude)
+            if dist_m <= radius_m:
+                with_dist.append((s, dist_m / 1000))
         with_dist.sort(key=lambda x: x[1])
-        with_dist = with_dist[:limit]
 
         serializer = SpecimenListSerializer(
             [s for s, _ in with_dist],
@@ -377,15 +392,6 @@ class SpecimenViewSet(viewsets.ModelViewSet):
         _invalidate_warnings_cache_for_garden(specimen.garden_id)
         return Response(ReminderSerializer(reminder).data, status=status.HTTP_201_CREATED)
 
-    # Mapping type_rappel -> type_event pour "marquer comme complété"
-    REMINDER_TO_EVENT_TYPE = {
-        'arrosage': 'arrosage',
-        'suivi_maladie': 'maladie',
-        'taille': 'taille',
-        'suivi_general': 'observation',
-        'cueillette': 'recolte',
-    }
-
     @action(detail=True, methods=['get', 'patch', 'delete'], url_path='reminders/(?P<reminder_pk>[^/.]+)')
     def reminder_detail(self, request, pk=None, reminder_pk=None):
         """GET/PATCH/DELETE un rappel spécifique."""
@@ -410,47 +416,14 @@ class SpecimenViewSet(viewsets.ModelViewSet):
         """
         specimen = self.get_object()
         reminder = get_object_or_404(Reminder, pk=reminder_pk, specimen=specimen)
-        today = date.today()
-        type_event = self.REMINDER_TO_EVENT_TYPE.get(reminder.type_rappel, 'observation')
-        Event.objects.create(
-            specimen=specimen,
-            type_event=type_event,
-            date=today,
-            titre=reminder.titre or '',
-            description=reminder.description or '',
-        )
-        create_next = reminder.recurrence_rule and reminder.recurrence_rule != 'none'
-        if create_next or request.data.get('create_next'):
-            rule = reminder.recurrence_rule or 'none'
-            if rule == 'biweekly':
-                next_date = today + timedelta(days=14)
-            elif rule == 'annual':
-                next_date = today.replace(year=today.year + 1)
-            elif rule == 'biannual':
-                month = today.month + 6
-                year = today.year
-                if month > 12:
-                    month -= 12
-                    year += 1
-                try:
-                    next_date = date(year, month, min(today.day, 28))
-                except ValueError:
-                    next_date = date(year, month, 28)
-            else:
-                next_date = None
-            if next_date:
-                Reminder.objects.create(
-                    specimen=specimen,
-                    type_rappel=reminder.type_rappel,
-                    date_rappel=next_date,
-                    type_alerte=reminder.type_alerte,
-                    titre=reminder.titre or '',
-                    description=reminder.description or '',
-                    recurrence_rule=reminder.recurrence_rule or 'none',
-                )
-        reminder.delete()
-        _invalidate_warnings_cache_for_garden(specimen.garden_id)
-        return Response({'detail': 'Rappel complété, événement créé.'}, status=status.HTTP_200_OK)
+        reminder.specimen = specimen
+        from .bulk_events import complete_reminder
+        event, next_reminder = complete_reminder(reminder, create_next=bool(request.data.get('create_next')))
+        return Response({
+            'detail': 'Rappel complété, événement créé.',
+            'event_id': event.pk,
+            'next_reminder': ReminderSerializer(next_reminder).data if next_reminder else None,
+        }, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['get', 'post'])
     def events(self, request, pk=None):
@@ -468,6 +441,69 @@ class SpecimenViewSet(viewsets.ModelViewSet):
         serializer.save()
         return Response(EventSerializer(serializer.instance).data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['post'], url_path='events/batch')
+    def events_batch(self, request):
+        """
+        POST /api/specimens/events/batch/ — Lot d'événements (file hors ligne de l'app), un seul appel.
+        Body: { "events": [ { "specimen": 12, "type_event": "paillage", "date": "2026-05-02",
+                              "photo_ids": [3], "client_id": "a1" }, ... ] }
+        Les éléments valides sont créés en une transaction (photos référencées, pas renvoyées).
+        results suit l'ordre du lot : event_id, ou errors. 201 si tout est créé, 207 si en partie, 400 sinon.
+        """
+        from .bulk_events import MAX_BATCH_EVENTS, PHOTO_COPY_FIELDS, create_events
+
+        items = request.data.get('events') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({'detail': 'Liste « events » requise.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > MAX_BATCH_EVENTS:
+            return Response(
+                {'detail': f'Au plus {MAX_BATCH_EVENTS} événements par lot.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        item_serializers = [EventBatchItemSerializer(data=item) for item in items]
+        valid = [ser.is_valid() for ser in item_serializers]
+        validated = [ser.validated_data if ok else None for ser, ok in zip(item_serializers, valid)]
+        specimens = Specimen.objects.only('id', 'garden_id').in_bulk(
+            {data['specimen'] for data in validated if data}
+        )
+        photos = Photo.objects.only('id', 'image', *PHOTO_COPY_FIELDS).in_bulk(
+            {pid for data in validated if data for pid in data['photo_ids']}
+        )
+
+        results = [None] * len(items)
+        to_create, positions = [], []
+        today = date.today()
+        for index, (ser, data) in enumerate(zip(item_serializers, validated)):
+            if data is None:
+                results[index] = {'index': index, 'errors': ser.errors}
+                continue
+            fields = dict(data)
+            client_id = fields.pop('client_id', '')
+            specimen = specimens.get(fields.pop('specimen'))
+            photo_ids = fields.pop('photo_ids')
+            missing = [pid for pid in photo_ids if pid not in photos]
+            if specimen is None or missing:
+                errors = {'specimen': ['Spécimen introuvable.']} if specimen is None else {}
+                if missing:
+                    errors['photo_ids'] = [f'Photos introuvables : {missing}']
+                results[index] = {'index': index, 'client_id': client_id, 'errors': errors}
+                continue
+            if not fields.get('date'):
+                fields['date'] = today
+            to_create.append((specimen, fields, [photos[pid] for pid in photo_ids]))
+            positions.append((index, client_id))
+
+        for (index, client_id), event_id in zip(positions, create_events(to_create)):
+            results[index] = {'index': index, 'client_id': client_id, 'event_id': event_id}
+        created = len(positions)
+        if created == len(items):
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response({'created': created, 'results': results}, status=response_status)
+
     @action(detail=True, methods=['get', 'patch', 'delete'], url_path='events/(?P<event_pk>[^/.]+)')
     def event_detail(self, request, pk=None, event_pk=None):
         """GET/PATCH/DELETE un événement spécifique."""
@@ -500,7 +536,10 @@ class SpecimenViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'], url_path='events/(?P<event_pk>[^/.]+)/apply-to-zone')
     def event_apply_to_zone(self, request, pk=None, event_pk=None):
-        """Applique un événement à tous les spécimens de la même zone (même garden + zone_jardin)."""
+        """
+        Applique un événement à tous les spécimens de la même zone (même garden + zone_jardin),
+        en une transaction ; les photos de l'événement sont référencées, pas renvoyées.
+        """
         specimen = self.get_object()
         event = get_object_or_404(Event, pk=event_pk, specimen=specimen)
         if not specimen.zone_jardin or not specimen.zone_jardin.strip():
@@ -510,24 +549,12 @@ class SpecimenViewSet(viewsets.ModelViewSet):
             )
         zone = specimen.zone_jardin.strip()
         targets = Specimen.objects.filter(
-            garden=specimen.garden,
+            garden_id=specimen.garden_id,
             zone_jardin__iexact=zone,
-        ).exclude(pk=specimen.pk)
-        created = 0
-        for target in targets:
-            Event.objects.create(
-                specimen=target,
-                type_event=event.type_event,
-                date=event.date,
-                heure=event.heure,
-                titre=event.titre or '',
-                description=event.description or '',
-                quantite=event.quantite,
-                unite=event.unite or '',
-                produit_utilise=event.produit_utilise or '',
-            )
-            created += 1
-        return Response({'created': created, 'zone': zone}, status=status.HTTP_200_OK)
+        ).exclude(pk=specimen.pk).only('id', 'garden_id')
+        from .bulk_events import apply_event_to_specimens
+        event_ids = apply_event_to_specimens(event, targets)
+        return Response({'created': len(event_ids), 'event_ids': event_ids, 'zone': zone}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['get', 'post'], url_path='events/(?P<event_pk>[^/.]+)/photos')
     def event_photos(self, request, pk=None, event_pk=None):
@@ -632,38 +659,14 @@ class OrganismPagination(PageNumberPagination):
 
 def filter_organisms_queryset_by_search(qs, search):
     """
-    Recherche sur nom commun, latin, genre et noms alternatifs.
+    Recherche sur nom commun, latin, genre et noms alternatifs, triée par pertinence.
 
     Une requête multi-mots (ex. « Viorne juddii ») impose que chaque mot
     apparaisse dans au moins un de ces champs — ce qui évite l’échec quand
     le nom français et le binôme latin ne sont pas concaténés dans un seul champ.
-    L’ancienne logique full-text PostgreSQL exigeait la phrase entière dans le
-    document indexé, et un seul icontains sur la phrase entière échouait dans le
-    même cas.
+    Voir catalog.search (index trigramme + tsvector, FTS5 sous SQLite).
     """
-    search = (search or '').strip()
-    if not search:
-        return qs
-    words = [w for w in search.split() if len(w) >= 2]
-    if len(words) >= 2:
-        q = Q()
-        for w in words:
-            q &= (
-                Q(nom_commun__unaccent__icontains=w)
-                | Q(nom_latin__unaccent__icontains=w)
-                | Q(genus__unaccent__icontains=w)
-                | Q(noms__nom__unaccent__icontains=w)
-            )
-        return qs.filter(q).distinct()
-    term = words[0] if words else search
-    return qs.filter(
-        Q(nom_commun__unaccent__icontains=search)
-        | Q(nom_latin__unaccent__icontains=search)
-        | Q(nom_commun__unaccent__icontains=term)
-        | Q(nom_latin__unaccent__icontains=term)
-        | Q(genus__unaccent__icontains=term)
-        | Q(noms__nom__unaccent__icontains=term)
-    ).distinct()
+    return search_organisms(qs, search)
 
 
 # --- Organism ViewSet (lecture + création + mise à jour) ---
@@ -690,6 +693,7 @@ class OrganismViewSet(
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
+        context['favorites'] = FavoritesContext.for_request(self.request)
         if self.action == 'create' and self.request:
             context['force_create'] = self.request.data.get('force_create', False)
         return context
@@ -717,13 +721,8 @@ class OrganismViewSet(
         zone_usda = self.request.query_params.get('zone_usda')
         if zone_usda:
             try:
-                z = int(zone_usda)
-                q_zone = Q()
-                for i in range(1, min(z + 1, 14)):
-                    for s in ('a', 'b'):
-                        q_zone |= Q(zone_rusticite__icontains=f'"zone": "{i}{s}"')
-                    q_zone |= Q(zone_rusticite__icontains=f'"zone": "{i}"')
-                qs = qs.filter(q_zone)
+                # Rustique jusqu'en zone N : au moins une zone ≤ Nb (ordinal indexé, voir zone_rusticite_bounds)
+                qs = qs.filter(zone_rusticite_min__lte=zone_usda_max_ordinal(int(zone_usda)))
             except ValueError:
                 pass
         fruits = self.request.query_params.get('fruits')
@@ -757,7 +756,8 @@ class OrganismViewSet(
                     ).exclude(disponible_chez=[])
                 )
             )
-        if self.action == 'list':
+        if self.action == 'list' and not search:
+            # Avec une recherche : ordre de pertinence (-search_rank) posé par catalog.search
             qs = qs.order_by('genus', 'nom_commun')
         if self.action == 'retrieve':
             from .models import CompanionRelation, Cultivar, CultivarPollinator
@@ -1048,7 +1048,8 @@ class GardenViewSet(
 
     def get_permissions(self):
         from rest_framework.permissions import IsAuthenticated
-        if self.action in ('create', 'phenology_alerts', 'warnings'):
+        if self.action in ('create', 'phenology_alerts', 'warnings', 'companions', 'terrain_specimens',
+                           'terrain_contours'):
             return [IsAuthenticated()]
         return []
 
@@ -1062,21 +1063,105 @@ class GardenViewSet(
         alerts = compute_phenology_alerts(garden.id)
         return Response(alerts)
 
+    @action(detail=True, methods=['get'], url_path='companions')
+    def companions(self, request, pk=None):
+        """
+        GET /api/gardens/<id>/companions/ — Compagnonnage de tous les spécimens vivants du jardin en un appel
+        (carte mobile). Liste de { specimen_id, benefices_de, aide_a } (même format que /api/specimens/<id>/companions/).
+        """
+        if not request.user.is_authenticated:
+            return Response({'detail': 'Authentification requise'}, status=status.HTTP_401_UNAUTHORIZED)
+        garden = self.get_object()
+        from .companion import compute_garden_companions
+        return Response(compute_garden_companions(garden.id))
+
     @action(detail=True, methods=['get'], url_path='warnings')
     def warnings(self, request, pk=None):
         """GET /api/gardens/<id>/warnings/ — Rappels en retard, pollinisateurs manquants, alertes phénologiques (cache 1 h)."""
         if not request.user.is_authenticated:
             return Response({'detail': 'Authentification requise'}, status=status.HTTP_401_UNAUTHORIZED)
         garden = self.get_object()
-        from django.core.cache import cache
+        from .garden_cache import get_or_compute
         from .warnings import compute_garden_warnings
-        cache_key = f'warnings_{garden.id}'
-        data = cache.get(cache_key)
-        if data is None:
-            data = compute_garden_warnings(garden.id)
-            cache.set(cache_key, data, timeout=3600)
+        data = get_or_compute('warnings', garden.id, lambda: compute_garden_warnings(garden.id), timeout=3600)
         return Response(data)
 
+    @action(detail=True, methods=['get'], url_path='terrain/specimens')
+    def terrain_specimens(self, request, pk=None):
+        """
+        GET /api/gardens/<id>/terrain/specimens/ — Spécimens de la vue 3D en colonnes (tableaux typés base64,
+        chaînes par dictionnaire ; voir species.terrain_payload). ETag + gzip ; 304 si inchangé.
+        """
+        garden = self.get_object()
+        from .terrain_payload import specimens_etag, specimens_payload
+        etag = specimens_etag(garden.id)
+        if _etag_matches(request, etag):
+            return _not_modified(etag)
+        return _cached_json_response(request, *specimens_payload(garden.id, etag))
+
+    @action(detail=True, methods=['get'], url_path=r'terrain/contours/(?P<zoom>\d+)')
+    def terrain_contours(self, request, pk=None, zoom=None):
+        """GET /api/gardens/<id>/terrain/contours/<zoom>/ — Courbes de niveau simplifiées (0 = grossier)."""
+        garden = self.get_object()
+        from .terrain_payload import MAX_CONTOUR_ZOOM, contours_etag, contours_payload
+        zoom = min(int(zoom), MAX_CONTOUR_ZOOM)
+        etag = contours_etag(garden, zoom)
+        if _etag_matches(request, etag):
+            return _not_modified(etag)
+        return _cached_json_response(request, *contours_payload(garden, zoom))
+
+    @action(detail=True, methods=['get'], url_path='sync')
+    def sync(self, request, pk=None):
+        """
+        GET /api/gardens/<id>/sync/?cursor=… — Changements depuis le curseur (spécimens, zones, événements,
+        rappels, photos, groupes) et suppressions ; sans curseur, instantané complet. Voir species.delta_sync.
+        """
+        garden = self.get_object()
+        from django.core.serializers.json import DjangoJSONEncoder
+        from .delta_sync import InvalidCursor, sync_garden
+        try:
+            payload = sync_garden(garden.id, request.query_params.get('cursor') or None, request=request)
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        body = json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        return _json_bytes_response(request, body)
+
+
+def _json_bytes_response(request, body):
+    """JSON sérialisé, compressé (gzip) si le client l'accepte ; jamais mis en cache."""
+    import gzip
+    use_gzip = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+    response = HttpResponse(gzip.compress(body, compresslevel=6) if use_gzip else body, content_type='application/json')
+    if use_gzip:
+        response['Content-Encoding'] = 'gzip'
+    response['Cache-Control'] = 'private, no-store'
+    response['Vary'] = 'Accept-Encoding'
+    return response
+
+
+def _etag_matches(request, etag):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+    return etag in [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+
+
+def _not_modified(etag):
+    from django.http import HttpResponseNotModified
+    response = HttpResponseNotModified()
+    response['ETag'] = etag
+    return response
+
+
+def _cached_json_response(request, etag, body, gzipped):
+    """JSON déjà sérialisé (et compressé) : gzip si le client l'accepte ; revalidation par ETag à chaque usage."""
+    use_gzip = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+    response = HttpResponse(gzipped if use_gzip else body, content_type='application/json')
+    if use_gzip:
+        response['Content-Encoding'] = 'gzip'
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    response['Vary'] = 'Accept-Encoding, Authorization, Cookie'
+    return response
+
 
 # --- Garden GCP (points de contrôle terrain) ---
 class GardenGCPViewSet(viewsets.ModelViewSet):
@@ -1133,6 +1218,28 @@ def export_garden_gcps_csv(request, garden_pk):
     return response
 
 
+def photo_rendition(request, pk, size):
+    """
+    GET /api/photos/<pk>/rendition/<size>/ — génère la déclinaison manquante puis redirige vers le fichier.
+    Sans authentification, comme les médias qu'elle remplace dans les balises <img>.
+    """
+    from django.http import Http404, HttpResponseRedirect
+    from .photo_renditions import RENDITIONS, generate_renditions, rendition_name
+
+    if size not in RENDITIONS:
+        raise Http404('Taille inconnue')
+    photo = get_object_or_404(Photo, pk=pk)
+    if not photo.image:
+        raise Http404('Photo sans image')
+    try:
+        generate_renditions(photo)
+    except Exception as e:
+        # Image illisible : l'original reste servi
+        logger.warning('Déclinaisons impossibles pour la photo %s : %s', pk, e)
+        return HttpResponseRedirect(photo.image.url)
+    return HttpResponseRedirect(photo.image.storage.url(rendition_name(photo.image.name, size)))
+
+
 # --- Partenaires / Fournisseurs (onglet Partenaires vue 3D) ---
 class PartnersListView(APIView):
     """
@@ -1316,32 +1423,23 @@ class ChangePasswordView(APIView):
 
 
 # --- Rappels à venir (page d'accueil) ---
-def _reminder_to_upcoming_item(r, request, today):
-    """Build one reminder payload with is_overdue and specimen info."""
-    s = r.specimen
-    photo_url = None
-    if s.photo_principale and s.photo_principale.image and request:
-        photo_url = request.build_absolute_uri(s.photo_principale.image.url)
-    else:
-        photos = list(s.photos.all())
-        if photos and photos[0].image and request:
-            photo_url = request.build_absolute_uri(photos[0].image.url)
-    return {
-        'id': r.id,
-        'type_rappel': r.type_rappel,
-        'date_rappel': str(r.date_rappel),
-        'type_alerte': r.type_alerte,
-        'titre': r.titre or '',
-        'description': r.description or '',
-        'is_overdue': r.date_rappel < today,
-        'recurrence_rule': getattr(r, 'recurrence_rule', 'none') or 'none',
-        'specimen': {
-            'id': s.id,
-            'nom': s.nom,
-            'organisme_nom': s.organisme.nom_commun,
-            'photo_url': photo_url,
-        },
-    }
+class DashboardFeedView(APIView):
+    """
+    GET /api/me/dashboard/
+    Accueil de l'app en une lecture : événements attendus du mois, rappels des favoris (is_overdue),
+    alertes météo. Précalculé par utilisateur (species.dashboard_feed) ; ETag, 304 si inchangé.
+    """
+    def get(self, request):
+        if not request.user.is_authenticated:
+            return Response({'detail': 'Authentification requise'}, status=status.HTTP_401_UNAUTHORIZED)
+        from .dashboard_feed import absolute_payload, get_feed
+        feed = get_feed(request.user)
+        if _etag_matches(request, feed.etag):
+            return _not_modified(feed.etag)
+        response = Response(absolute_payload(feed.payload, request))
+        response['ETag'] = feed.etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
 
 
 class ExpectedEventsView(APIView):
@@ -1349,68 +1447,36 @@ class ExpectedEventsView(APIView):
     GET /api/expected-events/?month=5
     Retourne les événements attendus (floraison, récolte, etc.) pour le mois donné,
     basés sur OrganismCalendrier, pour les organismes des spécimens favoris et organismes favoris.
-    month: 1-12 (défaut: mois courant).
+    month: 1-12 (défaut: mois courant, lu dans l'accueil précalculé).
     """
     def get(self, request):
         if not request.user.is_authenticated:
             return Response({'detail': 'Authentification requise'}, status=status.HTTP_401_UNAUTHORIZED)
+        from .dashboard_feed import compute_expected_events, get_feed
+        today = date.today()
         try:
-            month = int(request.query_params.get('month', date.today().month))
+            month = int(request.query_params.get('month', today.month))
         except (TypeError, ValueError):
-            month = date.today().month
+            month = today.month
         if not 1 <= month <= 12:
-            month = date.today().month
-
-        organism_ids_specimens = SpecimenFavorite.objects.filter(
-            user=request.user
-        ).values_list('specimen__organisme_id', flat=True).distinct()
-        organism_ids_fav = OrganismFavorite.objects.filter(
-            user=request.user
-        ).values_list('organism_id', flat=True).distinct()
-        organism_ids = set(organism_ids_specimens) | set(organism_ids_fav)
-        if not organism_ids:
-            return Response([])
-
-        cal = OrganismCalendrier.objects.filter(
-            organisme_id__in=organism_ids,
-            mois_debut__lte=month,
-            mois_fin__gte=month,
-        ).select_related('organisme').order_by('type_periode', 'organisme__nom_commun')
-
-        result = []
-        for c in cal:
-            result.append({
-                'type_periode': c.type_periode,
-                'type_periode_display': c.get_type_periode_display(),
-                'mois_debut': c.mois_debut,
-                'mois_fin': c.mois_fin,
-                'organisme_id': c.organisme_id,
-                'organisme_nom': c.organisme.nom_commun,
-                'organisme_nom_latin': c.organisme.nom_latin or '',
-                'source': c.source,
-            })
-        return Response(result)
+            month = today.month
+        if month == today.month:
+            return Response(get_feed(request.user, today).payload['expected_events'])
+        return Response(compute_expected_events(request.user.pk, month))
 
 
 class RemindersUpcomingView(APIView):
     """
     GET /api/reminders/upcoming/
     Retourne les rappels (passés et à venir) pour les spécimens favoris.
-    Inclut is_overdue=True si date_rappel < aujourd'hui.
+    Inclut is_overdue=True si date_rappel < aujourd'hui. Lu dans l'accueil précalculé.
     """
     def get(self, request):
         if not request.user.is_authenticated:
             return Response({'detail': 'Authentification requise'}, status=status.HTTP_401_UNAUTHORIZED)
-        today = date.today()
-        fav_ids = SpecimenFavorite.objects.filter(user=request.user).values_list('specimen_id', flat=True)
-        reminders = (
-            Reminder.objects.filter(specimen_id__in=fav_ids)
-            .select_related('specimen', 'specimen__organisme', 'specimen__photo_principale')
-            .prefetch_related('specimen__photos')
-            .order_by('date_rappel', 'date_ajout')[:30]
-        )
-        result = [_reminder_to_upcoming_item(r, request, today) for r in reminders]
-        return Response(result)
+        from .dashboard_feed import absolute_payload, get_feed
+        payload = absolute_payload(get_feed(request.user).payload, request)
+        return Response(payload['reminders'])
 
 
 # --- Alertes météo (page d'accueil) ---
@@ -1421,48 +1487,13 @@ class WeatherAlertsView(APIView):
     a) Pas de pluie depuis longtemps → icône avertissement
     b) Gel prévu ou survenu → icône flocon
     c) Température élevée prévue → icône canicule (seuil configurable admin)
+    Calculées depuis les prévisions stockées, partagées entre utilisateurs (species.dashboard_feed).
     """
     def get(self, request):
         if not request.user.is_authenticated:
             return Response({'detail': 'Authentification requise'}, status=status.HTTP_401_UNAUTHORIZED)
-        from .weather_service import (
-            fetch_forecast,
-            get_forecast_alerts,
-            get_watering_alert,
-        )
-        gardens = Garden.objects.filter(
-            latitude__isnull=False,
-            longitude__isnull=False,
-        ).filter(specimens__isnull=False).distinct()
-        alerts = []
-        for g in gardens:
-            # Alerte arrosage (chaud + sec)
-            watering = get_watering_alert(g)
-            if watering:
-                alerts.append({
-                    'type': 'no_rain',
-                    'icon': 'warning',
-                    'message': watering['message'],
-                    'garden_nom': g.nom,
-                })
-            # Prévisions et alertes
-            forecast = fetch_forecast(g, days=7)
-            forecast_alerts = get_forecast_alerts(g, forecast)
-            for fa in forecast_alerts:
-                icon = 'warning'
-                if fa.get('type') == 'frost_risk':
-                    icon = 'snowflake'
-                elif fa.get('type') == 'high_temp_forecast':
-                    icon = 'thermometer'
-                elif fa.get('type') == 'no_rain_forecast':
-                    icon = 'water'
-                alerts.append({
-                    'type': fa.get('type', 'info'),
-                    'icon': icon,
-                    'message': fa.get('message', ''),
-                    'garden_nom': g.nom,
-                })
-        return Response(alerts[:20])  # Limite pour éviter trop d'alertes
+        from .dashboard_feed import get_weather_alerts
+        return Response(get_weather_alerts())
 
 
 # --- Stats espèces (admin) ---
@@ -1537,17 +1568,56 @@ def _build_command_kwargs(command_name: str, options: dict) -> dict:
     return kwargs
 
 
+def _staff_required_response(request):
+    """Réponse 401 / 403 si l'utilisateur n'est pas staff, sinon None."""
+    if not request.user.is_authenticated:
+        return Response({'detail': 'Authentification requise'}, status=status.HTTP_401_UNAUTHORIZED)
+    if not request.user.is_staff:
+        return Response({'detail': 'Droits insuffisants'}, status=status.HTTP_403_FORBIDDEN)
+    return None
+
+
+def _job_payload(run, output='', truncated=False):
+    """État d'une tâche de fond pour le suivi (app mobile, page Gestion des données)."""
+    finished = run.status in DataImportRun.FINISHED_STATUSES
+    return {
+        'job_id': run.pk,
+        'command': run.source,
+        'status': run.status,
+        'status_display': run.get_status_display(),
+        'success': (run.status == 'success') if finished else None,
+        'finished': finished,
+        'cancel_requested': run.cancel_requested,
+        'started_at': run.started_at,
+        'finished_at': run.finished_at,
+        'stats': run.stats,
+        'output': output,
+        'offset': run.output_size,
+        'truncated': truncated,
+    }
+
+
+def _job_urls(request, job_id):
+    from django.urls import reverse
+    return {
+        'status_url': request.build_absolute_uri(reverse('admin-job-detail', args=[job_id])),
+        'events_url': request.build_absolute_uri(reverse('admin-job-events', args=[job_id])),
+        'cancel_url': request.build_absolute_uri(reverse('admin-job-cancel', args=[job_id])),
+    }
+
+
 class RunAdminCommandView(APIView):
     """
     POST /api/admin/run-command/
     Body: { "command": "sync_radixsylva", "options": { "full": true } }
     Réservé aux utilisateurs staff. Commandes autorisées : sync_radixsylva, rebuild_search_vectors, wipe_db_and_media.
+    La commande est mise en file (species.jobs, worker run_jobs) : réponse 202 avec job_id, suivi via
+    /api/admin/jobs/<id>/ (?offset= pour la suite de la sortie) ou /api/admin/jobs/<id>/events/ (SSE).
     """
     def post(self, request):
-        if not request.user.is_authenticated:
-            return Response({'detail': 'Authentification requise'}, status=status.HTTP_401_UNAUTHORIZED)
-        if not request.user.is_staff:
-            return Response({'detail': 'Droits insuffisants'}, status=status.HTTP_403_FORBIDDEN)
+        denied = _staff_required_response(request)
+        if denied:
+            return denied
 
         command = (request.data.get('command') or '').strip()
         if command not in ALLOWED_ADMIN_COMMANDS:
@@ -1561,21 +1631,122 @@ class RunAdminCommandView(APIView):
         if command == 'wipe_db_and_media':
             cmd_kwargs.setdefault('no_input', True)
 
-        from io import StringIO
-        from django.core.management import call_command
+        from .jobs import enqueue_command
+        run = enqueue_command(command, cmd_kwargs, trigger='api', user=request.user, stats=dict(cmd_kwargs))
+        data = _job_payload(run)
+        data.update(_job_urls(request, run.pk))
+        data['output'] = f'Commande « {command} » mise en file (tâche {run.pk}).'
+        return Response(data, status=status.HTTP_202_ACCEPTED)
+
 
-        out = StringIO()
-        err = StringIO()
+class AdminJobView(APIView):
+    """
+    GET /api/admin/jobs/<id>/?offset=<n>
+    État d'une tâche de fond ; output = sortie écrite depuis offset (valeur 'offset' de la réponse
+    précédente), ou les derniers caractères sans offset. truncated : début de la suite perdu.
+    """
+    def get(self, request, pk):
+        denied = _staff_required_response(request)
+        if denied:
+            return denied
+        run = get_object_or_404(DataImportRun, pk=pk)
+        offset = request.query_params.get('offset')
         try:
-            call_command(command, stdout=out, stderr=err, **cmd_kwargs)
-            output = (out.getvalue() + '\n' + err.getvalue()).strip()
-            return Response({'success': True, 'output': output or 'Commande exécutée.'})
-        except SystemExit:
-            output = (out.getvalue() + '\n' + err.getvalue()).strip()
-            return Response({'success': False, 'output': output, 'detail': 'Options manquantes ou erreur'})
-        except Exception as e:
-            output = (out.getvalue() + '\n' + err.getvalue()).strip() or str(e)
-            return Response({'success': False, 'output': output, 'detail': 'Erreur lors de l\'exécution'})
+            offset = int(offset) if offset not in (None, '') else None
+        except ValueError:
+            return Response({'detail': 'offset invalide'}, status=status.HTTP_400_BAD_REQUEST)
+        from .jobs import output_since
+        return Response(_job_payload(run, *output_since(run, offset)))
+
+
+class AdminJobCancelView(APIView):
+    """POST /api/admin/jobs/<id>/cancel/ — Retire une tâche en attente ou demande l'arrêt d'une tâche en cours."""
+    def post(self, request, pk):
+        denied = _staff_required_response(request)
+        if denied:
+            return denied
+        run = get_object_or_404(DataImportRun, pk=pk)
+        if run.status in DataImportRun.FINISHED_STATUSES:
+            return Response({'detail': 'Tâche déjà terminée', **_job_payload(run)}, status=status.HTTP_409_CONFLICT)
+        from .jobs import request_cancel
+        request_cancel(run.pk)
+        run.refresh_from_db()
+        return Response(_job_payload(run))
+
+
+class EventStreamRenderer(BaseRenderer):
+    """text/event-stream : les erreurs (401, 403, 404) deviennent un évènement 'error'."""
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return _sse_event('error', data).encode('utf-8')
+
+
+JOB_EVENTS_POLL_SECONDS = 1.0
+# Durée max d'une connexion SSE : EventSource se reconnecte (Last-Event-ID = offset)
+JOB_EVENTS_MAX_SECONDS = 25
+JOB_EVENTS_KEEPALIVE_SECONDS = 10
+
+
+def _sse_event(event, data, event_id=None):
+    from rest_framework.utils.encoders import JSONEncoder
+    head = f'id: {event_id}\n' if event_id is not None else ''
+    return f'{head}event: {event}\ndata: {json.dumps(data, cls=JSONEncoder)}\n\n'
+
+
+def _job_events(job_id, offset):
+    import time
+    from .jobs import output_since
+
+    deadline = time.monotonic() + JOB_EVENTS_MAX_SECONDS
+    last_status, last_sent = None, time.monotonic()
+    yield f'retry: {int(JOB_EVENTS_POLL_SECONDS * 2000)}\n\n'
+    while True:
+        run = DataImportRun.objects.filter(pk=job_id).first()
+        if run is None:
+            yield _sse_event('end', {'job_id': job_id, 'status': None})
+            return
+        text, truncated = output_since(run, offset)
+        if text or truncated or run.status != last_status:
+            offset, last_status, last_sent = run.output_size, run.status, time.monotonic()
+            yield _sse_event('progress', _job_payload(run, text, truncated), event_id=offset)
+        if run.status in DataImportRun.FINISHED_STATUSES:
+            yield _sse_event('end', {'job_id': job_id, 'status': run.status})
+            return
+        if time.monotonic() >= deadline:
+            return
+        if time.monotonic() - last_sent >= JOB_EVENTS_KEEPALIVE_SECONDS:
+            last_sent = time.monotonic()
+            yield ': keepalive\n\n'
+        time.sleep(JOB_EVENTS_POLL_SECONDS)
+
+
+class AdminJobEventsView(APIView):
+    """
+    GET /api/admin/jobs/<id>/events/ — Suivi en Server-Sent Events : évènements 'progress'
+    (même contenu que AdminJobView, id = offset) puis 'end'. Connexion courte (JOB_EVENTS_MAX_SECONDS) :
+    le client reprend avec Last-Event-ID ; derrière gunicorn synchrone, préférer le suivi par offset.
+    """
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    def get(self, request, pk):
+        denied = _staff_required_response(request)
+        if denied:
+            return denied
+        run = get_object_or_404(DataImportRun, pk=pk)
+        offset = request.META.get('HTTP_LAST_EVENT_ID') or request.query_params.get('offset')
+        try:
+            offset = int(offset) if offset not in (None, '') else None
+        except ValueError:
+            offset = None
+        from django.http import StreamingHttpResponse
+        response = StreamingHttpResponse(_job_events(run.pk, offset), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Nginx : pas de mise en tampon des évènements
+        response['X-Accel-Buffering'] = 'no'
+        return response
 
 
 MISSING_SPECIES_USER_MESSAGE = (
@@ -1699,16 +1870,12 @@ class MissingSpeciesRequestView(APIView):
             radix_response=radix_json if isinstance(radix_json, dict) else {},
         )
 
-        from species.management.commands.sync_radixsylva import (
-            fetch_and_apply_organism,
-            schedule_rebuild_search_vectors_async,
-        )
+        from species.management.commands.sync_radixsylva import fetch_and_apply_organism
 
         sync_ok, _sync_err = fetch_and_apply_organism(oid, dry_run=False, stdout=None)
         organism_payload = None
         sync_error = False
         if sync_ok:
-            schedule_rebuild_search_vectors_async()
             org = Organism.objects.filter(pk=oid).first()
             if org:
                 organism_payload = {
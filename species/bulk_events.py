@@ -0,0 +1,126 @@
+"""
+Création d'événements en masse (application à une zone, lots de la file hors ligne de l'app,
+rappel complété).
+
+Une transaction, un bulk_create par table (Event, puis Photo) : pas de save() par spécimen.
+Les photos d'un événement copié sont référencées, pas recopiées : les nouvelles Photo pointent
+le même fichier (et donc les mêmes déclinaisons, voir photo_renditions). Les caches des jardins
+touchés (garden_cache) sont invalidés une fois, après commit.
+"""
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+# Champs recopiés d'un événement source (application à la zone)
+EVENT_COPY_FIELDS = (
+    'type_event', 'date', 'heure', 'titre', 'description', 'quantite', 'unite',
+    'amendment_id', 'produit_utilise', 'temperature', 'conditions_meteo',
+)
+PHOTO_COPY_FIELDS = (
+    'type_photo', 'titre', 'description', 'date_prise', 'source_url', 'source_author', 'source_license',
+)
+BULK_BATCH_SIZE = 500
+# Taille max d'un lot reçu de l'app (POST /api/specimens/events/batch/)
+MAX_BATCH_EVENTS = 500
+
+# Mapping type_rappel -> type_event pour "marquer comme complété"
+REMINDER_TO_EVENT_TYPE = {
+    'arrosage': 'arrosage',
+    'suivi_maladie': 'maladie',
+    'taille': 'taille',
+    'suivi_general': 'observation',
+    'cueillette': 'recolte',
+}
+
+
+def _invalidate_gardens_on_commit(garden_ids):
+    from .garden_cache import invalidate_garden_cache
+
+    garden_ids = {g for g in garden_ids if g}
+    if garden_ids:
+        transaction.on_commit(lambda: [invalidate_garden_cache(g) for g in sorted(garden_ids)])
+
+
+def create_events(items):
+    """
+    Crée les événements items : [(specimen, {champ: valeur}, [photos à référencer])], specimen
+    étant une instance de Specimen (pour son garden_id). Retourne les ids, dans l'ordre d'items.
+    """
+    from .models import Event, Photo
+
+    if not items:
+        return []
+    with transaction.atomic():
+        events = Event.objects.bulk_create(
+            [Event(specimen_id=specimen.pk, **fields) for specimen, fields, _photos in items],
+            batch_size=BULK_BATCH_SIZE,
+        )
+        photo_refs = [
+            Photo(
+                specimen_id=specimen.pk,
+                event_id=event.pk,
+                image=photo.image.name,
+                **{field: getattr(photo, field) for field in PHOTO_COPY_FIELDS},
+            )
+            for event, (specimen, _fields, photos) in zip(events, items)
+            for photo in photos or ()
+        ]
+        if photo_refs:
+            Photo.objects.bulk_create(photo_refs, batch_size=BULK_BATCH_SIZE)
+        _invalidate_gardens_on_commit(specimen.garden_id for specimen, _fields, _photos in items)
+    return [event.pk for event in events]
+
+
+def apply_event_to_specimens(event, specimens, *, copy_photos=True):
+    """Copie event (et ses photos, par référence) sur chaque spécimen ; retourne les ids créés."""
+    fields = {field: getattr(event, field) for field in EVENT_COPY_FIELDS}
+    photos = list(event.photos.exclude(image='')) if copy_photos else []
+    return create_events([(specimen, fields, photos) for specimen in specimens])
+
+
+def next_reminder_date(rule, today):
+    """Prochaine date d'un rappel récurrent (None si rule n'est pas récurrente)."""
+    if rule == 'biweekly':
+        return today + timedelta(days=14)
+    if rule == 'annual':
+        return date(today.year + 1, today.month, min(today.day, 28) if today.month == 2 else today.day)
+    if rule == 'biannual':
+        month, year = today.month + 6, today.year
+        if month > 12:
+            month -= 12
+            year += 1
+        return date(year, month, min(today.day, 28))
+    return None
+
+
+def complete_reminder(reminder, *, create_next=False, today=None):
+    """
+    Rappel complété : événement du jour créé ; si le rappel est récurrent (ou create_next), il est
+    reporté à sa prochaine date (une mise à jour), sinon supprimé. Une transaction, cache après commit.
+    Retourne (event, rappel reporté ou None).
+    """
+    from .models import Event, Reminder
+
+    today = today or date.today()
+    rule = reminder.recurrence_rule or 'none'
+    next_date = next_reminder_date(rule, today) if (rule != 'none' or create_next) else None
+    specimen = reminder.specimen
+    with transaction.atomic():
+        event = Event.objects.create(
+            specimen_id=reminder.specimen_id,
+            type_event=REMINDER_TO_EVENT_TYPE.get(reminder.type_rappel, 'observation'),
+            date=today,
+            titre=reminder.titre or '',
+            description=reminder.description or '',
+        )
+        if next_date:
+            Reminder.objects.filter(pk=reminder.pk).update(date_rappel=next_date, date_modification=timezone.now())
+            reminder.date_rappel = next_date
+            # update() ne passe pas par les signaux de l'accueil précalculé
+            from .dashboard_feed import mark_specimen_favoriters_stale
+            mark_specimen_favoriters_stale([reminder.specimen_id], 'reminders')
+        else:
+            reminder.delete()
+        _invalidate_gardens_on_commit([specimen.garden_id])
+    return event, (reminder if next_date else None)
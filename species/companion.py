@@ -1,43 +1,151 @@
 """
 Compagnonnage par spécimen : deux directions (bénéficie de / aide à).
-Réutilise species.utils.distance_metres_between_specimens pour les distances.
+
+GardenCompanionMatrix charge une fois les spécimens vivants d'un jardin et les
+CompanionRelation qui touchent leurs espèces, puis calcule les distances au plus
+proche compagnon par paire d'espèces avec un haversine NumPy
+(species.utils.haversine_matrix_m). Les réponses par spécimen et l'endpoint
+groupé /api/gardens/<id>/companions/ lisent cette structure.
 """
+from collections import defaultdict
+
+from django.db.models import Q
+
 from catalog.models import CompanionRelation
 from .models import Specimen
-from .utils import distance_metres_between_specimens
+from .utils import haversine_matrix_m
 
+DEAD_STATUTS = ('mort', 'enleve')
 
-def _companion_status(specimen, other_specimens, distance_optimale_m):
-    """
-    Détermine le statut pour un ensemble de spécimens compagnons dans le même jardin.
-    Retourne (status, distance_m, other_specimen) avec status in ('ACTIF', 'TROP_LOIN', 'MANQUANT').
-    other_specimens: liste de spécimens du jardin (même organisme que le compagnon attendu).
-    On choisit le plus proche si plusieurs (haversine).
-    """
-    if not other_specimens:
-        return 'MANQUANT', None, None
-    best = None
-    best_dist = None
-    for s in other_specimens:
-        d = distance_metres_between_specimens(specimen, s)
-        if best is None:
-            best = s
-            best_dist = d
-            continue
-        if d is None and best_dist is None:
-            best = s
-            continue
-        if d is not None and (best_dist is None or d < best_dist):
-            best = s
-            best_dist = d
-    if best is None:
-        return 'MANQUANT', None, None
-    dist = best_dist
+
+def _empty_companions():
+    return {'benefices_de': {'actifs': [], 'manquants': []}, 'aide_a': {'actifs': [], 'manquants': []}}
+
+
+def _status_from_distance(dist, distance_optimale_m):
+    """Statut ACTIF / TROP_LOIN pour un compagnon présent à dist mètres (None = distance inconnue)."""
     if dist is None:
-        return 'ACTIF', None, best
+        return 'ACTIF'
     if distance_optimale_m is not None and dist > distance_optimale_m:
-        return 'TROP_LOIN', dist, best
-    return 'ACTIF', dist, best
+        return 'TROP_LOIN'
+    return 'ACTIF'
+
+
+def _build_entry(rel, other_organism, status, distance_metres, other_specimen):
+    entry = {
+        'organisme_nom': other_organism.nom_commun or other_organism.nom_latin,
+        'type_relation': rel.type_relation,
+        'type_relation_display': rel.get_type_relation_display(),
+        'force': rel.force,
+        'distance_optimale': rel.distance_optimale,
+        'status': status,
+        'distance_metres': round(distance_metres, 1) if distance_metres is not None else None,
+    }
+    if other_specimen:
+        entry['specimen_id'] = other_specimen['id']
+        entry['specimen_nom'] = other_specimen['nom']
+    return entry
+
+
+class GardenCompanionMatrix:
+    """
+    Structure de compagnonnage précalculée pour un jardin.
+
+    specimens : tous les spécimens du jardin (les morts/enlevés peuvent être interrogés
+    mais ne comptent jamais comme compagnons). Le plus proche compagnon d'une espèce B
+    pour les spécimens d'une espèce A est calculé une seule fois par paire (A, B).
+    """
+
+    def __init__(self, garden_id):
+        self.garden_id = garden_id
+        self.specimens = list(
+            Specimen.objects.filter(garden_id=garden_id)
+            .values('id', 'nom', 'organisme_id', 'statut', 'latitude', 'longitude')
+        )
+        self.by_id = {s['id']: s for s in self.specimens}
+        self.live_by_organism = defaultdict(list)
+        for s in self.specimens:
+            if s['statut'] not in DEAD_STATUTS:
+                self.live_by_organism[s['organisme_id']].append(s)
+
+        organism_ids = {s['organisme_id'] for s in self.specimens}
+        self.relations_as_target = defaultdict(list)
+        self.relations_as_source = defaultdict(list)
+        if organism_ids:
+            for rel in CompanionRelation.objects.filter(
+                Q(organisme_cible_id__in=organism_ids) | Q(organisme_source_id__in=organism_ids)
+            ).select_related('organisme_source', 'organisme_cible'):
+                self.relations_as_target[rel.organisme_cible_id].append(rel)
+                self.relations_as_source[rel.organisme_source_id].append(rel)
+        self._nearest = {}
+
+    def _nearest_for_pair(self, organism_id, other_organism_id):
+        """
+        {specimen_id: (compagnon, distance_m | None)} pour les spécimens de organism_id,
+        compagnon = spécimen vivant de other_organism_id le plus proche (haversine).
+        Sans coordonnées exploitables, le dernier compagnon de la liste est retenu (distance None).
+        """
+        key = (organism_id, other_organism_id)
+        if key in self._nearest:
+            return self._nearest[key]
+        subjects = [s for s in self.specimens if s['organisme_id'] == organism_id]
+        others = self.live_by_organism.get(other_organism_id, [])
+        out = {}
+        if others:
+            import numpy as np
+
+            dist = haversine_matrix_m(
+                [s['latitude'] if s['latitude'] is not None else np.nan for s in subjects],
+                [s['longitude'] if s['longitude'] is not None else np.nan for s in subjects],
+                [o['latitude'] if o['latitude'] is not None else np.nan for o in others],
+                [o['longitude'] if o['longitude'] is not None else np.nan for o in others],
+            )
+            dist = np.where(np.isnan(dist), np.inf, dist)
+            best_idx = dist.argmin(axis=1)
+            for row, s in enumerate(subjects):
+                j = int(best_idx[row])
+                d = dist[row, j]
+                if np.isinf(d):
+                    out[s['id']] = (others[-1], None)
+                else:
+                    out[s['id']] = (others[j], float(d))
+        self._nearest[key] = out
+        return out
+
+    def _direction(self, specimen, relations, other_attr):
+        actifs, manquants = [], []
+        for rel in relations:
+            other_organism = getattr(rel, other_attr)
+            nearest = self._nearest_for_pair(specimen['organisme_id'], other_organism.id).get(specimen['id'])
+            if nearest is None:
+                manquants.append(_build_entry(rel, other_organism, 'MANQUANT', None, None))
+                continue
+            other_specimen, dist = nearest
+            status = _status_from_distance(dist, rel.distance_optimale)
+            actifs.append(_build_entry(rel, other_organism, status, dist, other_specimen))
+        return {'actifs': actifs, 'manquants': manquants}
+
+    def for_specimen(self, specimen_id):
+        """Même payload que compute_specimen_companions pour un spécimen du jardin."""
+        specimen = self.by_id.get(specimen_id)
+        if specimen is None or not specimen['organisme_id']:
+            return _empty_companions()
+        organism_id = specimen['organisme_id']
+        return {
+            # benefices_de: organisme_cible = notre espèce → on cherche organisme_source dans le jardin
+            'benefices_de': self._direction(specimen, self.relations_as_target.get(organism_id, ()), 'organisme_source'),
+            # aide_a: organisme_source = notre espèce → on cherche organisme_cible dans le jardin
+            'aide_a': self._direction(specimen, self.relations_as_source.get(organism_id, ()), 'organisme_cible'),
+        }
+
+    def all_live(self):
+        """[{specimen_id, benefices_de, aide_a}, ...] pour tous les spécimens vivants du jardin."""
+        out = []
+        for s in self.specimens:
+            if s['statut'] in DEAD_STATUTS:
+                continue
+            out.append({'specimen_id': s['id'], **self.for_specimen(s['id'])})
+        return out
 
 
 def compute_specimen_companions(specimen_id):
@@ -54,72 +162,12 @@ def compute_specimen_companions(specimen_id):
         Chaque entrée: organisme_nom, type_relation, type_relation_display, force, distance_optimale,
         status ('ACTIF'|'TROP_LOIN'|'MANQUANT'), distance_metres (si calculée), specimen_id (compagnon si actif/trop_loin).
     """
-    specimen = (
-        Specimen.objects.filter(pk=specimen_id)
-        .select_related('organisme', 'garden')
-        .first()
-    )
-    if not specimen or not specimen.organisme_id or not specimen.garden_id:
-        return {'benefices_de': {'actifs': [], 'manquants': []}, 'aide_a': {'actifs': [], 'manquants': []}}
-
-    garden_id = specimen.garden_id
-    organism_id = specimen.organisme_id
-
-    def build_entry(rel, other_organism, status, distance_metres, other_specimen):
-        type_display = rel.get_type_relation_display() if hasattr(rel, 'get_type_relation_display') else rel.type_relation
-        entry = {
-            'organisme_nom': other_organism.nom_commun or other_organism.nom_latin,
-            'type_relation': rel.type_relation,
-            'type_relation_display': type_display,
-            'force': rel.force,
-            'distance_optimale': rel.distance_optimale,
-            'status': status,
-            'distance_metres': round(distance_metres, 1) if distance_metres is not None else None,
-        }
-        if other_specimen:
-            entry['specimen_id'] = other_specimen.id
-            entry['specimen_nom'] = other_specimen.nom
-        return entry
-
-    benefices_actifs = []
-    benefices_manquants = []
-    # benefices_de: organisme_cible = notre espèce → on cherche organisme_source dans le jardin
-    for rel in CompanionRelation.objects.filter(organisme_cible_id=organism_id).select_related('organisme_source'):
-        others = list(
-            Specimen.objects.filter(
-                garden_id=garden_id,
-                organisme_id=rel.organisme_source_id,
-            ).exclude(statut__in=('mort', 'enleve'))
-        )
-        status, dist_m, other_spec = _companion_status(
-            specimen, others, rel.distance_optimale
-        )
-        entry = build_entry(rel, rel.organisme_source, status, dist_m, other_spec)
-        if status == 'ACTIF' or status == 'TROP_LOIN':
-            benefices_actifs.append(entry)
-        else:
-            benefices_manquants.append(entry)
-
-    aide_actifs = []
-    aide_manquants = []
-    # aide_a: organisme_source = notre espèce → on cherche organisme_cible dans le jardin
-    for rel in CompanionRelation.objects.filter(organisme_source_id=organism_id).select_related('organisme_cible'):
-        others = list(
-            Specimen.objects.filter(
-                garden_id=garden_id,
-                organisme_id=rel.organisme_cible_id,
-            ).exclude(statut__in=('mort', 'enleve'))
-        )
-        status, dist_m, other_spec = _companion_status(
-            specimen, others, rel.distance_optimale
-        )
-        entry = build_entry(rel, rel.organisme_cible, status, dist_m, other_spec)
-        if status == 'ACTIF' or status == 'TROP_LOIN':
-            aide_actifs.append(entry)
-        else:
-            aide_manquants.append(entry)
-
-    return {
-        'benefices_de': {'actifs': benefices_actifs, 'manquants': benefices_manquants},
-        'aide_a': {'actifs': aide_actifs, 'manquants': aide_manquants},
-    }
+    garden_id = Specimen.objects.filter(pk=specimen_id).values_list('garden_id', flat=True).first()
+    if not garden_id:
+        return _empty_companions()
+    return GardenCompanionMatrix(garden_id).for_specimen(specimen_id)
+
+
+def compute_garden_companions(garden_id):
+    """Statut de compagnonnage de tous les spécimens vivants d'un jardin (un seul calcul)."""
+    return GardenCompanionMatrix(garden_id).all_live()
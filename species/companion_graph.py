@@ -0,0 +1,163 @@
+"""
+Graphe du réseau de compagnonnage (page admin companion-network et son endpoint JSON).
+
+Les nœuds (organismes reliés) et arêtes (CompanionRelation) sont matérialisés une fois,
+en une requête values(), puis gardés dans le cache partagé (species.garden_cache, portée
+GRAPH_SCOPE) et en mémoire du processus pour la version courante. Toute modification de
+relation (signaux, sync Radix) incrémente la version : le graphe suivant est reconstruit.
+
+subgraph() filtre sans requête : types de relation, force minimale, voisinage à k sauts
+d'un organisme (liens parcourus dans les deux sens). L'ETag d'une réponse dépend de la
+version du graphe et des paramètres : un client à jour reçoit 304 sans calcul.
+"""
+import hashlib
+import threading
+from collections import defaultdict, deque
+
+from django.db import transaction
+
+from .garden_cache import garden_cache_key, get_or_compute, invalidate_garden_cache
+
+GRAPH_SCOPE = 'companions'
+GRAPH_CACHE_PREFIX = 'companion_graph'
+GRAPH_CACHE_TIMEOUT = 24 * 3600
+MAX_DEPTH = 3
+
+POSITIVE_COLOR = '#2d5a27'  # Vert forêt
+NEGATIVE_COLOR = '#8b2500'
+POSITIVE_MARKERS = (
+    'positif', 'fixateur', 'attire', 'mycorhize', 'abri', 'support', 'accumulateur', 'repousse', 'coupe',
+)
+
+_memo = {'key': None, 'graph': None}
+_memo_lock = threading.Lock()
+
+
+def is_positive_relation(type_relation):
+    return any(marker in type_relation for marker in POSITIVE_MARKERS)
+
+
+class CompanionGraph:
+    """Nœuds et arêtes au format vis-network, avec index d'adjacence par organisme."""
+
+    def __init__(self, nodes, edges):
+        self.nodes = nodes  # {organism_id: nœud}
+        self.edges = edges  # [arête], 'from' / 'to' = organism_id
+        self.adjacency = defaultdict(list)  # organism_id → indices d'arêtes (entrantes et sortantes)
+        for index, edge in enumerate(edges):
+            self.adjacency[edge['from']].append(index)
+            self.adjacency[edge['to']].append(index)
+
+    def subgraph(self, center=None, depth=1, types=None, min_force=None):
+        """
+        Sous-graphe {'nodes', 'edges'} : arêtes de type dans types (tous si vide) et de force
+        >= min_force ; si center, seulement les organismes à depth sauts au plus de center.
+        """
+        types = set(types or ())
+
+        def keep(edge):
+            if types and edge['type_relation'] not in types:
+                return False
+            return min_force is None or edge['force'] >= min_force
+
+        if center is None:
+            edges = [e for e in self.edges if keep(e)]
+            node_ids = {e['from'] for e in edges} | {e['to'] for e in edges}
+        else:
+            if center not in self.nodes:
+                return {'nodes': [], 'edges': []}
+            node_ids = {center}
+            frontier = deque([(center, 0)])
+            while frontier:
+                organism_id, distance = frontier.popleft()
+                if distance >= depth:
+                    continue
+                for index in self.adjacency.get(organism_id, ()):
+                    edge = self.edges[index]
+                    if keep(edge):
+                        other = edge['to'] if edge['from'] == organism_id else edge['from']
+                        if other not in node_ids:
+                            node_ids.add(other)
+                            frontier.append((other, distance + 1))
+            # Sous-graphe induit : aussi les liens entre voisins du dernier saut
+            edge_indices = {
+                index for node_id in node_ids for index in self.adjacency.get(node_id, ())
+                if self.edges[index]['from'] in node_ids and self.edges[index]['to'] in node_ids
+                and keep(self.edges[index])
+            }
+            edges = [self.edges[index] for index in sorted(edge_indices)]
+        nodes = [self.nodes[node_id] for node_id in sorted(node_ids, key=lambda i: self.nodes[i]['label'])]
+        return {'nodes': nodes, 'edges': edges}
+
+
+def build_companion_graph():
+    """Matérialise le graphe complet (une requête, sans instances de modèle)."""
+    from catalog.models import CompanionRelation
+
+    labels = dict(CompanionRelation.TYPE_RELATION_CHOICES)
+    nodes, edges = {}, []
+    rows = CompanionRelation.objects.order_by('id').values_list(
+        'id', 'type_relation', 'force', 'description',
+        'organisme_source_id', 'organisme_source__nom_commun', 'organisme_source__nom_latin',
+        'organisme_cible_id', 'organisme_cible__nom_commun', 'organisme_cible__nom_latin',
+    )
+    for (rel_id, type_relation, force, description,
+         source_id, source_nom, source_latin, cible_id, cible_nom, cible_latin) in rows.iterator(chunk_size=2000):
+        for organism_id, nom, latin in ((source_id, source_nom, source_latin), (cible_id, cible_nom, cible_latin)):
+            if organism_id not in nodes:
+                nodes[organism_id] = {
+                    'id': organism_id,
+                    'label': nom,
+                    'title': f'{nom} ({latin})' if latin else nom,
+                    'color': POSITIVE_COLOR,
+                }
+        display = labels.get(type_relation, type_relation)
+        title = f'{source_nom} → {cible_nom}\n{display}\nForce: {force}'
+        if description:
+            title += f'\n{description}'
+        edges.append({
+            'id': rel_id,
+            'from': source_id,
+            'to': cible_id,
+            'type_relation': type_relation,
+            'force': force,
+            'label': display[:30],
+            'title': title,
+            'color': {'color': POSITIVE_COLOR if is_positive_relation(type_relation) else NEGATIVE_COLOR},
+            'width': max(1, force // 2),
+        })
+    return CompanionGraph(nodes, edges)
+
+
+def companion_graph_version_key():
+    """Clé versionnée du graphe courant (change à chaque invalidation)."""
+    return garden_cache_key(GRAPH_CACHE_PREFIX, GRAPH_SCOPE)
+
+
+def get_companion_graph():
+    """Graphe de la version courante : mémoire du processus, sinon cache partagé, sinon reconstruit."""
+    key = companion_graph_version_key()
+    with _memo_lock:
+        if _memo['key'] == key:
+            return _memo['graph']
+    graph = get_or_compute(GRAPH_CACHE_PREFIX, GRAPH_SCOPE, build_companion_graph, timeout=GRAPH_CACHE_TIMEOUT)
+    with _memo_lock:
+        _memo['key'], _memo['graph'] = key, graph
+    return graph
+
+
+def subgraph_etag(center=None, depth=1, types=None, min_force=None):
+    """ETag d'un sous-graphe : version du graphe + paramètres normalisés."""
+    params = f'{center}|{depth if center is not None else ""}|{",".join(sorted(types or ()))}|{min_force}'
+    digest = hashlib.sha1(f'{companion_graph_version_key()}|{params}'.encode('utf-8')).hexdigest()[:20]
+    return f'"cg-{digest}"'
+
+
+def _bump_graph_version():
+    invalidate_garden_cache(GRAPH_SCOPE)
+
+
+def invalidate_companion_graph():
+    """À appeler après une modification de relations hors signaux (bulk_create, update) ; effectif au commit."""
+    transaction.on_commit(_bump_graph_version)
+
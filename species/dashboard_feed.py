@@ -0,0 +1,267 @@
+"""
+Page d'accueil de l'app précalculée par utilisateur (GET /api/me/dashboard/, modèle DashboardFeed).
+
+Trois sections : événements attendus du mois (calendrier des organismes favoris), rappels des
+spécimens favoris (en retard et à venir), alertes météo (communes à tous, lues depuis les
+prévisions stockées). Les signaux (species.signals) marquent à recalculer les sections touchées
+chez les seuls utilisateurs concernés ; get_feed() ne recalcule que celles-là, et tout au
+changement de jour (is_overdue, mois courant). refresh_dashboard_feeds fait ce passage la nuit.
+
+Les URL sont enregistrées relatives (le stockage ne connaît pas l'hôte) et rendues absolues à
+la lecture ; l'ETag porte sur le contenu enregistré.
+"""
+import hashlib
+import json
+from datetime import date
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+FEED_REMINDERS_LIMIT = 30
+FEED_WEATHER_ALERTS_LIMIT = 20
+WEATHER_ALERTS_CACHE_KEY = 'dashboard_weather_alerts'
+WEATHER_ALERTS_CACHE_TIMEOUT = 3 * 3600
+
+# Section → champ « à recalculer » de DashboardFeed
+SECTIONS = {
+    'expected_events': 'expected_stale',
+    'reminders': 'reminders_stale',
+    'weather_alerts': 'weather_stale',
+}
+WEATHER_ICONS = {
+    'frost_risk': 'snowflake',
+    'high_temp_forecast': 'thermometer',
+    'no_rain_forecast': 'water',
+}
+
+
+def _favorite_organism_ids(user_id):
+    from .models import OrganismFavorite, SpecimenFavorite
+
+    return set(
+        SpecimenFavorite.objects.filter(user_id=user_id).values_list('specimen__organisme_id', flat=True)
+    ) | set(OrganismFavorite.objects.filter(user_id=user_id).values_list('organism_id', flat=True))
+
+
+def compute_expected_events(user_id, month):
+    """Périodes du calendrier (floraison, récolte…) couvrant month, pour les organismes favoris."""
+    from .models import OrganismCalendrier
+
+    organism_ids = _favorite_organism_ids(user_id)
+    if not organism_ids:
+        return []
+    cal = OrganismCalendrier.objects.filter(
+        organisme_id__in=organism_ids,
+        mois_debut__lte=month,
+        mois_fin__gte=month,
+    ).select_related('organisme').order_by('type_periode', 'organisme__nom_commun')
+    return [
+        {
+            'type_periode': c.type_periode,
+            'type_periode_display': c.get_type_periode_display(),
+            'mois_debut': c.mois_debut,
+            'mois_fin': c.mois_fin,
+            'organisme_id': c.organisme_id,
+            'organisme_nom': c.organisme.nom_commun,
+            'organisme_nom_latin': c.organisme.nom_latin or '',
+            'source': c.source,
+        }
+        for c in cal
+    ]
+
+
+def _specimen_photo(specimen):
+    photo = specimen.photo_principale if specimen.photo_principale and specimen.photo_principale.image else None
+    if photo is None:
+        photos = list(specimen.photos.all())
+        photo = photos[0] if photos and photos[0].image else None
+    return photo
+
+
+def compute_upcoming_reminders(user_id, today):
+    """Rappels des spécimens favoris (en retard puis à venir), URL de photo relatives."""
+    from django.urls import reverse
+
+    from .models import Reminder, SpecimenFavorite
+
+    fav_ids = SpecimenFavorite.objects.filter(user_id=user_id).values_list('specimen_id', flat=True)
+    reminders = (
+        Reminder.objects.filter(specimen_id__in=fav_ids)
+        .select_related('specimen', 'specimen__organisme', 'specimen__photo_principale')
+        .prefetch_related('specimen__photos')
+        .order_by('date_rappel', 'date_ajout')[:FEED_REMINDERS_LIMIT]
+    )
+    result = []
+    for r in reminders:
+        s = r.specimen
+        photo = _specimen_photo(s)
+        result.append({
+            'id': r.id,
+            'type_rappel': r.type_rappel,
+            'date_rappel': str(r.date_rappel),
+            'type_alerte': r.type_alerte,
+            'titre': r.titre or '',
+            'description': r.description or '',
+            'is_overdue': r.date_rappel < today,
+            'recurrence_rule': r.recurrence_rule or 'none',
+            'specimen': {
+                'id': s.id,
+                'nom': s.nom,
+                'organisme_nom': s.organisme.nom_commun,
+                'photo_url': photo.image.url if photo else None,
+                # Vue qui génère la déclinaison au besoin puis redirige
+                'photo_thumb_url': reverse('photo-rendition', args=[photo.pk, 'thumb']) if photo else None,
+            },
+        })
+    return result
+
+
+def compute_weather_alerts():
+    """Alertes météo des jardins qui ont des spécimens, depuis les prévisions stockées (sans réseau)."""
+    from gardens.models import Garden
+
+    from .weather_service import get_forecast_alerts, get_stored_forecasts, get_watering_alert
+
+    gardens = list(Garden.objects.filter(
+        latitude__isnull=False,
+        longitude__isnull=False,
+    ).filter(specimens__isnull=False).distinct())
+    forecasts = get_stored_forecasts(gardens, days=7)
+    alerts = []
+    for g in gardens:
+        watering = get_watering_alert(g)
+        if watering:
+            alerts.append({'type': 'no_rain', 'icon': 'warning', 'message': watering['message'], 'garden_nom': g.nom})
+        for fa in get_forecast_alerts(g, forecasts[g.pk]):
+            alerts.append({
+                'type': fa.get('type', 'info'),
+                'icon': WEATHER_ICONS.get(fa.get('type'), 'warning'),
+                'message': fa.get('message', ''),
+                'garden_nom': g.nom,
+            })
+    return alerts[:FEED_WEATHER_ALERTS_LIMIT]
+
+
+def get_weather_alerts():
+    """compute_weather_alerts() partagé entre utilisateurs ; oublié par mark_weather_stale()."""
+    alerts = cache.get(WEATHER_ALERTS_CACHE_KEY)
+    if alerts is None:
+        alerts = compute_weather_alerts()
+        cache.set(WEATHER_ALERTS_CACHE_KEY, alerts, timeout=WEATHER_ALERTS_CACHE_TIMEOUT)
+    return alerts
+
+
+def _etag(payload):
+    body = json.dumps(payload, cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':'))
+    return '"' + hashlib.sha1(body.encode('utf-8')).hexdigest()[:24] + '"'
+
+
+def refresh_feed(feed, today=None):
+    """
+    Recalcule les sections à recalculer (toutes si le jour a changé) ; enregistre si besoin.
+
+    Les indicateurs des sections recalculées sont remis à faux avant le calcul, puis seuls
+    payload / etag / computed_on sont écrits : un signal reçu pendant le calcul laisse son
+    indicateur levé et la section sera recalculée à la lecture suivante.
+    """
+    from django.utils import timezone
+
+    from .models import DashboardFeed
+
+    today = today or date.today()
+    new_day = feed.computed_on != today
+    payload = dict(feed.payload or {})
+    stale = {name: new_day or getattr(feed, flag) or name not in payload for name, flag in SECTIONS.items()}
+    if not any(stale.values()):
+        return feed
+    flags = {SECTIONS[name]: False for name, is_stale in stale.items() if is_stale}
+    DashboardFeed.objects.filter(pk=feed.pk).update(**flags)
+    try:
+        if stale['expected_events']:
+            payload['expected_events'] = compute_expected_events(feed.user_id, today.month)
+        if stale['reminders']:
+            payload['reminders'] = compute_upcoming_reminders(feed.user_id, today)
+        if stale['weather_alerts']:
+            payload['weather_alerts'] = get_weather_alerts()
+    except Exception:
+        _mark(Q(pk=feed.pk), [name for name, is_stale in stale.items() if is_stale])
+        raise
+    payload.update(date=today.isoformat(), month=today.month)
+    fields = {'payload': payload, 'etag': _etag(payload), 'computed_on': today, 'updated_at': timezone.now()}
+    # update() et non save() : les indicateurs relevés entre-temps ne sont pas écrasés
+    DashboardFeed.objects.filter(pk=feed.pk).update(**fields)
+    for name, value in {**flags, **fields}.items():
+        setattr(feed, name, value)
+    return feed
+
+
+def get_feed(user, today=None):
+    """Accueil de user, à jour : une lecture par clé primaire quand rien n'a changé."""
+    from .models import DashboardFeed
+
+    feed, _created = DashboardFeed.objects.get_or_create(user_id=user.pk)
+    return refresh_feed(feed, today)
+
+
+def absolute_payload(payload, request):
+    """Copie de payload avec les URL de photo absolues (hôte de la requête)."""
+    reminders = []
+    for item in payload.get('reminders', []):
+        specimen = dict(item['specimen'])
+        for key in ('photo_url', 'photo_thumb_url'):
+            if specimen.get(key) and request:
+                specimen[key] = request.build_absolute_uri(specimen[key])
+        reminders.append({**item, 'specimen': specimen})
+    return {**payload, 'reminders': reminders}
+
+
+def refresh_all_feeds(today=None):
+    """Passage de nuit : recalcule les accueils d'un autre jour ou marqués. Retourne le nombre recalculé."""
+    from .models import DashboardFeed
+
+    today = today or date.today()
+    stale = Q(computed_on__lt=today) | Q(computed_on__isnull=True)
+    for flag in SECTIONS.values():
+        stale |= Q(**{flag: True})
+    count = 0
+    for feed in DashboardFeed.objects.filter(stale).iterator(chunk_size=200):
+        refresh_feed(feed, today)
+        count += 1
+    return count
+
+
+# --- Invalidation (signaux) : une requête UPDATE, sans recalcul ---
+
+def _mark(users_filter, sections):
+    from .models import DashboardFeed
+
+    DashboardFeed.objects.filter(users_filter).update(**{SECTIONS[name]: True for name in sections})
+
+
+def mark_users_stale(user_ids, *sections):
+    _mark(Q(user_id__in=list(user_ids)), sections)
+
+
+def mark_specimen_favoriters_stale(specimen_ids, *sections):
+    """Utilisateurs qui ont l'un de ces spécimens en favori."""
+    from .models import SpecimenFavorite
+
+    _mark(Q(user_id__in=SpecimenFavorite.objects.filter(specimen_id__in=list(specimen_ids)).values('user_id')), sections)
+
+
+def mark_organism_favoriters_stale(organism_id, *sections):
+    """Utilisateurs qui ont l'organisme en favori, directement ou par un spécimen."""
+    from .models import OrganismFavorite, SpecimenFavorite
+
+    _mark(
+        Q(user_id__in=OrganismFavorite.objects.filter(organism_id=organism_id).values('user_id'))
+        | Q(user_id__in=SpecimenFavorite.objects.filter(specimen__organisme_id=organism_id).values('user_id')),
+        sections,
+    )
+
+
+def mark_weather_stale():
+    """Nouvelles prévisions ou relevés : alertes météo à recalculer chez tous."""
+    cache.delete(WEATHER_ALERTS_CACHE_KEY)
+    _mark(Q(), ('weather_alerts',))
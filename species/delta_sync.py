@@ -0,0 +1,251 @@
+"""
+Synchronisation différentielle de l'app mobile (GET /api/gardens/<id>/sync/).
+
+Le client garde un curseur opaque (signé) ; chaque appel ne renvoie que les lignes créées ou
+modifiées depuis (date_modification) et les suppressions (SyncTombstone), pour les sections
+SOURCES du jardin. Sans curseur : instantané complet (full), à paginer comme le reste.
+
+- Marque haute : maintenant - SYNC_SETTLE_SECONDS. auto_now est posé avant le commit : une ligne
+  enregistrée juste avant la marque peut ne devenir visible qu'après ; on ne lit donc que
+  jusqu'à la marque, la suite viendra au prochain appel.
+- Position par section (date_modification, id) : pagination par clé, SYNC_PAGE_SIZE lignes au
+  plus par section et par appel (has_more = rappeler tout de suite avec le nouveau curseur).
+- Curseur plus vieux que TOMBSTONE_RETENTION (suppressions purgées) : instantané complet (reset).
+- Spécimen déplacé : suppression pour l'ancien jardin, lui et ses enfants modifiés pour le nouveau.
+"""
+from datetime import timedelta
+
+from django.apps import apps
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+SYNC_PAGE_SIZE = 1000
+SYNC_SETTLE_SECONDS = 5
+TOMBSTONE_RETENTION = timedelta(days=90)
+CURSOR_SALT = 'species.delta_sync'
+CURSOR_VERSION = 1
+
+# Section → (modèle, lookup vers le jardin)
+SOURCES = {
+    'specimens': ('species.Specimen', 'garden_id'),
+    'zones': ('gardens.Zone', 'garden_id'),
+    'events': ('species.Event', 'specimen__garden_id'),
+    'reminders': ('species.Reminder', 'specimen__garden_id'),
+    'photos': ('species.Photo', 'specimen__garden_id'),
+    'specimen_groups': ('species.SpecimenGroup', 'members__specimen__garden_id'),
+}
+
+
+class InvalidCursor(Exception):
+    """Curseur illisible (altéré) ou d'un autre jardin."""
+
+
+def record_tombstone(instance):
+    """Enregistre la suppression d'une ligne synchronisée (signal post_delete, species.signals)."""
+    from .models import SyncTombstone
+
+    source = next((name for name, (label, _lookup) in SOURCES.items() if label == instance._meta.label), None)
+    if source is None:
+        return
+    if source == 'specimen_groups':
+        # Un groupe n'a pas de jardin : une trace par jardin de ses membres (relevés au pre_delete)
+        SyncTombstone.objects.bulk_create([
+            SyncTombstone(source=source, object_id=instance.pk, garden_id=garden_id)
+            for garden_id in getattr(instance, '_sync_garden_ids', ())
+        ])
+        return
+    garden_id = specimen_id = None
+    if source in ('specimens', 'zones'):
+        garden_id = instance.garden_id
+    else:
+        specimen_id = instance.specimen_id
+        if specimen_id is None:
+            # Photo d'organisme (catalogue) : hors synchro du jardin
+            return
+    SyncTombstone.objects.create(source=source, object_id=instance.pk, garden_id=garden_id, specimen_id=specimen_id)
+
+
+def remember_group_gardens(group):
+    """pre_delete d'un groupe : jardins de ses membres, supprimés avant le post_delete du groupe."""
+    from .models import SpecimenGroupMember
+
+    group._sync_garden_ids = sorted(set(
+        SpecimenGroupMember.objects.filter(group_id=group.pk).values_list('specimen__garden_id', flat=True)
+    ))
+
+
+def record_specimen_move(specimen):
+    """
+    Spécimen passé d'un jardin à un autre (signal post_save) : supprimé pour l'ancien jardin ;
+    ses enfants et groupes, inchangés, sont marqués modifiés pour être envoyés au nouveau.
+    """
+    from .models import SpecimenGroup, SyncTombstone
+
+    old_garden_id = getattr(specimen, '_loaded_garden_id', None)
+    if old_garden_id is None or old_garden_id == specimen.garden_id:
+        return
+    SyncTombstone.objects.create(source='specimens', object_id=specimen.pk, garden_id=old_garden_id)
+    now = timezone.now()
+    for source in ('events', 'reminders', 'photos'):
+        apps.get_model(SOURCES[source][0]).objects.filter(specimen_id=specimen.pk).update(date_modification=now)
+    SpecimenGroup.objects.filter(members__specimen_id=specimen.pk).update(date_modification=now)
+
+
+def prune_tombstones(now=None):
+    """Supprime les traces plus vieilles que TOMBSTONE_RETENTION ; retourne le nombre supprimé."""
+    from .models import SyncTombstone
+
+    cutoff = (now or timezone.now()) - TOMBSTONE_RETENTION
+    deleted, _ = SyncTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
+
+
+def encode_cursor(garden_id, positions, tombstones):
+    return signing.dumps(
+        {'v': CURSOR_VERSION, 'g': garden_id, 'p': positions, 't': tombstones},
+        salt=CURSOR_SALT, compress=True,
+    )
+
+
+def decode_cursor(cursor, garden_id):
+    """(positions, position des suppressions) ; None si le curseur est d'une version périmée."""
+    try:
+        data = signing.loads(cursor, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        raise InvalidCursor('Curseur invalide.')
+    if data.get('g') != garden_id:
+        raise InvalidCursor("Curseur d'un autre jardin.")
+    if data.get('v') != CURSOR_VERSION:
+        return None
+    return data['p'], data['t']
+
+
+def _after(position, field):
+    """Lignes après la position (horodatage ISO, id) ; id None : strictement après l'horodatage."""
+    if not position or position[0] is None:
+        return Q()
+    ts, pk = parse_datetime(position[0]), position[1]
+    if pk is None:
+        return Q(**{f'{field}__gt': ts})
+    return Q(**{f'{field}__gt': ts}) | Q(**{field: ts, 'pk__gt': pk})
+
+
+def _page(qs, position, high_water_mark, field, fields):
+    """(lignes, nouvelle position, reste-t-il des lignes)."""
+    rows = list(
+        qs.filter(_after(position, field), **{f'{field}__lte': high_water_mark})
+        .order_by(field, 'pk').values(*fields)[:SYNC_PAGE_SIZE]
+    )
+    if len(rows) == SYNC_PAGE_SIZE:
+        return rows, [rows[-1][field].isoformat(), rows[-1]['id']], True
+    return rows, [high_water_mark.isoformat(), None], False
+
+
+def _field_names(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def _source_queryset(source, garden_id):
+    label, lookup = SOURCES[source]
+    qs = apps.get_model(label).objects.filter(**{lookup: garden_id})
+    # Un groupe a plusieurs membres dans le jardin : une ligne par groupe
+    return qs.distinct() if source == 'specimen_groups' else qs
+
+
+def _add_photo_urls(rows, request):
+    from django.core.files.storage import default_storage
+    from django.urls import reverse
+
+    for row in rows:
+        image = row['image']
+        row['url'] = request.build_absolute_uri(default_storage.url(image)) if image and request else None
+        # Vue qui génère la déclinaison au besoin puis redirige (pas de exists() par photo)
+        row['thumb_url'] = (
+            request.build_absolute_uri(reverse('photo-rendition', args=[row['id'], 'thumb']))
+            if image and request else None
+        )
+
+
+def _add_group_members(rows):
+    from .models import SpecimenGroupMember
+
+    members = {}
+    for member in SpecimenGroupMember.objects.filter(group_id__in=[row['id'] for row in rows]).values(
+        'group_id', 'specimen_id', 'role',
+    ).order_by('group_id', 'id'):
+        members.setdefault(member.pop('group_id'), []).append(member)
+    for row in rows:
+        row['members'] = members.get(row['id'], [])
+
+
+def _tombstone_scope(garden_id):
+    from .models import Specimen, SyncTombstone
+
+    return (
+        Q(garden_id=garden_id)
+        | Q(specimen_id__in=Specimen.objects.filter(garden_id=garden_id).values('pk'))
+        # Enfants supprimés en cascade avec un spécimen du jardin
+        | Q(specimen_id__in=SyncTombstone.objects.filter(source='specimens', garden_id=garden_id).values('object_id'))
+    )
+
+
+def sync_garden(garden_id, cursor=None, request=None, now=None):
+    """
+    Changements du jardin depuis cursor (instantané complet sans curseur). Lève InvalidCursor.
+    Retourne le dict de la réponse ; seules les sections non vides figurent dans changes / deleted.
+    """
+    from .models import SyncTombstone
+
+    now = now or timezone.now()
+    high_water_mark = now - timedelta(seconds=SYNC_SETTLE_SECONDS)
+    decoded = decode_cursor(cursor, garden_id) if cursor else None
+    reset = bool(cursor) and decoded is None
+    if decoded is not None:
+        tomb_ts = parse_datetime(decoded[1][0]) if decoded[1][0] else None
+        if tomb_ts is None or tomb_ts < now - TOMBSTONE_RETENTION:
+            decoded, reset = None, True
+    full = decoded is None
+    if full:
+        positions = {source: None for source in SOURCES}
+        # Rien à supprimer chez un client qui repart de zéro
+        tomb_position = [high_water_mark.isoformat(), None]
+    else:
+        positions, tomb_position = decoded
+
+    changes, deleted, has_more = {}, {}, False
+    new_positions = {}
+    for source in SOURCES:
+        qs = _source_queryset(source, garden_id)
+        rows, new_positions[source], more = _page(
+            qs, positions.get(source), high_water_mark, 'date_modification', _field_names(qs.model),
+        )
+        has_more = has_more or more
+        if not rows:
+            continue
+        if source == 'photos':
+            _add_photo_urls(rows, request)
+        elif source == 'specimen_groups':
+            _add_group_members(rows)
+        changes[source] = rows
+
+    if not full:
+        tombstones, tomb_position, more = _page(
+            SyncTombstone.objects.filter(_tombstone_scope(garden_id)), tomb_position, high_water_mark,
+            'deleted_at', ('id', 'source', 'object_id', 'deleted_at'),
+        )
+        has_more = has_more or more
+        for tombstone in tombstones:
+            deleted.setdefault(tombstone['source'], []).append(tombstone['object_id'])
+
+    return {
+        'garden': garden_id,
+        'cursor': encode_cursor(garden_id, new_positions, tomb_position),
+        'high_water_mark': high_water_mark.isoformat(),
+        'full': full,
+        'reset': reset,
+        'has_more': has_more,
+        'changes': changes,
+        'deleted': deleted,
+    }
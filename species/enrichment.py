@@ -2,12 +2,15 @@
 Enrichissement d'un organisme unique depuis VASCAN, USDA/ITIS et Botanipedia.
 Utilisé par le bouton « Enrichir cette espèce » sur la fiche organisme (admin)
 et peut être appelé par des vues ou scripts.
+
+Les trois recherches partent en parallèle (species.http_fetch : session avec relances
+et cache disque) ; les écritures restent séquentielles dans le thread appelant.
 """
-import time
 from typing import Dict, List, Tuple
 
 import requests
 
+from species.http_fetch import enrichment_session, fetch_concurrently
 from species.models import Organism
 from species.source_rules import (
     SOURCE_BOTANIPEDIA,
@@ -19,12 +22,7 @@ from species.source_rules import (
 # Réutilisation des recherches des commandes d'import
 from species.management.commands.import_vascan import vascan_search
 from species.management.commands.import_usda import itis_search
-from species.management.commands.import_botanipedia import (
-    _build_botanipedia_title,
-    _extract_excerpt,
-    _get_page_content,
-    _search_page,
-)
+from species.management.commands.import_botanipedia import _extract_excerpt, botanipedia_fetch
 
 DELAY_DEFAULT = 0.6
 
@@ -41,41 +39,44 @@ def enrich_organism_vascan(
     nom_latin = (organism.nom_latin or "").strip()
     if not nom_latin:
         return False, "VASCAN : nom latin vide."
-    time.sleep(delay)
     try:
-        result = vascan_search(session, nom_latin, delay=0)
-        if not result:
-            return False, "VASCAN : aucune correspondance."
-        taxon_id = result["taxonID"]
-        scientific_name = result.get("scientificName") or result.get("canonicalName") or nom_latin
-        verns = result.get("vernacularNames") or []
-        fr_name = ""
+        return _apply_vascan(organism, vascan_search(session, nom_latin))
+    except Exception as e:
+        return False, f"VASCAN : {e}"
+
+
+def _apply_vascan(organism: Organism, result) -> Tuple[bool, str]:
+    if not result:
+        return False, "VASCAN : aucune correspondance."
+    nom_latin = (organism.nom_latin or "").strip()
+    taxon_id = result["taxonID"]
+    scientific_name = result.get("scientificName") or result.get("canonicalName") or nom_latin
+    verns = result.get("vernacularNames") or []
+    fr_name = ""
+    for v in verns:
+        if v.get("language") == "fr" and v.get("preferredName"):
+            fr_name = v.get("vernacularName") or ""
+            break
+    if not fr_name and verns:
         for v in verns:
-            if v.get("language") == "fr" and v.get("preferredName"):
+            if v.get("language") == "fr":
                 fr_name = v.get("vernacularName") or ""
                 break
-        if not fr_name and verns:
-            for v in verns:
-                if v.get("language") == "fr":
-                    fr_name = v.get("vernacularName") or ""
-                    break
-        common_name = fr_name or organism.nom_commun or scientific_name
-        indigene = False
-        for d in result.get("distribution") or []:
-            if d.get("locationID") == "ISO 3166-2:CA-QC" and d.get("occurrenceStatus") in ("native", "present"):
-                indigene = True
-                break
-        existing_sources = dict(organism.data_sources or {})
-        existing_sources[SOURCE_VASCAN] = result.get("raw", result)
-        organism.data_sources = existing_sources
-        organism.vascan_id = taxon_id
-        organism.indigene = indigene
-        if fr_name and not organism.nom_commun:
-            organism.nom_commun = common_name
-        organism.save(update_fields=["data_sources", "vascan_id", "indigene", "nom_commun"])
-        return True, f"VASCAN : vascan_id={taxon_id}"
-    except Exception as e:
-        return False, f"VASCAN : {e}"
+    common_name = fr_name or organism.nom_commun or scientific_name
+    indigene = False
+    for d in result.get("distribution") or []:
+        if d.get("locationID") == "ISO 3166-2:CA-QC" and d.get("occurrenceStatus") in ("native", "present"):
+            indigene = True
+            break
+    existing_sources = dict(organism.data_sources or {})
+    existing_sources[SOURCE_VASCAN] = result.get("raw", result)
+    organism.data_sources = existing_sources
+    organism.vascan_id = taxon_id
+    organism.indigene = indigene
+    if fr_name and not organism.nom_commun:
+        organism.nom_commun = common_name
+    organism.save(update_fields=["data_sources", "vascan_id", "indigene", "nom_commun"])
+    return True, f"VASCAN : vascan_id={taxon_id}"
 
 
 def enrich_organism_usda(
@@ -90,23 +91,25 @@ def enrich_organism_usda(
     nom_latin = (organism.nom_latin or "").strip()
     if not nom_latin:
         return False, "USDA : nom latin vide."
-    time.sleep(delay)
     try:
-        result = itis_search(session, nom_latin, delay=0)
-        if not result:
-            return False, "USDA : aucune correspondance."
-        tsn = result["tsn"]
-        existing_sources = dict(organism.data_sources or {})
-        raw = result.get("raw") if isinstance(result.get("raw"), dict) else result
-        existing_sources[SOURCE_USDA] = raw
-        organism.data_sources = existing_sources
-        organism.tsn = tsn
-        organism.save(update_fields=["data_sources", "tsn"])
-        return True, f"USDA : tsn={tsn}"
+        return _apply_usda(organism, itis_search(session, nom_latin))
     except Exception as e:
         return False, f"USDA : {e}"
 
 
+def _apply_usda(organism: Organism, result) -> Tuple[bool, str]:
+    if not result:
+        return False, "USDA : aucune correspondance."
+    tsn = result["tsn"]
+    existing_sources = dict(organism.data_sources or {})
+    raw = result.get("raw") if isinstance(result.get("raw"), dict) else result
+    existing_sources[SOURCE_USDA] = raw
+    organism.data_sources = existing_sources
+    organism.tsn = tsn
+    organism.save(update_fields=["data_sources", "tsn"])
+    return True, f"USDA : tsn={tsn}"
+
+
 def enrich_organism_botanipedia(
     organism: Organism,
     session: requests.Session,
@@ -119,34 +122,40 @@ def enrich_organism_botanipedia(
     nom_latin = (organism.nom_latin or "").strip()
     if not nom_latin:
         return False, "Botanipedia : nom latin vide."
-    time.sleep(delay)
     try:
-        title = _build_botanipedia_title(nom_latin)
-        content = _get_page_content(session, title)
-        if not content:
-            title = _search_page(session, nom_latin)
-            if title:
-                content = _get_page_content(session, title)
-        if not content:
-            return False, "Botanipedia : aucune page trouvée."
-        excerpt = _extract_excerpt(content)
-        payload = {"title": title, "excerpt": excerpt, "raw_length": len(content)}
-        sources = dict(organism.data_sources or {})
-        sources[SOURCE_BOTANIPEDIA] = payload
-        organism.data_sources = sources
-        update_fields = ["data_sources", "date_modification"]
-        if is_empty_value(organism.description) and excerpt:
-            organism.description = excerpt[:5000]
-            update_fields.append("description")
-        if is_empty_value(organism.usages_autres) and "usage" in content.lower():
-            organism.usages_autres = excerpt[:1500]
-            update_fields.append("usages_autres")
-        organism.save(update_fields=update_fields)
-        return True, f"Botanipedia : {title}"
+        return _apply_botanipedia(organism, botanipedia_fetch(session, nom_latin))
     except Exception as e:
         return False, f"Botanipedia : {e}"
 
 
+def _apply_botanipedia(organism: Organism, result) -> Tuple[bool, str]:
+    title, content = result
+    if not content:
+        return False, "Botanipedia : aucune page trouvée."
+    excerpt = _extract_excerpt(content)
+    payload = {"title": title, "excerpt": excerpt, "raw_length": len(content)}
+    sources = dict(organism.data_sources or {})
+    sources[SOURCE_BOTANIPEDIA] = payload
+    organism.data_sources = sources
+    update_fields = ["data_sources", "date_modification"]
+    if is_empty_value(organism.description) and excerpt:
+        organism.description = excerpt[:5000]
+        update_fields.append("description")
+    if is_empty_value(organism.usages_autres) and "usage" in content.lower():
+        organism.usages_autres = excerpt[:1500]
+        update_fields.append("usages_autres")
+    organism.save(update_fields=update_fields)
+    return True, f"Botanipedia : {title}"
+
+
+# source -> (libellé, recherche HTTP, application à l'organisme)
+SOURCES = {
+    "vascan": ("VASCAN", vascan_search, _apply_vascan),
+    "usda": ("USDA", itis_search, _apply_usda),
+    "botanipedia": ("Botanipedia", botanipedia_fetch, _apply_botanipedia),
+}
+
+
 def enrich_organism(
     organism: Organism,
     sources: List[str] | None = None,
@@ -154,17 +163,31 @@ def enrich_organism(
 ) -> Dict[str, Tuple[bool, str]]:
     """
     Enrichit un organisme avec les sources demandées (vascan, usda, botanipedia).
+    delay : intervalle minimal entre deux appels au même hôte.
     Retourne un dict { 'vascan': (ok, msg), 'usda': (ok, msg), 'botanipedia': (ok, msg) }.
     """
     if sources is None:
         sources = ["vascan", "usda", "botanipedia"]
+    wanted = [source for source in SOURCES if source in sources]
+    nom_latin = (organism.nom_latin or "").strip()
+    if not nom_latin:
+        return {source: (False, f"{SOURCES[source][0]} : nom latin vide.") for source in wanted}
+    session = enrichment_session("JardinBiot/1.0 (enrichment admin)", min_interval=delay)
+    fetched = {
+        source: (result, error)
+        for source, result, error in fetch_concurrently(
+            wanted, lambda source: SOURCES[source][1](session, nom_latin), max_workers=len(wanted)
+        )
+    }
     results = {}
-    session = requests.Session()
-    session.headers.setdefault("User-Agent", "JardinBiot/1.0 (enrichment admin)")
-    if "vascan" in sources:
-        results["vascan"] = enrich_organism_vascan(organism, session, delay=delay)
-    if "usda" in sources:
-        results["usda"] = enrich_organism_usda(organism, session, delay=delay)
-    if "botanipedia" in sources:
-        results["botanipedia"] = enrich_organism_botanipedia(organism, session, delay=delay)
+    for source in wanted:
+        label, _fetch, apply = SOURCES[source]
+        result, error = fetched[source]
+        if error is not None:
+            results[source] = (False, f"{label} : {error}")
+            continue
+        try:
+            results[source] = apply(organism, result)
+        except Exception as e:
+            results[source] = (False, f"{label} : {e}")
     return results
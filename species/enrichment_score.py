@@ -1,10 +1,32 @@
 """
 Note d'enrichissement des fiches espèces (0-100 %).
 Recalculée après import/migration ; stockée sur Organism et agrégée dans BaseEnrichmentStats.
+
+update_enrichment_scores calcule la note en SQL (enrichment_score_expression : un CASE par critère,
+EXISTS pour les relations) : un seul UPDATE pour le catalogue ou pour les fiches modifiées depuis `since`.
+compute_organism_enrichment_score reste l'équivalent Python pour une fiche isolée.
 """
+from django.db.models import Avg, Case, Count, Exists, IntegerField, OuterRef, Q, Value, When
+from django.db.models.functions import Cast, Length, Round, Trim
+from django.db.models.lookups import GreaterThan
 from django.utils import timezone
 
-from .models import Organism, BaseEnrichmentStats
+from .models import (
+    BaseEnrichmentStats,
+    Organism,
+    OrganismCalendrier,
+    OrganismPropriete,
+    OrganismUsage,
+    Photo,
+)
+
+# Critères (même ordre et même sens que compute_organism_enrichment_score)
+STR_FIELDS = (
+    'nom_commun', 'nom_latin', 'famille', 'genus', 'besoin_eau', 'besoin_soleil', 'sol_drainage',
+    'sol_richesse', 'vitesse_croissance', 'description', 'parties_comestibles', 'toxicite', 'usages_autres',
+)
+LIST_FIELDS = ('zone_rusticite', 'sol_textures', 'sol_ph')
+NUMBER_FIELDS = ('hauteur_max', 'largeur_max')
 
 
 def _filled_str(val):
@@ -72,23 +94,52 @@ def compute_organism_enrichment_score(organism: Organism) -> int:
     return round(100 * filled / total)
 
 
-def update_enrichment_scores(since=None):
+def _enrichment_conditions():
+    """Un critère rempli par élément (Q ou expression booléenne), en SQL."""
+    conditions = [GreaterThan(Length(Trim(name)), 0) for name in STR_FIELDS]
+    conditions += [
+        Q(**{f'{name}__isnull': False}) & ~Q(**{name: []}) & ~Q(**{name: {}}) for name in LIST_FIELDS
+    ]
+    conditions += [Q(**{f'{name}__isnull': False}) for name in NUMBER_FIELDS]
+    conditions.append(Q(indigene=True))
+    for model in (OrganismPropriete, OrganismUsage, OrganismCalendrier):
+        conditions.append(Q(Exists(model.objects.filter(organisme=OuterRef('pk')))))
+    conditions.append(
+        Q(photo_principale__isnull=False) | Q(Exists(Photo.objects.filter(organisme=OuterRef('pk'))))
+    )
+    return conditions
+
+
+def enrichment_score_expression():
+    """Expression SQL de la note (0-100) d'un Organism : à utiliser dans annotate() ou update()."""
+    conditions = _enrichment_conditions()
+    filled = sum(
+        (Case(When(cond, then=Value(1)), default=Value(0), output_field=IntegerField()) for cond in conditions),
+        Value(0),
+    )
+    return Cast(Round(filled * Value(100.0) / Value(len(conditions))), IntegerField())
+
+
+def update_enrichment_scores(since=None, organism_ids=None):
     """
-    Recalcule enrichment_score_pct pour tous les organismes et met à jour BaseEnrichmentStats.
-    - since: réservé (ignoré pour l’instant). Recalcul complet pour une note globale cohérente.
+    Recalcule enrichment_score_pct en un UPDATE puis met à jour BaseEnrichmentStats (agrégat SQL).
+    - since : seules les fiches modifiées depuis (date_modification >= since) sont recalculées ;
+    - organism_ids : seules ces fiches (ensemble « dirty »), cumulable avec since (union).
+    Sans argument : tout le catalogue. La note globale porte toujours sur tout le catalogue.
     """
-    qs = Organism.objects.all().prefetch_related("proprietes", "usages", "calendrier", "photos")
-    to_update = []
-    sum_scores = 0
-    for org in qs:
-        score = compute_organism_enrichment_score(org)
-        org.enrichment_score_pct = score
-        to_update.append(org)
-        sum_scores += score
-    total_count = len(to_update)
-    if to_update:
-        Organism.objects.bulk_update(to_update, ["enrichment_score_pct"], batch_size=500)
-    global_pct = round(sum_scores / total_count) if total_count else None
+    qs = Organism.objects.all()
+    if since is not None or organism_ids is not None:
+        scope = Q(pk__in=[])
+        if since is not None:
+            scope |= Q(date_modification__gte=since)
+        if organism_ids is not None:
+            scope |= Q(pk__in=list(organism_ids))
+        qs = qs.filter(scope)
+    updated = qs.update(enrichment_score_pct=enrichment_score_expression())
+
+    agg = Organism.objects.aggregate(total=Count('id'), avg=Avg('enrichment_score_pct'))
+    total_count = agg['total']
+    global_pct = round(agg['avg']) if agg['avg'] is not None else None
     stats = BaseEnrichmentStats.objects.first()
     if stats is None:
         stats = BaseEnrichmentStats(organism_count=0, global_score_pct=None)
@@ -96,4 +147,4 @@ def update_enrichment_scores(since=None):
     stats.global_score_pct = global_pct
     stats.computed_at = timezone.now()
     stats.save()
-    return {"updated": total_count, "total": total_count, "global_score_pct": global_pct}
+    return {"updated": updated, "total": total_count, "global_score_pct": global_pct}
@@ -1,21 +1,76 @@
 """
 Utilitaires d'export de données (CSV, PDF).
+
+Les exports lisent le queryset en flux (values_list + iterator) : mémoire constante
+quelle que soit la taille du catalogue.
+  - CSV : StreamingHttpResponse, les premiers octets partent dès le premier paquet de lignes ;
+  - PDF : dessiné page par page sur un canvas ReportLab (une page de lignes en mémoire),
+    dans un fichier temporaire débordant sur disque, puis servi en flux (FileResponse).
+    Le format PDF (table xref finale) empêche d'envoyer le document avant la dernière page.
 """
 import csv
-from io import StringIO, BytesIO
-from django.http import HttpResponse
+import tempfile
+from io import BytesIO
+
+from django.http import FileResponse, StreamingHttpResponse
+
+from .import_pipeline import chunked
+from .source_rules import primary_zone
+
+# Lignes lues par aller-retour de curseur
+EXPORT_CHUNK_SIZE = 2000
+# Lignes CSV par paquet envoyé au client
+CSV_ROWS_PER_WRITE = 200
+# Au-delà, le PDF en cours de rendu passe de la mémoire au disque
+PDF_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+
+class _Echo:
+    """Pseudo-fichier pour csv.writer : writerow retourne la ligne formatée."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_lines(headers, rows):
+    writer = csv.writer(_Echo())
+    yield "\ufeff" + writer.writerow(headers)  # BOM UTF-8 pour Excel
+    for chunk in chunked(rows, CSV_ROWS_PER_WRITE):
+        yield "".join(writer.writerow(row) for row in chunk)
+
+
+def streaming_csv_response(headers, rows, filename):
+    """Réponse CSV en flux : rows est un itérable de listes (consommé pendant l'envoi)."""
+    response = StreamingHttpResponse(_csv_lines(headers, rows), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _choices(model, field_name):
+    """{valeur: libellé} d'un champ à choix (équivalent de get_<champ>_display sur des values)."""
+    return {key: str(label) for key, label in model._meta.get_field(field_name).flatchoices}
+
+
+def _display(choices, value):
+    return choices.get(value, value) if value else ""
+
+
+def _yes_no(value):
+    return "Oui" if value else "Non"
+
+
+def _plain_field_names(model):
+    """Champs lus tels quels par values_list ; une relation s'exporte par str(objet), pas par sa clé."""
+    return {f.name for f in model._meta.concrete_fields if not f.is_relation}
 
 
 def export_queryset_csv(queryset, fields_config, filename="export.csv"):
     """
     Exporte un queryset en CSV.
     fields_config: liste de (attr_name, header_label) ou (attr_name,) pour utiliser attr_name
+    Champs concrets non relationnels seulement : lecture par values_list ; sinon (relations,
+    propriétés, méthodes) objets en flux.
     """
-    response = HttpResponse(content_type="text/csv; charset=utf-8")
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-    response.write("\ufeff")  # BOM UTF-8 pour Excel
-
-    writer = csv.writer(response)
     headers = []
     attrs = []
     for item in fields_config:
@@ -26,19 +81,24 @@ def export_queryset_csv(queryset, fields_config, filename="export.csv"):
             attrs.append(item)
             headers.append(item.replace("_", " ").title())
 
-    writer.writerow(headers)
-    for obj in queryset:
-        row = []
-        for attr in attrs:
-            val = getattr(obj, attr, "")
-            if callable(val):
-                val = val()
-            if val is None:
-                val = ""
-            row.append(str(val))
-        writer.writerow(row)
+    if set(attrs) <= _plain_field_names(queryset.model):
+        values = queryset.values_list(*attrs).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        rows = (["" if val is None else str(val) for val in row] for row in values)
+    else:
+        rows = (_object_row(obj, attrs) for obj in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE))
+    return streaming_csv_response(headers, rows, filename)
 
-    return response
+
+def _object_row(obj, attrs):
+    row = []
+    for attr in attrs:
+        val = getattr(obj, attr, "")
+        if callable(val):
+            val = val()
+        if val is None:
+            val = ""
+        row.append(str(val))
+    return row
 
 
 def export_organisms_csv(queryset, filename="organismes.csv"):
@@ -62,139 +122,129 @@ def export_organisms_csv(queryset, filename="organismes.csv"):
 
 
 def export_organisms_csv_simple(queryset):
-    """Version avec get_primary_zone pour zone_rusticite."""
-    response = HttpResponse(content_type="text/csv; charset=utf-8")
-    response["Content-Disposition"] = 'attachment; filename="organismes.csv"'
-    response.write("\ufeff")
-
-    writer = csv.writer(response)
+    """Version avec la zone principale (la plus froide) pour zone_rusticite."""
+    model = queryset.model
+    regnes = _choices(model, "regne")
+    types = _choices(model, "type_organisme")
+    eau = _choices(model, "besoin_eau")
+    soleil = _choices(model, "besoin_soleil")
     headers = [
         "Nom commun", "Nom latin", "Famille", "Règne", "Type",
         "Besoins eau", "Besoins soleil", "Zone rusticité",
         "Comestible", "Fixateur azote", "Mellifère", "Description"
     ]
-    writer.writerow(headers)
-    for obj in queryset:
-        zone = obj.get_primary_zone() if hasattr(obj, "get_primary_zone") else ""
-        writer.writerow([
-            obj.nom_commun,
-            obj.nom_latin,
-            obj.famille or "",
-            obj.get_regne_display() if hasattr(obj, "get_regne_display") else obj.regne,
-            obj.get_type_organisme_display() if hasattr(obj, "get_type_organisme_display") else obj.type_organisme,
-            obj.get_besoin_eau_display() if obj.besoin_eau and hasattr(obj, "get_besoin_eau_display") else (obj.besoin_eau or ""),
-            obj.get_besoin_soleil_display() if obj.besoin_soleil and hasattr(obj, "get_besoin_soleil_display") else (obj.besoin_soleil or ""),
-            zone,
-            "Oui" if obj.comestible else "Non",
-            "Oui" if obj.fixateur_azote else "Non",
-            "Oui" if obj.mellifere else "Non",
-            (obj.description or "")[:200],
-        ])
-    return response
+    values = queryset.values_list(
+        "nom_commun", "nom_latin", "famille", "regne", "type_organisme", "besoin_eau", "besoin_soleil",
+        "zone_rusticite", "comestible", "fixateur_azote", "mellifere", "description",
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    rows = (
+        [
+            nom_commun,
+            nom_latin,
+            famille or "",
+            regnes.get(regne, regne),
+            types.get(type_organisme, type_organisme),
+            _display(eau, besoin_eau),
+            _display(soleil, besoin_soleil),
+            primary_zone(zones),
+            _yes_no(comestible),
+            _yes_no(fixateur_azote),
+            _yes_no(mellifere),
+            (description or "")[:200],
+        ]
+        for (nom_commun, nom_latin, famille, regne, type_organisme, besoin_eau, besoin_soleil,
+             zones, comestible, fixateur_azote, mellifere, description) in values
+    )
+    return streaming_csv_response(headers, rows, "organismes.csv")
 
 
 def export_specimens_csv(queryset):
     """Export des spécimens en CSV."""
-    response = HttpResponse(content_type="text/csv; charset=utf-8")
-    response["Content-Disposition"] = 'attachment; filename="specimens.csv"'
-    response.write("\ufeff")
-
-    writer = csv.writer(response)
+    model = queryset.model
+    statuts = _choices(model, "statut")
+    sources = _choices(model, "source")
     headers = [
         "Nom", "Organisme", "Zone jardin", "Statut", "Date plantation",
         "Source", "Santé", "Code", "Latitude", "Longitude", "Notes"
     ]
-    writer.writerow(headers)
-    for obj in queryset:
-        writer.writerow([
-            obj.nom,
-            obj.organisme.nom_commun if obj.organisme else "",
-            obj.zone_jardin or "",
-            obj.get_statut_display() if obj.statut else "",
-            str(obj.date_plantation) if obj.date_plantation else "",
-            obj.get_source_display() if obj.source else "",
-            obj.sante,
-            obj.code_identification or "",
-            obj.latitude or "",
-            obj.longitude or "",
-            (obj.notes or "")[:200],
-        ])
-    return response
+    values = queryset.values_list(
+        "nom", "organisme__nom_commun", "zone_jardin", "statut", "date_plantation", "source", "sante",
+        "code_identification", "latitude", "longitude", "notes",
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    rows = (
+        [
+            nom,
+            organisme or "",
+            zone_jardin or "",
+            _display(statuts, statut),
+            str(date_plantation) if date_plantation else "",
+            _display(sources, source),
+            sante,
+            code or "",
+            latitude or "",
+            longitude or "",
+            (notes or "")[:200],
+        ]
+        for (nom, organisme, zone_jardin, statut, date_plantation, source, sante,
+             code, latitude, longitude, notes) in values
+    )
+    return streaming_csv_response(headers, rows, "specimens.csv")
 
 
 def export_seed_collections_csv(queryset):
     """Export des collections de semences en CSV."""
-    response = HttpResponse(content_type="text/csv; charset=utf-8")
-    response["Content-Disposition"] = 'attachment; filename="collections_semences.csv"'
-    response.write("\ufeff")
-
-    writer = csv.writer(response)
+    model = queryset.model
+    unites = _choices(model, "unite")
+    temps = _choices(model, "stratification_temp")
     headers = [
         "Organisme", "Variété", "Lot", "Fournisseur", "Quantité", "Unité",
         "Date récolte", "Stratification", "Notes"
     ]
-    writer.writerow(headers)
-    for obj in queryset:
-        strat = ""
-        if obj.stratification_requise:
-            strat = f"{obj.stratification_duree_jours or '?'}j {obj.get_stratification_temp_display() or ''}"
-        writer.writerow([
-            obj.organisme.nom_commun if obj.organisme else "",
-            obj.variete or "",
-            obj.lot_reference or "",
-            obj.fournisseur.nom if obj.fournisseur else "",
-            obj.quantite or "",
-            obj.get_unite_display() if obj.unite else "",
-            str(obj.date_recolte) if obj.date_recolte else "",
-            strat,
-            (obj.notes or "")[:200],
-        ])
-    return response
+    values = queryset.values_list(
+        "organisme__nom_commun", "variete", "lot_reference", "fournisseur__nom", "quantite", "unite",
+        "date_recolte", "stratification_requise", "stratification_duree_jours", "stratification_temp", "notes",
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
 
+    def rows():
+        for (organisme, variete, lot, fournisseur, quantite, unite, date_recolte,
+             strat_requise, strat_jours, strat_temp, notes) in values:
+            strat = ""
+            if strat_requise:
+                strat = f"{strat_jours or '?'}j {temps.get(strat_temp, strat_temp) or ''}"
+            yield [
+                organisme or "",
+                variete or "",
+                lot or "",
+                fournisseur or "",
+                quantite or "",
+                _display(unites, unite),
+                str(date_recolte) if date_recolte else "",
+                strat,
+                (notes or "")[:200],
+            ]
 
-def export_organisms_pdf(queryset):
-    """Export des organismes en PDF."""
+    return streaming_csv_response(headers, rows(), "collections_semences.csv")
+
+
+def write_organisms_pdf(queryset, fileobj):
+    """
+    Dessine l'export PDF des organismes dans fileobj, une page de tableau à la fois
+    (pas de liste complète de flowables, pas de count() séparé). Retourne le nombre d'organismes.
+    """
     from reportlab.lib import colors
     from reportlab.lib.pagesizes import A4
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.styles import getSampleStyleSheet
     from reportlab.lib.units import cm
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.ttfonts import TTFont
-
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=2*cm, leftMargin=2*cm)
-    styles = getSampleStyleSheet()
-    story = []
-
-    title = Paragraph(f"<b>Export Organismes - Jardin bIOT</b>", styles["Title"])
-    story.append(title)
-    story.append(Spacer(1, 0.5*cm))
-    story.append(Paragraph(f"{queryset.count()} organismes exportés", styles["Normal"]))
-    story.append(Spacer(1, 0.5*cm))
+    from reportlab.pdfgen import canvas
+    from reportlab.platypus import Paragraph, Table, TableStyle
 
+    page_width, page_height = A4
+    margin = 2 * cm
+    row_height = 0.5 * cm
+    col_widths = [4 * cm, 4 * cm, 3 * cm, 2 * cm, 2 * cm]
     headers = ["Nom commun", "Nom latin", "Type", "Zone", "Comestible"]
-    data = [headers]
-    for obj in queryset[:100]:  # Limite pour PDF raisonnable
-        zone = obj.get_primary_zone() if hasattr(obj, "get_primary_zone") else ""
-        type_val = ""
-        if hasattr(obj, "get_type_organisme_display") and obj.type_organisme:
-            try:
-                type_val = str(obj.get_type_organisme_display())[:25]
-            except (AttributeError, ValueError):
-                type_val = str(obj.type_organisme)[:25] if obj.type_organisme else "-"
-        else:
-            type_val = str(obj.type_organisme)[:25] if obj.type_organisme else "-"
-        data.append([
-            (obj.nom_commun or "")[:35],
-            (obj.nom_latin or "-")[:35],
-            type_val,
-            zone[:10] if zone else "-",
-            "Oui" if obj.comestible else "Non",
-        ])
-
-    table = Table(data, colWidths=[4*cm, 4*cm, 3*cm, 2*cm, 2*cm])
-    table.setStyle(TableStyle([
+    styles = getSampleStyleSheet()
+    table_style = TableStyle([
         ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#2d5a27")),
         ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
         ("ALIGN", (0, 0), (-1, -1), "LEFT"),
@@ -204,9 +254,69 @@ def export_organisms_pdf(queryset):
         ("BACKGROUND", (0, 1), (-1, -1), colors.white),
         ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
         ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f0f8f0")]),
-    ]))
-    story.append(table)
+    ])
+    types = _choices(queryset.model, "type_organisme")
+
+    def draw_paragraph(c, text, style, top):
+        paragraph = Paragraph(text, style)
+        _, height = paragraph.wrapOn(c, page_width - 2 * margin, page_height)
+        paragraph.drawOn(c, margin, top - height)
+        return top - height
+
+    c = canvas.Canvas(fileobj, pagesize=A4, pageCompression=1)
+    top = draw_paragraph(c, "<b>Export Organismes - Jardin bIOT</b>", styles["Title"], page_height - margin) - 0.5 * cm
+    values = queryset.values_list(
+        "nom_commun", "nom_latin", "type_organisme", "zone_rusticite", "comestible"
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    rows = (
+        [
+            (nom_commun or "")[:35],
+            (nom_latin or "-")[:35],
+            str(types.get(type_organisme, type_organisme))[:25] if type_organisme else "-",
+            primary_zone(zones)[:10] or "-",
+            _yes_no(comestible),
+        ]
+        for nom_commun, nom_latin, type_organisme, zones, comestible in values
+    )
 
-    doc.build(story)
-    buffer.seek(0)
+    total = 0
+    page = 1
+    while True:
+        # Ligne d'en-tête + lignes tenant dans la hauteur restante (réserve pour le pied de page)
+        capacity = max(1, int((top - margin - 1.5 * cm) // row_height) - 1)
+        page_rows = next(chunked(rows, capacity), [])
+        if page_rows:
+            table = Table([headers] + page_rows, colWidths=col_widths, rowHeights=row_height)
+            table.setStyle(table_style)
+            _, height = table.wrapOn(c, page_width - 2 * margin, top - margin)
+            table.drawOn(c, margin, top - height)
+            top -= height
+            total += len(page_rows)
+        if len(page_rows) < capacity:
+            break
+        c.setFont("Helvetica", 8)
+        c.drawRightString(page_width - margin, margin / 2, f"Page {page}")
+        c.showPage()
+        page += 1
+        top = page_height - margin
+    draw_paragraph(c, f"{total} organismes exportés", styles["Normal"], top - 0.5 * cm)
+    c.setFont("Helvetica", 8)
+    c.drawRightString(page_width - margin, margin / 2, f"Page {page}")
+    c.showPage()
+    c.save()
+    return total
+
+
+def export_organisms_pdf(queryset):
+    """Export des organismes en PDF (octets) ; pour une réponse HTTP, préférer organisms_pdf_response."""
+    buffer = BytesIO()
+    write_organisms_pdf(queryset, buffer)
     return buffer.getvalue()
+
+
+def organisms_pdf_response(queryset, filename="organismes.pdf"):
+    """PDF rendu dans un fichier temporaire (mémoire puis disque) et servi en flux."""
+    spool = tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_BYTES)
+    write_organisms_pdf(queryset, spool)
+    spool.seek(0)
+    return FileResponse(spool, as_attachment=True, filename=filename, content_type="application/pdf")
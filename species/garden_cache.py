@@ -0,0 +1,97 @@
+"""
+Cache par jardin partagé entre workers (warnings, etc.).
+
+Le backend est celui de settings.CACHES["default"] (CACHE_URL : Redis, fichier, base
+de données ; LocMem par défaut en dev). Les clés sont versionnées par jardin :
+invalider = écrire une nouvelle valeur aléatoire dans garden_cache_v_<id> (cache.set, pas
+incr : sur LocMem / fichier / base, incr est une lecture puis une écriture et deux
+invalidations simultanées pourraient n'en faire qu'une). Les anciennes entrées expirent d'elles-mêmes.
+
+get_or_compute protège contre l'effet « stampede » : un seul calcul par (clé, version),
+via un verrou dans le cache (cache.add atomique) entre processus et un verrou local
+entre threads d'un même worker ; les autres requêtes attendent le résultat.
+"""
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+
+DEFAULT_TIMEOUT = 3600
+LOCK_TIMEOUT = 60
+WAIT_TIMEOUT = 15.0
+WAIT_STEP = 0.05
+
+_local_locks = {}
+_local_locks_guard = threading.Lock()
+
+
+def _version_key(garden_id):
+    return f'garden_cache_v_{garden_id}'
+
+
+def garden_cache_version(garden_id):
+    """Version courante des entrées de cache du jardin (créée si absente)."""
+    key = _version_key(garden_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_garden_cache(garden_id):
+    """Invalide toutes les entrées du jardin en une opération (nouvelle version)."""
+    if garden_id is None:
+        return
+    cache.set(_version_key(garden_id), uuid.uuid4().hex, timeout=None)
+
+
+def garden_cache_key(prefix, garden_id):
+    """Clé versionnée, ex. warnings_12_v3f2a…"""
+    return f'{prefix}_{garden_id}_v{garden_cache_version(garden_id)}'
+
+
+def _local_lock(key):
+    with _local_locks_guard:
+        lock = _local_locks.get(key)
+        if lock is None:
+            lock = _local_locks[key] = threading.Lock()
+        return lock
+
+
+def get_or_compute(prefix, garden_id, compute, timeout=DEFAULT_TIMEOUT):
+    """
+    Valeur en cache pour (prefix, jardin) ou compute() — exécuté une seule fois même
+    si plusieurs requêtes arrivent en même temps sur le même jardin.
+    """
+    key = garden_cache_key(prefix, garden_id)
+    data = cache.get(key)
+    if data is not None:
+        return data
+    with _local_lock(f'{prefix}_{garden_id}'):
+        data = cache.get(key)
+        if data is not None:
+            return data
+        lock_key = f'{key}_lock'
+        token = uuid.uuid4().hex
+        if cache.add(lock_key, token, timeout=LOCK_TIMEOUT):
+            try:
+                data = compute()
+                cache.set(key, data, timeout=timeout)
+                return data
+            finally:
+                if cache.get(lock_key) == token:
+                    cache.delete(lock_key)
+        # Un autre worker calcule : attendre son résultat (ou calculer nous-mêmes si trop long)
+        deadline = time.monotonic() + WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(WAIT_STEP)
+            data = cache.get(key)
+            if data is not None:
+                return data
+            if cache.get(lock_key) is None:
+                break
+        data = compute()
+        cache.set(key, data, timeout=timeout)
+        return data
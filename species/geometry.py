@@ -0,0 +1,185 @@
+"""
+Géométrie des zones et des jardins (GeoJSON WGS84) : surface, périmètre, centroïde, zone d'un point.
+
+- Transformateurs pyproj gardés par processus (get_transformer) : en construire un coûte
+  plusieurs ms de recherche dans la base PROJ, Zone.save n'en reconstruit plus à chaque appel.
+- Calculs par lot (shapely 2) : les polygones sont lus en un tableau numpy, toutes leurs
+  coordonnées projetées en un seul appel PROJ (shapely.transform), puis area / length /
+  centroid vectorisés sur le tableau.
+- Zone d'un spécimen : STRtree des zones du jardin, une requête pour tous les points ;
+  un point dans plusieurs zones va à la plus petite (la plus précise).
+
+Mesures dans la projection Québec Lambert (EPSG:32198), comme la surface historique des zones.
+"""
+from functools import lru_cache
+
+WGS84 = 'EPSG:4326'
+METRIC_CRS = 'EPSG:32198'  # NAD83 / Québec Lambert
+POLYGON_TYPES = ('Polygon',)
+# Types acceptés pour la limite d'un jardin (souvent un FeatureCollection d'une seule parcelle)
+BOUNDARY_TYPES = ('Polygon', 'MultiPolygon')
+
+
+@lru_cache(maxsize=8)
+def get_transformer(source=WGS84, target=METRIC_CRS):
+    """Transformer pyproj (x = longitude, y = latitude), construit une fois par processus."""
+    from pyproj import Transformer
+
+    return Transformer.from_crs(source, target, always_xy=True)
+
+
+def _project(geometries, source=WGS84, target=METRIC_CRS):
+    """Projette un tableau de géométries : un seul appel PROJ pour toutes les coordonnées."""
+    import numpy as np
+    import shapely
+
+    transformer = get_transformer(source, target)
+
+    def transform(coords):
+        x, y = transformer.transform(coords[:, 0], coords[:, 1])
+        return np.column_stack([x, y])
+
+    return shapely.transform(geometries, transform)
+
+
+def _geometry_from_geojson(value, types):
+    """Géométrie shapely d'un objet GeoJSON (Geometry, Feature ou FeatureCollection), ou None."""
+    from shapely.geometry import shape
+    from shapely.ops import unary_union
+
+    if not isinstance(value, dict):
+        return None
+    kind = value.get('type')
+    try:
+        if kind == 'FeatureCollection':
+            parts = [_geometry_from_geojson(f.get('geometry'), types) for f in value.get('features') or []]
+            parts = [p for p in parts if p is not None]
+            geom = unary_union(parts) if parts else None
+        elif kind == 'Feature':
+            geom = _geometry_from_geojson(value.get('geometry'), types)
+        else:
+            geom = shape(value)
+    except (ValueError, TypeError, AttributeError, KeyError, IndexError):
+        return None
+    if geom is None or geom.is_empty or geom.geom_type not in types:
+        return None
+    return geom
+
+
+def polygons_from_geojson(boundaries, types=POLYGON_TYPES):
+    """Tableau numpy (objets) des géométries ; None pour une limite absente ou invalide."""
+    import numpy as np
+
+    geometries = np.empty(len(boundaries), dtype=object)
+    geometries[:] = [_geometry_from_geojson(b, types) for b in boundaries]
+    return geometries
+
+
+def polygon_metrics(boundaries, types=POLYGON_TYPES):
+    """
+    Mesures de chaque limite GeoJSON, dans l'ordre : dict surface_m2, perimetre_m,
+    centroide_latitude, centroide_longitude (valeurs None si la limite est absente ou invalide).
+    """
+    import numpy as np
+    import shapely
+
+    geometries = polygons_from_geojson(boundaries, types)
+    result = [dict.fromkeys(('surface_m2', 'perimetre_m', 'centroide_latitude', 'centroide_longitude'))
+              for _ in range(len(geometries))]
+    valid = np.flatnonzero(~shapely.is_missing(geometries))
+    if not len(valid):
+        return result
+    projected = _project(geometries[valid])
+    areas = shapely.area(projected)
+    perimeters = shapely.length(projected)
+    # Centroïde calculé dans le plan projeté, ramené en WGS84
+    centroids = shapely.centroid(projected)
+    lngs, lats = get_transformer(METRIC_CRS, WGS84).transform(shapely.get_x(centroids), shapely.get_y(centroids))
+    for i, area, perimeter, lat, lng in zip(valid, areas, perimeters, lats, lngs):
+        result[i].update(
+            surface_m2=float(area),
+            perimetre_m=float(perimeter),
+            centroide_latitude=float(lat),
+            centroide_longitude=float(lng),
+        )
+    return result
+
+
+def zone_metrics(boundary):
+    """Mesures d'une seule zone (Zone.save)."""
+    return polygon_metrics([boundary])[0]
+
+
+def boundary_metrics(boundary):
+    """Mesures de la limite d'un jardin (Polygon, MultiPolygon, Feature ou FeatureCollection)."""
+    return polygon_metrics([boundary], types=BOUNDARY_TYPES)[0]
+
+
+def recompute_zone_metrics(zones):
+    """Recalcule les mesures des zones (instances) en un passage ; retourne celles qui ont changé."""
+    fields = ('surface_m2', 'perimetre_m', 'centroide_latitude', 'centroide_longitude')
+    changed = []
+    for zone, metrics in zip(zones, polygon_metrics([zone.boundary for zone in zones])):
+        if any(getattr(zone, field) != metrics[field] for field in fields):
+            for field in fields:
+                setattr(zone, field, metrics[field])
+            changed.append(zone)
+    return changed
+
+
+def zones_for_points(zones, latitudes, longitudes):
+    """
+    Pour chaque point, l'id de la plus petite zone qui le contient (None hors zone).
+    zones : [(id, boundary GeoJSON)] ; une STRtree, une requête pour tous les points.
+    """
+    import numpy as np
+    import shapely
+
+    result = [None] * len(latitudes)
+    geometries = polygons_from_geojson([boundary for _id, boundary in zones])
+    valid = np.flatnonzero(~shapely.is_missing(geometries))
+    if not len(valid) or not len(latitudes):
+        return result
+    polygons = geometries[valid]
+    zone_ids = [zones[i][0] for i in valid]
+    points = shapely.points(np.asarray(longitudes, dtype=float), np.asarray(latitudes, dtype=float))
+    point_idx, tree_idx = shapely.STRtree(polygons).query(points, predicate='within')
+    # Plus grande d'abord : la plus petite zone contenant le point écrit en dernier
+    areas = shapely.area(polygons)
+    for p, t in sorted(zip(point_idx.tolist(), tree_idx.tolist()), key=lambda pair: -areas[pair[1]]):
+        result[p] = zone_ids[t]
+    return result
+
+
+def assign_specimens_to_zones(garden_id, only_unassigned=True):
+    """
+    Rattache les spécimens géolocalisés du jardin à la zone qui les contient (Specimen.zone).
+    only_unassigned : ne touche pas aux spécimens qui ont déjà une zone. Retourne le nombre modifié.
+    """
+    from django.utils import timezone
+
+    from gardens.models import Zone
+
+    from .garden_cache import invalidate_garden_cache
+    from .models import Specimen
+
+    zones = list(Zone.objects.filter(garden_id=garden_id).exclude(boundary=None).values_list('id', 'boundary'))
+    specimens = Specimen.objects.filter(garden_id=garden_id, latitude__isnull=False, longitude__isnull=False)
+    if only_unassigned:
+        specimens = specimens.filter(zone__isnull=True)
+    specimens = list(specimens.only('id', 'zone_id', 'latitude', 'longitude'))
+    if not zones or not specimens:
+        return 0
+    zone_ids = zones_for_points(zones, [s.latitude for s in specimens], [s.longitude for s in specimens])
+    now = timezone.now()
+    changed = []
+    for specimen, zone_id in zip(specimens, zone_ids):
+        if zone_id is not None and zone_id != specimen.zone_id:
+            specimen.zone_id = zone_id
+            # bulk_update ne pose pas auto_now (synchro différentielle, ETag de la vue terrain)
+            specimen.date_modification = now
+            changed.append(specimen)
+    if changed:
+        Specimen.objects.bulk_update(changed, ['zone', 'date_modification'], batch_size=500)
+        invalidate_garden_cache(garden_id)
+    return len(changed)
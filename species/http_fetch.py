@@ -0,0 +1,290 @@
+"""
+Appels HTTP des commandes d'enrichissement (VASCAN, ITIS/USDA, Wikidata, Commons, Botanipedia).
+
+enrichment_session() retourne une requests.Session qui :
+  - partage un pool de connexions keep-alive entre les threads de fetch_concurrently ;
+  - limite le débit par hôte (seau à jetons, ENRICHMENT_RATE_LIMITS, requêtes/s) ;
+  - relance les erreurs réseau, 429 et 5xx avec backoff exponentiel (Retry-After respecté),
+    chaque relance prenant elle aussi un jeton dans le seau de l'hôte (RateLimitedRetry) ;
+  - met en cache disque les réponses 200 des GET d'API (JSON, texte), clé = URL complète :
+    une seconde passe ne refait que les appels expirés (ENRICHMENT_HTTP_CACHE_TTL_S).
+
+Les fonctions de recherche des commandes prennent déjà une session : elles n'ont pas à changer.
+fetch_concurrently exécute ces recherches en parallèle et rend les résultats au thread appelant,
+qui garde toutes les écritures en base (même découpage que weather_service.fetch_weather_all_gardens).
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "JardinBiot/1.0 (species import; Django management command)"
+# Requêtes simultanées au plus (threads de fetch_concurrently, taille du pool de connexions)
+ENRICHMENT_MAX_WORKERS = 8
+ENRICHMENT_HTTP_CACHE_TTL_S_DEFAULT = 30 * 24 * 3600
+# Débit par hôte (requêtes/s) ; les autres hôtes : DEFAULT_RATE_PER_S
+ENRICHMENT_RATE_LIMITS_DEFAULT = {
+    "data.canadensys.net": 4.0,
+    "www.itis.gov": 4.0,
+    "plants.usda.gov": 2.0,
+    "plants.sc.egov.usda.gov": 2.0,
+    "query.wikidata.org": 2.0,
+    "www.wikidata.org": 5.0,
+    "commons.wikimedia.org": 5.0,
+    "upload.wikimedia.org": 5.0,
+    "www.botanipedia.org": 2.0,
+}
+DEFAULT_RATE_PER_S = 2.0
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+CACHED_CONTENT_TYPES = ("application/json", "application/sparql-results+json", "text/")
+
+
+class TokenBucket:
+    """Seau à jetons partagé entre threads : rate jetons/s, au plus burst d'avance."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.capacity = float(max(1, burst))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Bloque jusqu'à disposer d'un jeton."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimitedRetry(Retry):
+    """
+    Retry de l'adaptateur dont chaque relance passe par le seau à jetons de l'hôte : sans cela,
+    les relances (429, 5xx) partent hors débit au moment où le serveur en demande moins.
+    on_retry(hôte) est appelé après l'attente de backoff / Retry-After, juste avant le renvoi.
+    """
+
+    def __init__(self, *args, on_retry=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_retry = on_retry
+        self.host = None
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.on_retry = self.on_retry
+        return retry
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        retry = super().increment(method, url, response=response, error=error, _pool=_pool, _stacktrace=_stacktrace)
+        retry.host = getattr(_pool, "host", None)
+        return retry
+
+    def sleep(self, response=None):
+        super().sleep(response)
+        if self.on_retry is not None and self.host:
+            self.on_retry(self.host)
+
+
+class ResponseCache:
+    """
+    Réponses HTTP sur disque : <clé>.json (statut, en-têtes, date) + <clé>.body (octets).
+    Écritures atomiques (fichier temporaire puis rename) : sûres entre threads et processus.
+    """
+
+    def __init__(self, directory, ttl_s: float = ENRICHMENT_HTTP_CACHE_TTL_S_DEFAULT):
+        self.directory = Path(directory)
+        self.ttl_s = ttl_s
+
+    @staticmethod
+    def key(method: str, url: str) -> str:
+        return hashlib.sha256(f"{method.upper()} {url}".encode("utf-8")).hexdigest()
+
+    def _paths(self, key):
+        folder = self.directory / key[:2]
+        return folder / f"{key}.json", folder / f"{key}.body"
+
+    def get(self, key: str):
+        """(méta, octets) si présent et non expiré, sinon None."""
+        meta_path, body_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if self.ttl_s and time.time() - meta.get("stored_at", 0) > self.ttl_s:
+                return None
+            return meta, body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, meta: dict, body: bytes) -> None:
+        meta_path, body_path = self._paths(key)
+        try:
+            meta_path.parent.mkdir(parents=True, exist_ok=True)
+            # Corps d'abord : une méta présente désigne toujours un corps complet
+            self._write_atomic(body_path, body)
+            self._write_atomic(meta_path, json.dumps({**meta, "stored_at": time.time()}).encode("utf-8"))
+        except OSError as e:
+            logger.warning("Cache HTTP non écrit (%s) : %s", meta_path, e)
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+
+class EnrichmentSession(requests.Session):
+    """requests.Session avec débit par hôte, relances et cache disque des GET (voir module)."""
+
+    def __init__(
+        self,
+        *,
+        cache: ResponseCache | None = None,
+        rate_limits: dict | None = None,
+        default_rate: float = DEFAULT_RATE_PER_S,
+        retries: int = 3,
+        backoff: float = 1.0,
+        pool_maxsize: int = ENRICHMENT_MAX_WORKERS,
+    ):
+        super().__init__()
+        self.cache = cache
+        self.rate_limits = dict(rate_limits or {})
+        self.default_rate = default_rate
+        self.stats = {"requests": 0, "cache_hits": 0}
+        self._buckets = {}
+        self._lock = threading.Lock()
+        retry = RateLimitedRetry(
+            on_retry=self._acquire,
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def _bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate_limits.get(host, self.default_rate))
+            return bucket
+
+    def _acquire(self, host: str) -> None:
+        """Un jeton de l'hôte par appel réseau (requête ou relance de l'adaptateur)."""
+        self._bucket(host).acquire()
+        with self._lock:
+            self.stats["requests"] += 1
+
+    def request(self, method, url, params=None, **kwargs):
+        cacheable = self.cache is not None and method.upper() == "GET"
+        if cacheable:
+            full_url = requests.Request(method, url, params=params).prepare().url
+            key = ResponseCache.key(method, full_url)
+            hit = self.cache.get(key)
+            if hit is not None:
+                with self._lock:
+                    self.stats["cache_hits"] += 1
+                return _cached_response(full_url, *hit)
+        self._acquire(urlsplit(url).hostname or "")
+        response = super().request(method, url, params=params, **kwargs)
+        content_type = response.headers.get("Content-Type", "")
+        # Réponses d'API seulement : les images téléchargées sont stockées par les commandes
+        if cacheable and response.status_code == 200 and content_type.startswith(CACHED_CONTENT_TYPES):
+            self.cache.set(key, {"status": 200, "content_type": content_type}, response.content)
+        return response
+
+
+def _cached_response(url: str, meta: dict, body: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = meta.get("status", 200)
+    response.url = url
+    response._content = body
+    if meta.get("content_type"):
+        response.headers["Content-Type"] = meta["content_type"]
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers) or "utf-8"
+    return response
+
+
+def http_cache_dir() -> Path:
+    return Path(getattr(settings, "ENRICHMENT_HTTP_CACHE_DIR", Path(settings.BASE_DIR) / "data" / "http_cache"))
+
+
+def enrichment_session(
+    user_agent: str = USER_AGENT,
+    *,
+    use_cache: bool = True,
+    min_interval: float | None = None,
+    max_workers: int = ENRICHMENT_MAX_WORKERS,
+) -> EnrichmentSession:
+    """
+    Session configurée par les réglages ENRICHMENT_HTTP_CACHE_DIR, ENRICHMENT_HTTP_CACHE_TTL_S
+    et ENRICHMENT_RATE_LIMITS. min_interval (option --delay des commandes) plafonne le débit
+    de chaque hôte à 1 / min_interval requêtes/s.
+    """
+    rate_limits = {**ENRICHMENT_RATE_LIMITS_DEFAULT, **getattr(settings, "ENRICHMENT_RATE_LIMITS", {})}
+    default_rate = DEFAULT_RATE_PER_S
+    if min_interval and min_interval > 0:
+        cap = 1.0 / min_interval
+        rate_limits = {host: min(rate, cap) for host, rate in rate_limits.items()}
+        default_rate = min(default_rate, cap)
+    cache = None
+    if use_cache:
+        ttl = getattr(settings, "ENRICHMENT_HTTP_CACHE_TTL_S", ENRICHMENT_HTTP_CACHE_TTL_S_DEFAULT)
+        cache = ResponseCache(http_cache_dir(), ttl_s=ttl)
+    session = EnrichmentSession(
+        cache=cache, rate_limits=rate_limits, default_rate=default_rate, pool_maxsize=max_workers,
+    )
+    session.headers.update({"User-Agent": user_agent})
+    return session
+
+
+def fetch_concurrently(items, fetch, max_workers: int = ENRICHMENT_MAX_WORKERS):
+    """
+    Applique fetch(item) (appels HTTP seulement, pas d'accès base) sur max_workers threads.
+    Génère (item, résultat, exception) dans l'ordre d'arrivée, dans le thread appelant.
+    """
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        for item in items:
+            try:
+                yield item, fetch(item), None
+            except Exception as e:
+                yield item, None, e
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items)), thread_name_prefix="enrich") as pool:
+        futures = {pool.submit(fetch, item): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                yield item, future.result(), None
+            except Exception as e:
+                yield item, None, e
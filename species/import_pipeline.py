@@ -0,0 +1,241 @@
+"""
+Pipeline d'import en flux, par lots, pour les commandes import_*.
+
+    lecture (itérateur : species.pfaf_mapping.iter_pfaf_data, curseur SQLite, ijson...)
+      → map_row (ligne brute → enregistrement, None = ignorée)
+      → lots de batch_size enregistrements
+      → write_batch (résolution + bulk_create / bulk_update), une transaction par lot
+
+Seul le lot courant est en mémoire : la consommation reste stable quelle que soit la taille
+du fichier. L'avancement (compteurs, lots, lignes/s) est écrit dans DataImportRun après
+chaque lot, visible pendant l'import sur la page Gestion des données.
+
+Un lot en erreur est annulé puis rejoué ligne par ligne (chacune dans son savepoint) :
+seules les lignes fautives sont comptées en erreur, comme dans les boucles ligne à ligne.
+Après chaque écriture annulée, reset_state() remet l'état en mémoire de la sous-classe
+(OrganismResolver : ajouts défaits par rollback, sans recharger le catalogue).
+
+Un appelant qui a déjà créé son DataImportRun (tâche de fond species.jobs, action de la
+page Gestion des données) lance la commande dans caller_import_run(run) : le pipeline écrit
+ses statistiques dans cette exécution au lieu d'en créer une seconde, et laisse le statut
+final à l'appelant.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+DEFAULT_BATCH_SIZE = 500
+# Erreurs de ligne affichées (les suivantes sont seulement comptées)
+MAX_REPORTED_ERRORS = 5
+# Compteurs que write_batch peut retourner
+WRITE_COUNTS = ('created', 'updated', 'skipped')
+
+_state = threading.local()
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List[Any]]:
+    """Découpe un itérable en listes de size éléments (la dernière peut être plus courte)."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+@contextmanager
+def caller_import_run(run):
+    """Les pipelines lancés dans ce bloc (même thread) écrivent dans run, créé par l'appelant."""
+    previous = getattr(_state, 'run', None)
+    _state.run = run
+    try:
+        yield run
+    finally:
+        _state.run = previous
+
+
+class ImportPipeline:
+    """
+    Base des imports par lots. Les sous-classes définissent source (DataImportRun.source),
+    map_row et write_batch ; write_batch retourne le nombre de créations et de mises à jour.
+    """
+
+    source = ''
+    batch_size = DEFAULT_BATCH_SIZE
+    # OrganismResolver de l'import, le cas échéant : point de reprise avant chaque écriture
+    resolver = None
+
+    def __init__(
+        self,
+        *,
+        batch_size: Optional[int] = None,
+        stdout=None,
+        trigger: str = 'gestion_donnees',
+        user=None,
+        record_run: bool = True,
+    ):
+        if batch_size:
+            self.batch_size = batch_size
+        self.stdout = stdout
+        self.trigger = trigger
+        self.user = user
+        self.record_run = record_run
+        self.run_record = None
+        # Exécution de l'appelant : statistiques fusionnées dans les siennes, statut laissé à l'appelant
+        self._caller_stats = None
+        self.stats: Dict[str, Any] = {
+            'rows': 0,
+            'created': 0,
+            'updated': 0,
+            'skipped': 0,
+            'errors': 0,
+            'batches': 0,
+            'rows_per_s': 0.0,
+        }
+        self._started = None
+
+    # --- À définir par les sous-classes ---
+
+    def map_row(self, row: Dict[str, Any], index: int) -> Optional[Any]:
+        """Ligne brute → enregistrement pour write_batch ; None pour ignorer la ligne."""
+        return row
+
+    def write_batch(self, records: List[Any]) -> Dict[str, int]:
+        """
+        Écrit un lot (dans une transaction) ; retourne {'created': n, 'updated': n}, et
+        'skipped' pour les lignes écartées à l'écriture (déjà présentes, par exemple).
+        """
+        raise NotImplementedError
+
+    def row_label(self, record: Any) -> str:
+        """Libellé d'un enregistrement dans les messages d'erreur."""
+        return str(record)
+
+    def reset_state(self) -> None:
+        """
+        Après une écriture annulée (lot, puis ligne rejouée en erreur) : défait ce que
+        write_batch a ajouté à l'état en mémoire. Par défaut, les index du resolver.
+        """
+        if self.resolver is not None:
+            self.resolver.rollback()
+
+    # --- Exécution ---
+
+    def write(self, message: str) -> None:
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def run(self, rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Consomme rows lot par lot ; retourne les statistiques (aussi dans DataImportRun.stats)."""
+        from species.models import DataImportRun
+
+        self._started = time.monotonic()
+        caller_run = getattr(_state, 'run', None)
+        if caller_run is not None:
+            self.run_record = caller_run
+            self._caller_stats = dict(caller_run.stats or {})
+        elif self.record_run and self.source:
+            self.run_record = DataImportRun.objects.create(
+                source=self.source,
+                status='running',
+                trigger=self.trigger,
+                user=self.user,
+                stats=dict(self.stats),
+            )
+        try:
+            for batch in chunked(self._mapped(rows), self.batch_size):
+                self._write(batch)
+                self.stats['batches'] += 1
+                self._progress()
+        except BaseException as e:
+            self._finish('failure', str(e))
+            raise
+        self._finish('success')
+        return self.stats
+
+    def _mapped(self, rows):
+        for index, row in enumerate(rows, 1):
+            self.stats['rows'] += 1
+            try:
+                record = self.map_row(row, index)
+            except Exception as e:
+                self._error(f'ligne {index}', e)
+                continue
+            if record is None:
+                self.stats['skipped'] += 1
+                continue
+            yield record
+
+    def _attempt(self, records):
+        if self.resolver is not None:
+            self.resolver.checkpoint()
+        try:
+            with transaction.atomic():
+                return self.write_batch(records)
+        except Exception:
+            self.reset_state()
+            raise
+
+    def _write(self, batch):
+        try:
+            counts = self._attempt(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                self._error(self.row_label(batch[0]), e)
+                return
+            # Rejoue le lot ligne par ligne pour n'écarter que les lignes fautives
+            counts = {}
+            for record in batch:
+                try:
+                    one = self._attempt([record])
+                except Exception as e:
+                    self._error(self.row_label(record), e)
+                    continue
+                for key in WRITE_COUNTS:
+                    counts[key] = counts.get(key, 0) + one.get(key, 0)
+        for key in WRITE_COUNTS:
+            self.stats[key] += counts.get(key, 0)
+
+    def _error(self, label, exc):
+        self.stats['errors'] += 1
+        if self.stats['errors'] <= MAX_REPORTED_ERRORS:
+            self.write(f'  ⚠️ Erreur {label}: {exc}')
+
+    def _elapsed(self):
+        return max(time.monotonic() - self._started, 1e-6)
+
+    def _progress(self):
+        elapsed = self._elapsed()
+        self.stats['rows_per_s'] = round(self.stats['rows'] / elapsed, 1)
+        self.write(
+            f"  … lot {self.stats['batches']} : {self.stats['rows']} lignes "
+            f"({self.stats['created']} créées, {self.stats['updated']} mises à jour, "
+            f"{self.stats['rows_per_s']} lignes/s)"
+        )
+        if self.run_record is not None:
+            # Une requête par lot : l'avancement est lisible pendant l'import
+            type(self.run_record).objects.filter(pk=self.run_record.pk).update(stats=self._run_stats())
+
+    def _run_stats(self):
+        return {**(self._caller_stats or {}), **self.stats}
+
+    def _finish(self, status, output=''):
+        self.stats['rows_per_s'] = round(self.stats['rows'] / self._elapsed(), 1)
+        self.stats['duration_s'] = round(self._elapsed(), 2)
+        if self.run_record is None:
+            return
+        if self._caller_stats is not None:
+            self.run_record.stats = self._run_stats()
+            type(self.run_record).objects.filter(pk=self.run_record.pk).update(stats=self.run_record.stats)
+            return
+        self.run_record.status = status
+        self.run_record.finished_at = timezone.now()
+        self.run_record.stats = dict(self.stats)
+        if output:
+            self.run_record.output_snippet = output[:2000]
+        self.run_record.save()
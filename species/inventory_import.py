@@ -0,0 +1,97 @@
+"""
+Présence des espèces dans les inventaires municipaux d'arbres (import_arbres_quebec,
+import_arbres_montreal) : une essence = un Organism, marqué dans data_sources[source].
+
+Écriture par lots (species.import_pipeline) : correspondance en mémoire (OrganismResolver),
+fiches existantes lues par lot et écrites en un bulk_update ; seules les essences absentes
+(rares) et les cultivars passent par la création ligne à ligne.
+"""
+from django.utils import timezone
+
+from catalog.search_vectors import mark_search_vectors_dirty
+
+from .import_pipeline import ImportPipeline
+from .models import Cultivar, Organism
+from .source_rules import (
+    OrganismResolver,
+    find_organism_and_cultivar,
+    get_genus_from_nom_latin,
+    parse_cultivar_from_latin,
+)
+
+
+def unique_species(pairs):
+    """(nom_latin, nom_commun) sans doublons (casse ignorée), dans l'ordre du fichier."""
+    seen = set()
+    for nom_latin, nom_commun in pairs:
+        key = (nom_latin.lower(), (nom_commun or '').lower())
+        if key in seen:
+            continue
+        seen.add(key)
+        yield nom_latin, nom_commun or nom_latin
+
+
+class InventoryPresencePipeline(ImportPipeline):
+    """Lignes : (nom_latin, nom_commun) ; data_sources[data_source] = payload sur chaque fiche."""
+
+    UPDATE_FIELDS = ['nom_latin', 'genus', 'data_sources', 'date_modification']
+
+    def __init__(self, *, source, data_source, payload, **kwargs):
+        super().__init__(**kwargs)
+        self.source = source
+        self.data_source = data_source
+        self.payload = payload
+        self.resolver = OrganismResolver(Organism)
+
+    def row_label(self, record):
+        return record[0]
+
+    def write_batch(self, records):
+        counts = {'created': 0, 'updated': 0}
+        targets = {}
+        keys = []
+        renames = {}
+        for nom_latin, nom_commun in records:
+            base_latin, nom_cultivar = parse_cultivar_from_latin(nom_latin)
+            defaults = {'nom_commun': nom_commun, 'regne': 'plante'}
+            if nom_cultivar and base_latin:
+                defaults['slug_latin'] = self.resolver.unique_slug_latin(base_latin)
+                organism, _cultivar, created = find_organism_and_cultivar(
+                    Organism,
+                    Cultivar,
+                    nom_latin=nom_latin,
+                    nom_commun=nom_commun,
+                    defaults_organism=defaults,
+                    defaults_cultivar={},
+                    resolver=self.resolver,
+                )
+                targets[organism.pk] = organism
+            else:
+                key, rename = self.resolver.resolve(nom_latin, nom_commun)
+                if key is None:
+                    organism, created = self.resolver.find_or_match(nom_latin, nom_commun, defaults=defaults)
+                    targets[organism.pk] = organism
+                else:
+                    created = False
+                    keys.append(key)
+                    if rename is not None:
+                        renames[key] = rename
+                        self.resolver.rename(key, rename)
+            counts['created' if created else 'updated'] += 1
+
+        for oid, organism in Organism.objects.in_bulk([k for k in keys if k not in targets]).items():
+            targets[oid] = organism
+        for oid, nom_latin in renames.items():
+            targets[oid].nom_latin = nom_latin
+        now = timezone.now()
+        for organism in targets.values():
+            genus = get_genus_from_nom_latin(organism.nom_latin or '')
+            if genus:
+                organism.genus = genus
+            organism.data_sources = {**(organism.data_sources or {}), self.data_source: self.payload}
+            # bulk_update ne pose pas auto_now
+            organism.date_modification = now
+        Organism.objects.bulk_update(list(targets.values()), self.UPDATE_FIELDS, batch_size=self.batch_size)
+        # bulk_update n'émet pas post_save : noms latins corrigés marqués pour la recherche
+        mark_search_vectors_dirty(renames)
+        return counts
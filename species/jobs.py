@@ -0,0 +1,209 @@
+"""
+Tâches de fond pour les commandes de gestion (RunAdminCommandView, boutons de gestion_donnees).
+
+La file est la table DataImportRun : enqueue_command() crée une exécution 'queued' et rend
+la main tout de suite. Le worker (commande run_jobs, un processus par tâche) la réclame,
+lance call_command et écrit la sortie au fil de l'eau dans l'exécution : output_snippet
+garde les JOB_OUTPUT_TAIL derniers caractères, output_size compte tout ce qui a été écrit
+(un client qui a lu jusqu'à offset ne demande que la suite, voir output_since).
+
+Annulation : request_cancel() retire une tâche en attente, ou marque cancel_requested sur
+une tâche en cours ; la commande s'arrête à sa prochaine écriture (JobCancelled), et le
+worker termine le processus si elle reste muette plus de CANCEL_GRACE_SECONDS.
+"""
+import io
+import logging
+import os
+import socket
+import time
+from contextlib import redirect_stdout
+from datetime import timedelta
+
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+JOB_OUTPUT_TAIL = 50_000
+# Écriture de la sortie en base au plus une fois par intervalle (s)
+OUTPUT_FLUSH_INTERVAL = 1.0
+CANCEL_GRACE_SECONDS = 30
+# Tâche 'running' sans signe de vie depuis ce délai : worker mort
+STALE_AFTER = timedelta(minutes=5)
+
+
+class JobCancelled(Exception):
+    """Levée dans la commande (à l'écriture) quand l'annulation a été demandée."""
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def enqueue_command(command, command_kwargs, *, trigger='api', user=None, stats=None):
+    """Met la commande en file ; retourne l'exécution (DataImportRun, status 'queued')."""
+    from .models import DataImportRun
+
+    return DataImportRun.objects.create(
+        source=command,
+        status='queued',
+        trigger=trigger,
+        user=user,
+        stats=stats or {},
+        command_options=command_kwargs,
+    )
+
+
+def claim_next_job(worker=None):
+    """
+    Réclame la plus ancienne tâche en attente (passe à 'running') ; None si la file est vide.
+    Mise à jour conditionnelle sur le statut : deux workers ne prennent jamais la même tâche.
+    """
+    from .models import DataImportRun
+
+    candidates = DataImportRun.objects.filter(status='queued').order_by('started_at', 'id')
+    for job_id in candidates.values_list('id', flat=True)[:10]:
+        claimed = DataImportRun.objects.filter(pk=job_id, status='queued').update(
+            status='running', worker=worker or worker_name(), heartbeat_at=timezone.now(),
+        )
+        if claimed:
+            return job_id
+    return None
+
+
+def request_cancel(job_id):
+    """Annule une tâche en attente, ou demande l'arrêt d'une tâche en cours. Retourne le statut résultant."""
+    from .models import DataImportRun
+
+    message = 'Annulé avant démarrage.'
+    if DataImportRun.objects.filter(pk=job_id, status='queued').update(
+        status='cancelled', cancel_requested=True, finished_at=timezone.now(),
+        output_snippet=message, output_size=len(message),
+    ):
+        return 'cancelled'
+    DataImportRun.objects.filter(pk=job_id, status='running').update(cancel_requested=True)
+    return DataImportRun.objects.filter(pk=job_id).values_list('status', flat=True).first()
+
+
+def output_since(run, offset):
+    """(texte écrit depuis offset, tronqué) : tronqué si le début n'est plus dans output_snippet."""
+    tail = run.output_snippet or ''
+    tail_start = run.output_size - len(tail)
+    if offset is None or offset < tail_start:
+        return tail, offset is not None and offset < tail_start
+    return tail[max(0, offset - tail_start):], False
+
+
+class JobOutput(io.TextIOBase):
+    """
+    Flux texte (stdout / stderr de la commande) persisté dans l'exécution toutes les
+    OUTPUT_FLUSH_INTERVAL secondes ; lève JobCancelled à l'écriture si l'annulation est demandée.
+    """
+
+    def __init__(self, job_id, tail='', size=0):
+        super().__init__()
+        self.job_id = job_id
+        self.tail = tail
+        self.size = size
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+    def writable(self):
+        return True
+
+    def write(self, s):
+        if not s:
+            return 0
+        self.append(s)
+        if time.monotonic() - self._last_flush >= OUTPUT_FLUSH_INTERVAL:
+            self.persist(check_cancel=True)
+        return len(s)
+
+    def append(self, s):
+        """Ajoute s sans écrire en base (fin de tâche : finish_job enregistre le tout)."""
+        self.tail = (self.tail + s)[-JOB_OUTPUT_TAIL:]
+        self.size += len(s)
+        self._dirty = True
+
+    def flush(self):
+        if self._dirty and not self.closed:
+            self.persist(check_cancel=True)
+
+    def close(self):
+        # La sortie finale est enregistrée par finish_job, pas à la fermeture du flux
+        self._dirty = False
+        super().close()
+
+    def persist(self, check_cancel=False):
+        from .models import DataImportRun
+
+        qs = DataImportRun.objects.filter(pk=self.job_id)
+        if check_cancel:
+            qs = qs.filter(cancel_requested=False)
+        updated = qs.update(output_snippet=self.tail, output_size=self.size, heartbeat_at=timezone.now())
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        # Ligne absente (ex. base vidée par wipe_db_and_media) : pas une annulation
+        if check_cancel and not updated and DataImportRun.objects.filter(pk=self.job_id, cancel_requested=True).exists():
+            raise JobCancelled()
+
+
+def run_job(job_id):
+    """Exécute une tâche réclamée (status 'running') et enregistre son issue. Retourne le statut final."""
+    from django.core.management import call_command
+
+    from .import_pipeline import caller_import_run
+    from .models import DataImportRun
+
+    run = DataImportRun.objects.filter(pk=job_id).first()
+    if run is None:
+        return None
+    output = JobOutput(job_id, run.output_snippet, run.output_size)
+    status = 'failure'
+    try:
+        # Les commandes qui utilisent print() écrivent aussi dans la sortie de la tâche
+        # Les pipelines d'import écrivent leurs statistiques dans cette exécution
+        with redirect_stdout(output), caller_import_run(run):
+            call_command(run.source, stdout=output, stderr=output, **(run.command_options or {}))
+        status = 'success'
+    except JobCancelled:
+        status = 'cancelled'
+        output.append('\nAnnulé.')
+    except SystemExit:
+        output.append('\nOptions manquantes ou erreur.')
+    except Exception as e:
+        logger.exception('Tâche %s (%s) en échec', job_id, run.source)
+        output.append(f'\nErreur : {e}')
+    finish_job(run, status, output)
+    output.close()
+    return status
+
+
+def finish_job(run, status, output=None, message=None):
+    """Statut final, sortie et statistiques de fin (note d'enrichissement après, si notée avant)."""
+    from .models import BaseEnrichmentStats, DataImportRun
+
+    stats = dict(run.stats or {})
+    if status == 'success' and 'global_score_before' in stats:
+        enrichment = BaseEnrichmentStats.objects.first()
+        stats['global_score_after'] = enrichment.global_score_pct if enrichment else None
+    fields = {'status': status, 'finished_at': timezone.now(), 'stats': stats}
+    if output is not None:
+        fields.update(output_snippet=output.tail, output_size=output.size)
+    elif message:
+        current = DataImportRun.objects.filter(pk=run.pk).values_list('output_snippet', 'output_size').first()
+        if current:
+            tail, size = current
+            fields.update(output_snippet=(tail + message)[-JOB_OUTPUT_TAIL:], output_size=size + len(message))
+    DataImportRun.objects.filter(pk=run.pk, status='running').update(**fields)
+
+
+def fail_stale_jobs():
+    """Tâches 'running' sans signe de vie depuis STALE_AFTER (worker arrêté) : passées en échec."""
+    from .models import DataImportRun
+
+    stale = DataImportRun.objects.filter(status='running', heartbeat_at__lt=timezone.now() - STALE_AFTER)
+    count = 0
+    for run in stale:
+        finish_job(run, 'failure', message='\nWorker interrompu : tâche abandonnée.')
+        count += 1
+    return count
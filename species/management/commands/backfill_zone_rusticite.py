@@ -0,0 +1,19 @@
+"""
+Recalcule Organism.zone_rusticite_min / _max (ordinaux indexés du filtre zone_usda) à partir de zone_rusticite.
+Organism.save() et sync_radixsylva les tiennent à jour : ce recalcul ne sert qu'après
+une modification SQL directe, un update() de zone_rusticite ou une restauration.
+
+Usage:
+  python manage.py backfill_zone_rusticite
+"""
+from django.core.management.base import BaseCommand
+
+from species.source_rules import refresh_zone_rusticite_bounds
+
+
+class Command(BaseCommand):
+    help = "Recalcule les bornes de zone de rusticité (zone_rusticite_min / _max) de tous les organismes."
+
+    def handle(self, *args, **options):
+        updated = refresh_zone_rusticite_bounds()
+        self.stdout.write(self.style.SUCCESS(f"Bornes de zone mises à jour pour {updated} organisme(s)."))
@@ -4,7 +4,7 @@ Récupère les données météo (Open-Meteo) pour tous les jardins.
 """
 from django.core.management.base import BaseCommand
 
-from species.weather_service import fetch_weather_all_gardens
+from species.weather_service import WEATHER_MAX_WORKERS, fetch_weather_all_gardens
 
 
 class Command(BaseCommand):
@@ -17,10 +17,16 @@ class Command(BaseCommand):
             default=14,
             help="Nombre de jours à récupérer (défaut: 14)",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=WEATHER_MAX_WORKERS,
+            help=f"Requêtes Open-Meteo simultanées (défaut: {WEATHER_MAX_WORKERS}, 1 = séquentiel)",
+        )
 
     def handle(self, *args, **options):
         days = options["days"]
-        result = fetch_weather_all_gardens(days_back=days)
+        result = fetch_weather_all_gardens(days_back=days, max_workers=options["workers"])
         total = sum(result.values())
         for gid, count in result.items():
             self.stdout.write(f"  Jardin {gid}: {count} jours")
@@ -0,0 +1,80 @@
+"""
+Génère les déclinaisons (thumb, medium, full) des photos existantes (voir species.photo_renditions).
+Les nouvelles photos sont déclinées à l'envoi : cette commande sert au rattrapage
+et après un changement de tailles ou de format (--force).
+
+Usage:
+  python manage.py generate_photo_renditions
+  python manage.py generate_photo_renditions --sizes thumb medium --workers 4
+  python manage.py generate_photo_renditions --force
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from species.models import Photo
+from species.photo_renditions import RENDITIONS, generate_renditions
+
+DEFAULT_WORKERS = 4
+
+
+class Command(BaseCommand):
+    help = "Génère les déclinaisons (vignette, moyenne, pleine) des images de photos."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            choices=list(RENDITIONS),
+            default=list(RENDITIONS),
+            help="Tailles à générer (défaut: toutes)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regénérer même les déclinaisons existantes",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=DEFAULT_WORKERS,
+            help=f"Images traitées en parallèle (défaut: {DEFAULT_WORKERS}, 1 = séquentiel)",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=0,
+            help="Nombre max de photos (0 = toutes)",
+        )
+
+    def handle(self, *args, **options):
+        sizes = options["sizes"]
+        force = options["force"]
+        qs = Photo.objects.exclude(image="").only("id", "image").order_by("id")
+        if options["limit"]:
+            qs = qs[: options["limit"]]
+
+        def render(photo):
+            # Décodage et redimensionnement Pillow (hors GIL) : pas d'accès base dans les threads
+            try:
+                return photo, generate_renditions(photo, sizes, force=force), None
+            except Exception as e:
+                return photo, [], e
+
+        generated = unchanged = errors = 0
+        with ThreadPoolExecutor(max_workers=max(1, options["workers"]), thread_name_prefix="renditions") as pool:
+            for photo, written, exc in pool.map(render, qs.iterator(chunk_size=500)):
+                if exc is not None:
+                    errors += 1
+                    self.stdout.write(self.style.WARNING(f"  Photo {photo.pk} ({photo.image.name}) : {exc}"))
+                elif written:
+                    generated += 1
+                else:
+                    unchanged += 1
+                total = generated + unchanged + errors
+                if total % 200 == 0:
+                    self.stdout.write(f"  … {total} photo(s)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Déclinaisons : {generated} photo(s) traitée(s), {unchanged} déjà à jour, {errors} erreur(s)."
+        ))
@@ -8,24 +8,22 @@ Téléchargez le CSV depuis https://donnees.montreal.ca/dataset/arbres
 Les colonnes peuvent varier (ex. ESSENCE, NOM_LATIN, genre, espece). On tente d'extraire
 un nom scientifique (genre + espèce) pour le matching.
 
+Lecture en flux et écriture par lots (species.inventory_import) : une transaction par lot,
+avancement dans DataImportRun (source 'import_arbres_montreal').
+
 Usage:
   python manage.py import_arbres_montreal --file arbres_montreal.csv [--limit 100]
 """
 import csv
 import re
+from itertools import islice
 from pathlib import Path
 
 from django.core.management.base import BaseCommand
 
-from species.models import Cultivar, Organism
-from species.source_rules import (
-    SOURCE_VILLE_MONTREAL,
-    ensure_organism_genus,
-    find_organism_and_cultivar,
-    find_or_match_organism,
-    get_unique_slug_latin,
-    parse_cultivar_from_latin,
-)
+from species.import_pipeline import DEFAULT_BATCH_SIZE
+from species.inventory_import import InventoryPresencePipeline, unique_species
+from species.source_rules import SOURCE_VILLE_MONTREAL
 
 SOURCE_URL = "https://donnees.montreal.ca/dataset/arbres"
 
@@ -48,6 +46,15 @@ def extract_nom_latin(row):
     return ""
 
 
+def _csv_names(path):
+    """(nom_latin, nom_commun) de chaque ligne, lues en flux ; le nom latin sert de nom commun."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for row in csv.DictReader(f, delimiter=","):
+            nom_latin = extract_nom_latin(row)
+            if nom_latin and len(nom_latin) >= 3:
+                yield nom_latin.strip(), ""
+
+
 class Command(BaseCommand):
     help = (
         "Associe les espèces du fichier CSV (Arbres publics - Ville de Montréal) aux organismes. "
@@ -72,6 +79,12 @@ class Command(BaseCommand):
             action="store_true",
             help="Afficher les noms extraits sans modifier la base.",
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Essences écrites par transaction (défaut: {DEFAULT_BATCH_SIZE}).",
+        )
 
     def handle(self, *args, **options):
         file_path = Path(options["file"])
@@ -80,75 +93,35 @@ class Command(BaseCommand):
             return
 
         limit = options["limit"] or 0
-        dry_run = options["dry_run"]
+        names = unique_species(_csv_names(file_path))
+        if limit > 0:
+            names = islice(names, limit)
+
+        if options["dry_run"]:
+            count = 0
+            for nom_latin, _nom_commun in names:
+                count += 1
+                if count <= 20:
+                    self.stdout.write(f"  [DRY] {nom_latin}")
+            if count > 20:
+                self.stdout.write(f"  ... et {count - 20} autres.")
+            self.stdout.write(self.style.SUCCESS(f"Arbres Montréal : {count} essences uniques à associer."))
+            return
 
-        seen = set()
-        names = []
+        pipeline = InventoryPresencePipeline(
+            source="import_arbres_montreal",
+            data_source=SOURCE_VILLE_MONTREAL,
+            payload={"inventaire": True, "source": "Arbres publics - Ville de Montréal", "url": SOURCE_URL},
+            batch_size=options["batch_size"],
+            stdout=self.stdout,
+        )
         try:
-            with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-                reader = csv.DictReader(f, delimiter=",")
-                for row in reader:
-                    nom_latin = extract_nom_latin(row)
-                    if not nom_latin or len(nom_latin) < 3:
-                        continue
-                    key = nom_latin.lower().strip()
-                    if key in seen:
-                        continue
-                    seen.add(key)
-                    names.append(nom_latin)
-        except Exception as e:
+            stats = pipeline.run(names)
+        except (OSError, csv.Error) as e:
             self.stdout.write(self.style.ERROR(f"Erreur lecture CSV: {e}"))
             return
 
-        if limit > 0:
-            names = names[:limit]
-
-        self.stdout.write(self.style.SUCCESS(f"Arbres Montréal : {len(names)} essences uniques à associer."))
-
-        if dry_run:
-            for nom in names[:20]:
-                self.stdout.write(f"  [DRY] {nom}")
-            if len(names) > 20:
-                self.stdout.write(f"  ... et {len(names) - 20} autres.")
-            return
-
-        created = 0
-        updated = 0
-        for nom_latin in names:
-            try:
-                base_latin, nom_cultivar = parse_cultivar_from_latin(nom_latin)
-                defaults = {"nom_commun": nom_latin, "regne": "plante"}
-                if nom_cultivar and base_latin:
-                    defaults["slug_latin"] = get_unique_slug_latin(Organism, base_latin)
-                    organism, _cultivar, was_created = find_organism_and_cultivar(
-                        Organism,
-                        Cultivar,
-                        nom_latin=nom_latin,
-                        nom_commun=nom_latin,
-                        defaults_organism=defaults,
-                        defaults_cultivar={},
-                    )
-                else:
-                    organism, was_created = find_or_match_organism(
-                        Organism,
-                        nom_latin=nom_latin,
-                        nom_commun=nom_latin,
-                        defaults=defaults,
-                    )
-                ensure_organism_genus(organism)
-                existing_sources = dict(organism.data_sources or {})
-                existing_sources[SOURCE_VILLE_MONTREAL] = {
-                    "inventaire": True,
-                    "source": "Arbres publics - Ville de Montréal",
-                    "url": SOURCE_URL,
-                }
-                organism.data_sources = existing_sources
-                organism.save(update_fields=["data_sources"])
-                if was_created:
-                    created += 1
-                else:
-                    updated += 1
-            except Exception as e:
-                self.stdout.write(self.style.WARNING(f"  Erreur {nom_latin}: {e}"))
-
-        self.stdout.write(self.style.SUCCESS(f"\nTerminé: {created} créés, {updated} mis à jour."))
+        self.stdout.write(self.style.SUCCESS(
+            f"\nTerminé: {stats['rows']} essences, {stats['created']} créés, {stats['updated']} mis à jour, "
+            f"{stats['errors']} erreurs."
+        ))
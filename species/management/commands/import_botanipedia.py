@@ -8,10 +8,11 @@ Usage:
   python manage.py import_botanipedia --limit 10 --delay 1  # Limite et délai entre requêtes
 """
 import re
-import time
 import requests
 from django.core.management.base import BaseCommand
+from django.utils import timezone
 
+from species.http_fetch import ENRICHMENT_MAX_WORKERS, enrichment_session, fetch_concurrently
 from species.models import Organism
 from species.source_rules import SOURCE_BOTANIPEDIA, is_empty_value
 
@@ -120,6 +121,20 @@ def _extract_excerpt(wiki_text: str, max_len: int = 2000) -> str:
     return s
 
 
+def botanipedia_fetch(session: requests.Session, nom_latin: str) -> tuple[str, str]:
+    """
+    Page Botanipedia d'une espèce (appels HTTP seulement) : (titre, contenu wiki ou '').
+    1) titre construit (Botanipedia:GENUS SPECIES), 2) recherche full-text (souvent vide sur ce wiki).
+    """
+    title = _build_botanipedia_title(nom_latin)
+    content = _get_page_content(session, title)
+    if not content:
+        title = _search_page(session, nom_latin)
+        if title:
+            content = _get_page_content(session, title)
+    return title, content
+
+
 class Command(BaseCommand):
     help = (
         "Enrichit les organismes avec Botanipedia (botanipedia.org). "
@@ -142,7 +157,18 @@ class Command(BaseCommand):
             "--delay",
             type=float,
             default=1.0,
-            help="Délai en secondes entre chaque requête API (défaut: 1.0).",
+            help="Intervalle minimal en secondes entre deux requêtes API (défaut: 1.0).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=ENRICHMENT_MAX_WORKERS,
+            help=f"Recherches simultanées (défaut: {ENRICHMENT_MAX_WORKERS}).",
+        )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Ignorer le cache disque des réponses HTTP.",
         )
         parser.add_argument(
             "--verbose",
@@ -151,6 +177,8 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
+        # Fiches sauvegardées par cet import : date_modification >= started_at (note recalculée pour elles seules)
+        started_at = timezone.now()
         enrich = options["enrich"]
         limit = options["limit"] or 0
         delay = max(0.5, options["delay"])
@@ -179,21 +207,20 @@ class Command(BaseCommand):
             )
             return
 
-        session = requests.Session()
+        session = enrichment_session(
+            USER_AGENT, use_cache=not options["no_cache"], min_interval=delay, max_workers=options["workers"],
+        )
         updated = 0
-        for organism in qs:
-            nom = organism.nom_latin or ""
-            if not nom.strip():
+        errors = 0
+        todo = [(organism, organism.nom_latin) for organism in qs if (organism.nom_latin or "").strip()]
+        # Pages récupérées en parallèle (débit limité) ; écritures ici, dans l'ordre d'arrivée
+        fetched = fetch_concurrently(todo, lambda item: botanipedia_fetch(session, item[1]), options["workers"])
+        for (organism, nom), result, error in fetched:
+            if error is not None:
+                errors += 1
+                self.stdout.write(self.style.WARNING(f"  Erreur {organism.nom_commun or '?'} ({nom}): {error}"))
                 continue
-            # 1) Titre construit (Botanipedia:GENUS SPECIES) — correspondance exacte au wiki
-            title = _build_botanipedia_title(nom)
-            content = _get_page_content(session, title)
-            if not content:
-                # 2) Fallback : recherche full-text (souvent vide sur ce wiki)
-                title = _search_page(session, nom)
-                if title:
-                    content = _get_page_content(session, title)
-            time.sleep(delay)
+            title, content = result
             if not content:
                 if verbose:
                     self.stdout.write(
@@ -214,11 +241,11 @@ class Command(BaseCommand):
             self.stdout.write(f"  ✓ {organism.nom_commun} ({nom}) → {title}")
 
         self.stdout.write(
-            self.style.SUCCESS(f"\nTerminé : {updated} fiche(s) enrichie(s) avec Botanipedia.")
+            self.style.SUCCESS(f"\nTerminé : {updated} fiche(s) enrichie(s) avec Botanipedia, {errors} erreur(s).")
         )
         try:
             from species.enrichment_score import update_enrichment_scores
-            res = update_enrichment_scores()
+            res = update_enrichment_scores(since=started_at)
             self.stdout.write(self.style.SUCCESS(f"  Enrichissement: note globale {res['global_score_pct']}%"))
         except Exception as e:
             self.stdout.write(self.style.WARNING(f"  Recalcul enrichissement: {e}"))
@@ -12,25 +12,42 @@ from urllib3.exceptions import InsecureRequestWarning
 from requests.adapters import HTTPAdapter
 from urllib3.util.ssl_ import create_urllib3_context
 from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from catalog.search_vectors import mark_search_vectors_dirty
 
 try:
     import certifi
 except ImportError:
     certifi = None
+from species.import_pipeline import DEFAULT_BATCH_SIZE, ImportPipeline
 from species.models import Cultivar, Organism
 from species.source_rules import (
     MERGE_FILL_GAPS,
     MERGE_OVERWRITE,
     SOURCE_HYDROQUEBEC,
+    OrganismResolver,
     apply_fill_gaps,
-    ensure_organism_genus,
     find_organism_and_cultivar,
-    find_or_match_organism,
-    get_unique_slug_latin,
+    get_genus_from_nom_latin,
     merge_zones_rusticite,
     parse_cultivar_from_latin,
+    zone_rusticite_bounds,
 )
 
+# Champs descriptifs HQ : écrasés (overwrite) ou complétés (fill_gaps)
+HQ_FIELDS = [
+    'type_organisme', 'famille', 'besoin_eau', 'besoin_soleil', 'sol_textures', 'sol_ph',
+    'hauteur_max', 'largeur_max', 'vitesse_croissance', 'description',
+    'toxicite', 'parties_comestibles', 'usages_autres',
+]
+# Champs renseignés seulement si HQ a une valeur (création, fill_gaps)
+HQ_OPTIONAL_FIELDS = ('toxicite', 'parties_comestibles', 'usages_autres')
+UPDATE_FIELDS = HQ_FIELDS + [
+    'nom_latin', 'genus', 'zone_rusticite', 'zone_rusticite_min', 'zone_rusticite_max',
+    'data_sources', 'date_modification',
+]
+
 
 class TLS12Adapter(HTTPAdapter):
     """Adaptateur forçant TLS 1.2+ et utilisant certifi pour les certificats."""
@@ -46,6 +63,108 @@ class TLS12Adapter(HTTPAdapter):
         return super().init_poolmanager(*args, **kwargs)
 
 
+class HydroQuebecPipeline(ImportPipeline):
+    """
+    Écriture par lots des fiches HQ préparées par Command._preparer_arbre : correspondance en
+    mémoire (OrganismResolver), fiches existantes lues en un in_bulk et écrites en un bulk_update
+    par lot ; les espèces absentes et les cultivars sont créés ligne à ligne.
+    """
+
+    source = 'import_hydroquebec'
+
+    def __init__(self, *, prepare, merge_mode=MERGE_OVERWRITE, **kwargs):
+        super().__init__(**kwargs)
+        self.prepare = prepare
+        self.merge_mode = merge_mode
+        self.resolver = OrganismResolver(Organism)
+
+    def map_row(self, row, index):
+        return self.prepare(row)
+
+    def row_label(self, record):
+        return record['nom_francais']
+
+    def _defaults(self, record, slug_latin):
+        defaults = {'nom_commun': record['nom_francais'], 'regne': 'plante', 'slug_latin': slug_latin}
+        defaults.update(
+            (k, v) for k, v in record['fields'].items() if v or k not in HQ_OPTIONAL_FIELDS
+        )
+        return defaults
+
+    def write_batch(self, records):
+        counts = {'created': 0, 'updated': 0}
+        targets = {}
+        plan = []
+        renames = {}
+        for record in records:
+            nom_latin, nom_francais = record['nom_latin'], record['nom_francais']
+            base_latin, nom_cultivar = parse_cultivar_from_latin(nom_latin)
+            if nom_cultivar and base_latin:
+                organism, _cultivar, created = find_organism_and_cultivar(
+                    Organism,
+                    Cultivar,
+                    nom_latin=nom_latin,
+                    nom_commun=nom_francais,
+                    defaults_organism=self._defaults(record, self.resolver.unique_slug_latin(base_latin)),
+                    defaults_cultivar=record['defaults_cultivar'],
+                    resolver=self.resolver,
+                )
+                targets[organism.pk] = organism
+                key = organism.pk
+            else:
+                key, rename = self.resolver.resolve(nom_latin, nom_francais)
+                if key is None:
+                    organism, created = self.resolver.find_or_match(
+                        nom_latin, nom_francais, defaults=self._defaults(record, self.resolver.unique_slug_latin(nom_latin)),
+                    )
+                    targets[organism.pk] = organism
+                    key = organism.pk
+                else:
+                    created = False
+                    if rename is not None:
+                        renames[key] = rename
+                        self.resolver.rename(key, rename)
+            plan.append((key, record))
+            counts['created' if created else 'updated'] += 1
+
+        targets.update(Organism.objects.in_bulk([key for key, _record in plan if key not in targets]))
+        for oid, nom_latin in renames.items():
+            targets[oid].nom_latin = nom_latin
+        # Dans l'ordre du fichier : une fiche HQ en double s'applique comme avec des save successifs
+        for key, record in plan:
+            self._apply(targets[key], record)
+
+        now = timezone.now()
+        for organism in targets.values():
+            genus = get_genus_from_nom_latin(organism.nom_latin or '')
+            if genus:
+                organism.genus = genus
+            organism.zone_rusticite_min, organism.zone_rusticite_max = zone_rusticite_bounds(organism.zone_rusticite)
+            # bulk_update ne pose pas auto_now (update_enrichment_scores(since=...) s'y fie)
+            organism.date_modification = now
+        Organism.objects.bulk_update(list(targets.values()), UPDATE_FIELDS, batch_size=self.batch_size)
+        # bulk_update n'émet pas post_save : index de recherche marqué ici
+        mark_search_vectors_dirty(targets)
+        return counts
+
+    def _apply(self, organism, record):
+        fields = record['fields']
+        if self.merge_mode == MERGE_FILL_GAPS:
+            # Ne mettre à jour que les champs vides
+            fields = apply_fill_gaps(
+                {k: getattr(organism, k, None) for k in HQ_FIELDS},
+                {k: v for k, v in fields.items() if v or k not in HQ_OPTIONAL_FIELDS},
+            )
+        for key, value in fields.items():
+            setattr(organism, key, value)
+        # Zones de rusticité : toujours fusionnées (format JSONField avec source)
+        if record['zone_rusticite']:
+            organism.zone_rusticite = merge_zones_rusticite(
+                list(organism.zone_rusticite or []), record['zone_rusticite'], SOURCE_HYDROQUEBEC,
+            )
+        organism.data_sources = {**(organism.data_sources or {}), SOURCE_HYDROQUEBEC: record['hq_payload']}
+
+
 class Command(BaseCommand):
     help = (
         'Importe les arbres et arbustes depuis Hydro-Québec. '
@@ -138,8 +257,16 @@ class Command(BaseCommand):
                 'Exemple: --limit 0 --output arbres_hq.json puis --file arbres_hq.json pour importer.'
             )
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Fiches écrites par transaction (défaut: {DEFAULT_BATCH_SIZE}).',
+        )
 
     def handle(self, *args, **options):
+        # Fiches sauvegardées par cet import : date_modification >= started_at (note recalculée pour elles seules)
+        started_at = timezone.now()
         limit = options['limit']
         file_path = options.get('file')
         output_path = options.get('output')
@@ -216,238 +343,24 @@ class Command(BaseCommand):
                 'Accept': 'application/json',
             })
 
-        created = 0
-        updated = 0
-        skipped = 0
-
-        for arbre in arbres:
-            try:
-                # Lire et nettoyer les noms (trim, espaces, corrections optionnelles)
-                nom_latin, nom_francais = self._clean_import_names(
-                    arbre.get('nomLatin') or '',
-                    arbre.get('nomFrancais') or '',
-                )
-
-                if not nom_latin or not nom_francais:
-                    skipped += 1
-                    continue
-
-                # Compléter avec la fiche détail si champs descriptifs manquants
-                numero_fiche = arbre.get('numeroFiche')
-                if fetch_details and numero_fiche and self._manque_donnees_descriptives(arbre):
-                    detail = self._fetch_fiche_detail(session, numero_fiche, insecure=insecure)
-                    if detail:
-                        arbre = self._fusionner_fiche_detail(arbre, detail)
-                        if detail.get('fruitsDescription'):
-                            self.stdout.write(f'     📥 Fiche {numero_fiche}: fruits récupérés')
-
-                formes = arbre.get('formes', [])
-                fruits_description = arbre.get('fruitsDescription') or ''
-                nom_latin_raw = arbre.get('nomLatin') or ''
-                type_organisme = self._determiner_type(formes, fruits_description, nom_latin_raw)
-
-                # L'API peut renvoyer null: on force listes/chaînes vides pour éviter NOT NULL en base
-                famille = arbre.get('famille') or ''
-                zone_rusticite_raw = arbre.get('zoneRusticite') or ''
-                description = self._creer_description(arbre) or ''
-                sol_textures = arbre.get('solTextures') if arbre.get('solTextures') is not None else []
-                sol_ph = arbre.get('solPhs') if arbre.get('solPhs') is not None else []
-                toxicite = self._extraire_toxicite_fruits(arbre.get('fruitsDescription'))
-                parties_comestibles = self._deriver_parties_comestibles(
-                    arbre.get('fruitsDescription'), toxicite
-                )
-                hq_payload = {
-                    'numeroFiche': arbre.get('numeroFiche'),
-                    'plantationDistanceMinimum': arbre.get('plantationDistanceMinimum'),
-                    'remarques': arbre.get('remarquesFicheDeBase') or '',
-                    'usages': arbre.get('usages') or '',
-                    'maladies': arbre.get('maladies') or '',
-                    'insectes': arbre.get('insectes') or '',
-                    'feuillesDescription': arbre.get('feuillesDescription') or '',
-                    'fleursDescription': arbre.get('fleursDescription') or '',
-                    'fruitsDescription': arbre.get('fruitsDescription') or '',
-                }
-                usages_hq = arbre.get('usages') or ''
-
-                # Détecter cultivar dans le nom latin : si oui, rattacher à l'espèce + Cultivar
-                base_latin, nom_cultivar = parse_cultivar_from_latin(nom_latin)
-                if nom_cultivar and base_latin:
-                    slug_latin_espece = get_unique_slug_latin(Organism, base_latin)
-                    defaults_organism = {
-                        'nom_commun': nom_francais,
-                        'famille': famille,
-                        'regne': 'plante',
-                        'type_organisme': type_organisme,
-                        'slug_latin': slug_latin_espece,
-                        'besoin_eau': self._convertir_humidite(
-                            arbre.get('solHumidites') or []
-                        ),
-                        'besoin_soleil': self._convertir_exposition(
-                            arbre.get('expositionsLumiere') or []
-                        ),
-                        'sol_textures': sol_textures,
-                        'sol_ph': sol_ph,
-                        'hauteur_max': arbre.get('hauteur'),
-                        'largeur_max': arbre.get('largeur'),
-                        'vitesse_croissance': self._convertir_croissance(
-                            arbre.get('croissance') or ''
-                        ),
-                        'description': description,
-                    }
-                    if usages_hq:
-                        defaults_organism['usages_autres'] = usages_hq
-                    if toxicite:
-                        defaults_organism['toxicite'] = toxicite
-                    if parties_comestibles:
-                        defaults_organism['parties_comestibles'] = parties_comestibles
-                    cultivar_notes = (arbre.get('remarquesFicheDeBase') or '').strip()
-                    if arbre.get('fruitsDescription') and cultivar_notes:
-                        cultivar_notes = (arbre.get('fruitsDescription') or '')[:500] + '\n\n' + cultivar_notes
-                    elif arbre.get('fruitsDescription'):
-                        cultivar_notes = (arbre.get('fruitsDescription') or '')[:500]
-                    defaults_cultivar = {}
-                    if cultivar_notes:
-                        defaults_cultivar['description'] = cultivar_notes[: 2000]
-                    organism, _cultivar, est_nouveau = find_organism_and_cultivar(
-                        Organism,
-                        Cultivar,
-                        nom_latin=nom_latin,
-                        nom_commun=nom_francais,
-                        defaults_organism=defaults_organism,
-                        defaults_cultivar=defaults_cultivar,
-                    )
-                else:
-                    slug_latin_unique = get_unique_slug_latin(Organism, nom_latin)
-                    defaults = {
-                        'nom_commun': nom_francais,
-                        'famille': famille,
-                        'regne': 'plante',
-                        'type_organisme': type_organisme,
-                        'slug_latin': slug_latin_unique,
-                        'besoin_eau': self._convertir_humidite(
-                            arbre.get('solHumidites') or []
-                        ),
-                        'besoin_soleil': self._convertir_exposition(
-                            arbre.get('expositionsLumiere') or []
-                        ),
-                        'sol_textures': sol_textures,
-                        'sol_ph': sol_ph,
-                        'hauteur_max': arbre.get('hauteur'),
-                        'largeur_max': arbre.get('largeur'),
-                        'vitesse_croissance': self._convertir_croissance(
-                            arbre.get('croissance') or ''
-                        ),
-                        'description': description,
-                    }
-                    if usages_hq:
-                        defaults['usages_autres'] = usages_hq
-                    if toxicite:
-                        defaults['toxicite'] = toxicite
-                    if parties_comestibles:
-                        defaults['parties_comestibles'] = parties_comestibles
-                    organism, est_nouveau = find_or_match_organism(
-                        Organism,
-                        nom_latin=nom_latin,
-                        nom_commun=nom_francais,
-                        defaults=defaults
-                    )
-                
-                ensure_organism_genus(organism)
-                
-                # Gérer les zones de rusticité (format JSONField avec source)
-                current_zones = list(organism.zone_rusticite or [])
-                if zone_rusticite_raw:
-                    updated_zones = merge_zones_rusticite(
-                        current_zones,
-                        zone_rusticite_raw,
-                        SOURCE_HYDROQUEBEC
-                    )
-                else:
-                    updated_zones = current_zones
-                
-                # Préparer les mises à jour selon le mode de merge
-                update_fields = {}
-                
-                if merge_mode == MERGE_FILL_GAPS:
-                    # Ne mettre à jour que les champs vides
-                    current = {k: getattr(organism, k, None) for k in [
-                        'type_organisme', 'famille', 'besoin_eau', 'besoin_soleil', 'sol_textures',
-                        'sol_ph', 'hauteur_max', 'largeur_max', 'vitesse_croissance',
-                        'description', 'toxicite', 'parties_comestibles', 'usages_autres'
-                    ]}
-                    defaults_to_apply = {
-                        'type_organisme': type_organisme,
-                        'famille': famille,
-                        'besoin_eau': self._convertir_humidite(arbre.get('solHumidites') or []),
-                        'besoin_soleil': self._convertir_exposition(arbre.get('expositionsLumiere') or []),
-                        'sol_textures': sol_textures,
-                        'sol_ph': sol_ph,
-                        'hauteur_max': arbre.get('hauteur'),
-                        'largeur_max': arbre.get('largeur'),
-                        'vitesse_croissance': self._convertir_croissance(arbre.get('croissance') or ''),
-                        'description': description,
-                    }
-                    if usages_hq:
-                        defaults_to_apply['usages_autres'] = usages_hq
-                    if toxicite:
-                        defaults_to_apply['toxicite'] = toxicite
-                    if parties_comestibles:
-                        defaults_to_apply['parties_comestibles'] = parties_comestibles
-                    filtered = apply_fill_gaps(current, defaults_to_apply)
-                    update_fields.update(filtered)
-                else:
-                    # Mode overwrite: mettre à jour tous les champs (dont type_organisme)
-                    update_fields.update({
-                        'type_organisme': type_organisme,
-                        'famille': famille,
-                        'besoin_eau': self._convertir_humidite(arbre.get('solHumidites') or []),
-                        'besoin_soleil': self._convertir_exposition(arbre.get('expositionsLumiere') or []),
-                        'sol_textures': sol_textures,
-                        'sol_ph': sol_ph,
-                        'hauteur_max': arbre.get('hauteur'),
-                        'largeur_max': arbre.get('largeur'),
-                        'vitesse_croissance': self._convertir_croissance(arbre.get('croissance') or ''),
-                        'description': description,
-                        'toxicite': toxicite or '',
-                        'parties_comestibles': parties_comestibles or '',
-                        'usages_autres': usages_hq or '',
-                    })
-                
-                # Toujours mettre à jour les zones (merge intelligent)
-                update_fields['zone_rusticite'] = updated_zones
-                
-                # Fusionner data_sources
-                existing_sources = dict(organism.data_sources or {})
-                existing_sources[SOURCE_HYDROQUEBEC] = hq_payload
-                update_fields['data_sources'] = existing_sources
-                
-                # Appliquer les mises à jour
-                for key, value in update_fields.items():
-                    setattr(organism, key, value)
-                organism.save()
-
-                if est_nouveau:
-                    created += 1
-                    self.stdout.write(f'  ✅ Créé: {nom_francais}')
-                else:
-                    updated += 1
-                    self.stdout.write(f'  🔄 Mis à jour: {nom_francais}')
-
-            except Exception as e:
-                skipped += 1
-                nom_francais = arbre.get('nomFrancais', '?')
-                self.stdout.write(
-                    self.style.WARNING(f'  ⚠️ Erreur: {nom_francais} - {str(e)}')
-                )
+        pipeline = HydroQuebecPipeline(
+            prepare=lambda arbre: self._preparer_arbre(arbre, session, insecure=insecure),
+            merge_mode=merge_mode,
+            batch_size=options['batch_size'],
+            stdout=self.stdout,
+        )
+        stats = pipeline.run(arbres)
 
         self.stdout.write(self.style.SUCCESS(f'\n🎉 Import terminé!'))
-        self.stdout.write(f'  ✅ Créés: {created}')
-        self.stdout.write(f'  🔄 Mis à jour: {updated}')
-        self.stdout.write(f'  ⚠️ Ignorés: {skipped}')
+        self.stdout.write(f'  ✅ Créés: {stats["created"]}')
+        self.stdout.write(f'  🔄 Mis à jour: {stats["updated"]}')
+        self.stdout.write(f'  ⚠️ Ignorés: {stats["skipped"]}')
+        if stats['errors']:
+            self.stdout.write(self.style.WARNING(f'  ⚠️ Erreurs: {stats["errors"]}'))
         # Recalcul des notes d'enrichissement
         try:
             from species.enrichment_score import update_enrichment_scores
-            res = update_enrichment_scores()
+            res = update_enrichment_scores(since=started_at)
             self.stdout.write(self.style.SUCCESS(f'  📊 Enrichissement: note globale {res["global_score_pct"]}%'))
         except Exception as e:
             self.stdout.write(self.style.WARNING(f'  ⚠️ Recalcul enrichissement: {e}'))
@@ -460,6 +373,74 @@ class Command(BaseCommand):
         if fruit_noix > 0:
             self.stdout.write(self.style.SUCCESS(f'\n📊 Espèces fruitières/noix: {fruit_noix}'))
 
+    def _preparer_arbre(self, arbre, session=None, insecure=False):
+        """
+        Fiche HQ → enregistrement pour HydroQuebecPipeline (None si nom latin ou français absent).
+        Complète la fiche par la fiche détail (--fetch-details) si les descriptions manquent.
+        """
+        # Lire et nettoyer les noms (trim, espaces, corrections optionnelles)
+        nom_latin, nom_francais = self._clean_import_names(
+            arbre.get('nomLatin') or '',
+            arbre.get('nomFrancais') or '',
+        )
+        if not nom_latin or not nom_francais:
+            return None
+
+        # Compléter avec la fiche détail si champs descriptifs manquants
+        numero_fiche = arbre.get('numeroFiche')
+        if session is not None and numero_fiche and self._manque_donnees_descriptives(arbre):
+            detail = self._fetch_fiche_detail(session, numero_fiche, insecure=insecure)
+            if detail:
+                arbre = self._fusionner_fiche_detail(arbre, detail)
+                if detail.get('fruitsDescription'):
+                    self.stdout.write(f'     📥 Fiche {numero_fiche}: fruits récupérés')
+
+        formes = arbre.get('formes', [])
+        fruits_description = arbre.get('fruitsDescription') or ''
+        toxicite = self._extraire_toxicite_fruits(arbre.get('fruitsDescription'))
+        parties_comestibles = self._deriver_parties_comestibles(arbre.get('fruitsDescription'), toxicite)
+
+        # Notes du cultivar : début de la description des fruits puis remarques
+        cultivar_notes = (arbre.get('remarquesFicheDeBase') or '').strip()
+        if arbre.get('fruitsDescription') and cultivar_notes:
+            cultivar_notes = (arbre.get('fruitsDescription') or '')[:500] + '\n\n' + cultivar_notes
+        elif arbre.get('fruitsDescription'):
+            cultivar_notes = (arbre.get('fruitsDescription') or '')[:500]
+
+        return {
+            'nom_latin': nom_latin,
+            'nom_francais': nom_francais,
+            # L'API peut renvoyer null: on force listes/chaînes vides pour éviter NOT NULL en base
+            'fields': {
+                'type_organisme': self._determiner_type(formes, fruits_description, arbre.get('nomLatin') or ''),
+                'famille': arbre.get('famille') or '',
+                'besoin_eau': self._convertir_humidite(arbre.get('solHumidites') or []),
+                'besoin_soleil': self._convertir_exposition(arbre.get('expositionsLumiere') or []),
+                'sol_textures': arbre.get('solTextures') if arbre.get('solTextures') is not None else [],
+                'sol_ph': arbre.get('solPhs') if arbre.get('solPhs') is not None else [],
+                'hauteur_max': arbre.get('hauteur'),
+                'largeur_max': arbre.get('largeur'),
+                'vitesse_croissance': self._convertir_croissance(arbre.get('croissance') or ''),
+                'description': self._creer_description(arbre) or '',
+                'toxicite': toxicite or '',
+                'parties_comestibles': parties_comestibles or '',
+                'usages_autres': arbre.get('usages') or '',
+            },
+            'zone_rusticite': arbre.get('zoneRusticite') or '',
+            'hq_payload': {
+                'numeroFiche': arbre.get('numeroFiche'),
+                'plantationDistanceMinimum': arbre.get('plantationDistanceMinimum'),
+                'remarques': arbre.get('remarquesFicheDeBase') or '',
+                'usages': arbre.get('usages') or '',
+                'maladies': arbre.get('maladies') or '',
+                'insectes': arbre.get('insectes') or '',
+                'feuillesDescription': arbre.get('feuillesDescription') or '',
+                'fleursDescription': arbre.get('fleursDescription') or '',
+                'fruitsDescription': arbre.get('fruitsDescription') or '',
+            },
+            'defaults_cultivar': {'description': cultivar_notes[:2000]} if cultivar_notes else {},
+        }
+
     def _enrich_from_partiel(self, arbres, insecure=False):
         """
         Fusionne les données de l'API partiel (complètes) dans arbres chargé depuis --file.
@@ -12,30 +12,309 @@ Formats supportés (détection par extension) :
 Utilise species.pfaf_mapping pour unifier les noms de champs (Latin Name, latin_name,
 nom_latin, etc.). Par défaut --merge=fill_gaps pour préserver Hydro-Québec.
 Données brutes stockées dans Organism.data_sources['pfaf'].
+
+Lecture en flux et écriture par lots (species.import_pipeline) : correspondance en mémoire
+(OrganismResolver), bulk_create / bulk_update par lot de --batch-size lignes, avancement
+et débit (lignes/s) enregistrés dans DataImportRun (source 'pfaf').
 """
+from itertools import chain, islice
 from pathlib import Path
 
 from django.core.management.base import BaseCommand
+from django.utils import timezone
+from catalog.search_vectors import mark_search_vectors_dirty
+from species.import_pipeline import DEFAULT_BATCH_SIZE, ImportPipeline
 from species.models import Cultivar, Organism
 from species.pfaf_mapping import (
     PFAF_FIELD_ALIASES,
     get_available_columns,
     get_row_value,
-    load_pfaf_data,
+    iter_pfaf_data,
 )
 from species.source_rules import (
     MERGE_FILL_GAPS,
     MERGE_OVERWRITE,
     SOURCE_PFAF,
+    OrganismResolver,
     apply_fill_gaps,
     ensure_organism_genus,
     find_organism_and_cultivar,
-    find_or_match_organism,
-    get_unique_slug_latin,
+    get_genus_from_nom_latin,
     merge_zones_rusticite,
+    organism_create_data,
     parse_cultivar_from_latin,
+    zone_rusticite_bounds,
 )
 
+# Champs PFAF fusionnés (fill_gaps ou overwrite)
+PFAF_FIELDS = [
+    'famille', 'besoin_eau', 'besoin_soleil', 'hauteur_max',
+    'description', 'parties_comestibles', 'usages_autres', 'toxicite',
+]
+# Colonnes écrites par bulk_update sur les organismes existants
+UPDATE_FIELDS = PFAF_FIELDS + [
+    'nom_latin', 'genus', 'fixateur_azote', 'zone_rusticite', 'zone_rusticite_min',
+    'zone_rusticite_max', 'data_sources', 'date_modification',
+]
+
+
+class PfafImportPipeline(ImportPipeline):
+    """
+    Import PFAF par lots. Les lignes sans cultivar sont résolues en mémoire puis écrites
+    en un bulk_create (nouveaux) et un bulk_update (existants) par lot ; les lignes avec
+    cultivar gardent le chemin ligne à ligne (find_organism_and_cultivar).
+    """
+
+    source = 'pfaf'
+
+    def __init__(self, *, merge_mode=MERGE_FILL_GAPS, **kwargs):
+        super().__init__(**kwargs)
+        self.merge_mode = merge_mode
+        self.resolver = OrganismResolver(Organism)
+        self.skipped_empty_names = 0
+
+    # --- Lecture ---
+
+    def map_row(self, row, index):
+        nom_latin = get_row_value(row, PFAF_FIELD_ALIASES['latin_name'], default='')
+        nom_commun = get_row_value(row, PFAF_FIELD_ALIASES['common_name'], default='')
+
+        # Si ni nom_latin ni nom_commun, on ne peut pas importer
+        if not nom_latin and not nom_commun:
+            self.skipped_empty_names += 1
+            # Afficher les détails seulement pour les premières lignes ignorées
+            if self.skipped_empty_names <= 3:
+                available_cols = list(row.keys())
+                self.write(
+                    f'  ⚠️ Ignoré ligne {index}: nom_latin et nom_commun vides\n'
+                    f'     Colonnes disponibles: {", ".join(available_cols[:10])}{"..." if len(available_cols) > 10 else ""}'
+                )
+            return None
+
+        hauteur_raw = get_row_value(row, PFAF_FIELD_ALIASES['height'], default=None, coerce_str=False)
+        hauteur_max = None
+        if hauteur_raw is not None:
+            try:
+                if isinstance(hauteur_raw, str):
+                    hauteur_raw = hauteur_raw.replace(',', '.')
+                hauteur_max = float(hauteur_raw)
+            except (TypeError, ValueError):
+                pass
+
+        fixateur = get_row_value(row, PFAF_FIELD_ALIASES['fixateur_azote'], default='').lower()
+        base_latin, nom_cultivar = parse_cultivar_from_latin(nom_latin or '')
+        return {
+            'index': index,
+            'nom_latin': nom_latin or '',
+            'nom_commun': nom_commun,
+            'base_latin': base_latin,
+            'nom_cultivar': nom_cultivar,
+            'type_organisme': self._type_from_row(row),
+            'zone_raw': self._zone_from_row(row),
+            'fixateur_azote': bool(fixateur) and (
+                'y' in fixateur or 'yes' in fixateur or 'oui' in fixateur or '1' in fixateur
+            ),
+            'fields': {
+                'famille': get_row_value(row, PFAF_FIELD_ALIASES['family'], default=''),
+                'besoin_soleil': self._sun_from_row(row),
+                'besoin_eau': self._water_from_row(row),
+                'hauteur_max': hauteur_max,
+                'description': self._description_from_row(row),
+                'parties_comestibles': get_row_value(row, PFAF_FIELD_ALIASES['edible_parts'], default=''),
+                'usages_autres': get_row_value(row, PFAF_FIELD_ALIASES['uses'], default=''),
+                'toxicite': get_row_value(row, PFAF_FIELD_ALIASES['toxicite'], default=''),
+            },
+            'payload': self._serializable_payload(row),
+        }
+
+    def row_label(self, record):
+        return f"ligne {record['index']}: {record['nom_latin'] or record['nom_commun']}"
+
+    def _defaults(self, record):
+        return {
+            'nom_commun': record['nom_commun'] or record['nom_latin'],
+            'regne': 'plante',
+            'type_organisme': record['type_organisme'],
+            **record['fields'],
+        }
+
+    # --- Écriture ---
+
+    def write_batch(self, records):
+        now = timezone.now()
+        counts = {'created': 0, 'updated': 0}
+        targets = {}        # id (ou id provisoire < 0) -> Organism
+        renames = {}
+        plan = []
+        cultivar_records = []
+        for record in records:
+            if record['nom_cultivar'] and record['base_latin']:
+                cultivar_records.append(record)
+                continue
+            nom_commun = record['nom_commun'] or record['nom_latin']
+            key, rename = self.resolver.resolve(record['nom_latin'], nom_commun)
+            created = False
+            if key is None:
+                data = organism_create_data(self._defaults(record), record['nom_latin'], nom_commun)
+                organism = Organism(**data)
+                organism.slug_latin = self.resolver.unique_slug_latin(organism.nom_latin) or None
+                key = self.resolver.add_pending(organism.nom_latin, organism.nom_commun, organism.slug_latin)
+                targets[key] = organism
+                created = True
+            elif rename is not None:
+                renames[key] = rename
+                self.resolver.rename(key, rename)
+            plan.append((key, record, created))
+
+        existing_ids = [key for key, _record, _created in plan if key > 0]
+        targets.update(Organism.objects.in_bulk(existing_ids))
+        for oid, nom_latin in renames.items():
+            targets[oid].nom_latin = nom_latin
+
+        for key, record, created in plan:
+            self._apply(targets[key], record)
+            counts['created' if created else 'updated'] += 1
+
+        new_keys = [key for key in targets if key < 0]
+        for organism in targets.values():
+            genus = get_genus_from_nom_latin(organism.nom_latin or '')
+            if genus:
+                organism.genus = genus
+            organism.zone_rusticite_min, organism.zone_rusticite_max = zone_rusticite_bounds(organism.zone_rusticite)
+            organism.date_modification = now
+        Organism.objects.bulk_create([targets[key] for key in new_keys], batch_size=self.batch_size)
+        Organism.objects.bulk_update(
+            [targets[key] for key in targets if key > 0], UPDATE_FIELDS, batch_size=self.batch_size,
+        )
+        self._ensure_pks([targets[key] for key in new_keys])
+        # bulk_* n'émet pas post_save : index de recherche marqué ici
+        mark_search_vectors_dirty(organism.pk for organism in targets.values())
+        for key in new_keys:
+            self.resolver.confirm(key, targets[key])
+
+        for record in cultivar_records:
+            created = self._write_cultivar(record)
+            counts['created' if created else 'updated'] += 1
+        return counts
+
+    def _ensure_pks(self, organisms):
+        """Moteurs sans RETURNING sur bulk_create : ids relus par slug_latin (unique)."""
+        missing = {o.slug_latin: o for o in organisms if o.pk is None}
+        if not missing:
+            return
+        for pk, slug in Organism.objects.filter(slug_latin__in=list(missing)).values_list('pk', 'slug_latin'):
+            missing[slug].pk = pk
+
+    def _write_cultivar(self, record):
+        """Ligne avec cultivar : espèce de base + Cultivar, écrits ligne à ligne."""
+        defaults = self._defaults(record)
+        defaults['slug_latin'] = self.resolver.unique_slug_latin(record['base_latin'])
+        organism, _cultivar, est_nouveau = find_organism_and_cultivar(
+            Organism,
+            Cultivar,
+            nom_latin=record['nom_latin'],
+            nom_commun=record['nom_commun'] or record['nom_latin'],
+            defaults_organism=defaults,
+            defaults_cultivar={},
+            resolver=self.resolver,
+        )
+        ensure_organism_genus(organism)
+        self._apply(organism, record)
+        organism.save()
+        return est_nouveau
+
+    def _apply(self, organism, record):
+        """Fusionne une ligne PFAF dans l'organisme (en mémoire)."""
+        if record['fixateur_azote'] and not organism.fixateur_azote:
+            organism.fixateur_azote = True
+
+        # Zones de rusticité (format JSONField avec source)
+        current_zones = list(organism.zone_rusticite or [])
+        if record['zone_raw']:
+            organism.zone_rusticite = merge_zones_rusticite(current_zones, record['zone_raw'], SOURCE_PFAF)
+        else:
+            organism.zone_rusticite = current_zones
+
+        if self.merge_mode == MERGE_FILL_GAPS:
+            # Ne mettre à jour que les champs vides
+            current = {k: getattr(organism, k, None) for k in PFAF_FIELDS}
+            values = apply_fill_gaps(current, record['fields'])
+        else:
+            values = record['fields']
+        for key, value in values.items():
+            setattr(organism, key, value)
+
+        existing_sources = dict(organism.data_sources or {})
+        existing_sources[SOURCE_PFAF] = record['payload']
+        organism.data_sources = existing_sources
+
+
+    # --- Champs PFAF ---
+
+    def _serializable_payload(self, row: dict) -> dict:
+        """Construit un dict JSON-serialisable pour data_sources['pfaf']."""
+        out = {}
+        for k, v in row.items():
+            if v is None:
+                continue
+            if isinstance(v, (str, int, float, bool)):
+                out[k] = v
+            else:
+                out[k] = str(v)
+        return out
+
+    def _description_from_row(self, row: dict) -> str:
+        parts = []
+        for key in PFAF_FIELD_ALIASES['description'] + PFAF_FIELD_ALIASES['habitat']:
+            v = get_row_value(row, [key], default='')
+            if v:
+                parts.append(v)
+        return '\n\n'.join(parts) if parts else ''
+
+    def _zone_from_row(self, row: dict) -> str:
+        z = get_row_value(row, PFAF_FIELD_ALIASES['zone_rusticite'], default='', coerce_str=False)
+        if z is None:
+            return ''
+        if isinstance(z, (int, float)):
+            return str(int(z))
+        return str(z).strip() if z else ''
+
+    def _sun_from_row(self, row: dict) -> str:
+        sun = get_row_value(row, PFAF_FIELD_ALIASES['sun'], default='').lower()
+        if not sun:
+            return ''
+        if 'shade' in sun and 'sun' not in sun and 'partial' not in sun:
+            return 'ombre'
+        if 'partial' in sun or 'semi' in sun or 'mi-ombre' in sun or 'light shade' in sun:
+            return 'mi_ombre'
+        if 'full' in sun or 'sun' in sun or 'soleil' in sun or 'no shade' in sun:
+            return 'plein_soleil'
+        return ''
+
+    def _water_from_row(self, row: dict) -> str:
+        w = get_row_value(row, PFAF_FIELD_ALIASES['water'], default='').lower()
+        if not w:
+            return ''
+        if 'dry' in w or 'low' in w or 'faible' in w:
+            return 'faible'
+        if 'wet' in w or 'high' in w or 'eleve' in w or 'moist' in w:
+            return 'eleve'
+        return 'moyen'
+
+    def _type_from_row(self, row: dict) -> str:
+        t = get_row_value(row, PFAF_FIELD_ALIASES['habit'], default='').lower()
+        if 'tree' in t or 'arbre' in t:
+            return 'arbre_ornement'
+        if 'shrub' in t or 'arbuste' in t:
+            return 'arbuste'
+        if 'perennial' in t or 'vivace' in t:
+            return 'vivace'
+        if 'annual' in t or 'annuelle' in t:
+            return 'annuelle'
+        if 'climber' in t or 'grimpant' in t or 'vine' in t:
+            return 'grimpante'
+        return 'vivace'
+
 
 class Command(BaseCommand):
     help = (
@@ -69,6 +348,12 @@ class Command(BaseCommand):
             default=0,
             help='Nombre max à importer (0 = tout).',
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Lignes écrites par transaction (défaut: {DEFAULT_BATCH_SIZE}).',
+        )
         parser.add_argument(
             '--merge',
             type=str,
@@ -78,6 +363,8 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
+        # Fiches sauvegardées par cet import : date_modification >= started_at (note recalculée pour elles seules)
+        started_at = timezone.now()
         file_path = options.get('file') or options.get('db')
         if not file_path:
             self.stdout.write(
@@ -90,7 +377,8 @@ class Command(BaseCommand):
         path = Path(file_path)
 
         try:
-            data = load_pfaf_data(path, db_table=options['table'])
+            rows = iter_pfaf_data(path, db_table=options['table'])
+            first_row = next(rows, None)
         except FileNotFoundError:
             self.stdout.write(self.style.ERROR(f'❌ Fichier introuvable: {path}'))
             return
@@ -101,26 +389,26 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f'❌ Erreur de chargement: {e}'))
             return
 
-        if not data:
+        if first_row is None:
             self.stdout.write(self.style.WARNING('⚠️ Aucune donnée trouvée dans le fichier.'))
             return
 
+        rows = chain([first_row], rows)
         if limit > 0:
-            data = data[:limit]
+            rows = islice(rows, limit)
 
         self.stdout.write(self.style.SUCCESS(
-            f'🌿 Import PFAF (merge={merge_mode}, {len(data)} entrées)'
+            f'🌿 Import PFAF (merge={merge_mode}, lots de {options["batch_size"]} lignes)'
         ))
 
         # Validation: vérifier les colonnes disponibles et critiques
         validation_passed = True
-        if data:
-            available_cols = get_available_columns(data)
+        if first_row:
+            available_cols = get_available_columns([first_row])
             self.stdout.write(f'\n🔍 Colonnes disponibles dans le fichier ({len(available_cols)}):')
             self.stdout.write(f'   {", ".join(available_cols[:20])}{"..." if len(available_cols) > 20 else ""}')
             
             # Vérifier si les colonnes critiques sont trouvées
-            first_row = data[0]
             nom_latin_found = get_row_value(first_row, PFAF_FIELD_ALIASES['latin_name'], default=None)
             nom_commun_found = get_row_value(first_row, PFAF_FIELD_ALIASES['common_name'], default=None)
             
@@ -164,253 +452,24 @@ class Command(BaseCommand):
                 '\n⚠️ La validation a détecté des problèmes. L\'import continuera mais beaucoup d\'enregistrements pourraient être ignorés.'
             ))
 
-        created = 0
-        updated = 0
-        skipped = 0
-        skipped_empty_names = 0
-        skipped_errors = 0
-
-        for idx, row in enumerate(data, 1):
-            try:
-                nom_latin = get_row_value(row, PFAF_FIELD_ALIASES['latin_name'], default='')
-                nom_commun = get_row_value(row, PFAF_FIELD_ALIASES['common_name'], default='')
-                
-                # Si ni nom_latin ni nom_commun, on ne peut pas importer
-                if not nom_latin and not nom_commun:
-                    skipped += 1
-                    skipped_empty_names += 1
-                    # Afficher les détails seulement pour les premières lignes ignorées
-                    if skipped_empty_names <= 3:
-                        available_cols = list(row.keys())
-                        self.stdout.write(
-                            self.style.WARNING(
-                                f'  ⚠️ Ignoré ligne {idx}: nom_latin et nom_commun vides\n'
-                                f'     Colonnes disponibles: {", ".join(available_cols[:10])}{"..." if len(available_cols) > 10 else ""}'
-                            )
-                        )
-                    continue
-
-                famille = get_row_value(row, PFAF_FIELD_ALIASES['family'], default='')
-                description = self._description_from_row(row)
-                zone_raw = self._zone_from_row(row)
-                besoin_soleil = self._sun_from_row(row)
-                besoin_eau = self._water_from_row(row)
-                hauteur_raw = get_row_value(row, PFAF_FIELD_ALIASES['height'], default=None, coerce_str=False)
-                hauteur_max = None
-                if hauteur_raw is not None:
-                    try:
-                        if isinstance(hauteur_raw, str):
-                            hauteur_raw = hauteur_raw.replace(',', '.')
-                        hauteur_max = float(hauteur_raw)
-                    except (TypeError, ValueError):
-                        pass
-
-                # Détecter cultivar dans le nom latin : si oui, rattacher à l'espèce + Cultivar
-                base_latin, nom_cultivar = parse_cultivar_from_latin(nom_latin or '')
-                defaults_common = {
-                    'nom_commun': nom_commun or nom_latin,
-                    'famille': famille,
-                    'regne': 'plante',
-                    'type_organisme': self._type_from_row(row),
-                    'besoin_soleil': besoin_soleil,
-                    'besoin_eau': besoin_eau,
-                    'hauteur_max': hauteur_max,
-                    'description': description,
-                    'parties_comestibles': get_row_value(
-                        row, PFAF_FIELD_ALIASES['edible_parts'], default=''
-                    ),
-                    'usages_autres': get_row_value(
-                        row, PFAF_FIELD_ALIASES['uses'], default=''
-                    ),
-                    'toxicite': get_row_value(
-                        row, PFAF_FIELD_ALIASES['toxicite'], default=''
-                    ),
-                }
-                if nom_cultivar and base_latin:
-                    defaults_common['slug_latin'] = get_unique_slug_latin(Organism, base_latin)
-                    organism, _cultivar, est_nouveau = find_organism_and_cultivar(
-                        Organism,
-                        Cultivar,
-                        nom_latin=nom_latin or '',
-                        nom_commun=nom_commun or nom_latin or '',
-                        defaults_organism=defaults_common,
-                        defaults_cultivar={},
-                    )
-                else:
-                    organism, est_nouveau = find_or_match_organism(
-                        Organism,
-                        nom_latin=nom_latin or '',
-                        nom_commun=nom_commun or nom_latin,
-                        defaults=defaults_common,
-                    )
-                
-                ensure_organism_genus(organism)
-                
-                # Gérer fixateur_azote
-                fixateur = get_row_value(
-                    row, PFAF_FIELD_ALIASES['fixateur_azote'], default=''
-                ).lower()
-                if fixateur and ('y' in fixateur or 'yes' in fixateur or 'oui' in fixateur or '1' in fixateur):
-                    if not organism.fixateur_azote:
-                        organism.fixateur_azote = True
-                
-                # Gérer les zones de rusticité (format JSONField avec source)
-                current_zones = list(organism.zone_rusticite or [])
-                if zone_raw:
-                    updated_zones = merge_zones_rusticite(
-                        current_zones,
-                        zone_raw,
-                        SOURCE_PFAF
-                    )
-                else:
-                    updated_zones = current_zones
-                
-                # Préparer les mises à jour selon le mode de merge
-                update_fields = {}
-                
-                if merge_mode == MERGE_FILL_GAPS:
-                    # Ne mettre à jour que les champs vides
-                    current = {k: getattr(organism, k, None) for k in [
-                        'famille', 'besoin_eau', 'besoin_soleil', 'hauteur_max',
-                        'description', 'parties_comestibles', 'usages_autres', 'toxicite'
-                    ]}
-                    defaults_to_apply = {
-                        'famille': famille,
-                        'besoin_soleil': besoin_soleil,
-                        'besoin_eau': besoin_eau,
-                        'hauteur_max': hauteur_max,
-                        'description': description,
-                        'parties_comestibles': get_row_value(
-                            row, PFAF_FIELD_ALIASES['edible_parts'], default=''
-                        ),
-                        'usages_autres': get_row_value(
-                            row, PFAF_FIELD_ALIASES['uses'], default=''
-                        ),
-                        'toxicite': get_row_value(
-                            row, PFAF_FIELD_ALIASES['toxicite'], default=''
-                        ),
-                    }
-                    filtered = apply_fill_gaps(current, defaults_to_apply)
-                    update_fields.update(filtered)
-                else:
-                    # Mode overwrite: mettre à jour tous les champs
-                    update_fields.update({
-                        'famille': famille,
-                        'besoin_soleil': besoin_soleil,
-                        'besoin_eau': besoin_eau,
-                        'hauteur_max': hauteur_max,
-                        'description': description,
-                        'parties_comestibles': get_row_value(
-                            row, PFAF_FIELD_ALIASES['edible_parts'], default=''
-                        ),
-                        'usages_autres': get_row_value(
-                            row, PFAF_FIELD_ALIASES['uses'], default=''
-                        ),
-                        'toxicite': get_row_value(
-                            row, PFAF_FIELD_ALIASES['toxicite'], default=''
-                        ),
-                    })
-                
-                # Toujours mettre à jour les zones (merge intelligent)
-                update_fields['zone_rusticite'] = updated_zones
-                
-                # Fusionner data_sources
-                pfaf_payload = self._serializable_payload(row)
-                existing_sources = dict(organism.data_sources or {})
-                existing_sources[SOURCE_PFAF] = pfaf_payload
-                update_fields['data_sources'] = existing_sources
-                
-                # Appliquer les mises à jour
-                for key, value in update_fields.items():
-                    setattr(organism, key, value)
-                organism.save()
-                if est_nouveau:
-                    created += 1
-                    self.stdout.write(f'  ✅ Créé: {nom_commun}')
-                else:
-                    updated += 1
-                    self.stdout.write(f'  🔄 Mis à jour: {nom_commun}')
-            except Exception as e:
-                skipped += 1
-                skipped_errors += 1
-                nom_latin = get_row_value(row, PFAF_FIELD_ALIASES['latin_name'], default='?')
-                # Afficher les détails seulement pour les premières erreurs
-                if skipped_errors <= 5:
-                    self.stdout.write(
-                        self.style.WARNING(f'  ⚠️ Erreur ligne {idx}: {nom_latin} - {e}')
-                    )
+        pipeline = PfafImportPipeline(
+            merge_mode=merge_mode,
+            batch_size=options['batch_size'],
+            stdout=self.stdout,
+        )
+        stats = pipeline.run(rows)
 
         self.stdout.write(self.style.SUCCESS(f'\n🎉 Import PFAF terminé.'))
-        self.stdout.write(f'  ✅ Créés: {created}')
-        self.stdout.write(f'  🔄 Mis à jour: {updated}')
-        self.stdout.write(f'  ⚠️ Ignorés: {skipped} ({skipped_empty_names} noms vides, {skipped_errors} erreurs)')
+        self.stdout.write(f'  ✅ Créés: {stats["created"]}')
+        self.stdout.write(f'  🔄 Mis à jour: {stats["updated"]}')
+        self.stdout.write(
+            f'  ⚠️ Ignorés: {stats["skipped"] + stats["errors"]} '
+            f'({pipeline.skipped_empty_names} noms vides, {stats["errors"]} erreurs)'
+        )
+        self.stdout.write(f'  ⏱️ {stats["rows"]} lignes en {stats["duration_s"]} s ({stats["rows_per_s"]} lignes/s)')
         try:
             from species.enrichment_score import update_enrichment_scores
-            res = update_enrichment_scores()
+            res = update_enrichment_scores(since=started_at)
             self.stdout.write(self.style.SUCCESS(f'  📊 Enrichissement: note globale {res["global_score_pct"]}%'))
         except Exception as e:
             self.stdout.write(self.style.WARNING(f'  ⚠️ Recalcul enrichissement: {e}'))
-
-    def _serializable_payload(self, row: dict) -> dict:
-        """Construit un dict JSON-serialisable pour data_sources['pfaf']."""
-        out = {}
-        for k, v in row.items():
-            if v is None:
-                continue
-            if isinstance(v, (str, int, float, bool)):
-                out[k] = v
-            else:
-                out[k] = str(v)
-        return out
-
-    def _description_from_row(self, row: dict) -> str:
-        parts = []
-        for key in PFAF_FIELD_ALIASES['description'] + PFAF_FIELD_ALIASES['habitat']:
-            v = get_row_value(row, [key], default='')
-            if v:
-                parts.append(v)
-        return '\n\n'.join(parts) if parts else ''
-
-    def _zone_from_row(self, row: dict) -> str:
-        z = get_row_value(row, PFAF_FIELD_ALIASES['zone_rusticite'], default='', coerce_str=False)
-        if z is None:
-            return ''
-        if isinstance(z, (int, float)):
-            return str(int(z))
-        return str(z).strip() if z else ''
-
-    def _sun_from_row(self, row: dict) -> str:
-        sun = get_row_value(row, PFAF_FIELD_ALIASES['sun'], default='').lower()
-        if not sun:
-            return ''
-        if 'shade' in sun and 'sun' not in sun and 'partial' not in sun:
-            return 'ombre'
-        if 'partial' in sun or 'semi' in sun or 'mi-ombre' in sun or 'light shade' in sun:
-            return 'mi_ombre'
-        if 'full' in sun or 'sun' in sun or 'soleil' in sun or 'no shade' in sun:
-            return 'plein_soleil'
-        return ''
-
-    def _water_from_row(self, row: dict) -> str:
-        w = get_row_value(row, PFAF_FIELD_ALIASES['water'], default='').lower()
-        if not w:
-            return ''
-        if 'dry' in w or 'low' in w or 'faible' in w:
-            return 'faible'
-        if 'wet' in w or 'high' in w or 'eleve' in w or 'moist' in w:
-            return 'eleve'
-        return 'moyen'
-
-    def _type_from_row(self, row: dict) -> str:
-        t = get_row_value(row, PFAF_FIELD_ALIASES['habit'], default='').lower()
-        if 'tree' in t or 'arbre' in t:
-            return 'arbre_ornement'
-        if 'shrub' in t or 'arbuste' in t:
-            return 'arbuste'
-        if 'perennial' in t or 'vivace' in t:
-            return 'vivace'
-        if 'annual' in t or 'annuelle' in t:
-            return 'annuelle'
-        if 'climber' in t or 'grimpant' in t or 'vine' in t:
-            return 'grimpante'
-        return 'vivace'
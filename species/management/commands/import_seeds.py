@@ -4,31 +4,242 @@ Import de liste de semences (catalogues semenciers).
 Formats supportés : JSON, CSV
 Utilise species.seed_mapping pour le mapping flexible des colonnes.
 Crée ou met à jour Organism + SeedCollection.
+
+Lecture en flux et écriture par lots (species.import_pipeline) : collections existantes
+lues en une requête par lot, bulk_create / bulk_update ; avancement dans DataImportRun
+(source 'seeds').
 """
 from datetime import datetime
+from itertools import chain, islice
 from pathlib import Path
 
 from django.core.management.base import BaseCommand
+from django.utils import timezone
 
+from species.import_pipeline import DEFAULT_BATCH_SIZE, ImportPipeline
 from species.models import Cultivar, Organism, SeedCollection, SeedSupplier
 from species.seed_mapping import (
     SEED_FIELD_ALIASES,
     get_available_columns,
     get_row_value,
-    load_seed_data,
+    iter_seed_data,
     parse_bool,
     parse_float,
     parse_int,
     parse_int_or_range,
 )
 from species.source_rules import (
+    OrganismResolver,
     ensure_organism_genus,
     find_organism_and_cultivar,
-    find_or_match_organism,
-    get_unique_slug_latin,
     parse_cultivar_from_latin,
 )
 
+# Champs de SeedCollection écrits par l'import (hors organisme)
+SEED_FIELDS = [
+    'variete', 'lot_reference', 'fournisseur', 'quantite', 'unite', 'date_recolte',
+    'duree_vie_annees', 'germination_lab_pct', 'stratification_requise',
+    'stratification_duree_jours', 'stratification_temp', 'stratification_notes',
+    'temps_germination_jours_min', 'temps_germination_jours_max',
+    'temperature_optimal_min', 'temperature_optimal_max', 'pretraitement',
+]
+
+
+class SeedImportPipeline(ImportPipeline):
+    """
+    Import de semences par lots. Organismes résolus en mémoire (OrganismResolver) ;
+    collections existantes (organisme + variété + lot) lues en une requête par lot, puis
+    un bulk_create (nouvelles) et un bulk_update (existantes, --update-existing).
+    """
+
+    source = 'seeds'
+
+    def __init__(self, *, supplier=None, update_existing=False, **kwargs):
+        super().__init__(**kwargs)
+        self.supplier = supplier
+        self.update_existing = update_existing
+        self.resolver = OrganismResolver(Organism)
+        self.created_organisms = 0
+
+    # --- Lecture ---
+
+    def map_row(self, row, index):
+        nom_latin = get_row_value(row, SEED_FIELD_ALIASES['latin_name'], default='')
+        nom_commun = get_row_value(row, SEED_FIELD_ALIASES['common_name'], default='')
+        if not nom_latin and not nom_commun:
+            return None
+
+        def value(key):
+            return get_row_value(row, SEED_FIELD_ALIASES[key], default=None, coerce_str=False)
+
+        def text(key, default=''):
+            return get_row_value(row, SEED_FIELD_ALIASES[key], default=default)
+
+        return {
+            'index': index,
+            'nom_latin': nom_latin or '',
+            'nom_commun': nom_commun,
+            'famille': text('family'),
+            'fields': {
+                'variete': text('variete').strip(),
+                'lot_reference': text('lot_reference').strip(),
+                'fournisseur': self.supplier,
+                'quantite': parse_float(value('quantite')),
+                'unite': self._parse_unite(text('unite', default='graines')),
+                'date_recolte': self._parse_date(text('date_recolte')),
+                'duree_vie_annees': parse_float(value('duree_vie_annees')),
+                'germination_lab_pct': parse_float(value('germination_lab_pct')),
+                'stratification_requise': parse_bool(text('stratification_requise')),
+                'stratification_duree_jours': parse_int_or_range(value('stratification_duree_jours')),
+                'stratification_temp': self._parse_strat_temp(text('stratification_temp')),
+                'stratification_notes': text('stratification_notes'),
+                'temps_germination_jours_min': parse_int(value('temps_germination_jours_min')),
+                'temps_germination_jours_max': parse_int_or_range(value('temps_germination_jours_max')),
+                'temperature_optimal_min': parse_float(value('temperature_optimal_min')),
+                'temperature_optimal_max': parse_float(value('temperature_optimal_max')),
+                'pretraitement': text('pretraitement'),
+            },
+            'payload': self._serializable_payload(row),
+        }
+
+    def row_label(self, record):
+        return f"ligne {record['index']} ({record['nom_latin'] or record['nom_commun']})"
+
+    # --- Écriture ---
+
+    def _organism(self, record):
+        """Organisme de la ligne (espèce de base + Cultivar si le nom latin porte un cultivar)."""
+        nom_latin = record['nom_latin']
+        nom_commun = record['nom_commun'] or nom_latin
+        defaults = {
+            'nom_commun': nom_commun,
+            'famille': record['famille'],
+            'regne': 'plante',
+            'type_organisme': 'vivace',
+        }
+        base_latin, nom_cultivar = parse_cultivar_from_latin(nom_latin)
+        if nom_cultivar and base_latin:
+            defaults['slug_latin'] = self.resolver.unique_slug_latin(base_latin)
+            organisme, _cultivar, created = find_organism_and_cultivar(
+                Organism,
+                Cultivar,
+                nom_latin=nom_latin,
+                nom_commun=nom_commun,
+                defaults_organism=defaults,
+                defaults_cultivar={},
+                resolver=self.resolver,
+            )
+        else:
+            organisme, created = self.resolver.find_or_match(
+                nom_latin=nom_latin, nom_commun=nom_commun, defaults=defaults,
+            )
+        ensure_organism_genus(organisme)
+        return organisme, created
+
+    def write_batch(self, records):
+        now = timezone.now()
+        counts = {'created': 0, 'updated': 0, 'skipped': 0}
+        resolved = []
+        for record in records:
+            organisme, created = self._organism(record)
+            self.created_organisms += created
+            resolved.append((organisme, record))
+
+        # Collections existantes du lot : une requête, la plus ancienne par (organisme, variété, lot)
+        collections = {}
+        for seed in SeedCollection.objects.filter(
+            organisme_id__in={organisme.pk for organisme, _record in resolved},
+        ).order_by('pk'):
+            collections.setdefault((seed.organisme_id, seed.variete, seed.lot_reference), seed)
+
+        to_create, to_update = [], {}
+        for organisme, record in resolved:
+            fields = record['fields']
+            key = (organisme.pk, fields['variete'], fields['lot_reference'])
+            seed = collections.get(key)
+            if seed is not None and not self.update_existing:
+                counts['skipped'] += 1
+                continue
+            if seed is None:
+                seed = SeedCollection(organisme=organisme, data_sources={})
+                collections[key] = seed
+                to_create.append(seed)
+                counts['created'] += 1
+            else:
+                if seed.pk is not None:
+                    to_update[seed.pk] = seed
+                counts['updated'] += 1
+            for name, value in fields.items():
+                setattr(seed, name, value)
+            seed.data_sources = {**(seed.data_sources or {}), 'import': record['payload']}
+            # bulk_update ne pose pas auto_now
+            seed.date_modification = now
+
+        SeedCollection.objects.bulk_create(to_create, batch_size=self.batch_size)
+        SeedCollection.objects.bulk_update(
+            list(to_update.values()), SEED_FIELDS + ['data_sources', 'date_modification'],
+            batch_size=self.batch_size,
+        )
+        return counts
+
+    # --- Champs ---
+
+    def _parse_unite(self, val: str) -> str:
+        if not val:
+            return 'graines'
+        v = str(val).lower().strip()
+        mapping = {'g': 'g', 'grammes': 'g', 'ml': 'ml', 'sachet': 'sachet', 's': 'sachet'}
+        return mapping.get(v, 'graines')
+
+
+    def _parse_date(self, val: str):
+        if not val:
+            return None
+        s = str(val).strip()
+        if not s:
+            return None
+        # Essayons année seule
+        try:
+            y = int(s[:4])
+            if 1900 <= y <= 2100:
+                from datetime import date
+                return date(y, 1, 1)
+        except (ValueError, IndexError):
+            pass
+        for fmt in ('%Y-%m-%d', '%d/%m/%Y', '%Y/%m/%d', '%d-%m-%Y'):
+            try:
+                return datetime.strptime(s, fmt).date()
+            except ValueError:
+                continue
+        return None
+
+
+    def _parse_strat_temp(self, val: str) -> str:
+        if not val:
+            return ''
+        v = str(val).lower()
+        if 'froid' in v or 'cold' in v:
+            return 'froide'
+        if 'chaud' in v or 'warm' in v or 'hot' in v:
+            if 'puis' in v or 'then' in v or 'followed' in v:
+                return 'chaude_puis_froide'
+            return 'chaude'
+        if 'chaude_puis' in v or 'warm_then_cold' in v:
+            return 'chaude_puis_froide'
+        return ''
+
+
+    def _serializable_payload(self, row: dict) -> dict:
+        out = {}
+        for k, v in row.items():
+            if v is None:
+                continue
+            if isinstance(v, (str, int, float, bool)):
+                out[k] = v
+            else:
+                out[k] = str(v)
+        return out
+
 
 class Command(BaseCommand):
     help = (
@@ -55,6 +266,12 @@ class Command(BaseCommand):
             default=0,
             help='Nombre max à importer (0 = tout)',
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Lignes écrites par transaction (défaut: {DEFAULT_BATCH_SIZE}).',
+        )
         parser.add_argument(
             '--update-existing',
             action='store_true',
@@ -76,7 +293,8 @@ class Command(BaseCommand):
         path = Path(file_path)
 
         try:
-            data = load_seed_data(path)
+            rows = iter_seed_data(path)
+            first_row = next(rows, None)
         except FileNotFoundError:
             self.stdout.write(self.style.ERROR(f'❌ Fichier introuvable: {path}'))
             return
@@ -87,12 +305,13 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f'❌ Erreur de chargement: {e}'))
             return
 
-        if not data:
+        if first_row is None:
             self.stdout.write(self.style.WARNING('⚠️ Aucune donnée trouvée dans le fichier.'))
             return
 
+        rows = chain([first_row], rows)
         if limit > 0:
-            data = data[:limit]
+            rows = islice(rows, limit)
 
         supplier = None
         if supplier_id:
@@ -104,15 +323,14 @@ class Command(BaseCommand):
 
         mode_str = '(DRY-RUN) ' if dry_run else ''
         self.stdout.write(self.style.SUCCESS(
-            f'🌱 Import semences {mode_str}({len(data)} entrées)'
+            f'🌱 Import semences {mode_str}(lots de {options["batch_size"]} lignes)'
         ))
         if supplier:
             self.stdout.write(f'   Fournisseur: {supplier.nom}')
 
-        available_cols = get_available_columns(data)
+        available_cols = get_available_columns([first_row])
         self.stdout.write(f'\n🔍 Colonnes: {", ".join(available_cols[:15])}{"..." if len(available_cols) > 15 else ""}')
 
-        first_row = data[0]
         nom_latin = get_row_value(first_row, SEED_FIELD_ALIASES['latin_name'], default=None)
         nom_commun = get_row_value(first_row, SEED_FIELD_ALIASES['common_name'], default=None)
         self.stdout.write(f'\n🔍 Test 1ère ligne: latin="{nom_latin or "-"}", commun="{nom_commun or "-"}"')
@@ -122,181 +340,35 @@ class Command(BaseCommand):
                 '⚠️ ni nom_latin ni nom_commun trouvés. Vérifiez vos colonnes (voir docs/seed-supplier-mapping.md)'
             ))
 
-        created_org = 0
-        created_seed = 0
-        updated_seed = 0
-        skipped = 0
-        errors = 0
-
-        for idx, row in enumerate(data, 1):
-            try:
+        if dry_run:
+            listed = skipped = 0
+            for row in rows:
                 nom_latin = get_row_value(row, SEED_FIELD_ALIASES['latin_name'], default='')
                 nom_commun = get_row_value(row, SEED_FIELD_ALIASES['common_name'], default='')
-
                 if not nom_latin and not nom_commun:
                     skipped += 1
                     continue
+                listed += 1
+                self.stdout.write(f'  [DRY] {nom_commun or nom_latin}')
+            self.stdout.write(self.style.SUCCESS(f'\n🎉 Dry-run terminé: {listed} entrées, {skipped} ignorées.'))
+            return
 
-                if dry_run:
-                    created_seed += 1
-                    self.stdout.write(f'  [DRY] {nom_commun or nom_latin}')
-                    continue
-
-                # Détecter cultivar dans le nom latin : si oui, rattacher à l'espèce + Cultivar
-                base_latin, nom_cultivar = parse_cultivar_from_latin(nom_latin or '')
-                defaults_org = {
-                    'nom_commun': nom_commun or nom_latin,
-                    'famille': get_row_value(row, SEED_FIELD_ALIASES['family'], default=''),
-                    'regne': 'plante',
-                    'type_organisme': 'vivace',
-                }
-                if nom_cultivar and base_latin:
-                    defaults_org['slug_latin'] = get_unique_slug_latin(Organism, base_latin)
-                    organisme, _cultivar, org_created = find_organism_and_cultivar(
-                        Organism,
-                        Cultivar,
-                        nom_latin=nom_latin or '',
-                        nom_commun=nom_commun or nom_latin or '',
-                        defaults_organism=defaults_org,
-                        defaults_cultivar={},
-                    )
-                else:
-                    organisme, org_created = find_or_match_organism(
-                        Organism,
-                        nom_latin=nom_latin or '',
-                        nom_commun=nom_commun or nom_latin,
-                        defaults=defaults_org,
-                    )
-                ensure_organism_genus(organisme)
-                if org_created:
-                    created_org += 1
-
-                variete = get_row_value(row, SEED_FIELD_ALIASES['variete'], default='').strip()
-                lot = get_row_value(row, SEED_FIELD_ALIASES['lot_reference'], default='').strip()
-
-                # Chercher SeedCollection existante (organisme + variété + lot)
-                qs = SeedCollection.objects.filter(organisme=organisme)
-                if variete:
-                    qs = qs.filter(variete=variete)
-                else:
-                    qs = qs.filter(variete='')
-                if lot:
-                    qs = qs.filter(lot_reference=lot)
-                else:
-                    qs = qs.filter(lot_reference='')
-                existing = qs.first()
-
-                if existing and not update_existing:
-                    skipped += 1
-                    continue
-
-                # Construire le payload pour création/mise à jour
-                seed_data = {
-                    'organisme': organisme,
-                    'variete': variete,
-                    'lot_reference': lot,
-                    'fournisseur': supplier,
-                    'quantite': parse_float(get_row_value(row, SEED_FIELD_ALIASES['quantite'], default=None, coerce_str=False)),
-                    'unite': self._parse_unite(get_row_value(row, SEED_FIELD_ALIASES['unite'], default='graines')),
-                    'date_recolte': self._parse_date(get_row_value(row, SEED_FIELD_ALIASES['date_recolte'], default='')),
-                    'duree_vie_annees': parse_float(get_row_value(row, SEED_FIELD_ALIASES['duree_vie_annees'], default=None, coerce_str=False)),
-                    'germination_lab_pct': parse_float(get_row_value(row, SEED_FIELD_ALIASES['germination_lab_pct'], default=None, coerce_str=False)),
-                    'stratification_requise': parse_bool(get_row_value(row, SEED_FIELD_ALIASES['stratification_requise'], default='')),
-                    'stratification_duree_jours': parse_int_or_range(get_row_value(row, SEED_FIELD_ALIASES['stratification_duree_jours'], default=None, coerce_str=False)),
-                    'stratification_temp': self._parse_strat_temp(get_row_value(row, SEED_FIELD_ALIASES['stratification_temp'], default='')),
-                    'stratification_notes': get_row_value(row, SEED_FIELD_ALIASES['stratification_notes'], default=''),
-                    'temps_germination_jours_min': parse_int(get_row_value(row, SEED_FIELD_ALIASES['temps_germination_jours_min'], default=None, coerce_str=False)),
-                    'temps_germination_jours_max': parse_int_or_range(get_row_value(row, SEED_FIELD_ALIASES['temps_germination_jours_max'], default=None, coerce_str=False)),
-                    'temperature_optimal_min': parse_float(get_row_value(row, SEED_FIELD_ALIASES['temperature_optimal_min'], default=None, coerce_str=False)),
-                    'temperature_optimal_max': parse_float(get_row_value(row, SEED_FIELD_ALIASES['temperature_optimal_max'], default=None, coerce_str=False)),
-                    'pretraitement': get_row_value(row, SEED_FIELD_ALIASES['pretraitement'], default=''),
-                    'data_sources': {'import': self._serializable_payload(row)},
-                }
-
-                if existing:
-                    for k, v in seed_data.items():
-                        if k == 'organisme':
-                            continue
-                        if k == 'data_sources':
-                            existing.data_sources = dict(existing.data_sources or {})
-                            existing.data_sources['import'] = v.get('import', v)
-                            continue
-                        setattr(existing, k, v)
-                    existing.save()
-                    updated_seed += 1
-                    self.stdout.write(f'  🔄 {organisme.nom_commun} — {variete or "-"}')
-                else:
-                    SeedCollection.objects.create(**seed_data)
-                    created_seed += 1
-                    self.stdout.write(f'  ✅ {organisme.nom_commun} — {variete or "-"}')
-
-            except Exception as e:
-                errors += 1
-                nom = get_row_value(row, SEED_FIELD_ALIASES['latin_name'], default='?')
-                if errors <= 5:
-                    self.stdout.write(self.style.WARNING(f'  ⚠️ Ligne {idx} ({nom}): {e}'))
+        pipeline = SeedImportPipeline(
+            supplier=supplier,
+            update_existing=update_existing,
+            batch_size=options['batch_size'],
+            stdout=self.stdout,
+        )
+        stats = pipeline.run(rows)
 
         # Mettre à jour dernier_import du fournisseur
-        if supplier and not dry_run and (created_seed + updated_seed) > 0:
-            from django.utils import timezone
+        if supplier and (stats['created'] + stats['updated']) > 0:
             supplier.dernier_import = timezone.now()
             supplier.save(update_fields=['dernier_import'])
 
         self.stdout.write(self.style.SUCCESS(f'\n🎉 Import terminé.'))
-        self.stdout.write(f'  Organismes créés: {created_org}')
-        self.stdout.write(f'  Collections créées: {created_seed}')
-        self.stdout.write(f'  Collections mises à jour: {updated_seed}')
-        self.stdout.write(f'  Ignorés: {skipped}, Erreurs: {errors}')
-
-    def _parse_unite(self, val: str) -> str:
-        if not val:
-            return 'graines'
-        v = str(val).lower().strip()
-        mapping = {'g': 'g', 'grammes': 'g', 'ml': 'ml', 'sachet': 'sachet', 's': 'sachet'}
-        return mapping.get(v, 'graines')
-
-    def _parse_date(self, val: str):
-        if not val:
-            return None
-        s = str(val).strip()
-        if not s:
-            return None
-        # Essayons année seule
-        try:
-            y = int(s[:4])
-            if 1900 <= y <= 2100:
-                from datetime import date
-                return date(y, 1, 1)
-        except (ValueError, IndexError):
-            pass
-        for fmt in ('%Y-%m-%d', '%d/%m/%Y', '%Y/%m/%d', '%d-%m-%Y'):
-            try:
-                return datetime.strptime(s, fmt).date()
-            except ValueError:
-                continue
-        return None
-
-    def _parse_strat_temp(self, val: str) -> str:
-        if not val:
-            return ''
-        v = str(val).lower()
-        if 'froid' in v or 'cold' in v:
-            return 'froide'
-        if 'chaud' in v or 'warm' in v or 'hot' in v:
-            if 'puis' in v or 'then' in v or 'followed' in v:
-                return 'chaude_puis_froide'
-            return 'chaude'
-        if 'chaude_puis' in v or 'warm_then_cold' in v:
-            return 'chaude_puis_froide'
-        return ''
-
-    def _serializable_payload(self, row: dict) -> dict:
-        out = {}
-        for k, v in row.items():
-            if v is None:
-                continue
-            if isinstance(v, (str, int, float, bool)):
-                out[k] = v
-            else:
-                out[k] = str(v)
-        return out
+        self.stdout.write(f'  Organismes créés: {pipeline.created_organisms}')
+        self.stdout.write(f'  Collections créées: {stats["created"]}')
+        self.stdout.write(f'  Collections mises à jour: {stats["updated"]}')
+        self.stdout.write(f'  Ignorés: {stats["skipped"]}, Erreurs: {stats["errors"]}')
+        self.stdout.write(f'  ⏱️ {stats["rows"]} lignes en {stats["duration_s"]} s ({stats["rows_per_s"]} lignes/s)')
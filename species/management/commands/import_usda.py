@@ -11,19 +11,18 @@ Usage:
 """
 import re
 import sys
-import time
 from pathlib import Path
 
 import requests
 from django.core.management.base import BaseCommand
 
+from species.http_fetch import ENRICHMENT_MAX_WORKERS, enrichment_session, fetch_concurrently
 from species.models import Cultivar, Organism
 from species.source_rules import (
     SOURCE_USDA,
+    OrganismResolver,
     ensure_organism_genus,
     find_organism_and_cultivar,
-    find_or_match_organism,
-    get_unique_slug_latin,
     parse_cultivar_from_latin,
 )
 
@@ -53,55 +52,49 @@ def itis_search(session: requests.Session, nom_latin: str, delay: float = 0.5):
     q = _search_key_for_itis(nom_latin)
     if not q:
         return None
-    for attempt in range(3):
-        try:
-            r = session.get(
-                ITIS_SEARCH_URL,
-                params={"srchKey": q},
-                timeout=15,
-                headers={"User-Agent": USER_AGENT},
-            )
-            r.raise_for_status()
-            data = r.json()
-            if not data:
-                return None
-            raw_names = data.get("scientificNames")
-            # ITIS peut renvoyer une liste, un seul objet ou null
-            if isinstance(raw_names, list):
-                names = [x for x in raw_names if isinstance(x, dict)]
-            elif isinstance(raw_names, dict):
-                names = [raw_names]
-            else:
-                names = []
-            if not names:
-                return None
-            # Préférer Plantae et nom exact ou le premier
-            for item in names:
-                if not isinstance(item, dict):
-                    continue
-                if item.get("kingdom") == "Plantae":
-                    tsn_str = item.get("tsn")
-                    if tsn_str:
-                        try:
-                            tsn = int(tsn_str)
-                            return {"tsn": tsn, "combinedName": item.get("combinedName"), "raw": item}
-                        except (TypeError, ValueError):
-                            continue
-            first = names[0]
-            if not isinstance(first, dict):
-                return None
-            tsn_str = first.get("tsn")
+    # Relances (erreurs réseau, 429, 5xx) : faites par la session (species.http_fetch)
+    r = session.get(
+        ITIS_SEARCH_URL,
+        params={"srchKey": q},
+        timeout=15,
+        headers={"User-Agent": USER_AGENT},
+    )
+    r.raise_for_status()
+    data = r.json()
+    if not data:
+        return None
+    raw_names = data.get("scientificNames")
+    # ITIS peut renvoyer une liste, un seul objet ou null
+    if isinstance(raw_names, list):
+        names = [x for x in raw_names if isinstance(x, dict)]
+    elif isinstance(raw_names, dict):
+        names = [raw_names]
+    else:
+        names = []
+    if not names:
+        return None
+    # Préférer Plantae et nom exact ou le premier
+    for item in names:
+        if not isinstance(item, dict):
+            continue
+        if item.get("kingdom") == "Plantae":
+            tsn_str = item.get("tsn")
             if tsn_str:
                 try:
                     tsn = int(tsn_str)
-                    return {"tsn": tsn, "combinedName": first.get("combinedName"), "raw": first}
+                    return {"tsn": tsn, "combinedName": item.get("combinedName"), "raw": item}
                 except (TypeError, ValueError):
-                    pass
-            return None
-        except (requests.RequestException, ValueError, KeyError) as e:
-            if attempt == 2:
-                raise
-            time.sleep(1.0 * (attempt + 1))
+                    continue
+    first = names[0]
+    if not isinstance(first, dict):
+        return None
+    tsn_str = first.get("tsn")
+    if tsn_str:
+        try:
+            tsn = int(tsn_str)
+            return {"tsn": tsn, "combinedName": first.get("combinedName"), "raw": first}
+        except (TypeError, ValueError):
+            pass
     return None
 
 
@@ -133,7 +126,18 @@ class Command(BaseCommand):
             "--delay",
             type=float,
             default=0.5,
-            help="Délai en secondes entre chaque appel API (défaut: 0.5)",
+            help="Intervalle minimal en secondes entre deux appels à l'API (défaut: 0.5)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=ENRICHMENT_MAX_WORKERS,
+            help=f"Recherches simultanées (défaut: {ENRICHMENT_MAX_WORKERS})",
+        )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Ignorer le cache disque des réponses HTTP",
         )
         parser.add_argument(
             "--dry-run",
@@ -179,21 +183,28 @@ class Command(BaseCommand):
                 self.stdout.write(f"  ... et {len(names_to_process) - 10} autres.")
             return
 
-        session = requests.Session()
-        session.headers.update({"User-Agent": USER_AGENT, "Accept": "application/json"})
+        session = enrichment_session(
+            USER_AGENT, use_cache=not options["no_cache"], min_interval=delay, max_workers=options["workers"],
+        )
+        session.headers.update({"Accept": "application/json"})
 
         created = 0
         updated = 0
         skipped = 0
         errors = 0
 
-        for nom_latin, nom_commun in names_to_process:
-            if not nom_latin:
-                skipped += 1
+        # Index en mémoire des organismes existants : pas de requêtes de correspondance par ligne
+        resolver = OrganismResolver(Organism)
+        names = [(nom_latin, nom_commun) for nom_latin, nom_commun in names_to_process if nom_latin]
+        skipped += len(names_to_process) - len(names)
+        # Recherches en parallèle (débit limité par hôte) ; écritures ici, dans l'ordre d'arrivée
+        fetched = fetch_concurrently(names, lambda name: itis_search(session, name[0]), options["workers"])
+        for (nom_latin, nom_commun), result, error in fetched:
+            if error is not None:
+                errors += 1
+                self.stdout.write(self.style.WARNING(f"  Erreur {nom_latin}: {error}"))
                 continue
-            time.sleep(delay)
             try:
-                result = itis_search(session, nom_latin, delay=delay)
                 if not result:
                     skipped += 1
                     continue
@@ -208,7 +219,7 @@ class Command(BaseCommand):
                 }
                 base_latin, nom_cultivar = parse_cultivar_from_latin(combined_name)
                 if nom_cultivar and base_latin:
-                    defaults["slug_latin"] = get_unique_slug_latin(Organism, base_latin)
+                    defaults["slug_latin"] = resolver.unique_slug_latin(base_latin)
                     organism, _cultivar, was_created = find_organism_and_cultivar(
                         Organism,
                         Cultivar,
@@ -217,10 +228,10 @@ class Command(BaseCommand):
                         defaults_organism=defaults,
                         defaults_cultivar={},
                         tsn=tsn,
+                        resolver=resolver,
                     )
                 else:
-                    organism, was_created = find_or_match_organism(
-                        Organism,
+                    organism, was_created = resolver.find_or_match(
                         nom_latin=combined_name,
                         nom_commun=nom_commun or combined_name,
                         defaults=defaults,
@@ -4,26 +4,32 @@ Mode enrich-only strict : ne crée jamais de nouveaux organismes.
 Utilise uniquement find_or_match_organism(..., create_missing=False).
 Si l'organisme n'existe pas en base → skip et log "ignoré".
 
+Écriture par lots (species.import_pipeline) : fiches lues par lot, bulk_update des
+organismes et bulk_create du calendrier ; avancement dans DataImportRun (import_usda_chars).
+
 Utilise l'API USDA PLANTS ou un fichier CSV (symbol,scientific_name,height,spread,bloom_period).
 
 Usage:
   python manage.py import_usda_chars --limit 50
   python manage.py import_usda_chars --file data/usda/characteristics.csv
 """
+import csv
 import re
-import sys
-import time
+from itertools import islice
 from pathlib import Path
 
 import requests
 from django.db import models
 from django.core.management.base import BaseCommand
 
+from catalog.search_vectors import mark_search_vectors_dirty
+from species.http_fetch import ENRICHMENT_MAX_WORKERS, enrichment_session, fetch_concurrently
+from species.import_pipeline import DEFAULT_BATCH_SIZE, ImportPipeline
 from species.models import Organism, OrganismCalendrier
 from species.source_rules import (
     SOURCE_USDA_PLANTS,
-    ensure_organism_genus,
-    find_or_match_organism,
+    OrganismResolver,
+    get_genus_from_nom_latin,
     is_empty_value,
     latin_name_without_author,
 )
@@ -195,6 +201,115 @@ def usda_fetch_characteristics(session: requests.Session, symbol: str) -> dict |
     return None
 
 
+def usda_fetch(session: requests.Session, nom: str) -> tuple[dict | None, dict | None]:
+    """Recherche puis caractéristiques (appels HTTP seulement) : (résultat de recherche, caractéristiques)."""
+    result = usda_search(session, nom)
+    if not result or not result.get("symbol"):
+        return result, None
+    return result, usda_fetch_characteristics(session, result["symbol"])
+
+
+class UsdaCharsPipeline(ImportPipeline):
+    """
+    Écriture des caractéristiques USDA par lots. Lignes : {'nom', 'chars'} et l'organisme
+    déjà chargé (--enrich) ou à retrouver (CSV, OrganismResolver sans création). Par lot :
+    une lecture des fiches, une du calendrier USDA existant, un bulk_update, un bulk_create.
+    """
+
+    source = 'import_usda_chars'
+    UPDATE_FIELDS = ['nom_latin', 'genus', 'hauteur_max', 'largeur_max', 'data_sources']
+
+    def __init__(self, *, dry_run=False, **kwargs):
+        super().__init__(**kwargs)
+        self.dry_run = dry_run
+        self.resolver = None
+        self.calendar_created = 0
+
+    def map_row(self, row, index):
+        if row.get('error') is not None:
+            raise ValueError(f"{row['nom']}: {row['error']}")
+        if not row.get('chars'):
+            self.write(f"  ignoré: {row['nom']}")
+            return None
+        return {'index': index, **row}
+
+    def row_label(self, record):
+        return record['nom']
+
+    def write_batch(self, records):
+        counts = {'updated': 0, 'skipped': 0}
+        renames = {}
+        for record in records:
+            if record.get('organism') is None:
+                if self.resolver is None:
+                    self.resolver = OrganismResolver(Organism)
+                    # Créé pendant le lot : point de reprise pour reset_state()
+                    self.resolver.checkpoint()
+                key, rename = self.resolver.resolve(record['nom'], record['nom'])
+                if key is None:
+                    self.write(f"  ignoré: {record['nom']}")
+                    counts['skipped'] += 1
+                    continue
+                if rename is not None:
+                    renames[key] = rename
+                    self.resolver.rename(key, rename)
+                record['organism_id'] = key
+        loaded = Organism.objects.in_bulk([r['organism_id'] for r in records if 'organism_id' in r])
+        for oid, nom_latin in renames.items():
+            loaded[oid].nom_latin = nom_latin
+
+        targets = []
+        for record in records:
+            organism = record.get('organism') or loaded.get(record.get('organism_id'))
+            if organism is not None:
+                targets.append((organism, record['chars']))
+        with_calendar = set(OrganismCalendrier.objects.filter(
+            organisme_id__in=[organism.pk for organism, _chars in targets],
+            type_periode='floraison',
+            source=SOURCE_USDA_PLANTS,
+        ).values_list('organisme_id', flat=True))
+
+        changed, calendar = {}, []
+        for organism, chars in targets:
+            h = _parse_height_ft(chars.get('height') or '')
+            w = _parse_spread_ft(chars.get('spread') or '')
+            m1, m2 = _parse_bloom_months(chars.get('bloom') or '')
+            updated = False
+            if h is not None and is_empty_value(organism.hauteur_max):
+                organism.hauteur_max = h
+                updated = True
+            if w is not None and is_empty_value(organism.largeur_max):
+                organism.largeur_max = w
+                updated = True
+            if m1 is not None:
+                if organism.pk not in with_calendar:
+                    with_calendar.add(organism.pk)
+                    calendar.append(OrganismCalendrier(
+                        organisme=organism, type_periode='floraison', mois_debut=m1, mois_fin=m2 or m1,
+                        source=SOURCE_USDA_PLANTS,
+                    ))
+                updated = True
+            if h or w or m1:
+                organism.data_sources = {**(organism.data_sources or {}), SOURCE_USDA_PLANTS: chars}
+                changed[organism.pk] = organism
+            if updated:
+                counts['updated'] += 1
+        for oid in renames:
+            changed[oid] = loaded[oid]
+        for organism in changed.values():
+            genus = get_genus_from_nom_latin(organism.nom_latin or '')
+            if genus:
+                organism.genus = genus
+
+        if not self.dry_run:
+            Organism.objects.bulk_update(list(changed.values()), self.UPDATE_FIELDS, batch_size=self.batch_size)
+            OrganismCalendrier.objects.bulk_create(calendar, batch_size=self.batch_size)
+            # bulk_update n'émet pas post_save : noms latins corrigés marqués pour la recherche
+            mark_search_vectors_dirty(renames)
+        self.calendar_created += len(calendar)
+        return counts
+
+
 class Command(BaseCommand):
     help = "Importe hauteur, largeur, floraison depuis USDA PLANTS. Mode fill_gaps."
 
@@ -206,12 +321,13 @@ class Command(BaseCommand):
         )
         parser.add_argument("--file", type=str, default=None, help="CSV: symbol,scientific_name,height,spread,bloom_period")
         parser.add_argument("--limit", type=int, default=0)
-        parser.add_argument("--delay", type=float, default=0.6)
+        parser.add_argument("--delay", type=float, default=0.6, help="Intervalle minimal entre deux appels à l'API (s)")
+        parser.add_argument("--workers", type=int, default=ENRICHMENT_MAX_WORKERS, help="Recherches simultanées")
+        parser.add_argument("--no-cache", action="store_true", help="Ignorer le cache disque des réponses HTTP")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Organismes écrits par transaction")
         parser.add_argument("--dry-run", action="store_true")
 
     def handle(self, *args, **options):
-        import csv as csv_module
-
         file_path = options.get("file")
         enrich = bool(options.get("enrich")) or not file_path
         limit = options["limit"] or 0
@@ -227,123 +343,71 @@ class Command(BaseCommand):
                 qs = qs[:limit]
             organisms = list(qs)
             self.stdout.write(self.style.SUCCESS(f"Enrichissement USDA chars: {len(organisms)} organismes."))
-        elif file_path:
+            session = enrichment_session(
+                USER_AGENT, use_cache=not options["no_cache"], min_interval=delay, max_workers=options["workers"],
+            )
+            session.headers.update({"Accept": "application/json"})
+            rows = self._fetched_rows(session, organisms, options["workers"])
+        else:
             path = Path(file_path)
             if not path.exists():
                 self.stdout.write(self.style.ERROR(f"Fichier introuvable: {path}"))
                 return
-            rows = []
-            with open(path, newline="", encoding="utf-8", errors="replace") as f:
-                for i, row in enumerate(csv_module.DictReader(f)):
-                    if limit and i >= limit:
-                        break
-                    rows.append(row)
-            organisms = None
-            self.stdout.write(self.style.SUCCESS(f"Import USDA chars depuis {path.name}: {len(rows)} lignes."))
-
-        enrichis = 0
-        ignorés = 0
-        erreurs = 0
-        cal_created = 0
+            self.stdout.write(self.style.SUCCESS(f"Import USDA chars depuis {path.name}."))
+            rows = self._csv_rows(path)
+            if limit:
+                rows = islice(rows, limit)
 
-        if enrich:
-            session = requests.Session()
-            session.headers.update({"User-Agent": USER_AGENT, "Accept": "application/json"})
-            for organism in organisms:
-                time.sleep(delay)
-                nom = latin_name_without_author(organism.nom_latin or "")
-                if not nom:
-                    ignorés += 1
-                    self.stdout.write(self.style.WARNING(f"  ignoré: {organism.nom_latin or '(vide)'}"))
-                    continue
-                try:
-                    result = usda_search(session, nom)
-                    if not result:
-                        ignorés += 1
-                        self.stdout.write(self.style.WARNING(f"  ignoré: {nom}"))
-                        continue
-                    symbol = result.get("symbol")
-                    if not symbol:
-                        ignorés += 1
-                        self.stdout.write(self.style.WARNING(f"  ignoré: {nom}"))
-                        continue
-                    chars = usda_fetch_characteristics(session, symbol)
-                    if not chars:
-                        chars = {"height": result.get("height"), "spread": result.get("spread"), "bloom": result.get("bloomPeriod")}
-                    ok, cal = self._apply_chars(organism, chars, dry_run)
-                    if ok:
-                        enrichis += 1
-                    if cal:
-                        cal_created += 1
-                    ensure_organism_genus(organism)
-                except Exception as e:
-                    erreurs += 1
-                    self.stdout.write(self.style.ERROR(f"  erreur {nom}: {e}"))
-        else:
-            for row in rows:
+        pipeline = UsdaCharsPipeline(
+            dry_run=dry_run,
+            batch_size=options["batch_size"],
+            stdout=self.stdout,
+            record_run=not dry_run,
+        )
+        stats = pipeline.run(rows)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Terminé: enrichis={stats['updated']}, ignorés={stats['skipped']}, erreurs={stats['errors']}"
+            + (f", {pipeline.calendar_created} entrées calendrier" if pipeline.calendar_created else "")
+            + (" (dry-run, rien d'écrit)" if dry_run else "")
+            + "."
+        ))
+
+    def _fetched_rows(self, session, organisms, workers):
+        """Lignes du pipeline depuis l'API ; appels HTTP en parallèle (débit limité par hôte), dans l'ordre d'arrivée."""
+        todo = []
+        for organism in organisms:
+            nom = latin_name_without_author(organism.nom_latin or "")
+            if not nom:
+                yield {"nom": organism.nom_latin or "(vide)", "chars": None}
+                continue
+            todo.append((organism, nom))
+        for (organism, nom), fetched, error in fetch_concurrently(todo, lambda item: usda_fetch(session, item[1]), workers):
+            if error is not None:
+                yield {"nom": nom, "organism": organism, "error": error}
+                continue
+            result, chars = fetched
+            if not result or not result.get("symbol"):
+                chars = None
+            elif not chars:
+                chars = {"height": result.get("height"), "spread": result.get("spread"), "bloom": result.get("bloomPeriod")}
+            yield {"nom": nom, "organism": organism, "chars": chars}
+
+    @staticmethod
+    def _csv_rows(path):
+        """Lignes du pipeline lues en flux depuis le CSV (organisme retrouvé à l'écriture, jamais créé)."""
+        with open(path, newline="", encoding="utf-8", errors="replace") as f:
+            for row in csv.DictReader(f):
                 symbol = (row.get("symbol") or row.get("Symbol") or "").strip()
                 sci = (row.get("scientific_name") or row.get("Scientific_Name") or row.get("species") or "").strip()
                 if not sci and not symbol:
-                    ignorés += 1
+                    yield {"nom": "(vide)", "chars": None}
                     continue
-                organism, _ = find_or_match_organism(
-                    Organism,
-                    nom_latin=sci or symbol,
-                    nom_commun=sci or symbol,
-                    defaults={},
-                    create_missing=False,  # enrich-only: ne jamais créer de nouveaux organismes
-                )
-                if organism is None:
-                    ignorés += 1
-                    self.stdout.write(self.style.WARNING(f"  ignoré: {sci or symbol}"))
-                    continue
-                try:
-                    chars = {
+                yield {
+                    "nom": sci or symbol,
+                    "chars": {
                         "height": row.get("height") or row.get("Height"),
                         "spread": row.get("spread") or row.get("Spread"),
                         "bloom": row.get("bloom_period") or row.get("Bloom_Period") or row.get("bloom"),
-                    }
-                    ok, cal = self._apply_chars(organism, chars, dry_run)
-                    if ok:
-                        enrichis += 1
-                    if cal:
-                        cal_created += 1
-                    ensure_organism_genus(organism)
-                except Exception as e:
-                    erreurs += 1
-                    self.stdout.write(self.style.ERROR(f"  erreur {sci or symbol}: {e}"))
-
-        self.stdout.write(self.style.SUCCESS(
-            f"Terminé: enrichis={enrichis}, ignorés={ignorés}, erreurs={erreurs}"
-            + (f", {cal_created} entrées calendrier" if cal_created else "")
-            + "."
-        ))
-
-    def _apply_chars(self, organism, chars, dry_run):
-        """Applique height, spread, bloom. Retourne (updated, cal_created)."""
-        updated = False
-        cal_created = False
-        h = _parse_height_ft(chars.get("height") or "")
-        if h is not None and is_empty_value(organism.hauteur_max) and not dry_run:
-            organism.hauteur_max = h
-            organism.save(update_fields=["hauteur_max"])
-            updated = True
-        w = _parse_spread_ft(chars.get("spread") or "")
-        if w is not None and is_empty_value(organism.largeur_max) and not dry_run:
-            organism.largeur_max = w
-            organism.save(update_fields=["largeur_max"])
-            updated = True
-        m1, m2 = _parse_bloom_months(chars.get("bloom") or "")
-        if m1 is not None and not dry_run:
-            if not OrganismCalendrier.objects.filter(organisme=organism, type_periode="floraison", source=SOURCE_USDA_PLANTS).exists():
-                OrganismCalendrier.objects.create(
-                    organisme=organism, type_periode="floraison", mois_debut=m1, mois_fin=m2 or m1, source=SOURCE_USDA_PLANTS
-                )
-                cal_created = True
-            updated = True
-        if not dry_run and (h or w or m1):
-            sources = dict(organism.data_sources or {})
-            sources[SOURCE_USDA_PLANTS] = chars
-            organism.data_sources = sources
-            organism.save(update_fields=["data_sources"])
-        return updated, cal_created
+                    },
+                }
@@ -11,12 +11,12 @@ Usage:
 """
 import re
 import sys
-import time
 from pathlib import Path
 
 import requests
 from django.core.management.base import BaseCommand
 
+from species.http_fetch import ENRICHMENT_MAX_WORKERS, enrichment_session, fetch_concurrently
 from species.models import Organism
 from species.source_rules import SOURCE_VASCAN, find_or_match_organism
 
@@ -51,41 +51,36 @@ def vascan_search(session: requests.Session, nom_latin: str, delay: float = 0.5)
     key_species = _search_key_for_vascan(nom_latin)
     if key_species and key_species != full_q:
         search_keys.append(key_species)
+    # Relances (erreurs réseau, 429, 5xx) : faites par la session (species.http_fetch)
     for q in search_keys:
-        for attempt in range(3):
-            try:
-                r = session.get(
-                    VASCAN_SEARCH_URL,
-                    params={"q": q},
-                    timeout=15,
-                    headers={"User-Agent": USER_AGENT},
-                )
-                r.raise_for_status()
-                data = r.json()
-                results = data.get("results") or []
-                if not results:
-                    break
-                first = results[0]
-                matches = first.get("matches") or []
-                if not matches:
-                    break
-                match = matches[0]
-                taxon_id = match.get("taxonID")
-                if taxon_id is None:
-                    break
-                return {
-                    "taxonID": taxon_id,
-                    "scientificName": match.get("scientificName"),
-                    "canonicalName": match.get("canonicalName"),
-                    "vernacularNames": match.get("vernacularNames", []),
-                    "distribution": match.get("distribution", []),
-                    "taxonomicAssertions": match.get("taxonomicAssertions", []),
-                    "raw": match,
-                }
-            except (requests.RequestException, ValueError, KeyError):
-                if attempt == 2:
-                    raise
-                time.sleep(1.0 * (attempt + 1))
+        r = session.get(
+            VASCAN_SEARCH_URL,
+            params={"q": q},
+            timeout=15,
+            headers={"User-Agent": USER_AGENT},
+        )
+        r.raise_for_status()
+        data = r.json()
+        results = data.get("results") or []
+        if not results:
+            continue
+        first = results[0]
+        matches = first.get("matches") or []
+        if not matches:
+            continue
+        match = matches[0]
+        taxon_id = match.get("taxonID")
+        if taxon_id is None:
+            continue
+        return {
+            "taxonID": taxon_id,
+            "scientificName": match.get("scientificName"),
+            "canonicalName": match.get("canonicalName"),
+            "vernacularNames": match.get("vernacularNames", []),
+            "distribution": match.get("distribution", []),
+            "taxonomicAssertions": match.get("taxonomicAssertions", []),
+            "raw": match,
+        }
     return None
 
 
@@ -117,7 +112,18 @@ class Command(BaseCommand):
             "--delay",
             type=float,
             default=0.5,
-            help="Délai en secondes entre chaque appel API (défaut: 0.5)",
+            help="Intervalle minimal en secondes entre deux appels à l'API (défaut: 0.5)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=ENRICHMENT_MAX_WORKERS,
+            help=f"Recherches simultanées (défaut: {ENRICHMENT_MAX_WORKERS})",
+        )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Ignorer le cache disque des réponses HTTP",
         )
         parser.add_argument(
             "--dry-run",
@@ -169,21 +175,26 @@ class Command(BaseCommand):
                 self.stdout.write(f"  ... et {len(names_to_process) - 10} autres.")
             return
 
-        session = requests.Session()
-        session.headers.update({"User-Agent": USER_AGENT, "Accept": "application/json"})
+        session = enrichment_session(
+            USER_AGENT, use_cache=not options["no_cache"], min_interval=delay, max_workers=options["workers"],
+        )
+        session.headers.update({"Accept": "application/json"})
 
         created = 0
         updated = 0
         skipped = 0
         errors = 0
 
-        for i, (nom_latin, nom_commun) in enumerate(names_to_process):
-            if not nom_latin:
-                skipped += 1
+        names = [(nom_latin, nom_commun) for nom_latin, nom_commun in names_to_process if nom_latin]
+        skipped += len(names_to_process) - len(names)
+        # Recherches en parallèle (débit limité par hôte) ; écritures ici, dans l'ordre d'arrivée
+        fetched = fetch_concurrently(names, lambda name: vascan_search(session, name[0]), options["workers"])
+        for (nom_latin, nom_commun), result, error in fetched:
+            if error is not None:
+                errors += 1
+                self.stdout.write(self.style.WARNING(f"  Erreur {nom_latin}: {error}"))
                 continue
-            time.sleep(delay)
             try:
-                result = vascan_search(session, nom_latin, delay=delay)
                 if not result:
                     skipped += 1
                     continue
@@ -8,11 +8,11 @@ Usage:
 """
 import re
 import sys
-import time
 
 import requests
 from django.core.management.base import BaseCommand
 
+from species.http_fetch import ENRICHMENT_MAX_WORKERS, enrichment_session, fetch_concurrently
 from species.models import Organism, OrganismCalendrier
 from species.source_rules import (
     SOURCE_WIKIDATA,
@@ -115,7 +115,9 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument("--enrich", action="store_true", help="Enrichir les organismes existants")
         parser.add_argument("--limit", type=int, default=0)
-        parser.add_argument("--delay", type=float, default=0.5)
+        parser.add_argument("--delay", type=float, default=0.5, help="Intervalle minimal entre deux requêtes SPARQL (s)")
+        parser.add_argument("--workers", type=int, default=ENRICHMENT_MAX_WORKERS, help="Requêtes simultanées")
+        parser.add_argument("--no-cache", action="store_true", help="Ignorer le cache disque des réponses HTTP")
         parser.add_argument("--dry-run", action="store_true")
 
     def handle(self, *args, **options):
@@ -143,16 +145,25 @@ class Command(BaseCommand):
 
         updated = 0
         skipped = 0
-        session = requests.Session()
-        session.headers.update({"User-Agent": USER_AGENT})
+        errors = 0
+        session = enrichment_session(
+            USER_AGENT, use_cache=not options["no_cache"], min_interval=delay, max_workers=options["workers"],
+        )
 
+        todo = []
         for organism in organisms:
-            time.sleep(delay)
             nom = latin_name_without_author(organism.nom_latin or "")
             if not nom:
                 skipped += 1
                 continue
-            result = wikidata_fetch(session, nom)
+            todo.append((organism, nom))
+        # Requêtes SPARQL en parallèle (débit limité par hôte) ; écritures ici, dans l'ordre d'arrivée
+        fetched = fetch_concurrently(todo, lambda item: wikidata_fetch(session, item[1]), options["workers"])
+        for (organism, nom), result, error in fetched:
+            if error is not None:
+                errors += 1
+                self.stdout.write(self.style.WARNING(f"  Erreur {nom}: {error}"))
+                continue
             if not result:
                 skipped += 1
                 continue
@@ -181,4 +192,4 @@ class Command(BaseCommand):
                 organism.save(update_fields=["data_sources"])
                 ensure_organism_genus(organism)
 
-        self.stdout.write(self.style.SUCCESS(f"Terminé: {updated} mis à jour, {skipped} ignorés."))
+        self.stdout.write(self.style.SUCCESS(f"Terminé: {updated} mis à jour, {skipped} ignorés, {errors} erreurs."))
@@ -5,7 +5,6 @@ Télécharge et stocke localement avec attribution (source_url, source_author, s
 Objectifs par espèce : au moins 1 photo de feuille, fleur, fruit (si applicable), racines (si dispo).
 """
 import re
-import time
 from io import BytesIO
 from pathlib import Path
 
@@ -13,6 +12,7 @@ import requests
 from django.core.files.base import ContentFile
 from django.core.management.base import BaseCommand
 
+from species.http_fetch import ENRICHMENT_MAX_WORKERS, enrichment_session, fetch_concurrently
 from species.models import Organism, Photo
 
 
@@ -207,6 +207,38 @@ def download_image(session: requests.Session, url: str) -> bytes | None:
         return None
 
 
+def wikimedia_fetch(
+    session: requests.Session,
+    nom_latin: str,
+    want_port_general: bool,
+    types_wanted: set[str],
+) -> dict:
+    """
+    Appels HTTP seulement (exécutable en parallèle) : entité Wikidata, image principale
+    et une image Commons par type manquant, téléchargées.
+    Retourne {'wd_id': str | None, 'images': [(type_photo, info, octets), ...]}.
+    """
+    wd_id = wikidata_search_species(session, nom_latin)
+    images = []
+    if wd_id and want_port_general:
+        img_info = wikidata_get_image(session, wd_id)
+        if img_info:
+            img_bytes = download_image(session, img_info['url'])
+            if img_bytes:
+                img_info.setdefault('page_url', f'https://www.wikidata.org/wiki/{wd_id}')
+                images.append(('port_general', img_info, img_bytes))
+    for type_photo, search_terms in PHOTO_TYPE_SEARCHES:
+        if type_photo not in types_wanted:
+            continue
+        found = commons_search_images(session, nom_latin, search_terms, limit=1)
+        if not found:
+            continue
+        img_bytes = download_image(session, found[0]['url'])
+        if img_bytes:
+            images.append((type_photo, found[0], img_bytes))
+    return {'wd_id': wd_id, 'images': images}
+
+
 def save_photo_to_organism(
     organism: Organism,
     image_bytes: bytes,
@@ -267,7 +299,18 @@ class Command(BaseCommand):
             '--delay',
             type=float,
             default=1.0,
-            help='Délai en secondes entre les requêtes API (défaut: 1.0)',
+            help='Intervalle minimal en secondes entre deux requêtes au même site (défaut: 1.0)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=ENRICHMENT_MAX_WORKERS,
+            help=f'Espèces traitées simultanément (défaut: {ENRICHMENT_MAX_WORKERS})',
+        )
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Ignorer le cache disque des réponses HTTP',
         )
 
     def handle(self, *args, **options):
@@ -275,11 +318,9 @@ class Command(BaseCommand):
         skip_existing = options['skip_existing'] and not options['no_skip']
         delay = max(0.5, options['delay'])
 
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': USER_AGENT,
-            'Accept': 'application/json',
-        })
+        session = enrichment_session(
+            USER_AGENT, use_cache=not options['no_cache'], min_interval=delay, max_workers=options['workers'],
+        )
 
         qs = Organism.objects.filter(regne='plante').order_by('nom_latin')
         if skip_existing:
@@ -296,58 +337,45 @@ class Command(BaseCommand):
         skipped = 0
         errors = 0
 
-        for organism in qs:
-            nom_latin = organism.nom_latin or ''
-            if not nom_latin.strip():
+        organisms = list(qs)
+        existing_types = {}
+        for organisme_id, type_photo in Photo.objects.filter(organisme__in=organisms).values_list('organisme_id', 'type_photo'):
+            existing_types.setdefault(organisme_id, set()).add(type_photo)
+        todo = []
+        for organism in organisms:
+            if not (organism.nom_latin or '').strip():
                 skipped += 1
                 continue
-
-            time.sleep(delay)
+            have = existing_types.get(organism.pk, set())
+            wanted = {type_photo for type_photo, _terms in PHOTO_TYPE_SEARCHES if type_photo not in have}
+            todo.append((organism, 'port_general' not in have, wanted))
+
+        # Recherches et téléchargements en parallèle (débit limité par site) ; photos enregistrées ici
+        fetched = fetch_concurrently(
+            todo,
+            lambda item: wikimedia_fetch(session, item[0].nom_latin, item[1], item[2]),
+            options['workers'],
+        )
+        for (organism, _want_port_general, _wanted), result, error in fetched:
+            if error is not None:
+                errors += 1
+                self.stdout.write(self.style.WARNING(f'  ⚠️ Erreur {organism.nom_latin}: {error}'))
+                continue
             added = 0
-
-            # 1. Wikidata : image principale (port_general)
-            wd_id = wikidata_search_species(session, nom_latin)
-            if wd_id:
-                time.sleep(delay)
-                img_info = wikidata_get_image(session, wd_id)
-                if img_info:
-                    page_url = img_info.get('page_url', f'https://www.wikidata.org/wiki/{wd_id}')
-                    img_bytes = download_image(session, img_info['url'])
-                    if img_bytes and not Photo.objects.filter(organisme=organism, type_photo='port_general').exists():
-                        time.sleep(0.3)
-                        attr = f"{img_info.get('author', 'Wikidata')} — {img_info.get('license', '')}"
-                        photo = save_photo_to_organism(
-                            organism, img_bytes, img_info['filename'],
-                            'port_general', page_url, attr, img_info.get('license', ''),
-                        )
-                        if photo:
-                            added += 1
-                            created += 1
-                            self.stdout.write(f'  📷 {organism.nom_commun}: port_general (Wikidata)')
-
-            # 2. Commons : feuille, fleur, fruit, racines
-            for type_photo, search_terms in PHOTO_TYPE_SEARCHES:
-                if Photo.objects.filter(organisme=organism, type_photo=type_photo).exists():
-                    continue
-                time.sleep(delay)
-                images = commons_search_images(session, nom_latin, search_terms, limit=1)
-                if not images:
-                    continue
-                img_info = images[0]
-                img_bytes = download_image(session, img_info['url'])
-                if img_bytes:
-                    time.sleep(0.3)
-                    attr = f"{img_info.get('author', 'Wikimedia Commons')} — {img_info.get('license', '')}"
-                    photo = save_photo_to_organism(
-                        organism, img_bytes, img_info['filename'],
-                        type_photo, img_info.get('page_url', ''), attr, img_info.get('license', ''),
-                    )
-                    if photo:
-                        added += 1
-                        created += 1
-                        self.stdout.write(f'  📷 {organism.nom_commun}: {type_photo}')
-
-            if added == 0 and not wd_id:
+            for type_photo, img_info, img_bytes in result['images']:
+                source = 'Wikidata' if type_photo == 'port_general' else 'Wikimedia Commons'
+                attr = f"{img_info.get('author', source)} — {img_info.get('license', '')}"
+                photo = save_photo_to_organism(
+                    organism, img_bytes, img_info['filename'],
+                    type_photo, img_info.get('page_url', ''), attr, img_info.get('license', ''),
+                )
+                if photo:
+                    added += 1
+                    created += 1
+                    suffix = ' (Wikidata)' if type_photo == 'port_general' else ''
+                    self.stdout.write(f'  📷 {organism.nom_commun}: {type_photo}{suffix}')
+
+            if added == 0 and not result['wd_id']:
                 errors += 1
 
-        self.stdout.write(self.style.SUCCESS(f'\n✅ Import terminé: {created} photos créées, {skipped} ignorées'))
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Import terminé: {created} photos créées, {skipped} ignorées, {errors} erreurs'))
@@ -17,6 +17,7 @@ Usage:
 from collections import defaultdict
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from django.utils import timezone
 
 from species.models import (
     Organism,
@@ -76,9 +77,9 @@ def merge_into_kept(kept, duplicates, stdout):
         if org.id == kept.id:
             continue
         # Réattribuer Specimen
-        Specimen.objects.filter(organisme=org).update(organisme=kept)
+        Specimen.objects.filter(organisme=org).update(organisme=kept, date_modification=timezone.now())
         # Réattribuer Photo
-        Photo.objects.filter(organisme=org).update(organisme=kept)
+        Photo.objects.filter(organisme=org).update(organisme=kept, date_modification=timezone.now())
         # Réattribuer SeedCollection
         SeedCollection.objects.filter(organisme=org).update(organisme=kept)
         # Réattribuer Cultivar
@@ -10,6 +10,7 @@ Usage:
 """
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from django.utils import timezone
 
 from species.models import (
     Cultivar,
@@ -99,10 +100,10 @@ def migrate_one_cultivar_organism(org, stdout):
     CompanionRelation = _get_companion_relation()
 
     # Specimens : réattribuer vers espèce + cultivar
-    Specimen.objects.filter(organisme=org).update(organisme=species, cultivar=cultivar)
+    Specimen.objects.filter(organisme=org).update(organisme=species, cultivar=cultivar, date_modification=timezone.now())
 
     # Photos
-    Photo.objects.filter(organisme=org).update(organisme=species)
+    Photo.objects.filter(organisme=org).update(organisme=species, date_modification=timezone.now())
 
     # SeedCollection
     SeedCollection.objects.filter(organisme=org).update(organisme=species)
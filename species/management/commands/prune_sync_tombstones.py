@@ -0,0 +1,19 @@
+"""
+Purge les traces de suppression (SyncTombstone) plus vieilles que la rétention de la synchro
+différentielle (species.delta_sync.TOMBSTONE_RETENTION). Un client dont le curseur est plus
+ancien repart d'un instantané complet.
+
+Usage:
+  python manage.py prune_sync_tombstones      # cron quotidien
+"""
+from django.core.management.base import BaseCommand
+
+from species.delta_sync import TOMBSTONE_RETENTION, prune_tombstones
+
+
+class Command(BaseCommand):
+    help = f"Supprime les traces de suppression de la synchro plus vieilles que {TOMBSTONE_RETENTION.days} jours."
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(f"{deleted} trace(s) de suppression purgée(s)."))
@@ -1,37 +1,24 @@
 """
-Recalcule search_vector pour tous les Organism (PostgreSQL uniquement).
-À appeler après bulk_create/bulk_update car le signal post_save ne se déclenche pas.
+Recalcule l'index de recherche de tous les Organism : search_vector + nom_recherche (PostgreSQL),
+nom_recherche + table FTS5 (SQLite).
+Les saves et les imports marquent déjà les organismes modifiés (catalog.search_vectors) :
+ce recalcul complet ne sert qu'après une modification SQL directe ou une restauration.
 """
 from django.db import connection
 from django.core.management.base import BaseCommand
 
-from catalog.models import Organism
+from catalog.search_vectors import refresh_search_vectors
 
 
 class Command(BaseCommand):
-    help = "Recalcule le champ search_vector pour tous les organismes (PostgreSQL)."
+    help = "Recalcule l'index de recherche (search_vector, nom_recherche) de tous les organismes."
 
     def handle(self, *args, **options):
-        if connection.vendor != 'postgresql':
+        if connection.vendor not in ('postgresql', 'sqlite'):
             self.stdout.write(self.style.WARNING(
-                "search_vector n'est géré que sur PostgreSQL. Ignoré."
+                "Index de recherche géré uniquement sur PostgreSQL et SQLite. Ignoré."
             ))
             return
         # Inclut nom_commun, nom_latin, description, usages_autres + noms (OrganismNom) en une requête
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """
-                UPDATE species_espece SET search_vector =
-                    setweight(to_tsvector('simple', coalesce(nom_commun, '')), 'A')
-                    || setweight(to_tsvector('simple', coalesce(nom_latin, '')), 'A')
-                    || setweight(to_tsvector('simple', coalesce(description, '')), 'B')
-                    || setweight(to_tsvector('simple', coalesce(usages_autres, '')), 'C')
-                    || coalesce(
-                        (SELECT setweight(to_tsvector('simple', coalesce(string_agg(nom, ' '), '')), 'B')
-                         FROM species_organismnom WHERE organism_id = species_espece.id),
-                        to_tsvector('')
-                    )
-                """
-            )
-            updated = cursor.rowcount
-        self.stdout.write(self.style.SUCCESS(f"search_vector mis à jour pour {updated} organisme(s)."))
+        updated = refresh_search_vectors()
+        self.stdout.write(self.style.SUCCESS(f"Index de recherche mis à jour pour {updated} organisme(s)."))
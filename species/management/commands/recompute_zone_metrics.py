@@ -0,0 +1,57 @@
+"""
+Recalcule les mesures de toutes les zones (surface, périmètre, centroïde) en un passage :
+toutes les limites projetées ensemble (species.geometry), puis un bulk_update des zones changées.
+Option --assign-specimens : rattache aussi les spécimens géolocalisés à la zone qui les contient.
+
+Usage:
+  python manage.py recompute_zone_metrics
+  python manage.py recompute_zone_metrics --garden 3 --assign-specimens
+  python manage.py recompute_zone_metrics --assign-specimens --reassign   # même les spécimens déjà rattachés
+"""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from gardens.models import Zone
+from species.geometry import assign_specimens_to_zones, recompute_zone_metrics
+
+
+class Command(BaseCommand):
+    help = "Recalcule surface, périmètre et centroïde de chaque zone (et, en option, la zone des spécimens)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--garden", type=int, action="append", help="ID de jardin (répétable). Défaut : tous.")
+        parser.add_argument(
+            "--assign-specimens",
+            action="store_true",
+            help="Rattacher les spécimens géolocalisés sans zone à la zone qui les contient",
+        )
+        parser.add_argument(
+            "--reassign",
+            action="store_true",
+            help="Avec --assign-specimens : recalculer aussi la zone des spécimens déjà rattachés",
+        )
+
+    def handle(self, *args, **options):
+        zones = Zone.objects.order_by("id")
+        if options["garden"]:
+            zones = zones.filter(garden_id__in=options["garden"])
+        zones = list(zones)
+        changed = recompute_zone_metrics(zones)
+        if changed:
+            # bulk_update ne pose pas auto_now (synchro différentielle)
+            now = timezone.now()
+            for zone in changed:
+                zone.date_modification = now
+            Zone.objects.bulk_update(
+                changed,
+                ["surface_m2", "perimetre_m", "centroide_latitude", "centroide_longitude", "date_modification"],
+                batch_size=500,
+            )
+        self.stdout.write(f"Zones : {len(changed)} mise(s) à jour sur {len(zones)}.")
+
+        if options["assign_specimens"]:
+            total = 0
+            for garden_id in sorted({zone.garden_id for zone in zones}):
+                total += assign_specimens_to_zones(garden_id, only_unassigned=not options["reassign"])
+            self.stdout.write(f"Spécimens rattachés à une zone : {total}.")
+        self.stdout.write(self.style.SUCCESS("Mesures des zones recalculées."))
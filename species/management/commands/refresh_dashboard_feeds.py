@@ -0,0 +1,17 @@
+"""
+Recalcule les accueils précalculés (species.dashboard_feed) d'un autre jour ou marqués :
+is_overdue des rappels, événements attendus du nouveau mois, calendriers importés en masse.
+À exécuter via cron après minuit : python manage.py refresh_dashboard_feeds
+Sans ce passage, l'accueil est recalculé à la première ouverture de la journée.
+"""
+from django.core.management.base import BaseCommand
+
+from species.dashboard_feed import refresh_all_feeds
+
+
+class Command(BaseCommand):
+    help = "Recalcule les accueils précalculés de l'app (changement de jour, sections marquées)."
+
+    def handle(self, *args, **options):
+        count = refresh_all_feeds()
+        self.stdout.write(self.style.SUCCESS(f"{count} accueil(s) recalculé(s)."))
@@ -0,0 +1,37 @@
+"""
+Stocke une nouvelle prévision météo (Open-Meteo) pour chaque jardin géolocalisé.
+À exécuter via cron (ex. toutes les 3 h) : python manage.py refresh_forecasts
+Les vues (alertes météo, tableau de bord) lisent uniquement ces prévisions stockées.
+"""
+from django.core.management.base import BaseCommand
+
+from gardens.models import Garden
+from species.weather_service import FORECAST_STORE_DAYS, refresh_forecast_store
+
+
+class Command(BaseCommand):
+    help = "Rafraîchit les prévisions météo stockées de tous les jardins (Open-Meteo)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=FORECAST_STORE_DAYS,
+            help=f"Nombre de jours de prévision (défaut: {FORECAST_STORE_DAYS}, max 16)",
+        )
+        parser.add_argument(
+            "--garden",
+            type=int,
+            action="append",
+            help="ID de jardin (répétable). Défaut : tous les jardins géolocalisés.",
+        )
+
+    def handle(self, *args, **options):
+        gardens = None
+        if options["garden"]:
+            gardens = Garden.objects.filter(pk__in=options["garden"])
+        result = refresh_forecast_store(gardens, days=options["days"])
+        for gid, count in result.items():
+            self.stdout.write(f"  Jardin {gid}: {count} jours prévus")
+        ok = sum(1 for count in result.values() if count)
+        self.stdout.write(self.style.SUCCESS(f"Prévisions stockées: {ok}/{len(result)} jardins"))
@@ -0,0 +1,151 @@
+"""
+Worker des tâches de fond (species.jobs) : exécute les commandes mises en file par
+RunAdminCommandView et la page Gestion des données, chacune dans son propre processus.
+
+Usage:
+  python manage.py run_jobs                    # boucle, 2 tâches en parallèle
+  python manage.py run_jobs --processes 4
+  python manage.py run_jobs --once             # vide la file puis s'arrête (cron)
+  python manage.py run_jobs --processes 0      # dans ce processus, une tâche à la fois (débogage)
+
+En production : un service à côté de gunicorn (voir DEPLOYMENT.md).
+"""
+import multiprocessing
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from species.jobs import (
+    CANCEL_GRACE_SECONDS,
+    claim_next_job,
+    fail_stale_jobs,
+    finish_job,
+    run_job,
+    worker_name,
+)
+from species.models import DataImportRun
+
+DEFAULT_PROCESSES = 2
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+def _job_process(job_id):
+    """Cible du processus enfant : connexions propres (pas celles héritées du parent)."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+    # Gestionnaires du parent hérités au fork : SIGTERM (terminate) doit arrêter l'enfant,
+    # Ctrl-C arrête le worker qui laisse finir les tâches en cours
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    connections.close_all()
+    try:
+        run_job(job_id)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Exécute les tâches de fond en file (commandes lancées depuis l'admin ou l'API)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=DEFAULT_PROCESSES,
+            help=f"Tâches exécutées en parallèle, un processus chacune (défaut: {DEFAULT_PROCESSES} ; 0 = dans ce processus)",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=DEFAULT_POLL_INTERVAL,
+            help=f"Secondes entre deux consultations de la file (défaut: {DEFAULT_POLL_INTERVAL})",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="S'arrêter quand la file est vide et les tâches lancées terminées",
+        )
+
+    def handle(self, *args, **options):
+        self.worker = worker_name()
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        stale = fail_stale_jobs()
+        if stale:
+            self.stdout.write(self.style.WARNING(f"{stale} tâche(s) abandonnée(s) par un worker arrêté : en échec."))
+        self.stdout.write(f"Worker {self.worker} ({options['processes']} processus).")
+
+        if options["processes"] <= 0:
+            self._run_inline(options)
+        else:
+            self._run_pool(options)
+        self.stdout.write("Worker arrêté.")
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+
+    def _run_inline(self, options):
+        while not self.stopping:
+            job_id = claim_next_job(self.worker)
+            if job_id is None:
+                if options["once"]:
+                    return
+                time.sleep(options["poll_interval"])
+                continue
+            self.stdout.write(f"  Tâche {job_id} : {run_job(job_id)}")
+
+    def _run_pool(self, options):
+        context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+        running = {}  # job_id → Process
+        cancel_seen = {}  # job_id → instant où l'annulation a été vue
+        while True:
+            self._reap(running, cancel_seen)
+            if running:
+                # Signe de vie pour les commandes silencieuses (fail_stale_jobs)
+                DataImportRun.objects.filter(pk__in=running, status="running").update(heartbeat_at=timezone.now())
+                self._enforce_cancel(running, cancel_seen)
+            while not self.stopping and len(running) < options["processes"]:
+                job_id = claim_next_job(self.worker)
+                if job_id is None:
+                    break
+                # Le processus enfant ne doit pas réutiliser la connexion du parent
+                connections.close_all()
+                process = context.Process(target=_job_process, args=(job_id,), name=f"job-{job_id}")
+                process.start()
+                running[job_id] = process
+                self.stdout.write(f"  Tâche {job_id} démarrée (pid {process.pid}).")
+            if not running and (self.stopping or options["once"]):
+                return
+            time.sleep(options["poll_interval"])
+
+    def _reap(self, running, cancel_seen):
+        for job_id, process in list(running.items()):
+            if process.is_alive():
+                continue
+            process.join()
+            del running[job_id]
+            cancel_seen.pop(job_id, None)
+            run = DataImportRun.objects.filter(pk=job_id).first()
+            final = run.status if run else "supprimée"
+            if run is not None and run.status == "running":
+                # Processus mort sans enregistrer d'issue (signal, mémoire, terminate)
+                final = "cancelled" if run.cancel_requested else "failure"
+                finish_job(run, final, message=f"\nProcessus terminé (code {process.exitcode}).")
+            self.stdout.write(f"  Tâche {job_id} terminée ({final}).")
+
+    def _enforce_cancel(self, running, cancel_seen):
+        now = time.monotonic()
+        requested = DataImportRun.objects.filter(pk__in=running, cancel_requested=True).values_list("id", flat=True)
+        for job_id in requested:
+            seen = cancel_seen.setdefault(job_id, now)
+            if now - seen >= CANCEL_GRACE_SECONDS and running[job_id].is_alive():
+                self.stdout.write(self.style.WARNING(f"  Tâche {job_id} : annulation forcée."))
+                running[job_id].terminate()
@@ -1,10 +1,12 @@
 """
 Définit le champ boundary (GeoJSON) d'un jardin par nom.
 Usage: python manage.py set_garden_boundary "Jardins Du Mon Caprice" --geojson='{"type":"FeatureCollection",...}'
+La surface (surface_ha) est recalculée depuis la limite (species.geometry).
 """
 import json
 from django.core.management.base import BaseCommand
 from gardens.models import Garden
+from species.geometry import boundary_metrics
 
 
 BOUNDARY_MON_CAPRICE = {
@@ -453,6 +455,14 @@ class Command(BaseCommand):
         if not garden:
             self.stderr.write(self.style.ERROR(f"Jardin introuvable: {name}"))
             return
+        metrics = boundary_metrics(boundary)
+        if metrics["surface_m2"] is None:
+            self.stderr.write(self.style.ERROR("GeoJSON sans polygone valide."))
+            return
         garden.boundary = boundary
-        garden.save(update_fields=["boundary"])
-        self.stdout.write(self.style.SUCCESS(f"Boundary mis à jour pour: {garden.nom} (id={garden.id})"))
+        garden.surface_ha = round(metrics["surface_m2"] / 10_000, 4)
+        garden.save(update_fields=["boundary", "surface_ha", "date_modification"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Boundary mis à jour pour: {garden.nom} (id={garden.id}) — "
+            f"{garden.surface_ha} ha, périmètre {metrics['perimetre_m']:.0f} m"
+        ))
@@ -13,16 +13,19 @@ Usage:
 """
 from __future__ import annotations
 
-import threading
+import json
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
-from django.core.management import call_command
 from django.db import transaction
 from django.utils.dateparse import parse_datetime
 from django.utils import timezone
 
 from catalog.models import (
+    _slugify_latin,
     Amendment,
     CompanionRelation,
     Cultivar,
@@ -36,6 +39,9 @@ from catalog.models import (
     OrganismUsage,
     RadixSyncState,
 )
+from catalog.search_vectors import mark_search_vectors_dirty
+from species.companion_graph import invalidate_companion_graph
+from species.source_rules import zone_rusticite_bounds
 
 # Aligné sur radixsylva/botanique/sync_payload.py (pas d’import cross-projet).
 ORGANISM_SYNC_FIELDS = (
@@ -79,6 +85,12 @@ ORGANISM_SYNC_FIELDS = (
     'enrichment_score_pct',
 )
 
+# Dénormalisés localement à partir de zone_rusticite (pas dans le payload Radix)
+ZONE_BOUND_FIELDS = ('zone_rusticite_min', 'zone_rusticite_max')
+
+# Taille des lots INSERT/UPDATE (limite de paramètres SQLite, requêtes raisonnables en PostgreSQL)
+BULK_BATCH_SIZE = 500
+
 AMENDMENT_FIELDS = (
     'nom',
     'type_amendment',
@@ -114,8 +126,9 @@ def _headers():
     return h
 
 
-def _iter_sync_pages(base: str, subpath: str, since_iso: str | None):
+def _iter_sync_pages(base: str, subpath: str, since_iso: str | None, session=None):
     """DRF pagination: première requête avec ?since=, puis suit next."""
+    http = session or requests
     base = base.rstrip('/')
     path = subpath.strip('/')
     url = f'{base}/{path}/'
@@ -124,7 +137,7 @@ def _iter_sync_pages(base: str, subpath: str, since_iso: str | None):
         params['since'] = since_iso
     first = True
     while url:
-        r = requests.get(url, headers=_headers(), params=params if first else None, timeout=180)
+        r = http.get(url, headers=_headers(), params=params if first else None, timeout=180)
         if r.status_code != 200:
             raise CommandError(f'HTTP {r.status_code} {url}: {r.text[:500]}')
         first = False
@@ -150,14 +163,32 @@ def _iter_organism_id_pages(base: str, organism_id: int):
         url = payload.get('next')
 
 
+def _prefetched(pages):
+    """
+    Itère sur pages en téléchargeant la page N+1 (thread dédié) pendant que l'appelant applique la page N.
+    Les erreurs HTTP remontent au moment où la page concernée est demandée.
+    """
+    pages = iter(pages)
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix='radix-prefetch') as pool:
+        future = pool.submit(next, pages, None)
+        while True:
+            payload = future.result()
+            if payload is None:
+                return
+            future = pool.submit(next, pages, None)
+            yield payload
+
+
 def fetch_and_apply_organism(
     organism_id: int,
     *,
     dry_run: bool = False,
     stdout=None,
+    mark_search: bool = True,
 ) -> tuple[bool, str | None]:
     """
     Télécharge un seul organisme depuis Radix (GET sync/organisms/?organism_id=) et l’applique localement.
+    Son search_vector est recalculé au commit (mark_search=False pour s'en dispenser).
     Ne met pas à jour RadixSyncState. Retourne (True, None) ou (False, message d’erreur).
     """
     base = getattr(settings, 'RADIX_SYLVA_API_URL', '') or ''
@@ -171,8 +202,7 @@ def fetch_and_apply_organism(
                 continue
             try:
                 with transaction.atomic():
-                    for row in rows:
-                        _apply_organism(row, dry_run)
+                    _apply_organisms(rows, dry_run, mark_search=mark_search)
                 total_rows += len(rows)
             except Exception as e:
                 return False, str(e)[:500]
@@ -186,227 +216,258 @@ def fetch_and_apply_organism(
     return True, None
 
 
-def schedule_rebuild_search_vectors_async() -> None:
-    """Lance rebuild_search_vectors dans un thread daemon (ferme les connexions DB)."""
-
-    def _run() -> None:
-        from django.core.management import call_command
-        from django.db import close_old_connections
-        from io import StringIO
+def _freeze(value):
+    """Valeur comparable/hachable (listes et dicts JSON → texte canonique)."""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, sort_keys=True)
+    return value
 
-        close_old_connections()
-        try:
-            call_command('rebuild_search_vectors', stdout=StringIO())
-        finally:
-            close_old_connections()
 
-    threading.Thread(target=_run, daemon=True).start()
+def _dedupe_by_id(rows: list) -> list:
+    """Une seule ligne par id (la dernière) : ON CONFLICT ne peut toucher deux fois la même ligne."""
+    return list({row['id']: row for row in rows}.values())
 
 
-def _apply_amendment(data: dict, dry_run: bool) -> None:
-    if dry_run:
-        return
-    aid = data['id']
-    defaults = {k: data[k] for k in AMENDMENT_FIELDS}
-    Amendment.objects.update_or_create(id=aid, defaults=defaults)
-    dt = _parse_dt(data.get('date_ajout'))
-    if dt:
-        Amendment.objects.filter(pk=aid).update(date_ajout=dt)
+def _restore_dates(model, objs: list, rows: list, fields=('date_ajout', 'date_modification')) -> None:
+    """
+    Réapplique les dates Radix (auto_now / auto_now_add écrasés par bulk_create) :
+    un bulk_update par champ, seulement pour les lignes qui fournissent la date.
+    """
+    for field in fields:
+        changed = []
+        for obj, row in zip(objs, rows):
+            dt = _parse_dt(row.get(field))
+            if dt:
+                setattr(obj, field, dt)
+                changed.append(obj)
+        if changed:
+            model.objects.bulk_update(changed, [field], batch_size=BULK_BATCH_SIZE)
+
+
+def _sync_children(model, fk: str, parent_ids: list, desired_by_parent: dict, fields: tuple) -> None:
+    """
+    Aligne les lignes enfants de parent_ids sur desired_by_parent {parent_id: [tuple(fields), ...]}.
+    Les lignes identiques sont laissées en place ; seules les lignes en trop sont supprimées
+    et les manquantes créées. Au plus 3 requêtes quel que soit le nombre de parents.
+    """
+    existing = defaultdict(lambda: defaultdict(list))
+    for pk, parent_id, *values in model.objects.filter(**{f'{fk}__in': parent_ids}).values_list(
+        'pk', fk, *fields
+    ):
+        existing[parent_id][tuple(_freeze(v) for v in values)].append(pk)
+
+    to_delete, to_create = [], []
+    for parent_id in parent_ids:
+        pool = existing.get(parent_id, {})
+        for values in desired_by_parent.get(parent_id, ()):
+            pks = pool.get(tuple(_freeze(v) for v in values))
+            if pks:
+                pks.pop()
+                continue
+            to_create.append(model(**{fk: parent_id}, **dict(zip(fields, values))))
+        for pks in pool.values():
+            to_delete.extend(pks)
+
+    if to_delete:
+        model.objects.filter(pk__in=to_delete).delete()
+    if to_create:
+        model.objects.bulk_create(to_create, batch_size=BULK_BATCH_SIZE)
+
+
+NOM_FIELDS = ('nom', 'langue', 'source', 'principal')
+PROPRIETE_FIELDS = ('type_sol', 'ph_min', 'ph_max', 'tolerance_ombre', 'source')
+USAGE_FIELDS = ('type_usage', 'parties', 'description', 'source')
+CALENDRIER_FIELDS = ('type_periode', 'mois_debut', 'mois_fin', 'source')
+ORGANISM_AMENDMENT_FIELDS = ('amendment_id', 'priorite', 'dose_specifique', 'moment_application', 'notes')
+PORTE_GREFFE_FIELDS = ('nom_porte_greffe', 'vigueur', 'hauteur_max_m', 'notes', 'source', 'disponible_chez')
+POLLINATOR_FIELDS = ('companion_cultivar_id', 'companion_organism_id', 'notes', 'source')
+CULTIVAR_FIELDS = (
+    'organism_id', 'slug_cultivar', 'nom', 'description', 'couleur_fruit', 'gout', 'resistance_maladies', 'notes',
+)
+COMPANION_FIELDS = (
+    'organisme_source_id', 'organisme_cible_id', 'type_relation', 'force', 'distance_optimale',
+    'description', 'source_info',
+)
 
 
-def _apply_organism(data: dict, dry_run: bool) -> None:
-    if dry_run:
+def _apply_amendments(rows: list, dry_run: bool) -> None:
+    if dry_run or not rows:
         return
-    oid = data['id']
-    defaults = {k: data[k] for k in ORGANISM_SYNC_FIELDS}
-    Organism.objects.update_or_create(id=oid, defaults=defaults)
-    da = _parse_dt(data.get('date_ajout'))
-    dm = _parse_dt(data.get('date_modification'))
-    upd = {}
-    if da:
-        upd['date_ajout'] = da
-    if dm:
-        upd['date_modification'] = dm
-    if upd:
-        Organism.objects.filter(pk=oid).update(**upd)
-
-    OrganismNom.objects.filter(organism_id=oid).delete()
-    OrganismNom.objects.bulk_create(
-        [
-            OrganismNom(
-                organism_id=oid,
-                nom=row['nom'],
-                langue=row['langue'],
-                source=row['source'],
-                principal=row.get('principal', False),
-            )
-            for row in data.get('noms') or []
-        ]
+    rows = _dedupe_by_id(rows)
+    objs = [Amendment(id=row['id'], **{k: row[k] for k in AMENDMENT_FIELDS}) for row in rows]
+    Amendment.objects.bulk_create(
+        objs, update_conflicts=True, unique_fields=['id'], update_fields=list(AMENDMENT_FIELDS),
+        batch_size=BULK_BATCH_SIZE,
     )
+    _restore_dates(Amendment, objs, rows, fields=('date_ajout',))
 
-    OrganismPropriete.objects.filter(organisme_id=oid).delete()
-    OrganismPropriete.objects.bulk_create(
-        [
-            OrganismPropriete(
-                organisme_id=oid,
-                type_sol=row.get('type_sol') or [],
-                ph_min=row.get('ph_min'),
-                ph_max=row.get('ph_max'),
-                tolerance_ombre=row.get('tolerance_ombre') or '',
-                source=row.get('source') or '',
-            )
-            for row in data.get('proprietes') or []
-        ]
-    )
 
-    OrganismUsage.objects.filter(organisme_id=oid).delete()
-    OrganismUsage.objects.bulk_create(
-        [
-            OrganismUsage(
-                organisme_id=oid,
-                type_usage=row['type_usage'],
-                parties=row.get('parties') or '',
-                description=row.get('description') or '',
-                source=row.get('source') or '',
-            )
-            for row in data.get('usages') or []
-        ]
+def _apply_organisms(rows: list, dry_run: bool, mark_search: bool = True) -> None:
+    """
+    Une page d'organismes : upsert groupé des parents puis diff des six tables enfants.
+    mark_search : marque les organismes pour recalcul de search_vector au commit.
+    """
+    if dry_run or not rows:
+        return
+    rows = _dedupe_by_id(rows)
+    objs = []
+    for row in rows:
+        obj = Organism(id=row['id'], **{k: row[k] for k in ORGANISM_SYNC_FIELDS})
+        if not obj.slug_latin and obj.nom_latin:
+            obj.slug_latin = _slugify_latin(obj.nom_latin)
+        # bulk_create ne passe pas par Organism.save() : bornes de zone calculées ici
+        obj.zone_rusticite_min, obj.zone_rusticite_max = zone_rusticite_bounds(obj.zone_rusticite)
+        objs.append(obj)
+    Organism.objects.bulk_create(
+        objs, update_conflicts=True, unique_fields=['id'],
+        update_fields=[*ORGANISM_SYNC_FIELDS, *ZONE_BOUND_FIELDS, 'date_modification'], batch_size=BULK_BATCH_SIZE,
     )
-
-    OrganismCalendrier.objects.filter(organisme_id=oid).delete()
-    OrganismCalendrier.objects.bulk_create(
-        [
-            OrganismCalendrier(
-                organisme_id=oid,
-                type_periode=row['type_periode'],
-                mois_debut=row.get('mois_debut'),
-                mois_fin=row.get('mois_fin'),
-                source=row.get('source') or '',
+    _restore_dates(Organism, objs, rows)
+
+    ids = [row['id'] for row in rows]
+    by_id = {row['id']: row for row in rows}
+
+    def desired(key, to_values):
+        return {oid: [to_values(r) for r in by_id[oid].get(key) or []] for oid in ids}
+
+    _sync_children(OrganismNom, 'organism_id', ids, desired('noms', lambda r: (
+        r['nom'], r['langue'], r['source'], bool(r.get('principal', False)),
+    )), NOM_FIELDS)
+    _sync_children(OrganismPropriete, 'organisme_id', ids, desired('proprietes', lambda r: (
+        r.get('type_sol') or [], r.get('ph_min'), r.get('ph_max'),
+        r.get('tolerance_ombre') or '', r.get('source') or '',
+    )), PROPRIETE_FIELDS)
+    _sync_children(OrganismUsage, 'organisme_id', ids, desired('usages', lambda r: (
+        r['type_usage'], r.get('parties') or '', r.get('description') or '', r.get('source') or '',
+    )), USAGE_FIELDS)
+    _sync_children(OrganismCalendrier, 'organisme_id', ids, desired('calendrier', lambda r: (
+        r['type_periode'], r.get('mois_debut'), r.get('mois_fin'), r.get('source') or '',
+    )), CALENDRIER_FIELDS)
+    _sync_children(OrganismAmendment, 'organisme_id', ids, desired('amendements_recommandes', lambda r: (
+        r['amendment_id'], r.get('priorite', 1), r.get('dose_specifique') or '',
+        r.get('moment_application') or '', r.get('notes') or '',
+    )), ORGANISM_AMENDMENT_FIELDS)
+    if mark_search:
+        mark_search_vectors_dirty(ids)
+    # bulk_update sans signaux : les noms affichés par le graphe ont pu changer
+    invalidate_companion_graph()
+
+
+def _apply_cultivars(rows: list, deferred_pollinators: list, dry_run: bool, stdout) -> None:
+    """
+    Une page de cultivars. Les pollinisateurs dont le cultivar compagnon n'existe pas encore
+    sont mis de côté (deferred_pollinators) et créés par _flush_deferred_pollinators.
+    """
+    if dry_run or not rows:
+        return
+    rows = _dedupe_by_id(rows)
+    objs = [
+        Cultivar(
+            id=row['id'],
+            organism_id=row['organism_id'],
+            slug_cultivar=row['slug_cultivar'],
+            nom=row['nom'],
+            description=row.get('description') or '',
+            couleur_fruit=row.get('couleur_fruit') or '',
+            gout=row.get('gout') or '',
+            resistance_maladies=row.get('resistance_maladies') or '',
+            notes=row.get('notes') or '',
+        )
+        for row in rows
+    ]
+    Cultivar.objects.bulk_create(
+        objs, update_conflicts=True, unique_fields=['id'],
+        update_fields=[*CULTIVAR_FIELDS, 'date_modification'], batch_size=BULK_BATCH_SIZE,
+    )
+    _restore_dates(Cultivar, objs, rows)
+
+    ids = [row['id'] for row in rows]
+    _sync_children(CultivarPorteGreffe, 'cultivar_id', ids, {
+        row['id']: [
+            (
+                pg['nom_porte_greffe'], pg.get('vigueur') or '', pg.get('hauteur_max_m'),
+                pg.get('notes') or '', pg.get('source') or '', pg.get('disponible_chez') or [],
             )
-            for row in data.get('calendrier') or []
+            for pg in row.get('porte_greffes') or []
         ]
-    )
+        for row in rows
+    }, PORTE_GREFFE_FIELDS)
 
-    OrganismAmendment.objects.filter(organisme_id=oid).delete()
-    for row in data.get('amendements_recommandes') or []:
-        OrganismAmendment.objects.create(
-            organisme_id=oid,
-            amendment_id=row['amendment_id'],
-            priorite=row.get('priorite', 1),
-            dose_specifique=row.get('dose_specifique') or '',
-            moment_application=row.get('moment_application') or '',
-            notes=row.get('notes') or '',
-        )
+    companion_ids = {
+        p['companion_cultivar_id']
+        for row in rows for p in row.get('pollinators') or []
+        if p.get('companion_cultivar_id')
+    }
+    known = set(Cultivar.objects.filter(pk__in=companion_ids).values_list('pk', flat=True)) if companion_ids else set()
+    pollinators = {}
+    for row in rows:
+        cid = row['id']
+        pollinators[cid] = []
+        for p in row.get('pollinators') or []:
+            cc = p.get('companion_cultivar_id')
+            co = p.get('companion_organism_id')
+            if cc and cc not in known:
+                deferred_pollinators.append((cid, p))
+                continue
+            if not cc and not co:
+                stdout.write(f'Pollinator ignoré (cultivar {cid}): pas de compagnon')
+                continue
+            pollinators[cid].append((cc, co, p.get('notes') or '', p.get('source') or ''))
+    _sync_children(CultivarPollinator, 'cultivar_id', ids, pollinators, POLLINATOR_FIELDS)
 
 
-def _apply_cultivar(data: dict, deferred_pollinators: list, dry_run: bool, stdout) -> None:
-    if dry_run:
+def _flush_deferred_pollinators(deferred: list, dry_run: bool, stdout) -> None:
+    """Crée en une fois les pollinisateurs différés dont le cultivar compagnon existe maintenant."""
+    if dry_run or not deferred:
         return
-    cid = data['id']
-    CultivarPorteGreffe.objects.filter(cultivar_id=cid).delete()
-    CultivarPollinator.objects.filter(cultivar_id=cid).delete()
-
-    defaults = {
-        'organism_id': data['organism_id'],
-        'slug_cultivar': data['slug_cultivar'],
-        'nom': data['nom'],
-        'description': data.get('description') or '',
-        'couleur_fruit': data.get('couleur_fruit') or '',
-        'gout': data.get('gout') or '',
-        'resistance_maladies': data.get('resistance_maladies') or '',
-        'notes': data.get('notes') or '',
-    }
-    Cultivar.objects.update_or_create(id=cid, defaults=defaults)
-    da = _parse_dt(data.get('date_ajout'))
-    dm = _parse_dt(data.get('date_modification'))
-    upd = {}
-    if da:
-        upd['date_ajout'] = da
-    if dm:
-        upd['date_modification'] = dm
-    if upd:
-        Cultivar.objects.filter(pk=cid).update(**upd)
-
-    for pg in data.get('porte_greffes') or []:
-        CultivarPorteGreffe.objects.create(
-            cultivar_id=cid,
-            nom_porte_greffe=pg['nom_porte_greffe'],
-            vigueur=pg.get('vigueur') or '',
-            hauteur_max_m=pg.get('hauteur_max_m'),
-            notes=pg.get('notes') or '',
-            source=pg.get('source') or '',
-            disponible_chez=pg.get('disponible_chez') or [],
-        )
-
-    for p in data.get('pollinators') or []:
-        cc = p.get('companion_cultivar_id')
-        co = p.get('companion_organism_id')
-        if cc and not Cultivar.objects.filter(pk=cc).exists():
-            deferred_pollinators.append((cid, p))
-            continue
-        if not cc and not co:
-            stdout.write(f'Pollinator ignoré (cultivar {cid}): pas de compagnon')
+    pending = list(deferred)
+    deferred.clear()
+    known = set(
+        Cultivar.objects.filter(pk__in={p['companion_cultivar_id'] for _, p in pending}).values_list('pk', flat=True)
+    )
+    to_create, unresolved = [], 0
+    for cid, p in pending:
+        cc = p['companion_cultivar_id']
+        if cc not in known:
+            unresolved += 1
             continue
-        CultivarPollinator.objects.create(
+        to_create.append(CultivarPollinator(
             cultivar_id=cid,
             companion_cultivar_id=cc,
-            companion_organism_id=co,
+            companion_organism_id=p.get('companion_organism_id'),
             notes=p.get('notes') or '',
             source=p.get('source') or '',
+        ))
+    CultivarPollinator.objects.bulk_create(to_create, batch_size=BULK_BATCH_SIZE)
+    if unresolved:
+        stdout.write(
+            f'Attention: {unresolved} pollinisateur(s) cultivar non résolus (FK cultivar manquante).'
         )
 
 
-def _flush_deferred_pollinators(deferred: list, dry_run: bool, stdout) -> None:
-    if dry_run or not deferred:
-        return
-    max_rounds = 15
-    pending = list(deferred)
-    deferred.clear()
-    for _ in range(max_rounds):
-        if not pending:
-            return
-        nxt = []
-        for cid, p in pending:
-            cc = p.get('companion_cultivar_id')
-            co = p.get('companion_organism_id')
-            if cc and not Cultivar.objects.filter(pk=cc).exists():
-                nxt.append((cid, p))
-                continue
-            if not cc and not co:
-                continue
-            CultivarPollinator.objects.create(
-                cultivar_id=cid,
-                companion_cultivar_id=cc,
-                companion_organism_id=co,
-                notes=p.get('notes') or '',
-                source=p.get('source') or '',
-            )
-        if len(nxt) == len(pending):
-            stdout.write(
-                f'Attention: {len(nxt)} pollinisateur(s) cultivar non résolus (FK cultivar manquante).'
-            )
-            return
-        pending = nxt
-    stdout.write('Attention: pollinisateurs cultivar — trop de passes, arrêt.')
-
-
-def _apply_companion(data: dict, dry_run: bool) -> None:
-    if dry_run:
+def _apply_companions(rows: list, dry_run: bool) -> None:
+    if dry_run or not rows:
         return
-    rid = data['id']
-    defaults = {
-        'organisme_source_id': data['organisme_source_id'],
-        'organisme_cible_id': data['organisme_cible_id'],
-        'type_relation': data['type_relation'],
-        'force': data.get('force', 5),
-        'distance_optimale': data.get('distance_optimale'),
-        'description': data.get('description') or '',
-        'source_info': data.get('source_info') or '',
-    }
-    CompanionRelation.objects.update_or_create(id=rid, defaults=defaults)
-    dt = _parse_dt(data.get('date_ajout'))
-    if dt:
-        CompanionRelation.objects.filter(pk=rid).update(date_ajout=dt)
+    rows = _dedupe_by_id(rows)
+    objs = [
+        CompanionRelation(
+            id=row['id'],
+            organisme_source_id=row['organisme_source_id'],
+            organisme_cible_id=row['organisme_cible_id'],
+            type_relation=row['type_relation'],
+            force=row.get('force', 5),
+            distance_optimale=row.get('distance_optimale'),
+            description=row.get('description') or '',
+            source_info=row.get('source_info') or '',
+        )
+        for row in rows
+    ]
+    CompanionRelation.objects.bulk_create(
+        objs, update_conflicts=True, unique_fields=['id'], update_fields=list(COMPANION_FIELDS),
+        batch_size=BULK_BATCH_SIZE,
+    )
+    _restore_dates(CompanionRelation, objs, rows, fields=('date_ajout',))
+    invalidate_companion_graph()
 
 
 class Command(BaseCommand):
@@ -426,7 +487,7 @@ class Command(BaseCommand):
         parser.add_argument(
             '--no-rebuild-search',
             action='store_true',
-            help='Ne pas lancer rebuild_search_vectors à la fin.',
+            help='Ne pas recalculer search_vector des organismes synchronisés (fait au commit sinon).',
         )
         parser.add_argument(
             '--only',
@@ -451,13 +512,12 @@ class Command(BaseCommand):
             dry_run = options['dry_run']
             rebuild = not options['no_rebuild_search']
             self.stdout.write(f'--- organismes (ciblé id={organism_id}) ---')
-            ok, err = fetch_and_apply_organism(organism_id, dry_run=dry_run, stdout=self.stdout)
+            ok, err = fetch_and_apply_organism(
+                organism_id, dry_run=dry_run, stdout=self.stdout, mark_search=rebuild
+            )
             if not ok:
                 raise CommandError(err)
             self.stdout.write(self.style.SUCCESS(f'Sync OK — organism {organism_id}'))
-            if rebuild and not dry_run:
-                self.stdout.write('rebuild_search_vectors (arrière-plan)…')
-                schedule_rebuild_search_vectors_async()
             return
 
         dry_run = options['dry_run']
@@ -491,28 +551,34 @@ class Command(BaseCommand):
         counts = {'amendments': 0, 'organisms': 0, 'cultivars': 0, 'companions': 0}
         deferred_pollinators: list = []
 
+        session = requests.Session()
+
         def run_section(name: str, subpath: str, apply_fn):
+            """Applique chaque page en bloc ; la page suivante est téléchargée pendant ce temps."""
             if only and only != name:
                 return
             self.stdout.write(f'--- {name} ---')
-            for payload in _iter_sync_pages(base, subpath, since_iso):
+            for payload in _prefetched(_iter_sync_pages(base, subpath, since_iso, session=session)):
                 rows = payload.get('results') or []
-                for row in rows:
-                    apply_fn(row)
-                    counts[name] += 1
+                apply_fn(rows)
+                counts[name] += len(rows)
                 self.stdout.write(f'  page +{len(rows)} (total {name}={counts[name]})')
 
         try:
             with transaction.atomic():
-                run_section('amendments', 'sync/amendments', lambda row: _apply_amendment(row, dry_run))
-                run_section('organisms', 'sync/organisms', lambda row: _apply_organism(row, dry_run))
+                run_section('amendments', 'sync/amendments', lambda rows: _apply_amendments(rows, dry_run))
+                run_section(
+                    'organisms',
+                    'sync/organisms',
+                    lambda rows: _apply_organisms(rows, dry_run, mark_search=rebuild),
+                )
                 run_section(
                     'cultivars',
                     'sync/cultivars',
-                    lambda row: _apply_cultivar(row, deferred_pollinators, dry_run, self.stdout),
+                    lambda rows: _apply_cultivars(rows, deferred_pollinators, dry_run, self.stdout),
                 )
                 _flush_deferred_pollinators(deferred_pollinators, dry_run, self.stdout)
-                run_section('companions', 'sync/companions', lambda row: _apply_companion(row, dry_run))
+                run_section('companions', 'sync/companions', lambda rows: _apply_companions(rows, dry_run))
 
                 if dry_run:
                     raise DryRunRollback()
@@ -532,11 +598,10 @@ class Command(BaseCommand):
                 state.last_error = str(e)[:2000]
                 state.save(update_fields=['last_run_ok', 'last_error', 'last_run_at'])
             raise
+        finally:
+            session.close()
 
         self.stdout.write(self.style.SUCCESS(f'Sync OK — {counts}'))
-        if rebuild and not dry_run:
-            self.stdout.write('rebuild_search_vectors…')
-            call_command('rebuild_search_vectors', stdout=self.stdout)
 
 
 class DryRunRollback(Exception):
@@ -1,20 +1,36 @@
 """
-Recalcule la note d'enrichissement (0-100 %) pour toutes les fiches Organism
+Recalcule la note d'enrichissement (0-100 %) des fiches Organism (un UPDATE SQL)
 et met à jour BaseEnrichmentStats. À lancer après migration ou manuellement.
 
 Usage:
   python manage.py update_enrichment_scores
+  python manage.py update_enrichment_scores --since 2026-10-01T00:00
 """
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 from species.enrichment_score import update_enrichment_scores
 
 
 class Command(BaseCommand):
-    help = "Recalcule enrichment_score_pct pour tous les organismes et met à jour BaseEnrichmentStats."
+    help = "Recalcule enrichment_score_pct des organismes (tous, ou modifiés depuis --since) et met à jour BaseEnrichmentStats."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help="Date/heure ISO : ne recalculer que les fiches modifiées depuis (date_modification).",
+        )
 
     def handle(self, *args, **options):
-        result = update_enrichment_scores()
+        since = None
+        if options.get('since'):
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError(f"--since invalide : {options['since']!r} (format ISO attendu)")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+        result = update_enrichment_scores(since=since)
         self.stdout.write(
             self.style.SUCCESS(
                 f"Enrichissement: {result['updated']} fiches mises à jour, "
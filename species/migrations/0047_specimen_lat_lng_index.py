@@ -0,0 +1,17 @@
+# Index composite (latitude, longitude) pour le préfiltre spatial de /api/specimens/nearby/
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('species', '0046_alter_dataimportrun_source_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='specimen',
+            index=models.Index(fields=['latitude', 'longitude'], name='species_spec_lat_lng_idx'),
+        ),
+    ]
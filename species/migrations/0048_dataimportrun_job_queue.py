@@ -0,0 +1,43 @@
+# Generated by Django 5.2.11 on 2026-10-18 00:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('species', '0047_specimen_lat_lng_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataimportrun',
+            name='cancel_requested',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='dataimportrun',
+            name='command_options',
+            field=models.JSONField(blank=True, default=dict, help_text='Arguments de call_command (tâches de fond)'),
+        ),
+        migrations.AddField(
+            model_name='dataimportrun',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dataimportrun',
+            name='output_size',
+            field=models.PositiveBigIntegerField(default=0, help_text='Caractères de sortie écrits au total (tâches de fond : reprise du suivi)'),
+        ),
+        migrations.AddField(
+            model_name='dataimportrun',
+            name='worker',
+            field=models.CharField(blank=True, help_text='Worker qui exécute la tâche (hôte:pid)', max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='dataimportrun',
+            name='status',
+            field=models.CharField(choices=[('queued', 'En attente'), ('running', 'En cours'), ('success', 'Succès'), ('failure', 'Échec'), ('cancelled', 'Annulé')], db_index=True, default='running', max_length=20),
+        ),
+    ]
@@ -0,0 +1,60 @@
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+# Modèles qui n'avaient que date_ajout : date_modification initialisée à date_ajout
+SYNC_MODELS = ('event', 'reminder', 'photo', 'specimengroup')
+
+
+def backfill_date_modification(apps, schema_editor):
+    for model_name in SYNC_MODELS:
+        model = apps.get_model('species', model_name)
+        model.objects.update(date_modification=F('date_ajout'))
+
+
+def _date_modification_field():
+    return models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('species', '0048_dataimportrun_job_queue'),
+        ('gardens', '0007_zone_date_modification'),
+    ]
+
+    operations = [
+        *[
+            migrations.AddField(
+                model_name=model_name,
+                name='date_modification',
+                field=_date_modification_field(),
+                preserve_default=False,
+            )
+            for model_name in SYNC_MODELS
+        ],
+        migrations.RunPython(backfill_date_modification, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='specimen',
+            index=models.Index(fields=['garden', 'date_modification', 'id'], name='species_spec_garden_mod_idx'),
+        ),
+        migrations.CreateModel(
+            name='SyncTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(help_text='Section de la synchro (specimens, events, photos…)', max_length=30)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('garden_id', models.IntegerField(blank=True, null=True)),
+                ('specimen_id', models.IntegerField(blank=True, null=True)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Suppression (synchro)',
+                'verbose_name_plural': 'Suppressions (synchro)',
+                'indexes': [
+                    models.Index(fields=['deleted_at', 'id'], name='species_tomb_deleted_idx'),
+                    models.Index(fields=['garden_id', 'deleted_at'], name='species_tomb_garden_idx'),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.11 on 2026-10-18 00:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('species', '0049_delta_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardFeed',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='dashboard_feed', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('etag', models.CharField(blank=True, max_length=40)),
+                ('computed_on', models.DateField(blank=True, help_text='Jour de calcul (is_overdue, mois courant)', null=True)),
+                ('expected_stale', models.BooleanField(default=True)),
+                ('reminders_stale', models.BooleanField(default=True)),
+                ('weather_stale', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Accueil précalculé',
+                'verbose_name_plural': 'Accueils précalculés',
+            },
+        ),
+    ]
@@ -22,7 +22,7 @@ from catalog.models import (
     OrganismAmendment,
     BaseEnrichmentStats,
 )
-from gardens.models import Garden, WeatherRecord, SprinklerZone, UserPreference
+from gardens.models import Garden, WeatherRecord, ForecastSnapshot, SprinklerZone, UserPreference
 
 
 # (Catalog and gardens models moved to catalog/gardens apps; re-exported above.)
@@ -216,7 +216,20 @@ class Specimen(models.Model):
         verbose_name = "Spécimen"
         verbose_name_plural = "Spécimens"
         ordering = ['-date_plantation', 'nom']
+        indexes = [
+            # Préfiltre « à proximité » par boîte englobante (species.spatial)
+            models.Index(fields=['latitude', 'longitude'], name='species_spec_lat_lng_idx'),
+            # Changements depuis un curseur, par jardin (species.delta_sync)
+            models.Index(fields=['garden', 'date_modification', 'id'], name='species_spec_garden_mod_idx'),
+        ]
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Jardin tel que lu en base : un déplacement invalide aussi l'ancien jardin (species.signals)
+        instance._loaded_garden_id = instance.__dict__.get('garden_id')
+        return instance
+
     def __str__(self):
         return f"{self.nom} ({self.organisme.nom_commun})"
     
@@ -295,6 +308,8 @@ class SpecimenGroup(models.Model):
         help_text="Espèce commune (optionnel, pour cross_pollination_cultivar)",
     )
     date_ajout = models.DateTimeField(auto_now_add=True)
+    # Synchronisation différentielle de l'app (species.delta_sync)
+    date_modification = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         verbose_name = "Groupe de pollinisation"
@@ -459,6 +474,8 @@ class Event(models.Model):
     
     # === MÉTADONNÉES ===
     date_ajout = models.DateTimeField(auto_now_add=True)
+    # Synchronisation différentielle de l'app (species.delta_sync)
+    date_modification = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         verbose_name = "Événement"
@@ -535,6 +552,8 @@ class Reminder(models.Model):
     )
 
     date_ajout = models.DateTimeField(auto_now_add=True)
+    # Synchronisation différentielle de l'app (species.delta_sync)
+    date_modification = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         verbose_name = "Rappel"
@@ -658,6 +677,8 @@ class Photo(models.Model):
     
     # === AUTO ===
     date_ajout = models.DateTimeField(auto_now_add=True)
+    # Synchronisation différentielle de l'app (species.delta_sync)
+    date_modification = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         verbose_name = "Photo"
@@ -669,6 +690,7 @@ class DataImportRun(models.Model):
     """
     Historique des exécutions d'import / enrichissement.
     Permet d'afficher le statut et l'historique sur la page Gestion des données et les change_list admin.
+    Sert aussi de file des tâches de fond (species.jobs) : status 'queued', command_options, annulation.
     """
     SOURCE_CHOICES = [
         ('pfaf', 'PFAF'),
@@ -692,10 +714,13 @@ class DataImportRun(models.Model):
         ('rebuild_search_vectors', 'Rebuild search vectors'),
     ]
     STATUS_CHOICES = [
+        ('queued', 'En attente'),
         ('running', 'En cours'),
         ('success', 'Succès'),
         ('failure', 'Échec'),
+        ('cancelled', 'Annulé'),
     ]
+    FINISHED_STATUSES = ('success', 'failure', 'cancelled')
     TRIGGER_CHOICES = [
         ('admin_import', 'Admin (import)'),
         ('gestion_donnees', 'Gestion des données'),
@@ -725,6 +750,10 @@ class DataImportRun(models.Model):
         blank=True,
         help_text="Derniers caractères de la sortie (stdout/err) pour débogage",
     )
+    output_size = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Caractères de sortie écrits au total (tâches de fond : reprise du suivi)",
+    )
     trigger = models.CharField(
         max_length=30,
         choices=TRIGGER_CHOICES,
@@ -737,6 +766,14 @@ class DataImportRun(models.Model):
         blank=True,
         related_name='data_import_runs',
     )
+    command_options = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Arguments de call_command (tâches de fond)",
+    )
+    cancel_requested = models.BooleanField(default=False)
+    worker = models.CharField(max_length=100, blank=True, help_text="Worker qui exécute la tâche (hôte:pid)")
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         verbose_name = "Exécution d'import"
@@ -747,4 +784,55 @@ class DataImportRun(models.Model):
         ]
 
     def __str__(self):
-        return f"{self.get_source_display()} — {self.started_at:%Y-%m-%d %H:%M} ({self.get_status_display()})"
\ No newline at end of file
+        return f"{self.get_source_display()} — {self.started_at:%Y-%m-%d %H:%M} ({self.get_status_display()})"
+
+
+class SyncTombstone(models.Model):
+    """
+    Trace d'une suppression pour la synchronisation différentielle de l'app (species.delta_sync).
+    garden_id / specimen_id : portée (entiers, pas de clé étrangère : la ligne visée n'existe plus).
+    """
+    source = models.CharField(max_length=30, help_text="Section de la synchro (specimens, events, photos…)")
+    object_id = models.PositiveBigIntegerField()
+    garden_id = models.IntegerField(null=True, blank=True)
+    specimen_id = models.IntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Suppression (synchro)"
+        verbose_name_plural = "Suppressions (synchro)"
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='species_tomb_deleted_idx'),
+            models.Index(fields=['garden_id', 'deleted_at'], name='species_tomb_garden_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} #{self.object_id} supprimé le {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+class DashboardFeed(models.Model):
+    """
+    Page d'accueil de l'app pour un utilisateur, précalculée (species.dashboard_feed) :
+    événements attendus du mois, rappels des favoris, alertes météo.
+    Les signaux marquent une section à recalculer ; la lecture ne recalcule que celles-là.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='dashboard_feed',
+    )
+    payload = models.JSONField(default=dict, blank=True)
+    etag = models.CharField(max_length=40, blank=True)
+    computed_on = models.DateField(null=True, blank=True, help_text="Jour de calcul (is_overdue, mois courant)")
+    expected_stale = models.BooleanField(default=True)
+    reminders_stale = models.BooleanField(default=True)
+    weather_stale = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Accueil précalculé"
+        verbose_name_plural = "Accueils précalculés"
+
+    def __str__(self):
+        return f"Accueil de {self.user} ({self.computed_on})"
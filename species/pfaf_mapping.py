@@ -82,22 +82,42 @@ def get_row_value(
     return default
 
 
-def rows_from_json(path: Path) -> List[Dict[str, Any]]:
-    """Charge une liste d'objets depuis un fichier JSON."""
-    with open(path, 'r', encoding='utf-8') as f:
+def iter_rows_from_json(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Objets d'un fichier JSON, un à la fois. Un tableau racine est lu en flux avec ijson
+    (si installé) : la mémoire ne dépend pas de la taille du fichier.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(64).lstrip()
+        f.seek(0)
+        if head.startswith(b'['):
+            try:
+                import ijson
+            except ImportError:
+                ijson = None
+            if ijson is not None:
+                for item in ijson.items(f, 'item', use_float=True):
+                    yield normalize_row_keys(item)
+                return
         data = json.load(f)
     if not isinstance(data, list):
         data = [data]
-    return [normalize_row_keys(item) for item in data]
+    for item in data:
+        yield normalize_row_keys(item)
 
 
-def rows_from_csv(
+def rows_from_json(path: Path) -> List[Dict[str, Any]]:
+    """Charge une liste d'objets depuis un fichier JSON."""
+    return list(iter_rows_from_json(path))
+
+
+def iter_rows_from_csv(
     path: Path,
     delimiter: Optional[str] = None,
     encoding: str = 'utf-8',
-) -> List[Dict[str, Any]]:
+) -> Iterator[Dict[str, Any]]:
     """
-    Charge un CSV ; délimiteur auto (,, ;, tab) si non fourni.
+    Lignes d'un CSV, une à la fois ; délimiteur auto (,, ;, tab) si non fourni.
     Les en-têtes sont normalisés en snake_case.
     """
     with open(path, 'r', encoding=encoding, errors='replace') as f:
@@ -105,36 +125,55 @@ def rows_from_csv(
     if delimiter is None:
         delimiter = ',' if ',' in sample else (';' if ';' in sample else '\t')
     with open(path, 'r', encoding=encoding, errors='replace') as f:
-        reader = csv.DictReader(f, delimiter=delimiter)
-        rows = []
-        for r in reader:
-            rows.append(normalize_row_keys(r))
-    return rows
+        for r in csv.DictReader(f, delimiter=delimiter):
+            yield normalize_row_keys(r)
 
 
-def rows_from_sqlite(
+def rows_from_csv(
     path: Path,
-    table: str = 'plant_data',
+    delimiter: Optional[str] = None,
+    encoding: str = 'utf-8',
 ) -> List[Dict[str, Any]]:
+    """Charge un CSV (voir iter_rows_from_csv)."""
+    return list(iter_rows_from_csv(path, delimiter=delimiter, encoding=encoding))
+
+
+def iter_rows_from_sqlite(
+    path: Path,
+    table: str = 'plant_data',
+) -> Iterator[Dict[str, Any]]:
     """
-    Charge les lignes d'une table SQLite (ex. pfaf-data data.sqlite).
+    Lignes d'une table SQLite (ex. pfaf-data data.sqlite), lues au curseur.
     Les noms de colonnes sont normalisés en snake_case.
     """
     if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', table):
         raise ValueError(f'Nom de table invalide: {table}')
     conn = sqlite3.connect(path)
     conn.row_factory = sqlite3.Row
-    cur = conn.execute(f'SELECT * FROM "{table}"')
-    rows = []
-    for row in cur:
-        d = {to_snake(k): row[k] for k in row.keys()}
-        # SQLite Row values: convert to Python types
-        for k, v in d.items():
-            if v is not None and not isinstance(v, (str, int, float, bool)):
-                d[k] = str(v)
-        rows.append(d)
-    conn.close()
-    return rows
+    try:
+        cur = conn.execute(f'SELECT * FROM "{table}"')
+        keys = None
+        for row in cur:
+            if keys is None:
+                keys = [(k, to_snake(k)) for k in row.keys()]
+            d = {}
+            for k, snake in keys:
+                v = row[k]
+                # SQLite Row values: convert to Python types
+                if v is not None and not isinstance(v, (str, int, float, bool)):
+                    v = str(v)
+                d[snake] = v
+            yield d
+    finally:
+        conn.close()
+
+
+def rows_from_sqlite(
+    path: Path,
+    table: str = 'plant_data',
+) -> List[Dict[str, Any]]:
+    """Charge les lignes d'une table SQLite (voir iter_rows_from_sqlite)."""
+    return list(iter_rows_from_sqlite(path, table=table))
 
 
 def get_available_columns(data: List[Dict[str, Any]]) -> List[str]:
@@ -148,24 +187,37 @@ def get_available_columns(data: List[Dict[str, Any]]) -> List[str]:
     return sorted(list(data[0].keys()))
 
 
-def load_pfaf_data(
+def iter_pfaf_data(
     path: Path,
     db_table: str = 'plant_data',
-) -> List[Dict[str, Any]]:
+) -> Iterator[Dict[str, Any]]:
     """
-    Charge des données PFAF depuis un fichier.
-    Format détecté par extension : .json, .csv, .sqlite / .db
+    Lit des données PFAF en flux depuis un fichier.
+    Format détecté par extension : .json, .csv, .sqlite / .db ; erreurs levées dès l'appel.
     """
     path = path.expanduser().resolve()
     if not path.exists():
         raise FileNotFoundError(str(path))
     suffix = path.suffix.lower()
     if suffix == '.json':
-        return rows_from_json(path)
+        return iter_rows_from_json(path)
     if suffix in ('.csv', '.txt'):
-        return rows_from_csv(path)
+        return iter_rows_from_csv(path)
     if suffix in ('.sqlite', '.sqlite3', '.db'):
-        return rows_from_sqlite(path, table=db_table)
+        if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', db_table):
+            raise ValueError(f'Nom de table invalide: {db_table}')
+        return iter_rows_from_sqlite(path, table=db_table)
     raise ValueError(
         f'Format non supporté: {suffix}. Utilisez .json, .csv ou .sqlite/.db'
     )
+
+
+def load_pfaf_data(
+    path: Path,
+    db_table: str = 'plant_data',
+) -> List[Dict[str, Any]]:
+    """
+    Charge des données PFAF depuis un fichier.
+    Format détecté par extension : .json, .csv, .sqlite / .db
+    """
+    return list(iter_pfaf_data(path, db_table=db_table))
@@ -6,14 +6,110 @@ Si cette date est < today (déjà passée dans l'année), on prend today.year +
 
 "déjà confirmé" = un Event du même type (floraison/fructification/recolte) avec
 date >= today - 30 jours pour ce spécimen.
+
+Moteur par lots : trois requêtes quel que soit le nombre de spécimens, de jardins
+et de dates de référence (spécimens actifs, fenêtres OrganismCalendrier, dernier
+événement par (spécimen, type)). Pour chaque date de référence, le délai avant le
+début de chacun des 12 mois est calculé une seule fois puis appliqué à toutes les fenêtres.
 """
+from collections import defaultdict
 from datetime import date, timedelta
 
+from django.db.models import Max
+
 from catalog.models import OrganismCalendrier
 from .models import Event, Specimen
 
 
 PHENOLOGY_EVENT_TYPES = ('floraison', 'fructification', 'recolte')
+ALERT_HORIZON_DAYS = 14
+CONFIRMATION_WINDOW_DAYS = 30
+
+
+def _days_until_month_starts(today):
+    """Jours restants avant le 1er de chaque mois (index 1-12) ; l'année suivante si déjà passé."""
+    days = [None] * 13
+    for mois in range(1, 13):
+        start = date(today.year, mois, 1)
+        if start < today:
+            start = date(today.year + 1, mois, 1)
+        days[mois] = (start - today).days
+    return days
+
+
+def compute_phenology_alerts_batch(garden_ids, reference_dates):
+    """
+    Alertes phénologiques pour plusieurs jardins et plusieurs dates de référence
+    (ex. une saison complète pour un tableau de bord ou des tests).
+
+    Returns:
+        dict {(garden_id, reference_date): [alerte, ...]} — mêmes entrées et même tri
+        que compute_phenology_alerts pour chaque couple.
+    """
+    garden_ids = list(dict.fromkeys(garden_ids))
+    reference_dates = list(dict.fromkeys(reference_dates))
+    result = {(g, d): [] for g in garden_ids for d in reference_dates}
+    if not garden_ids or not reference_dates:
+        return result
+
+    specimens = list(
+        Specimen.objects.filter(garden_id__in=garden_ids)
+        .exclude(statut__in=('mort', 'enleve'))
+        .values_list('id', 'nom', 'garden_id', 'organisme_id', 'organisme__nom_commun')
+    )
+    if not specimens:
+        return result
+
+    windows_by_organism = defaultdict(list)
+    for organisme_id, type_periode, mois_debut in (
+        OrganismCalendrier.objects.filter(
+            organisme_id__in={s[3] for s in specimens},
+            type_periode__in=PHENOLOGY_EVENT_TYPES,
+            mois_debut__gte=1,
+            mois_debut__lte=12,
+        )
+        .order_by('organisme', 'type_periode', 'mois_debut')
+        .values_list('organisme_id', 'type_periode', 'mois_debut')
+    ):
+        windows_by_organism[organisme_id].append((type_periode, mois_debut))
+
+    # Dernier événement par (spécimen, type) depuis la plus ancienne borne de confirmation
+    oldest_cutoff = min(reference_dates) - timedelta(days=CONFIRMATION_WINDOW_DAYS)
+    last_event = {
+        (row['specimen_id'], row['type_event']): row['last_date']
+        for row in Event.objects.filter(
+            specimen__garden_id__in=garden_ids,
+            type_event__in=PHENOLOGY_EVENT_TYPES,
+            date__gte=oldest_cutoff,
+        )
+        .values('specimen_id', 'type_event')
+        .annotate(last_date=Max('date'))
+        .order_by()
+    }
+
+    for today in reference_dates:
+        days_until = _days_until_month_starts(today)
+        cutoff = today - timedelta(days=CONFIRMATION_WINDOW_DAYS)
+        for specimen_id, nom, garden_id, organisme_id, organisme_nom in specimens:
+            for type_periode, mois_debut in windows_by_organism.get(organisme_id, ()):
+                jours = days_until[mois_debut]
+                if jours > ALERT_HORIZON_DAYS:
+                    continue
+                last = last_event.get((specimen_id, type_periode))
+                if last is not None and last >= cutoff:
+                    continue
+                result[(garden_id, today)].append({
+                    'specimen_id': specimen_id,
+                    'specimen_nom': nom,
+                    'organisme_nom': organisme_nom or '',
+                    'type_periode': type_periode,
+                    'mois_debut': mois_debut,
+                    'jours_restants': jours,
+                })
+
+    for alerts in result.values():
+        alerts.sort(key=lambda a: a['jours_restants'])
+    return result
 
 
 def compute_phenology_alerts(garden_id, reference_date=None):
@@ -28,48 +124,4 @@ def compute_phenology_alerts(garden_id, reference_date=None):
     """
     if reference_date is None:
         reference_date = date.today()
-
-    today = reference_date
-    specimens = (
-        Specimen.objects.filter(garden_id=garden_id)
-        .exclude(statut__in=('mort', 'enleve'))
-        .select_related('organisme')
-        .prefetch_related('organisme__calendrier', 'evenements')
-    )
-
-    alerts = []
-    for specimen in specimens:
-        if not specimen.organisme_id:
-            continue
-        for cal in specimen.organisme.calendrier.all():
-            if cal.type_periode not in PHENOLOGY_EVENT_TYPES:
-                continue
-            mois_debut = cal.mois_debut
-            if not mois_debut or mois_debut < 1 or mois_debut > 12:
-                continue
-            # Premier jour du mois de début pour cette année
-            start_this_year = date(today.year, mois_debut, 1)
-            if start_this_year < today:
-                start_this_year = date(today.year + 1, mois_debut, 1)
-            days_until = (start_this_year - today).days
-            if days_until < 0 or days_until > 14:
-                continue
-            # Déjà confirmé par un événement du même type dans les 30 derniers jours ?
-            cutoff = today - timedelta(days=30)
-            if Event.objects.filter(
-                specimen=specimen,
-                type_event=cal.type_periode,
-                date__gte=cutoff,
-            ).exists():
-                continue
-            alerts.append({
-                'specimen_id': specimen.id,
-                'specimen_nom': specimen.nom,
-                'organisme_nom': specimen.organisme.nom_commun if specimen.organisme else '',
-                'type_periode': cal.type_periode,
-                'mois_debut': mois_debut,
-                'jours_restants': days_until,
-            })
-
-    alerts.sort(key=lambda a: a['jours_restants'])
-    return alerts
+    return compute_phenology_alerts_batch([garden_id], [reference_date])[(garden_id, reference_date)]
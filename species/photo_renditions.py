@@ -0,0 +1,147 @@
+"""
+Déclinaisons (renditions) des images de Photo pour les listes et fiches de l'app mobile.
+
+Chaque Photo.image est décliné en RENDITIONS (thumb, medium, full : côté max en pixels),
+orientation EXIF appliquée, métadonnées retirées, au format PHOTO_RENDITION_FORMAT
+(WebP par défaut, JPEG si Pillow n'a pas WebP). Les fichiers vivent à côté des médias :
+
+    MEDIA_ROOT/renditions/<taille>/<chemin de l'original sans extension>.<webp|jpg>
+
+Générés au dépôt de la photo (signal, après commit), ou à la première demande par
+photo_rendition_view, ou en masse par la commande generate_photo_renditions.
+Les sérialiseurs pointent directement le fichier s'il existe, sinon la vue paresseuse.
+"""
+import io
+import logging
+import posixpath
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Côté le plus long (px) ; l'image n'est jamais agrandie
+RENDITIONS = {
+    'thumb': 160,
+    'medium': 800,
+    'full': 2048,
+}
+RENDITIONS_DIR = 'renditions'
+RENDITION_QUALITY = {'thumb': 75, 'medium': 80, 'full': 85}
+_EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+
+
+def rendition_format() -> str:
+    """Format de sortie : PHOTO_RENDITION_FORMAT ('WEBP' ou 'JPEG') ; JPEG si WebP indisponible."""
+    fmt = str(getattr(settings, 'PHOTO_RENDITION_FORMAT', 'WEBP')).upper()
+    if fmt == 'WEBP':
+        from PIL import features
+
+        if not features.check('webp'):
+            return 'JPEG'
+    return fmt if fmt in _EXTENSIONS else 'JPEG'
+
+
+def rendition_name(image_name: str, size: str, fmt: str | None = None) -> str:
+    """Chemin de stockage de la déclinaison size de l'image image_name."""
+    stem = posixpath.splitext(image_name)[0]
+    return f'{RENDITIONS_DIR}/{size}/{stem}.{_EXTENSIONS[fmt or rendition_format()]}'
+
+
+def rendition_exists(photo, size: str) -> bool:
+    if not photo or not photo.image:
+        return False
+    return photo.image.storage.exists(rendition_name(photo.image.name, size))
+
+
+def _render(image, size: str, fmt: str) -> bytes:
+    from PIL import Image
+
+    max_side = RENDITIONS[size]
+    rendition = image.copy()
+    rendition.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+    if fmt == 'JPEG' and rendition.mode not in ('RGB', 'L'):
+        rendition = rendition.convert('RGB')
+    elif fmt == 'WEBP' and rendition.mode not in ('RGB', 'RGBA', 'L'):
+        rendition = rendition.convert('RGBA' if 'A' in rendition.getbands() else 'RGB')
+    buf = io.BytesIO()
+    options = {'quality': RENDITION_QUALITY.get(size, 80)}
+    if fmt == 'JPEG':
+        options.update(optimize=True, progressive=True)
+    else:
+        options['method'] = 4
+    rendition.save(buf, fmt, **options)
+    return buf.getvalue()
+
+
+def generate_renditions(photo, sizes=None, *, force: bool = False) -> list[str]:
+    """
+    Crée les déclinaisons manquantes (toutes si force) de photo.image.
+    L'original n'est décodé qu'une fois pour toutes les tailles.
+    Retourne les tailles écrites ; lève OSError / PIL.UnidentifiedImageError si l'image est illisible.
+    """
+    if not photo or not photo.image:
+        return []
+    from django.core.files.base import ContentFile
+    from PIL import Image, ImageOps
+
+    storage = photo.image.storage
+    fmt = rendition_format()
+    names = {size: rendition_name(photo.image.name, size, fmt) for size in (sizes or RENDITIONS)}
+    todo = [size for size, name in names.items() if force or not storage.exists(name)]
+    if not todo:
+        return []
+    with storage.open(photo.image.name, 'rb') as f:
+        with Image.open(f) as original:
+            # Décodage réduit (JPEG) : inutile de décompresser 24 Mpx pour une vignette
+            original.draft('RGB', (max(RENDITIONS[s] for s in todo),) * 2)
+            image = ImageOps.exif_transpose(original)
+            image.load()
+    written = []
+    for size in sorted(todo, key=RENDITIONS.get, reverse=True):
+        name = names[size]
+        if storage.exists(name):
+            storage.delete(name)
+        storage.save(name, ContentFile(_render(image, size, fmt)))
+        written.append(size)
+    return written
+
+
+def delete_renditions(image_name: str, storage) -> None:
+    """Supprime les déclinaisons (tous formats) d'une image supprimée ou remplacée."""
+    for size in RENDITIONS:
+        for fmt in _EXTENSIONS:
+            name = rendition_name(image_name, size, fmt)
+            try:
+                if storage.exists(name):
+                    storage.delete(name)
+            except OSError as e:
+                logger.warning('Déclinaison non supprimée (%s) : %s', name, e)
+
+
+def rendition_url(request, photo, size: str):
+    """
+    URL absolue de la déclinaison size de photo : le fichier s'il existe déjà,
+    sinon la vue qui le génère puis redirige (None sans requête ou sans image).
+    """
+    if not photo or not photo.image or not request:
+        return None
+    name = rendition_name(photo.image.name, size)
+    storage = photo.image.storage
+    if storage.exists(name):
+        return request.build_absolute_uri(storage.url(name))
+    from django.urls import reverse
+
+    return request.build_absolute_uri(reverse('photo-rendition', args=[photo.pk, size]))
+
+
+def generate_renditions_quietly(photo_id: int) -> None:
+    """Rappel on_commit du dépôt d'une photo : une image illisible ne doit pas faire échouer l'envoi."""
+    from .models import Photo
+
+    photo = Photo.objects.filter(pk=photo_id).first()
+    if photo is None:
+        return
+    try:
+        generate_renditions(photo)
+    except Exception as e:
+        logger.warning('Déclinaisons non générées pour la photo %s : %s', photo_id, e)
@@ -5,13 +5,13 @@ Permet d'accepter JSON, CSV avec des noms de colonnes variés selon les fourniss
 Les clés sont normalisées en snake_case. Compatible avec le format pfaf_mapping.
 """
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 # Réutiliser les alias PFAF pour l'identification de l'organisme
 from .pfaf_mapping import (
     PFAF_FIELD_ALIASES,
-    rows_from_json,
-    rows_from_csv,
+    iter_rows_from_csv,
+    iter_rows_from_json,
     get_row_value as pfaf_get_row_value,
     get_available_columns as pfaf_get_available_columns,
 )
@@ -167,22 +167,33 @@ def parse_bool(value: Any) -> bool:
     return bool(s)
 
 
-def load_seed_data(
+def iter_seed_data(
     path: Path,
     encoding: str = 'utf-8',
-) -> List[Dict[str, Any]]:
+) -> Iterator[Dict[str, Any]]:
     """
-    Charge des données de semences depuis un fichier.
-    Format détecté par extension : .json, .csv
+    Lit des données de semences en flux depuis un fichier.
+    Format détecté par extension : .json, .csv ; erreurs levées dès l'appel.
     """
     path = path.expanduser().resolve()
     if not path.exists():
         raise FileNotFoundError(str(path))
     suffix = path.suffix.lower()
     if suffix == '.json':
-        return rows_from_json(path)
+        return iter_rows_from_json(path)
     if suffix in ('.csv', '.txt'):
-        return rows_from_csv(path, encoding=encoding)
+        return iter_rows_from_csv(path, encoding=encoding)
     raise ValueError(
         f'Format non supporté: {suffix}. Utilisez .json ou .csv'
     )
+
+
+def load_seed_data(
+    path: Path,
+    encoding: str = 'utf-8',
+) -> List[Dict[str, Any]]:
+    """
+    Charge des données de semences depuis un fichier.
+    Format détecté par extension : .json, .csv
+    """
+    return list(iter_seed_data(path, encoding=encoding))
@@ -25,6 +25,7 @@ from .models import (
     Photo,
     UserTag,
 )
+from .photo_renditions import rendition_url
 from .utils import distance_metres_between_specimens, get_pollination_distance_max_m
 from .source_rules import (
     find_organism_by_latin_fuzzy,
@@ -33,30 +34,71 @@ from .source_rules import (
 )
 
 
+# --- Favoris : chargés une fois par requête ---
+class FavoritesContext:
+    """
+    Favoris de l'utilisateur pour une requête : une requête par type (organismes, spécimens),
+    exécutée au premier accès puis partagée par toutes les lignes sérialisées.
+    """
+
+    def __init__(self, user):
+        self.user = user if user is not None and user.is_authenticated else None
+        self._organism_ids = None
+        self._specimen_ids = None
+
+    @classmethod
+    def for_request(cls, request):
+        return cls(getattr(request, 'user', None))
+
+    @property
+    def organism_ids(self):
+        if self._organism_ids is None:
+            self._organism_ids = set() if self.user is None else set(
+                OrganismFavorite.objects.filter(user=self.user).values_list('organism_id', flat=True)
+            )
+        return self._organism_ids
+
+    @property
+    def specimen_ids(self):
+        if self._specimen_ids is None:
+            self._specimen_ids = set() if self.user is None else set(
+                SpecimenFavorite.objects.filter(user=self.user).values_list('specimen_id', flat=True)
+            )
+        return self._specimen_ids
+
+
+def _favorites(context):
+    """FavoritesContext de la requête (créé dans le contexte s'il n'a pas été fourni par la vue)."""
+    favorites = context.get('favorites')
+    if favorites is None:
+        favorites = context['favorites'] = FavoritesContext.for_request(context.get('request'))
+    return favorites
+
+
 # --- Organism (lecture pour choix espèce) ---
 class OrganismMinimalSerializer(serializers.ModelSerializer):
     """Minimal pour listes et choix."""
     is_favori = serializers.SerializerMethodField()
     photo_principale_url = serializers.SerializerMethodField()
+    photo_principale_thumb_url = serializers.SerializerMethodField()
     has_availability = serializers.SerializerMethodField()
 
     def get_is_favori(self, obj):
-        request = self.context.get('request')
-        if not request or not request.user.is_authenticated:
-            return False
-        return OrganismFavorite.objects.filter(user=request.user, organism=obj).exists()
+        return obj.pk in _favorites(self.context).organism_ids
 
     def get_photo_principale_url(self, obj):
-        request = self.context.get('request')
-        photo = getattr(obj, 'photo_principale', None) or obj.photos.first()
-        return _get_photo_url(request, photo) if photo else None
+        return _get_photo_url(self.context.get('request'), _photo_principale(obj))
+
+    def get_photo_principale_thumb_url(self, obj):
+        return rendition_url(self.context.get('request'), _photo_principale(obj), 'thumb')
 
     def get_has_availability(self, obj):
         return getattr(obj, 'has_availability', False)
 
     class Meta:
         model = Organism
-        fields = ['id', 'nom_commun', 'nom_latin', 'slug_latin', 'type_organisme', 'genus', 'is_favori', 'photo_principale_url', 'has_availability']
+        fields = ['id', 'nom_commun', 'nom_latin', 'slug_latin', 'type_organisme', 'genus', 'is_favori', 'photo_principale_url',
+                  'photo_principale_thumb_url', 'has_availability']
 
 
 # --- Nested data for organism detail (proprietes, usages, calendrier, companions) ---
@@ -195,6 +237,7 @@ class OrganismDetailSerializer(serializers.ModelSerializer):
     """Détail complet pour affichage et édition (inclut proprietes, usages, calendrier, compagnons)."""
     is_favori = serializers.SerializerMethodField()
     photo_principale_url = serializers.SerializerMethodField()
+    photo_principale_medium_url = serializers.SerializerMethodField()
     photos = serializers.SerializerMethodField()
     proprietes = serializers.SerializerMethodField()
     usages = serializers.SerializerMethodField()
@@ -203,15 +246,13 @@ class OrganismDetailSerializer(serializers.ModelSerializer):
     companion_relations = serializers.SerializerMethodField()
 
     def get_is_favori(self, obj):
-        request = self.context.get('request')
-        if not request or not request.user.is_authenticated:
-            return False
-        return OrganismFavorite.objects.filter(user=request.user, organism=obj).exists()
+        return obj.pk in _favorites(self.context).organism_ids
 
     def get_photo_principale_url(self, obj):
-        request = self.context.get('request')
-        photo = getattr(obj, 'photo_principale', None) or obj.photos.first()
-        return _get_photo_url(request, photo) if photo else None
+        return _get_photo_url(self.context.get('request'), _photo_principale(obj))
+
+    def get_photo_principale_medium_url(self, obj):
+        return rendition_url(self.context.get('request'), _photo_principale(obj), 'medium')
 
     def get_photos(self, obj):
         return PhotoSerializer(obj.photos.all(), many=True, context=self.context).data
@@ -240,7 +281,7 @@ class OrganismDetailSerializer(serializers.ModelSerializer):
         model = Organism
         fields = [
             'id', 'nom_commun', 'nom_latin', 'slug_latin', 'famille', 'regne', 'type_organisme', 'is_favori',
-            'photo_principale_url', 'photos',
+            'photo_principale_url', 'photo_principale_medium_url', 'photos',
             'besoin_eau', 'besoin_soleil', 'zone_rusticite', 'sol_textures', 'sol_ph', 'sol_drainage', 'sol_richesse',
             'hauteur_max', 'largeur_max', 'vitesse_croissance',
             'comestible', 'parties_comestibles', 'toxicite',
@@ -426,16 +467,19 @@ class GardenGCPSerializer(serializers.ModelSerializer):
 
 
 class ZoneSerializer(serializers.ModelSerializer):
-    """CRUD Zone : boundary en GeoJSON (dict), surface_m2 en lecture seule."""
+    """CRUD Zone : boundary en GeoJSON (dict), mesures (surface, périmètre, centroïde) en lecture seule."""
     boundary = serializers.JSONField(required=False, allow_null=True)
 
     class Meta:
         model = Zone
         fields = [
             'id', 'garden', 'nom', 'type', 'boundary',
-            'surface_m2', 'batiment_hauteur_m', 'couleur', 'ordre', 'date_creation',
+            'surface_m2', 'perimetre_m', 'centroide_latitude', 'centroide_longitude',
+            'batiment_hauteur_m', 'couleur', 'ordre', 'date_creation',
+        ]
+        read_only_fields = [
+            'id', 'surface_m2', 'perimetre_m', 'centroide_latitude', 'centroide_longitude', 'date_creation',
         ]
-        read_only_fields = ['id', 'surface_m2', 'date_creation']
 
     def validate_boundary(self, value):
         if value is None:
@@ -452,6 +496,14 @@ class ZoneSerializer(serializers.ModelSerializer):
         return value
 
 
+def _rayon_adulte_m(specimen):
+    """≈ 60 % de la plus grande hauteur de porte-greffe du cultivar (lit cultivar__porte_greffes préchargés)."""
+    if not getattr(specimen, 'cultivar_id', None):
+        return None
+    hauteurs = [pg.hauteur_max_m for pg in specimen.cultivar.porte_greffes.all() if pg.hauteur_max_m]
+    return round(max(hauteurs) * 0.60, 1) if hauteurs else None
+
+
 def _get_photo_url(request, photo):
     """Retourne l'URL absolue d'une photo ou None."""
     if not photo or not photo.image or not request:
@@ -459,6 +511,11 @@ def _get_photo_url(request, photo):
     return request.build_absolute_uri(photo.image.url)
 
 
+def _photo_principale(obj):
+    """Photo par défaut d'un organisme ou spécimen, sinon sa première photo (lit photos préchargées)."""
+    return getattr(obj, 'photo_principale', None) or obj.photos.first()
+
+
 # --- Specimen ---
 class SpecimenListSerializer(serializers.ModelSerializer):
     """Liste des spécimens avec organisme et statut."""
@@ -468,37 +525,25 @@ class SpecimenListSerializer(serializers.ModelSerializer):
     garden_nom = serializers.SerializerMethodField()
     is_favori = serializers.SerializerMethodField()
     photo_principale_url = serializers.SerializerMethodField()
+    photo_principale_thumb_url = serializers.SerializerMethodField()
     rayon_adulte_m = serializers.SerializerMethodField()
 
     def get_garden_nom(self, obj):
         return obj.garden.nom if obj.garden else None
 
     def get_is_favori(self, obj):
-        request = self.context.get('request')
-        if not request or not request.user.is_authenticated:
-            return False
-        return SpecimenFavorite.objects.filter(user=request.user, specimen=obj).exists()
+        return obj.pk in _favorites(self.context).specimen_ids
 
     def get_photo_principale_url(self, obj):
-        request = self.context.get('request')
-        if obj.photo_principale:
-            return _get_photo_url(request, obj.photo_principale)
         # Fallback: première photo du spécimen
-        first = obj.photos.first()
-        return _get_photo_url(request, first) if first else None
+        return _get_photo_url(self.context.get('request'), _photo_principale(obj))
+
+    def get_photo_principale_thumb_url(self, obj):
+        return rendition_url(self.context.get('request'), _photo_principale(obj), 'thumb')
 
     def get_rayon_adulte_m(self, obj):
         """Rayon adulte estimé en mètres pour le cercle d'emprise sur la carte (≈ 60 % hauteur max)."""
-        if not getattr(obj, 'cultivar_id', None) or not obj.cultivar_id:
-            return None
-        pg = (
-            obj.cultivar.porte_greffes.filter(hauteur_max_m__isnull=False)
-            .order_by('-hauteur_max_m')
-            .first()
-        )
-        if pg and pg.hauteur_max_m:
-            return round(pg.hauteur_max_m * 0.60, 1)
-        return None
+        return _rayon_adulte_m(obj)
 
     class Meta:
         model = Specimen
@@ -506,7 +551,7 @@ class SpecimenListSerializer(serializers.ModelSerializer):
             'id', 'nom', 'code_identification', 'nfc_tag_uid', 'organisme', 'organisme_nom',
             'organisme_nom_latin', 'garden', 'garden_nom', 'zone', 'zone_jardin', 'statut', 'sante',
             'date_plantation', 'latitude', 'longitude', 'is_favori', 'photo_principale_url',
-            'rayon_adulte_m',
+            'photo_principale_thumb_url', 'rayon_adulte_m',
         ]
 
 
@@ -519,6 +564,7 @@ class SpecimenDetailSerializer(serializers.ModelSerializer):
     garden = GardenMinimalSerializer(read_only=True, allow_null=True)
     is_favori = serializers.SerializerMethodField()
     photo_principale_url = serializers.SerializerMethodField()
+    photo_principale_medium_url = serializers.SerializerMethodField()
     pollination_associations = serializers.SerializerMethodField()
     rayon_adulte_m = serializers.SerializerMethodField()
 
@@ -534,30 +580,17 @@ class SpecimenDetailSerializer(serializers.ModelSerializer):
         return {'id': c.id, 'nom': c.nom, 'slug_cultivar': c.slug_cultivar}
 
     def get_is_favori(self, obj):
-        request = self.context.get('request')
-        if not request or not request.user.is_authenticated:
-            return False
-        return SpecimenFavorite.objects.filter(user=request.user, specimen=obj).exists()
+        return obj.pk in _favorites(self.context).specimen_ids
 
     def get_photo_principale_url(self, obj):
-        request = self.context.get('request')
-        if obj.photo_principale:
-            return _get_photo_url(request, obj.photo_principale)
-        first = obj.photos.first()
-        return _get_photo_url(request, first) if first else None
+        return _get_photo_url(self.context.get('request'), _photo_principale(obj))
+
+    def get_photo_principale_medium_url(self, obj):
+        return rendition_url(self.context.get('request'), _photo_principale(obj), 'medium')
 
     def get_rayon_adulte_m(self, obj):
         """Rayon adulte estimé en mètres pour le cercle d'emprise sur la carte (≈ 60 % hauteur max)."""
-        if not getattr(obj, 'cultivar_id', None) or not obj.cultivar_id:
-            return None
-        pg = (
-            obj.cultivar.porte_greffes.filter(hauteur_max_m__isnull=False)
-            .order_by('-hauteur_max_m')
-            .first()
-        )
-        if pg and pg.hauteur_max_m:
-            return round(pg.hauteur_max_m * 0.60, 1)
-        return None
+        return _rayon_adulte_m(obj)
 
     def get_pollination_associations(self, obj):
         request = self.context.get('request')
@@ -599,7 +632,7 @@ class SpecimenDetailSerializer(serializers.ModelSerializer):
             'zone', 'zone_jardin', 'latitude', 'longitude', 'date_plantation', 'age_plantation',
             'source', 'pepiniere_fournisseur', 'statut', 'sante', 'hauteur_actuelle',
             'premiere_fructification', 'notes', 'date_ajout', 'date_modification', 'is_favori',
-            'photo_principale_url', 'photo_principale',
+            'photo_principale_url', 'photo_principale_medium_url', 'photo_principale',
             'pollination_associations', 'rayon_adulte_m',
         ]
 
@@ -690,6 +723,19 @@ class EventCreateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class EventBatchItemSerializer(EventCreateSerializer):
+    """
+    Élément d'un lot d'événements (file hors ligne de l'app) : spécimen cible, champs de
+    l'événement, photos déjà envoyées à référencer (photo_ids) et identifiant client optionnel.
+    """
+    specimen = serializers.IntegerField()
+    photo_ids = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    client_id = serializers.CharField(required=False, allow_blank=True, max_length=100)
+
+    class Meta(EventCreateSerializer.Meta):
+        fields = EventCreateSerializer.Meta.fields + ['specimen', 'photo_ids', 'client_id']
+
+
 class EventUpdateSerializer(serializers.ModelSerializer):
     """Mise à jour d'un événement."""
 
@@ -714,16 +760,20 @@ class RecentEventSerializer(serializers.Serializer):
     specimen_id = serializers.IntegerField()
     specimen_nom = serializers.CharField(source='specimen.nom', allow_blank=True, default='')
     photo_url = serializers.SerializerMethodField()
+    photo_thumb_url = serializers.SerializerMethodField()
+
+    def _first_photo(self, obj):
+        return getattr(obj, '_first_photo', None) or (obj.photos.first() if hasattr(obj, 'photos') else None)
 
     def get_photo_url(self, obj):
         try:
-            first_photo = getattr(obj, '_first_photo', None) or (obj.photos.first() if hasattr(obj, 'photos') else None)
-            if not first_photo or not first_photo.image:
-                return None
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(first_photo.image.url)
+            return _get_photo_url(self.context.get('request'), self._first_photo(obj))
+        except Exception:
             return None
+
+    def get_photo_thumb_url(self, obj):
+        try:
+            return rendition_url(self.context.get('request'), self._first_photo(obj), 'thumb')
         except Exception:
             return None
 
@@ -779,13 +829,16 @@ class PhotoSerializer(serializers.ModelSerializer):
     """Photo (lecture). Inclut event_id et event (résumé) si la photo est liée à un événement."""
 
     image_url = serializers.SerializerMethodField()
+    thumb_url = serializers.SerializerMethodField()
+    medium_url = serializers.SerializerMethodField()
+    full_url = serializers.SerializerMethodField()
     event_id = serializers.SerializerMethodField()
     event = serializers.SerializerMethodField()
 
     class Meta:
         model = Photo
         fields = [
-            'id', 'image', 'image_url', 'type_photo', 'titre', 'description',
+            'id', 'image', 'image_url', 'thumb_url', 'medium_url', 'full_url', 'type_photo', 'titre', 'description',
             'date_prise', 'date_ajout',
             'source_url', 'source_author', 'source_license',
             'event_id', 'event',
@@ -797,6 +850,15 @@ class PhotoSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.image.url)
         return None
 
+    def get_thumb_url(self, obj):
+        return rendition_url(self.context.get('request'), obj, 'thumb')
+
+    def get_medium_url(self, obj):
+        return rendition_url(self.context.get('request'), obj, 'medium')
+
+    def get_full_url(self, obj):
+        return rendition_url(self.context.get('request'), obj, 'full')
+
     def get_event_id(self, obj):
         return obj.event_id if obj.event_id else None
 
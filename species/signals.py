@@ -1,31 +1,183 @@
 """
-Signaux pour Jardin bIOT.
+Signaux pour Jardin bIOT (app species).
+Le fetch météo à la création d'un jardin vit dans gardens.signals.
 """
 import logging
 
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 
-from .models import Garden
+from catalog.models import CompanionRelation, Organism, OrganismCalendrier
+from gardens.models import Zone
+
+from .models import (
+    Event,
+    OrganismFavorite,
+    Photo,
+    Reminder,
+    Specimen,
+    SpecimenFavorite,
+    SpecimenGroup,
+    SpecimenGroupMember,
+)
 
 logger = logging.getLogger(__name__)
 
 
-@receiver(post_save, sender=Garden)
-def fetch_weather_on_garden_create(sender, instance, created, **kwargs):
+@receiver(post_save, sender=Specimen)
+@receiver(post_delete, sender=Specimen)
+def invalidate_spatial_index_on_specimen_change(sender, instance, **kwargs):
+    """Nouvelle version de l'index en grille du jardin (et de l'ancien jardin si le spécimen a été déplacé)."""
+    from .spatial import invalidate_garden_index
+    invalidate_garden_index(
+        instance.garden_id, getattr(instance, '_loaded_garden_id', None), specimen_id=instance.pk,
+    )
+
+
+@receiver(post_save, sender=Photo)
+def generate_photo_renditions_on_save(sender, instance, raw=False, **kwargs):
+    """Déclinaisons (thumb, medium, full) de l'image après commit ; les existantes sont gardées."""
+    if raw or not instance.image or not getattr(settings, 'PHOTO_RENDITIONS_ON_UPLOAD', True):
+        return
+    from .photo_renditions import generate_renditions_quietly
+    transaction.on_commit(lambda: generate_renditions_quietly(instance.pk))
+
+
+@receiver(post_delete, sender=Photo)
+def delete_photo_renditions(sender, instance, **kwargs):
+    # Fichier partagé par d'autres photos (événement appliqué à une zone, species.bulk_events)
+    if not instance.image or Photo.objects.filter(image=instance.image.name).exists():
+        return
+    from .photo_renditions import delete_renditions
+    delete_renditions(instance.image.name, instance.image.storage)
+
+
+@receiver(post_save, sender=CompanionRelation)
+@receiver(post_delete, sender=CompanionRelation)
+def invalidate_companion_graph_on_relation_change(sender, instance, **kwargs):
+    from .companion_graph import invalidate_companion_graph
+    invalidate_companion_graph()
+
+
+def _organism_renamed(instance, update_fields):
     """
-    Récupère automatiquement la météo lorsqu'un jardin est créé avec des coordonnées,
-    ou lorsqu'un jardin existant reçoit des coordonnées pour la première fois.
+    nom_commun ou nom_latin changé depuis la lecture (Organism._loaded_names) : un enregistrement
+    sans changement de nom (imports en boucle) n'invalide rien.
     """
-    if not instance.a_coordonnees():
-        return
-    # Nouveau jardin OU jardin sans données météo (coords ajoutées récemment)
-    has_records = instance.weather_records.exists()
-    if created or not has_records:
-        from .weather_service import fetch_weather_for_garden
-
-        try:
-            n = fetch_weather_for_garden(instance, days_back=14)
-            logger.info(f"Météo auto-fetch pour jardin {instance}: {n} jours")
-        except Exception as e:
-            logger.warning(f"Météo auto-fetch échoué pour {instance}: {e}")
+    if update_fields is not None and not {'nom_commun', 'nom_latin'} & set(update_fields):
+        return False
+    return getattr(instance, '_loaded_names', None) != (instance.nom_commun, instance.nom_latin)
+
+
+@receiver(post_save, sender=Organism)
+def invalidate_companion_graph_on_organism_rename(sender, instance, created=False, update_fields=None, **kwargs):
+    """Les noms des organismes sont les libellés du graphe (sans requête : les imports renomment en boucle)."""
+    if created or not _organism_renamed(instance, update_fields):
+        return
+    from .companion_graph import invalidate_companion_graph
+    invalidate_companion_graph()
+
+
+@receiver(post_delete, sender=Specimen)
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=Reminder)
+@receiver(post_delete, sender=Photo)
+@receiver(post_delete, sender=Zone)
+@receiver(post_delete, sender=SpecimenGroup)
+def record_sync_tombstone(sender, instance, **kwargs):
+    """Suppression visible par la synchronisation différentielle de l'app (species.delta_sync)."""
+    from .delta_sync import record_tombstone
+    record_tombstone(instance)
+
+
+@receiver(pre_delete, sender=SpecimenGroup)
+def remember_specimen_group_gardens(sender, instance, **kwargs):
+    from .delta_sync import remember_group_gardens
+    remember_group_gardens(instance)
+
+
+@receiver(post_save, sender=Specimen)
+def record_sync_specimen_move(sender, instance, created=False, raw=False, **kwargs):
+    """Spécimen changé de jardin : suppression pour l'ancien, enfants renvoyés au nouveau (species.delta_sync)."""
+    if raw or created:
+        return
+    from .delta_sync import record_specimen_move
+    record_specimen_move(instance)
+
+
+@receiver(post_save, sender=SpecimenGroupMember)
+@receiver(post_delete, sender=SpecimenGroupMember)
+def touch_specimen_group_on_member_change(sender, instance, raw=False, **kwargs):
+    """Les membres sont synchronisés avec leur groupe : le groupe passe pour modifié."""
+    if raw:
+        return
+    from django.utils import timezone
+    SpecimenGroup.objects.filter(pk=instance.group_id).update(date_modification=timezone.now())
+
+
+# --- Accueil précalculé (species.dashboard_feed) : sections à recalculer ---
+
+@receiver(post_save, sender=SpecimenFavorite)
+@receiver(post_delete, sender=SpecimenFavorite)
+def mark_dashboard_on_specimen_favorite(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from .dashboard_feed import mark_users_stale
+    mark_users_stale([instance.user_id], 'expected_events', 'reminders')
+
+
+@receiver(post_save, sender=OrganismFavorite)
+@receiver(post_delete, sender=OrganismFavorite)
+def mark_dashboard_on_organism_favorite(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from .dashboard_feed import mark_users_stale
+    mark_users_stale([instance.user_id], 'expected_events')
+
+
+@receiver(post_save, sender=Reminder)
+@receiver(post_delete, sender=Reminder)
+def mark_dashboard_on_reminder(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from .dashboard_feed import mark_specimen_favoriters_stale
+    mark_specimen_favoriters_stale([instance.specimen_id], 'reminders')
+
+
+@receiver(post_save, sender=Specimen)
+def mark_dashboard_on_specimen(sender, instance, created=False, raw=False, **kwargs):
+    """Nom, organisme ou photo principale affichés avec les rappels (pas de favori à la création)."""
+    if raw or created:
+        return
+    from .dashboard_feed import mark_specimen_favoriters_stale
+    mark_specimen_favoriters_stale([instance.pk], 'expected_events', 'reminders')
+
+
+@receiver(post_save, sender=Photo)
+@receiver(post_delete, sender=Photo)
+def mark_dashboard_on_specimen_photo(sender, instance, raw=False, **kwargs):
+    if raw or not instance.specimen_id:
+        return
+    from .dashboard_feed import mark_specimen_favoriters_stale
+    mark_specimen_favoriters_stale([instance.specimen_id], 'reminders')
+
+
+@receiver(post_save, sender=OrganismCalendrier)
+@receiver(post_delete, sender=OrganismCalendrier)
+def mark_dashboard_on_calendar(sender, instance, raw=False, **kwargs):
+    """Les imports en bulk_create ne passent pas ici : repris par le passage de nuit."""
+    if raw:
+        return
+    from .dashboard_feed import mark_organism_favoriters_stale
+    mark_organism_favoriters_stale(instance.organisme_id, 'expected_events')
+
+
+@receiver(post_save, sender=Organism)
+def mark_dashboard_on_organism_rename(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    """Noms de l'organisme affichés dans les événements attendus et les rappels des favoris."""
+    if raw or created or not _organism_renamed(instance, update_fields):
+        return
+    from .dashboard_feed import mark_organism_favoriters_stale
+    mark_organism_favoriters_stale(instance.pk, 'expected_events', 'reminders')
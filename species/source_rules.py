@@ -102,6 +102,63 @@ def zone_rusticite_order(zone: str) -> tuple:
     return (num, sub)
 
 
+def primary_zone(zone_rusticite) -> str:
+    """Zone la plus froide d'une liste zone_rusticite [{'zone', 'source'}, ...] ('' si aucune)."""
+    if not zone_rusticite or not isinstance(zone_rusticite, list):
+        return ''
+    zones = [z.get('zone') for z in zone_rusticite if isinstance(z, dict) and z.get('zone')]
+    return min(zones, key=zone_rusticite_order) if zones else ''
+
+
+def zone_rusticite_ordinal(zone: str) -> Optional[int]:
+    """
+    Zone USDA en entier ordonné (2 × numéro + demi-zone) : 4a → 8, 4b → 9, « 4 » → 8.
+    None si la zone n'est pas reconnue.
+    """
+    m = _ZONE_PATTERN.match((zone or '').strip())
+    if not m:
+        return None
+    return int(m.group(1)) * 2 + (1 if (m.group(2) or '').lower() == 'b' else 0)
+
+
+def zone_rusticite_bounds(zones: list) -> Tuple[Optional[int], Optional[int]]:
+    """
+    (min, max) ordinaux des zones d'un Organism.zone_rusticite ([{"zone": "4a", "source": ...}, ...]).
+    Dénormalisés sur Organism (zone_rusticite_min / _max) pour le filtre « rustique en zone ≤ N ».
+    """
+    ordinals = [
+        o for o in (
+            zone_rusticite_ordinal(z.get('zone') or '') for z in (zones or []) if isinstance(z, dict)
+        ) if o is not None
+    ]
+    if not ordinals:
+        return None, None
+    return min(ordinals), max(ordinals)
+
+
+def refresh_zone_rusticite_bounds(organisms=None) -> int:
+    """
+    Recalcule zone_rusticite_min / _max à partir de zone_rusticite (tous les organismes si None).
+    Seules les lignes dont les bornes changent sont écrites ; retourne leur nombre.
+    """
+    from species.models import Organism
+
+    qs = Organism.objects.all() if organisms is None else organisms
+    changed = []
+    rows = qs.values_list('id', 'zone_rusticite', 'zone_rusticite_min', 'zone_rusticite_max')
+    for oid, zones, cur_min, cur_max in rows.iterator(chunk_size=2000):
+        zmin, zmax = zone_rusticite_bounds(zones)
+        if (zmin, zmax) != (cur_min, cur_max):
+            changed.append(Organism(pk=oid, zone_rusticite_min=zmin, zone_rusticite_max=zmax))
+    Organism.objects.bulk_update(changed, ['zone_rusticite_min', 'zone_rusticite_max'], batch_size=500)
+    return len(changed)
+
+
+def zone_usda_max_ordinal(zone_number: int) -> int:
+    """Borne du filtre zone_usda=N : toute zone jusqu'à Nb incluse."""
+    return zone_number * 2 + 1
+
+
 def merge_zone_rusticite(current: Optional[str], new: Optional[str]) -> str:
     """
     Retourne la zone la plus conservative (la plus froide = plus petit numéro).
@@ -282,6 +339,7 @@ def merge_zones_rusticite(current_zones: list, new_zone: str, source: str) -> li
     if not found:
         zones.append({"zone": new_zone_clean, "source": source})
     
+    # Organism.save() recalcule zone_rusticite_min / _max (zone_rusticite_bounds) à partir de cette liste
     return zones
 
 
@@ -452,7 +510,22 @@ def find_or_match_organism(
     if not create_missing:
         return None, False
 
-    create_data = dict(defaults)
+    organism = Organism.objects.create(
+        **organism_create_data(defaults, nom_latin, nom_commun, tsn=tsn, vascan_id=vascan_id)
+    )
+    return organism, True
+
+
+def organism_create_data(
+    defaults: Optional[Dict[str, Any]],
+    nom_latin: str,
+    nom_commun: str,
+    *,
+    tsn: Optional[int] = None,
+    vascan_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Champs d'un nouvel organisme (find_or_match_organism) : defaults + identifiants + noms de repli."""
+    create_data = dict(defaults or {})
     if tsn is not None:
         create_data['tsn'] = tsn
     if vascan_id is not None:
@@ -464,12 +537,9 @@ def find_or_match_organism(
             create_data['nom_latin'] = nom_commun.strip()
         else:
             raise ValueError("Impossible de créer un organisme sans nom_latin ni nom_commun")
-    
     if not create_data.get('nom_commun') and nom_commun and nom_commun.strip():
         create_data['nom_commun'] = nom_commun.strip()
-    
-    organism = Organism.objects.create(**create_data)
-    return organism, True
+    return create_data
 
 
 def find_organism_and_cultivar(
@@ -482,6 +552,7 @@ def find_organism_and_cultivar(
     *,
     tsn: Optional[int] = None,
     vascan_id: Optional[int] = None,
+    resolver: Optional['OrganismResolver'] = None,
 ) -> Tuple[Any, Optional[Any], bool]:
     """
     Trouve ou crée l'espèce (Organism) et, si le nom latin contient un cultivar, le cultivar associé.
@@ -492,6 +563,7 @@ def find_organism_and_cultivar(
       - Retourne (organism, cultivar, was_organism_created).
 
     Sinon : comportement identique à find_or_match_organism, avec (organism, None, was_created).
+    resolver : OrganismResolver de l'import en cours (résolution en mémoire au lieu de requêtes).
 
     Returns:
         (organism, cultivar ou None, was_organism_created)
@@ -499,6 +571,11 @@ def find_organism_and_cultivar(
     base_latin, nom_cultivar = parse_cultivar_from_latin(nom_latin or '')
     defaults_organism = defaults_organism or {}
     defaults_cultivar = defaults_cultivar or {}
+    if resolver is not None:
+        match = resolver.find_or_match
+    else:
+        def match(**kwargs):
+            return find_or_match_organism(Organism, **kwargs)
 
     if nom_cultivar and base_latin:
         # Dériver nom_commun espèce : retirer le nom du cultivar en fin de chaîne si présent
@@ -509,8 +586,7 @@ def find_organism_and_cultivar(
             nom_commun_clean,
             flags=re.IGNORECASE,
         ).strip() or nom_commun_clean
-        organism, was_created = find_or_match_organism(
-            Organism,
+        organism, was_created = match(
             nom_latin=base_latin,
             nom_commun=nom_commun_espece,
             defaults=defaults_organism,
@@ -529,8 +605,7 @@ def find_organism_and_cultivar(
         )
         return (organism, cultivar, was_created)
 
-    organism, was_created = find_or_match_organism(
-        Organism,
+    organism, was_created = match(
         nom_latin=nom_latin or '',
         nom_commun=nom_commun or '',
         defaults=defaults_organism,
@@ -538,3 +613,259 @@ def find_organism_and_cultivar(
         vascan_id=vascan_id,
     )
     return (organism, None, was_created)
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class OrganismResolver:
+    """
+    Équivalent en mémoire de find_or_match_organism / get_unique_slug_latin pour un import.
+
+    Charge une fois (une requête) les identifiants (vascan_id, tsn), les noms latins (exact,
+    sans accents, index trigramme pour le fuzzy), les noms communs et les slugs pris ;
+    chaque ligne est ensuite résolue sans requête, sauf la lecture de l'organisme trouvé
+    et les écritures (création, correction du nom latin), qui mettent les index à jour.
+    Mêmes règles et même ordre que find_or_match_organism ; parmi plusieurs candidats,
+    le premier selon l'ordre du modèle (nom_commun).
+
+    checkpoint() / rollback() : les ajouts aux index depuis le point de reprise sont notés
+    et défaits quand le lot qui les a faits est annulé, sans recharger le catalogue.
+    """
+
+    def __init__(self, Organism):
+        self.Organism = Organism
+        self._rows = {}          # id -> (nom_latin, nom_commun)
+        self._by_vascan = {}
+        self._by_tsn = {}
+        self._by_latin = {}      # nom_latin.lower() -> ids
+        self._by_latin_unaccent = {}
+        self._by_common_unaccent = {}
+        self._trigrams = {}      # trigramme de nom_latin.lower() -> ids
+        self._slugs = set()
+        self._journal = None     # (fonction, args) qui défont chaque ajout depuis checkpoint()
+        rows = Organism.objects.values_list('id', 'nom_latin', 'nom_commun', 'vascan_id', 'tsn', 'slug_latin')
+        for oid, nom_latin, nom_commun, vascan_id, tsn, slug in rows.iterator(chunk_size=5000):
+            self._index(oid, nom_latin or '', nom_commun or '')
+            if vascan_id is not None:
+                self._by_vascan.setdefault(vascan_id, set()).add(oid)
+            if tsn is not None:
+                self._by_tsn.setdefault(tsn, set()).add(oid)
+            if slug:
+                self._slugs.add(slug)
+
+    # --- Index ---
+
+    def _undo(self, fn, *args):
+        if self._journal is not None:
+            self._journal.append((fn, args))
+
+    def _add(self, values, value):
+        if value not in values:
+            values.add(value)
+            self._undo(values.discard, value)
+
+    def _index(self, oid, nom_latin, nom_commun):
+        from catalog.search import normalize_search_text
+
+        self._rows[oid] = (nom_latin, nom_commun)
+        lower = nom_latin.lower()
+        self._by_latin.setdefault(lower, set()).add(oid)
+        self._by_latin_unaccent.setdefault(normalize_search_text(nom_latin), set()).add(oid)
+        self._by_common_unaccent.setdefault(normalize_search_text(nom_commun), set()).add(oid)
+        for tri in _trigrams(lower):
+            self._trigrams.setdefault(tri, set()).add(oid)
+        self._undo(self._unindex, oid)
+
+    def _unindex(self, oid):
+        from catalog.search import normalize_search_text
+
+        nom_latin, nom_commun = self._rows.pop(oid)
+        lower = nom_latin.lower()
+        self._by_latin.get(lower, set()).discard(oid)
+        self._by_latin_unaccent.get(normalize_search_text(nom_latin), set()).discard(oid)
+        self._by_common_unaccent.get(normalize_search_text(nom_commun), set()).discard(oid)
+        for tri in _trigrams(lower):
+            self._trigrams.get(tri, set()).discard(oid)
+        self._undo(self._index, oid, nom_latin, nom_commun)
+
+    def _first(self, ids):
+        """Id du premier candidat dans l'ordre du modèle (nom_commun), ou None."""
+        if not ids:
+            return None
+        return min(ids, key=lambda oid: (self._rows[oid][1], oid))
+
+    def _get(self, oid):
+        return self.Organism.objects.get(pk=oid)
+
+    def _latin_substring_candidates(self, words):
+        """Organismes dont nom_latin contient le plus long mot (filtre trigramme, exact)."""
+        longest = max(words, key=len)
+        if len(longest) < 3:
+            return set(self._rows)
+        sets = sorted((self._trigrams.get(tri, set()) for tri in _trigrams(longest)), key=len)
+        return set.intersection(*sets) if sets else set()
+
+    def _find_fuzzy(self, nom_latin):
+        """find_organism_by_latin_fuzzy en mémoire."""
+        from catalog.search import normalize_search_text
+
+        found = self._first(self._by_latin_unaccent.get(normalize_search_text(nom_latin)))
+        if found is not None:
+            return found
+        norm = normalize_latin_name(nom_latin)
+        if not norm:
+            return None
+        words = norm.split()
+        candidates = self._latin_substring_candidates(words)
+        pattern = re.compile(norm.replace(' ', '.*'), re.IGNORECASE)
+        found = self._first({oid for oid in candidates if pattern.search(self._rows[oid][0])})
+        if found is not None or len(words) <= 1:
+            return found
+        return self._first({
+            oid for oid in candidates if all(w in self._rows[oid][0].lower() for w in words)
+        })
+
+    # --- API ---
+
+    def unique_slug_latin(self, nom_latin: str) -> str:
+        """get_unique_slug_latin sur les slugs chargés (réservé à la création de l'organisme)."""
+        if not nom_latin or not nom_latin.strip():
+            return ''
+        base = _slugify_latin(nom_latin.strip())
+        if not base:
+            return ''
+        candidate = base
+        suffix = 2
+        while candidate in self._slugs:
+            candidate = f"{base}-{suffix}"
+            suffix += 1
+        return candidate
+
+    def resolve(
+        self,
+        nom_latin: str,
+        nom_commun: str,
+        *,
+        tsn: Optional[int] = None,
+        vascan_id: Optional[int] = None,
+    ) -> Tuple[Optional[int], Optional[str]]:
+        """
+        Correspondance sans aucune requête : (id ou None, nom latin à écrire sur la fiche ou None).
+        Le nom latin est renvoyé quand find_or_match_organism corrigerait la fiche (match sans auteur / fuzzy).
+        """
+        if vascan_id is not None:
+            found = self._first(self._by_vascan.get(vascan_id))
+            if found is not None:
+                return found, None
+        if tsn is not None:
+            found = self._first(self._by_tsn.get(tsn))
+            if found is not None:
+                return found, None
+
+        if nom_latin and nom_latin.strip():
+            nom_latin_clean = nom_latin.strip()
+            # Exact (le couple nom latin + nom commun de find_or_match_organism en est un cas particulier)
+            found = self._first(self._by_latin.get(nom_latin_clean.lower()))
+            if found is not None:
+                return found, None
+
+            base = latin_name_without_author(nom_latin_clean)
+            if base and base != nom_latin_clean:
+                base_lower = base.lower()
+                found = self._first(
+                    self._by_latin.get(base_lower, set())
+                    | {oid for oid in self._latin_substring_candidates([base_lower])
+                       if self._rows[oid][0].lower().startswith(base_lower + ' ')}
+                )
+                if found is not None:
+                    current = self._rows[found][0]
+                    return found, (nom_latin_clean if current != nom_latin_clean else None)
+
+            found = self._find_fuzzy(nom_latin_clean)
+            if found is not None:
+                current = self._rows[found][0]
+                if not current or normalize_latin_name(current) != normalize_latin_name(nom_latin_clean):
+                    return found, nom_latin_clean
+                return found, None
+
+        if (not nom_latin or not nom_latin.strip()) and nom_commun and nom_commun.strip():
+            from catalog.search import normalize_search_text
+
+            found = self._first(self._by_common_unaccent.get(normalize_search_text(nom_commun.strip())))
+            if found is not None:
+                return found, None
+        return None, None
+
+    def find_or_match(
+        self,
+        nom_latin: str,
+        nom_commun: str,
+        defaults: Optional[Dict[str, Any]] = None,
+        *,
+        tsn: Optional[int] = None,
+        vascan_id: Optional[int] = None,
+        create_missing: bool = True,
+    ) -> Tuple[Optional[Any], bool]:
+        """Même contrat que find_or_match_organism."""
+        found, rename = self.resolve(nom_latin, nom_commun, tsn=tsn, vascan_id=vascan_id)
+        if found is not None:
+            organism = self._get(found)
+            if rename is not None:
+                organism.nom_latin = rename
+                organism.save(update_fields=['nom_latin'])
+                self.rename(found, rename)
+            return organism, False
+
+        if not create_missing:
+            return None, False
+        organism = self.Organism.objects.create(
+            **organism_create_data(defaults, nom_latin, nom_commun, tsn=tsn, vascan_id=vascan_id)
+        )
+        self.register(organism)
+        return organism, True
+
+    def rename(self, oid, nom_latin: str) -> None:
+        """Met l'index à jour après correction du nom latin d'une fiche."""
+        nom_commun = self._rows[oid][1]
+        self._unindex(oid)
+        self._index(oid, nom_latin, nom_commun)
+
+    def add_pending(self, nom_latin: str, nom_commun: str, slug_latin: str = '') -> int:
+        """
+        Indexe un organisme pas encore inséré (création groupée) sous un id provisoire négatif,
+        pour que les lignes suivantes du même lot le retrouvent ; voir confirm().
+        """
+        self._pending_seq = getattr(self, '_pending_seq', 0) - 1
+        self._index(self._pending_seq, nom_latin or '', nom_commun or '')
+        if slug_latin:
+            self._add(self._slugs, slug_latin)
+        return self._pending_seq
+
+    def confirm(self, pending_id: int, organism) -> None:
+        """Remplace l'id provisoire par l'organisme inséré."""
+        self._unindex(pending_id)
+        self.register(organism)
+
+    def register(self, organism) -> None:
+        """Ajoute aux index un organisme créé hors du resolver pendant l'import."""
+        if organism.pk in self._rows:
+            self._unindex(organism.pk)
+        self._index(organism.pk, organism.nom_latin or '', organism.nom_commun or '')
+        if organism.vascan_id is not None:
+            self._add(self._by_vascan.setdefault(organism.vascan_id, set()), organism.pk)
+        if organism.tsn is not None:
+            self._add(self._by_tsn.setdefault(organism.tsn, set()), organism.pk)
+        if organism.slug_latin:
+            self._add(self._slugs, organism.slug_latin)
+
+    def checkpoint(self) -> None:
+        """Point de reprise : les ajouts suivants aux index sont notés pour rollback()."""
+        self._journal = []
+
+    def rollback(self) -> None:
+        """Défait les ajouts depuis checkpoint() (lot annulé : créations et renommages n'existent plus)."""
+        journal, self._journal = self._journal or [], None
+        for fn, args in reversed(journal):
+            fn(*args)
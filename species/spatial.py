@@ -0,0 +1,201 @@
+"""
+Index spatial des spécimens (recherche « à proximité » depuis l'app mobile).
+
+Deux niveaux :
+- Préfiltre SQL par boîte englobante sur (latitude, longitude) — index composite
+  species_spec_lat_lng_idx — pour ne charger que les candidats du rayon.
+- Index en grille par jardin, gardé en mémoire du processus : cellules de
+  GRID_CELL_M mètres. Sa version est dans le cache partagé (spatial_index_v_<jardin>) :
+  save/delete d'un Specimen (voir species.signals) la change, et chaque worker gunicorn
+  reconstruit son index à la requête suivante. GRID_INDEX_MAX_AGE_S couvre les mises à jour
+  en masse (update(), bulk_update) qui ne passent pas par les signaux.
+
+Les distances des candidats sont recalculées sur les coordonnées en base avant d'appliquer
+limit ; seuls les N plus proches sont ensuite chargés avec leurs relations pour la sérialisation.
+"""
+import threading
+import time
+import uuid
+from math import cos, floor, radians
+
+from django.core.cache import cache
+
+from .utils import _haversine_m
+
+METRES_PER_DEGREE_LAT = 111320.0
+GRID_CELL_M = 100.0
+GRID_INDEX_MAX_AGE_S = 300
+
+_grid_indexes = {}
+_grid_lock = threading.Lock()
+
+
+def bounding_box(lat, lng, radius_m):
+    """
+    Boîte englobante (lat_min, lat_max, lng_min, lng_max) d'un cercle de radius_m autour de (lat, lng).
+    Près des pôles, la longitude n'est pas bornée (cos(lat) → 0).
+    """
+    dlat = radius_m / METRES_PER_DEGREE_LAT
+    cos_lat = cos(radians(lat))
+    if cos_lat < 1e-6:
+        dlng = 180.0
+    else:
+        dlng = min(radius_m / (METRES_PER_DEGREE_LAT * cos_lat), 180.0)
+    return lat - dlat, lat + dlat, lng - dlng, lng + dlng
+
+
+class GardenGridIndex:
+    """
+    Grille régulière (en degrés) des spécimens géolocalisés d'un jardin.
+    points: liste de (specimen_id, latitude, longitude).
+    """
+
+    def __init__(self, points, cell_m=GRID_CELL_M, version=None):
+        self.built_at = time.monotonic()
+        self.version = version
+        self.ids = set()
+        self.cells = {}
+        ref_lat = sum(p[1] for p in points) / len(points) if points else 0.0
+        self.cell_lat = cell_m / METRES_PER_DEGREE_LAT
+        self.cell_lng = cell_m / (METRES_PER_DEGREE_LAT * max(cos(radians(ref_lat)), 1e-6))
+        for specimen_id, lat, lng in points:
+            self.ids.add(specimen_id)
+            self.cells.setdefault(self._cell(lat, lng), []).append((specimen_id, lat, lng))
+
+    def _cell(self, lat, lng):
+        return floor(lat / self.cell_lat), floor(lng / self.cell_lng)
+
+    def is_stale(self):
+        return time.monotonic() - self.built_at > GRID_INDEX_MAX_AGE_S
+
+    def query(self, lat, lng, radius_m):
+        """Retourne [(specimen_id, distance_m), ...] dans le rayon (non trié)."""
+        lat_min, lat_max, lng_min, lng_max = bounding_box(lat, lng, radius_m)
+        i_min, j_min = self._cell(lat_min, lng_min)
+        i_max, j_max = self._cell(lat_max, lng_max)
+        if (i_max - i_min + 1) * (j_max - j_min + 1) > len(self.cells):
+            buckets = self.cells.values()
+        else:
+            buckets = (
+                self.cells.get((i, j), ())
+                for i in range(i_min, i_max + 1)
+                for j in range(j_min, j_max + 1)
+            )
+        out = []
+        for bucket in buckets:
+            for specimen_id, s_lat, s_lng in bucket:
+                d = _haversine_m(lat, lng, s_lat, s_lng)
+                if d <= radius_m:
+                    out.append((specimen_id, d))
+        return out
+
+
+def _version_key(garden_id):
+    return f'spatial_index_v_{garden_id}'
+
+
+def garden_index_version(garden_id):
+    """Version partagée (cache) de l'index du jardin, créée si absente."""
+    key = _version_key(garden_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _build_garden_index(garden_id, version):
+    from .models import Specimen
+
+    points = list(
+        Specimen.objects.filter(
+            garden_id=garden_id,
+            latitude__isnull=False,
+            longitude__isnull=False,
+        ).values_list('id', 'latitude', 'longitude')
+    )
+    return GardenGridIndex(points, version=version)
+
+
+def get_garden_index(garden_id):
+    """Index en grille du jardin (reconstruit si sa version partagée a changé ou s'il est trop vieux)."""
+    version = garden_index_version(garden_id)
+    with _grid_lock:
+        index = _grid_indexes.get(garden_id)
+    if index is not None and index.version == version and not index.is_stale():
+        return index
+    index = _build_garden_index(garden_id, version)
+    with _grid_lock:
+        _grid_indexes[garden_id] = index
+    return index
+
+
+def invalidate_garden_index(*garden_ids, specimen_id=None):
+    """
+    Change la version partagée des index des jardins garden_ids (tous les workers reconstruisent)
+    et oublie localement tout index contenant specimen_id. Sans argument : vide l'index local.
+    """
+    garden_ids = {gid for gid in garden_ids if gid is not None}
+    for gid in garden_ids:
+        # cache.set d'une nouvelle valeur (pas incr : lecture-écriture non atomique selon le backend)
+        cache.set(_version_key(gid), uuid.uuid4().hex, timeout=None)
+    with _grid_lock:
+        if not garden_ids and specimen_id is None:
+            _grid_indexes.clear()
+            return
+        for gid in list(_grid_indexes):
+            if gid in garden_ids or (specimen_id is not None and specimen_id in _grid_indexes[gid].ids):
+                del _grid_indexes[gid]
+
+
+def _fresh_distances(lat, lng, radius_m, candidates, limit):
+    """
+    Distances recalculées sur les coordonnées en base (l'index peut dater de quelques instants),
+    par lots dans l'ordre des candidats, jusqu'à avoir limit spécimens dans le rayon.
+    """
+    from .models import Specimen
+
+    out = []
+    step = max(limit, 100)
+    for start in range(0, len(candidates), step):
+        ids = [specimen_id for specimen_id, _d in candidates[start:start + step]]
+        for specimen_id, s_lat, s_lng in Specimen.objects.filter(
+            pk__in=ids, latitude__isnull=False, longitude__isnull=False,
+        ).values_list('id', 'latitude', 'longitude'):
+            d = _haversine_m(lat, lng, s_lat, s_lng)
+            if d <= radius_m:
+                out.append((specimen_id, d))
+        if len(out) >= limit:
+            break
+    return out
+
+
+def find_nearby_specimen_ids(lat, lng, radius_m, limit, garden_id=None):
+    """
+    Spécimens géolocalisés à moins de radius_m de (lat, lng), les plus proches d'abord.
+    Avec garden_id : index en grille du jardin ; sinon préfiltre SQL par boîte englobante.
+    Returns: liste de (specimen_id, distance_m), au plus `limit` éléments.
+    """
+    if radius_m < 0 or limit <= 0:
+        return []
+    if garden_id is not None:
+        candidates = get_garden_index(garden_id).query(lat, lng, radius_m)
+        candidates.sort(key=lambda c: c[1])
+        candidates = _fresh_distances(lat, lng, radius_m, candidates, limit)
+    else:
+        from .models import Specimen
+
+        lat_min, lat_max, lng_min, lng_max = bounding_box(lat, lng, radius_m)
+        rows = Specimen.objects.filter(
+            latitude__gte=lat_min,
+            latitude__lte=lat_max,
+            longitude__gte=lng_min,
+            longitude__lte=lng_max,
+        ).values_list('id', 'latitude', 'longitude')
+        candidates = []
+        for specimen_id, s_lat, s_lng in rows:
+            d = _haversine_m(lat, lng, s_lat, s_lng)
+            if d <= radius_m:
+                candidates.append((specimen_id, d))
+    candidates.sort(key=lambda c: c[1])
+    return candidates[:limit]
@@ -19,9 +19,13 @@
   var layerSpecimensVisible = true;
   var layerMaturityCirclesVisible = true;
   var layerBoundaryVisible = true;
+  var layerContoursVisible = true;
   /** null = tous ; tableau d'id = filtre recherche */
   var visibleSpecimenFilterIds = null;
   var boundaryEntity = null;
+  /** Courbes de niveau affichées et leur niveau de simplification (terrainFetchContours) */
+  var contourEntities = [];
+  var contourZoom = null;
   var sunRayEntity = null;
   var sunShadowEntity = null;
   var buildingShadowEntity = null;
@@ -65,6 +69,11 @@
   var BOUNDARY_OFFSET_M = 10;
   var BOUNDARY_COLOR = '#c4832a';
   var BOUNDARY_WIDTH = 3;
+  var CONTOUR_COLOR = '#8b6f47';
+  var CONTOUR_WIDTH = 1.5;
+  /** Hauteur de caméra (m) au-dessus de laquelle on garde le niveau grossier ; ÷ 2 par niveau */
+  var CONTOUR_COARSE_HEIGHT_M = 2000;
+  var CONTOUR_MAX_ZOOM = 4;
   var SUN_RAY_LENGTH_M = 50000;
   var SUN_SHADOW_LENGTH_M = 200;
   var SUN_RAY_COLOR = '#f5a623';
@@ -282,6 +291,65 @@
     }
   }
 
+  function contourZoomForHeight(height) {
+    var zoom = 0;
+    var h = CONTOUR_COARSE_HEIGHT_M;
+    while (zoom < CONTOUR_MAX_ZOOM && height < h) {
+      zoom++;
+      h /= 2;
+    }
+    return zoom;
+  }
+
+  function contourLines(geometry) {
+    if (!geometry) return [];
+    if (geometry.type === 'LineString') return [geometry.coordinates];
+    if (geometry.type === 'MultiLineString' || geometry.type === 'Polygon') return geometry.coordinates;
+    if (geometry.type === 'MultiPolygon') return [].concat.apply([], geometry.coordinates);
+    return [];
+  }
+
+  function showContours(collection) {
+    contourEntities.forEach(function (e) { viewer.entities.remove(e); });
+    contourEntities = [];
+    var material = Cesium.Color.fromCssColorString(CONTOUR_COLOR).withAlpha(0.85);
+    ((collection && collection.features) || []).forEach(function (feature) {
+      contourLines(feature.geometry).forEach(function (line) {
+        if (!line || line.length < 2) return;
+        var entity = viewer.entities.add({
+          polyline: {
+            positions: Cesium.Cartesian3.fromDegreesArray([].concat.apply([], line.map(function (c) { return [c[0], c[1]]; }))),
+            width: CONTOUR_WIDTH,
+            material: material,
+            clampToGround: true
+          }
+        });
+        entity.show = layerContoursVisible;
+        contourEntities.push(entity);
+      });
+    });
+    viewer.scene.requestRender();
+  }
+
+  /** Charge (terrain_data.js, ETag) le niveau de simplification adapté à la hauteur de la caméra. */
+  function refreshContours() {
+    if (!viewer || !window.terrainFetchContours || !(window.GARDEN_DATA || {}).has_contours) return;
+    var carto = viewer.camera.positionCartographic;
+    var zoom = contourZoomForHeight(carto ? carto.height : CONTOUR_COARSE_HEIGHT_M);
+    if (zoom === contourZoom) return;
+    contourZoom = zoom;
+    window.terrainFetchContours(zoom).then(function (collection) {
+      // Réponse d'un niveau dépassé entre-temps (zoom rapide) : ignorée
+      if (collection && zoom === contourZoom) showContours(collection);
+    });
+  }
+
+  window.terrainCesiumSetContoursVisible = function (visible) {
+    layerContoursVisible = !!visible;
+    contourEntities.forEach(function (e) { e.show = layerContoursVisible; });
+    if (viewer && viewer.scene) viewer.scene.requestRender();
+  };
+
   window.terrainCesiumRefreshSpecimens = function (specList) {
     addSpecimenMarkers(specList || []);
   };
@@ -1391,8 +1459,15 @@
       loadZones();
     }
 
-    if (window.INITIAL_SPECIMENS && Array.isArray(window.INITIAL_SPECIMENS)) {
-      addSpecimenMarkers(window.INITIAL_SPECIMENS);
+    if (gardenData.has_contours) {
+      viewer.camera.moveEnd.addEventListener(refreshContours);
+      refreshContours();
+    }
+
+    if (window.TERRAIN_SPECIMENS_PROMISE) {
+      window.TERRAIN_SPECIMENS_PROMISE.then(function (list) {
+        if (Array.isArray(list) && list.length) addSpecimenMarkers(list);
+      });
     }
 
     var search = window.location && window.location.search ? window.location.search : '';
@@ -0,0 +1,91 @@
+/**
+ * Données de la vue terrain chargées après la page (voir species/terrain_payload.py).
+ * - window.TERRAIN_SPECIMENS_PROMISE : liste des spécimens du jardin (même forme que
+ *   l'ancien INITIAL_SPECIMENS), décodée depuis la charge utile en colonnes.
+ * - window.terrainFetchContours(zoom) : courbes de niveau simplifiées (GeoJSON) pour zoom.
+ * Le navigateur revalide par ETag (304) : rien n'est retéléchargé si le jardin n'a pas changé.
+ */
+(function () {
+  'use strict';
+
+  var gardenId = window.GARDEN_DATA && window.GARDEN_DATA.id;
+  var apiBase = (window.location.origin || '') + (window.API_BASE_PATH || '/api/');
+  var token = (window.location.search.match(/access_token=([^&]+)/) || [])[1];
+
+  function fetchJson(path) {
+    var opts = { credentials: 'same-origin' };
+    if (token) opts.headers = { Authorization: 'Bearer ' + token };
+    return fetch(apiBase + 'gardens/' + encodeURIComponent(gardenId) + '/' + path, opts).then(function (r) {
+      if (!r.ok) throw new Error('HTTP ' + r.status);
+      return r.json();
+    });
+  }
+
+  function decodeTyped(column) {
+    var binary = atob(column.data);
+    var bytes = new Uint8Array(binary.length);
+    for (var i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+    if (column.dtype === 'float64') return new Float64Array(bytes.buffer);
+    if (column.dtype === 'float32') return new Float32Array(bytes.buffer);
+    return new Uint16Array(bytes.buffer);
+  }
+
+  function decodeDictionary(column) {
+    var codes = decodeTyped({ dtype: 'uint16', data: column.codes });
+    var out = new Array(codes.length);
+    for (var i = 0; i < codes.length; i++) out[i] = column.values[codes[i]];
+    return out;
+  }
+
+  function finiteOrNull(value) {
+    return isNaN(value) ? null : value;
+  }
+
+  function decodeSpecimens(payload) {
+    var n = payload.count || 0;
+    var lat = decodeTyped(payload.typed.latitude);
+    var lng = decodeTyped(payload.typed.longitude);
+    var rayon = decodeTyped(payload.typed.rayon_adulte_m);
+    var dict = {};
+    Object.keys(payload.dictionary).forEach(function (name) {
+      dict[name] = decodeDictionary(payload.dictionary[name]);
+    });
+    var cols = payload.columns;
+    var list = new Array(n);
+    for (var i = 0; i < n; i++) {
+      var s = {
+        latitude: finiteOrNull(lat[i]),
+        longitude: finiteOrNull(lng[i]),
+        // Float32 : on revient à une décimale comme côté serveur
+        rayon_adulte_m: isNaN(rayon[i]) ? null : Math.round(rayon[i] * 10) / 10,
+        emoji: '🌱'
+      };
+      Object.keys(dict).forEach(function (name) { s[name] = dict[name][i]; });
+      Object.keys(cols).forEach(function (name) { s[name] = cols[name][i]; });
+      s.health = s.sante;
+      list[i] = s;
+    }
+    return list;
+  }
+
+  window.TERRAIN_SPECIMENS_PROMISE = gardenId
+    ? fetchJson('terrain/specimens/').then(decodeSpecimens).catch(function (e) {
+      console.warn('[terrain_data] spécimens:', e);
+      return [];
+    })
+    : Promise.resolve([]);
+
+  var contoursByZoom = {};
+  window.terrainFetchContours = function (zoom) {
+    if (!gardenId) return Promise.resolve(null);
+    var z = Math.max(0, Math.round(zoom || 0));
+    if (!contoursByZoom[z]) {
+      contoursByZoom[z] = fetchJson('terrain/contours/' + z + '/').catch(function (e) {
+        delete contoursByZoom[z];
+        console.warn('[terrain_data] courbes de niveau:', e);
+        return null;
+      });
+    }
+    return contoursByZoom[z];
+  };
+})();
@@ -19,6 +19,7 @@
     user: '<svg xmlns="http://www.w3.org/2000/svg" width="20" height="20" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M19 21v-2a4 4 0 0 0-4-4H9a4 4 0 0 0-4 4v2"/><circle cx="12" cy="7" r="4"/></svg>',
     mapPinned: '<svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M18 8c0 4.5-6 9-6 9s-6-4.5-6-9a6 6 0 0 1 12 0"/><circle cx="12" cy="8" r="2"/></svg>',
     circleDot: '<svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><circle cx="12" cy="12" r="10"/><circle cx="12" cy="12" r="1"/></svg>',
+    mountain: '<svg xmlns="http://www.w3.org/2000/svg" width="20" height="20" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="m8 3 4 8 5-5 5 15H2L8 3z"/></svg>',
     pentagon: '<svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><rect width="18" height="18" x="3" y="3" rx="2"/></svg>',
     plus: '<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M5 12h14"/><path d="M12 5v14"/></svg>',
     minus: '<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M5 12h14"/></svg>',
@@ -3639,6 +3640,11 @@
     pillLayers.appendChild(btnSpec);
     pillLayers.appendChild(btnRay);
     pillLayers.appendChild(btnBound);
+    var btnContours = null;
+    if ((window.GARDEN_DATA || {}).has_contours) {
+      btnContours = pillBtn('terrain-layer-contours', 'Courbes de niveau', IC.mountain);
+      pillLayers.appendChild(btnContours);
+    }
     container.appendChild(pillLayers);
 
     var hasLidar = !!window.LIDAR_ASSET_ID;
@@ -3726,6 +3732,13 @@
       if (window.terrainCesiumSetBoundaryVisible) window.terrainCesiumSetBoundaryVisible(next);
       togglePressed(btnBound, next);
     });
+    if (btnContours) {
+      btnContours.addEventListener('click', function () {
+        var next = !btnContours.classList.contains('terrain-pill-toggle--active');
+        if (window.terrainCesiumSetContoursVisible) window.terrainCesiumSetContoursVisible(next);
+        togglePressed(btnContours, next);
+      });
+    }
 
     windRoseEl = el('div', 'terrain-wind-rose terrain-wind-rose--corner');
     windRoseEl.title = 'Nord – cliquer pour réorienter vers le nord';
@@ -3807,8 +3820,13 @@
   renderPopup();
   renderControlsRight();
 
-  if (window.INITIAL_SPECIMENS && Array.isArray(window.INITIAL_SPECIMENS)) {
-    specimens = window.INITIAL_SPECIMENS;
-    applySearchAndFilters();
+  if (window.TERRAIN_SPECIMENS_PROMISE) {
+    window.TERRAIN_SPECIMENS_PROMISE.then(function (list) {
+      // L'app (LOAD_SPECIMENS) a pu envoyer sa liste entre-temps : elle prime
+      if (Array.isArray(list) && list.length && !specimens.length) {
+        specimens = list;
+        applySearchAndFilters();
+      }
+    });
   }
 })();
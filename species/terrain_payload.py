@@ -0,0 +1,241 @@
+"""
+Données de la vue terrain Cesium servies hors de la page HTML (cesium_terrain_view).
+
+- build_specimen_columns(garden_id) : spécimens du jardin en colonnes ; latitude / longitude
+  (Float64) et rayon adulte (Float32, NaN = inconnu) en tableaux typés little-endian
+  encodés base64, chaînes répétitives (statut, espèce, cultivar, zone...) encodées par
+  dictionnaire (valeurs uniques + codes Uint16), autres champs en listes.
+  terrain_data.js reconstruit la liste d'objets attendue par terrain_cesium / terrain_ui.
+- build_contour_level(contours_geojson, zoom) : courbes de niveau du jardin simplifiées (shapely) pour un
+  niveau de zoom (0 = plus grossier) ; les segments plus courts que la tolérance sont omis.
+
+Chaque charge utile est sérialisée et compressée (gzip) une fois, gardée dans le cache
+sous une clé qui contient son ETag : l'empreinte des lignes sources (requêtes agrégées).
+"""
+import base64
+import gzip
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+SPECIMEN_PAYLOAD_TIMEOUT = 24 * 3600
+# Tolérance de simplification au zoom 0 (m), divisée par 2 à chaque niveau
+CONTOUR_BASE_TOLERANCE_M = 8.0
+MAX_CONTOUR_ZOOM = 4
+METERS_PER_DEGREE = 111_320.0
+
+FRUIT_TYPES = ('arbre_fruitier', 'arbuste_fruitier', 'arbuste_baies')
+# Colonnes à faible cardinalité : dictionnaire + codes
+DICTIONARY_COLUMNS = (
+    'statut', 'statut_display', 'organisme_nom_latin', 'organisme_nom_commun', 'cultivar_nom',
+    'porte_greffe_nom', 'zone_nom', 'source', 'source_display', 'pepiniere_fournisseur',
+)
+PLAIN_COLUMNS = (
+    'id', 'nom', 'sante', 'date_plantation', 'zone_jardin', 'code_identification', 'notes',
+    'hauteur_actuelle', 'age_plantation', 'premiere_fructification', 'fruits', 'noix',
+)
+
+
+def _typed_array(values, dtype):
+    import numpy as np
+
+    return base64.b64encode(np.asarray(values, dtype=dtype).tobytes()).decode('ascii')
+
+
+def _dictionary_encode(values):
+    index, codes = {}, []
+    for value in values:
+        codes.append(index.setdefault(value, len(index)))
+    return {'values': list(index), 'codes': _typed_array(codes, '<u2')}
+
+
+def _json_gzip(payload):
+    body = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return body, gzip.compress(body, compresslevel=6)
+
+
+def _etag(*parts):
+    return '"' + hashlib.sha1('|'.join(str(p) for p in parts).encode('utf-8')).hexdigest()[:24] + '"'
+
+
+def _etag_key(etag):
+    return etag.strip('"')
+
+
+def specimens_etag(garden_id):
+    """
+    ETag des spécimens du jardin : nombre et dernières modifications des lignes de la charge utile
+    (spécimens, espèces, cultivars, porte-greffes, zones). Les nombres couvrent les suppressions :
+    une zone supprimée vide Specimen.zone sans toucher à date_modification.
+    """
+    from catalog.models import CultivarPorteGreffe
+    from gardens.models import Zone
+
+    from .models import Specimen
+
+    specimens = Specimen.objects.filter(garden_id=garden_id)
+    fingerprint = specimens.aggregate(
+        n=Count('id'),
+        max_id=Max('id'),
+        specimen=Max('date_modification'),
+        organisme=Max('organisme__date_modification'),
+        cultivar=Max('cultivar__date_modification'),
+    )
+    porte_greffes = CultivarPorteGreffe.objects.filter(cultivar_id__in=specimens.values('cultivar_id')).aggregate(
+        porte_greffe_n=Count('id'),
+        porte_greffe=Max('date_modification'),
+    )
+    zones = Zone.objects.filter(garden_id=garden_id).aggregate(zone_n=Count('id'), zone=Max('date_modification'))
+    fingerprint.update(porte_greffes, **zones)
+    return _etag('specimens', garden_id, *(fingerprint[k] for k in sorted(fingerprint)))
+
+
+def build_specimen_columns(garden_id):
+    """Charge utile en colonnes (dict) des spécimens du jardin, triés par nom."""
+    from catalog.models import CultivarPorteGreffe
+    from .models import Specimen
+
+    rows = list(
+        Specimen.objects.filter(garden_id=garden_id).order_by('nom').values_list(
+            'id', 'nom', 'latitude', 'longitude', 'statut', 'sante', 'organisme__nom_latin',
+            'organisme__nom_commun', 'organisme__type_organisme', 'cultivar_id', 'cultivar__nom',
+            'date_plantation', 'zone__nom', 'zone_jardin', 'code_identification', 'source',
+            'pepiniere_fournisseur', 'notes', 'hauteur_actuelle', 'age_plantation', 'premiere_fructification',
+        )
+    )
+    # Porte-greffe le plus haut de chaque cultivar : rayon adulte ≈ 60 % de sa hauteur max
+    cultivar_ids = {row[9] for row in rows if row[9]}
+    porte_greffes = {}
+    for cultivar_id, nom, hauteur in (
+        CultivarPorteGreffe.objects.filter(cultivar_id__in=cultivar_ids)
+        .order_by('cultivar_id', '-hauteur_max_m').values_list('cultivar_id', 'nom_porte_greffe', 'hauteur_max_m')
+    ):
+        porte_greffes.setdefault(cultivar_id, (nom, hauteur))
+
+    statut_labels = dict(Specimen.STATUT_CHOICES)
+    source_labels = dict(Specimen.SOURCE_CHOICES)
+    columns = {name: [] for name in (*DICTIONARY_COLUMNS, *PLAIN_COLUMNS)}
+    latitudes, longitudes, rayons = [], [], []
+    for (specimen_id, nom, lat, lng, statut, sante, nom_latin, nom_commun, type_organisme, cultivar_id,
+         cultivar_nom, date_plantation, zone_nom, zone_jardin, code, source, pepiniere, notes,
+         hauteur, age, premiere_fructification) in rows:
+        porte_greffe_nom, hauteur_pg = porte_greffes.get(cultivar_id, (None, None))
+        latitudes.append(float('nan') if lat is None else lat)
+        longitudes.append(float('nan') if lng is None else lng)
+        rayons.append(round(float(hauteur_pg) * 0.60, 1) if hauteur_pg else float('nan'))
+        for name, value in (
+            ('statut', statut or ''),
+            ('statut_display', statut_labels.get(statut, statut or '')),
+            ('organisme_nom_latin', nom_latin or ''),
+            ('organisme_nom_commun', nom_commun or ''),
+            ('cultivar_nom', cultivar_nom or ''),
+            ('porte_greffe_nom', porte_greffe_nom or ''),
+            ('zone_nom', zone_nom or ''),
+            ('source', source or ''),
+            ('source_display', source_labels.get(source, '') or ''),
+            ('pepiniere_fournisseur', pepiniere or ''),
+            ('id', specimen_id),
+            ('nom', nom or ''),
+            ('sante', sante),
+            ('date_plantation', date_plantation.isoformat() if date_plantation else ''),
+            ('zone_jardin', zone_jardin or ''),
+            ('code_identification', code or ''),
+            ('notes', notes or ''),
+            ('hauteur_actuelle', hauteur),
+            ('age_plantation', age),
+            ('premiere_fructification', premiere_fructification),
+            ('fruits', type_organisme in FRUIT_TYPES),
+            ('noix', type_organisme == 'arbre_noix'),
+        ):
+            columns[name].append(value)
+
+    return {
+        'count': len(rows),
+        'typed': {
+            'latitude': {'dtype': 'float64', 'data': _typed_array(latitudes, '<f8')},
+            'longitude': {'dtype': 'float64', 'data': _typed_array(longitudes, '<f8')},
+            'rayon_adulte_m': {'dtype': 'float32', 'data': _typed_array(rayons, '<f4')},
+        },
+        'dictionary': {name: _dictionary_encode(columns[name]) for name in DICTIONARY_COLUMNS},
+        'columns': {name: columns[name] for name in PLAIN_COLUMNS},
+    }
+
+
+def specimens_payload(garden_id, etag=None):
+    """(etag, corps JSON, corps gzip) des spécimens du jardin, depuis le cache si l'empreinte n'a pas changé."""
+    etag = etag or specimens_etag(garden_id)
+    key = f'terrain_specimens_{garden_id}_{_etag_key(etag)}'
+    cached = cache.get(key)
+    if cached is None:
+        cached = _json_gzip(build_specimen_columns(garden_id))
+        cache.set(key, cached, timeout=SPECIMEN_PAYLOAD_TIMEOUT)
+    return (etag, *cached)
+
+
+def contour_tolerance_m(zoom):
+    return CONTOUR_BASE_TOLERANCE_M / (2 ** zoom)
+
+
+def contours_etag(garden, zoom):
+    return _etag('contours', garden.pk, garden.date_modification.isoformat() if garden.date_modification else '', zoom)
+
+
+def build_contour_level(contours_geojson, zoom):
+    """FeatureCollection simplifiée pour zoom ; propriétés des entités conservées."""
+    from shapely.geometry import mapping, shape
+
+    tolerance_m = contour_tolerance_m(zoom)
+    tolerance_deg = tolerance_m / METERS_PER_DEGREE
+    # Au-delà de la précision de la tolérance, les décimales n'apportent que des octets
+    decimals = 7 if tolerance_m < 1 else 6
+    features = []
+    source_count = 0
+    for feature in (contours_geojson or {}).get('features') or []:
+        geometry = feature.get('geometry')
+        if not geometry:
+            continue
+        source_count += 1
+        try:
+            geom = shape(geometry)
+        except (ValueError, TypeError, AttributeError):
+            continue
+        simplified = geom.simplify(tolerance_deg, preserve_topology=False)
+        if simplified.is_empty or simplified.length < 2 * tolerance_deg:
+            continue
+        features.append({
+            'type': 'Feature',
+            'properties': feature.get('properties') or {},
+            'geometry': _round_coordinates(mapping(simplified), decimals),
+        })
+    return {
+        'type': 'FeatureCollection',
+        'zoom': zoom,
+        'tolerance_m': tolerance_m,
+        'features_source': source_count,
+        'features': features,
+    }
+
+
+def _round_coordinates(geometry, decimals):
+    def round_coords(coords):
+        if coords and isinstance(coords[0], (int, float)):
+            return [round(c, decimals) for c in coords]
+        return [round_coords(c) for c in coords]
+
+    if geometry.get('type') == 'GeometryCollection':
+        return {'type': 'GeometryCollection',
+                'geometries': [_round_coordinates(g, decimals) for g in geometry['geometries']]}
+    return {'type': geometry['type'], 'coordinates': round_coords(geometry['coordinates'])}
+
+
+def contours_payload(garden, zoom):
+    """(etag, corps JSON, corps gzip) des courbes de niveau du jardin au zoom donné."""
+    etag = contours_etag(garden, zoom)
+    key = f'terrain_contours_{garden.pk}_{_etag_key(etag)}'
+    cached = cache.get(key)
+    if cached is None:
+        cached = _json_gzip(build_contour_level(garden.contours_geojson, zoom))
+        cache.set(key, cached, timeout=SPECIMEN_PAYLOAD_TIMEOUT)
+    return (etag, *cached)
@@ -1,16 +1,19 @@
 """
 Tests pour l'app species - API REST (mobile) et serializers critiques.
 """
-from datetime import date
+import os
+from datetime import date, timedelta
+from io import BytesIO, StringIO
 from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from catalog.models import MissingSpeciesRequest
-from .models import Garden, Organism, Specimen
+from .models import DataImportRun, Garden, Organism, Specimen
 
 User = get_user_model()
 
@@ -106,6 +109,64 @@ class SpecimenAPITestCase(TestCase):
         self.assertIsNotNone(resp.data.get("date"))
 
 
+class SpecimenNearbyAPITestCase(TestCase):
+    """GET /api/specimens/nearby/ — préfiltre boîte englobante + index en grille par jardin."""
+
+    def setUp(self):
+        from .spatial import invalidate_garden_index
+
+        invalidate_garden_index()
+        self.client = APIClient()
+        self.user, self.garden, self.organism, self.specimen = create_test_data()
+        self.specimen.latitude, self.specimen.longitude = 45.9000, -74.1000
+        self.specimen.save()
+        self.proche = Specimen.objects.create(
+            organisme=self.organism, garden=self.garden, nom="Pomme proche",
+            latitude=45.9003, longitude=-74.1000,
+        )
+        self.loin = Specimen.objects.create(
+            organisme=self.organism, garden=self.garden, nom="Pomme loin",
+            latitude=46.5000, longitude=-74.1000,
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_sorted_by_distance_within_radius(self):
+        for params in ("", f"&garden={self.garden.id}"):
+            resp = self.client.get(f"/api/specimens/nearby/?lat=45.9&lng=-74.1&radius=500{params}")
+            self.assertEqual(resp.status_code, status.HTTP_200_OK)
+            self.assertEqual([s["nom"] for s in resp.data], ["Pomme 1", "Pomme proche"])
+            self.assertLess(resp.data[0]["distance_km"], resp.data[1]["distance_km"])
+
+    def test_limit_and_grid_rebuilt_after_save(self):
+        url = f"/api/specimens/nearby/?lat=46.5&lng=-74.1&radius=500&garden={self.garden.id}"
+        resp = self.client.get(url)
+        self.assertEqual([s["nom"] for s in resp.data], ["Pomme loin"])
+        self.proche.latitude = 46.5001
+        self.proche.save()
+        resp = self.client.get(url + "&limit=1")
+        self.assertEqual([s["nom"] for s in resp.data], ["Pomme loin"])
+        resp = self.client.get(url)
+        self.assertEqual([s["nom"] for s in resp.data], ["Pomme loin", "Pomme proche"])
+
+    def test_shared_version_and_limit_after_fresh_distance(self):
+        from django.core.cache import cache
+
+        from .spatial import _version_key, get_garden_index
+
+        self.proche.latitude = 46.50005
+        self.proche.save()
+        url = f"/api/specimens/nearby/?lat=46.50005&lng=-74.1&radius=500&garden={self.garden.id}&limit=1"
+        self.assertEqual([s["nom"] for s in self.client.get(url).data], ["Pomme proche"])
+        index = get_garden_index(self.garden.id)
+        # update() sans signal : l'index garde l'ancienne position, limit s'applique après recalcul
+        Specimen.objects.filter(pk=self.proche.pk).update(latitude=45.0)
+        self.assertEqual([s["nom"] for s in self.client.get(url).data], ["Pomme loin"])
+        self.assertIs(get_garden_index(self.garden.id), index)
+        # Invalidation faite par un autre worker : version partagée changée
+        cache.set(_version_key(self.garden.id), "autre-worker", timeout=None)
+        self.assertIsNot(get_garden_index(self.garden.id), index)
+
+
 class SpecimenSerializerTestCase(TestCase):
     """Tests des serializers critiques."""
 
@@ -143,6 +204,1780 @@ class SpecimenSerializerTestCase(TestCase):
         self.assertEqual(ev.type_event, "observation")
 
 
+class PhotoRenditionsTestCase(TestCase):
+    """Déclinaisons thumb / medium / full : vue paresseuse, commande de rattrapage, URLs des sérialiseurs."""
+
+    def setUp(self):
+        import tempfile
+
+        from django.test import override_settings
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        media = override_settings(MEDIA_ROOT=tmp.name, PHOTO_RENDITION_FORMAT="WEBP")
+        media.enable()
+        self.addCleanup(media.disable)
+        self.user, self.garden, self.organism, self.specimen = create_test_data()
+
+    def _photo(self, size=(1200, 900)):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from PIL import Image
+
+        from .models import Photo
+
+        buf = BytesIO()
+        Image.new("RGB", size, (40, 120, 40)).save(buf, "JPEG")
+        image = SimpleUploadedFile("pommier.jpg", buf.getvalue(), content_type="image/jpeg")
+        return Photo.objects.create(specimen=self.specimen, image=image, type_photo="autre")
+
+    def test_lazy_view_then_direct_urls(self):
+        from django.test import RequestFactory
+        from PIL import Image
+
+        from .photo_renditions import rendition_name
+        from .serializers import PhotoSerializer, SpecimenListSerializer
+
+        photo = self._photo()
+        request = RequestFactory().get("/")
+        data = PhotoSerializer(photo, context={"request": request}).data
+        self.assertIn(f"/api/photos/{photo.pk}/rendition/thumb/", data["thumb_url"])
+
+        response = self.client.get(f"/api/photos/{photo.pk}/rendition/thumb/")
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response["Location"].endswith(".webp"))
+        storage = photo.image.storage
+        with storage.open(rendition_name(photo.image.name, "thumb")) as f, Image.open(f) as thumb:
+            self.assertEqual(thumb.size, (160, 120))
+        with storage.open(rendition_name(photo.image.name, "full")) as f, Image.open(f) as full:
+            self.assertEqual(full.size, (1200, 900))  # jamais agrandie
+
+        # Fichiers présents : les URLs pointent directement les médias
+        data = PhotoSerializer(photo, context={"request": request}).data
+        self.assertIn("/media/renditions/medium/photos/", data["medium_url"])
+        self.assertEqual(self.client.get(f"/api/photos/{photo.pk}/rendition/huge/").status_code, 404)
+        row = SpecimenListSerializer(self.specimen, context={"request": request}).data
+        self.assertIn("/media/renditions/thumb/", row["photo_principale_thumb_url"])
+
+    def test_backfill_command(self):
+        from django.core.management import call_command
+
+        from .photo_renditions import RENDITIONS, rendition_exists
+
+        photos = [self._photo(), self._photo((300, 200))]
+        out = StringIO()
+        call_command("generate_photo_renditions", workers=2, stdout=out)
+        self.assertIn("2 photo(s) traitée(s)", out.getvalue())
+        for photo in photos:
+            self.assertTrue(all(rendition_exists(photo, size) for size in RENDITIONS))
+        call_command("generate_photo_renditions", stdout=out)
+        self.assertIn("0 photo(s) traitée(s), 2 déjà à jour", out.getvalue())
+
+        photos[0].delete()
+        self.assertFalse(rendition_exists(photos[0], "thumb"))
+
+
+class BulkEventsTestCase(TestCase):
+    """Événements en masse (species.bulk_events) : zone, lot de la file hors ligne, rappel complété."""
+
+    def setUp(self):
+        import tempfile
+
+        from django.test import override_settings
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        media = override_settings(MEDIA_ROOT=tmp.name, PHOTO_RENDITIONS_ON_UPLOAD=False)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.client = APIClient()
+        self.user, self.garden, self.organism, self.specimen = create_test_data()
+        self.client.force_authenticate(user=self.user)
+        Specimen.objects.filter(pk=self.specimen.pk).update(zone_jardin="Verger")
+        self.voisins = [
+            Specimen.objects.create(organisme=self.organism, garden=self.garden, nom=f"Pomme {i}", zone_jardin="verger")
+            for i in range(2, 6)
+        ]
+
+    def test_apply_to_zone_references_photos(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        from .models import Event, Photo
+
+        event = Event.objects.create(specimen=self.specimen, type_event="paillage", date=date(2026, 5, 2), titre="Copeaux")
+        photo = Photo.objects.create(
+            specimen=self.specimen, event=event, image=SimpleUploadedFile("paillis.jpg", b"jpeg"), titre="Avant",
+        )
+        url = f"/api/specimens/{self.specimen.pk}/events/{event.pk}/apply-to-zone/"
+        # Nombre de requêtes indépendant de la taille de la zone
+        with self.assertNumQueries(9):
+            resp = self.client.post(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["created"], 4)
+        copies = Photo.objects.filter(event_id__in=resp.data["event_ids"])
+        self.assertEqual(copies.count(), 4)
+        self.assertEqual({p.image.name for p in copies}, {photo.image.name})
+        self.assertEqual(set(copies.values_list("specimen_id", flat=True)), {s.pk for s in self.voisins})
+        self.assertEqual(Event.objects.get(pk=resp.data["event_ids"][0]).titre, "Copeaux")
+
+    def test_batch_creates_valid_items_and_reports_errors(self):
+        from .models import Event
+
+        resp = self.client.post("/api/specimens/events/batch/", {"events": [
+            {"specimen": self.voisins[0].pk, "type_event": "arrosage", "client_id": "a"},
+            {"specimen": 999999, "type_event": "arrosage", "client_id": "b"},
+            {"specimen": self.voisins[1].pk, "type_event": "inconnu"},
+            {"specimen": self.voisins[1].pk, "type_event": "taille", "date": "2026-04-01", "quantite": 2},
+        ]}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(resp.data["created"], 2)
+        results = resp.data["results"]
+        self.assertEqual(results[0]["client_id"], "a")
+        self.assertIn("specimen", results[1]["errors"])
+        self.assertIn("type_event", results[2]["errors"])
+        taille = Event.objects.get(pk=results[3]["event_id"])
+        self.assertEqual((taille.specimen_id, taille.date, taille.quantite), (self.voisins[1].pk, date(2026, 4, 1), 2))
+        self.assertEqual(Event.objects.get(pk=results[0]["event_id"]).date, date.today())
+
+    def test_complete_recurring_reminder_moves_it(self):
+        from .models import Event, Reminder
+
+        reminder = Reminder.objects.create(
+            specimen=self.specimen, type_rappel="arrosage", date_rappel=date.today(), recurrence_rule="biweekly",
+        )
+        resp = self.client.post(f"/api/specimens/{self.specimen.pk}/reminders/{reminder.pk}/complete/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(Event.objects.get(pk=resp.data["event_id"]).type_event, "arrosage")
+        reminder.refresh_from_db()
+        self.assertEqual(reminder.date_rappel, date.today() + timedelta(days=14))
+        self.assertEqual(resp.data["next_reminder"]["id"], reminder.pk)
+
+        once = Reminder.objects.create(specimen=self.specimen, type_rappel="taille", date_rappel=date.today())
+        resp = self.client.post(f"/api/specimens/{self.specimen.pk}/reminders/{once.pk}/complete/")
+        self.assertIsNone(resp.data["next_reminder"])
+        self.assertFalse(Reminder.objects.filter(pk=once.pk).exists())
+
+
+class DeltaSyncTestCase(TestCase):
+    """Synchronisation différentielle (species.delta_sync) : curseur, pagination, suppressions."""
+
+    def setUp(self):
+        self.user, self.garden, self.organism, self.specimen = create_test_data()
+        self.autres = [
+            Specimen.objects.create(organisme=self.organism, garden=self.garden, nom=f"Pomme {i}")
+            for i in range(2, 6)
+        ]
+
+    def _later(self, seconds=10):
+        from django.utils import timezone
+
+        return timezone.now() + timedelta(seconds=seconds)
+
+    def test_delta_after_snapshot_has_only_changes_and_tombstones(self):
+        import json
+
+        from django.core.serializers.json import DjangoJSONEncoder
+
+        from .delta_sync import sync_garden
+        from .models import Event
+
+        event = Event.objects.create(specimen=self.autres[0], type_event="arrosage", date=date(2026, 6, 1))
+        snapshot = sync_garden(self.garden.id, now=self._later())
+        self.assertTrue(snapshot["full"])
+        self.assertEqual(len(snapshot["changes"]["specimens"]), 5)
+        self.assertEqual(snapshot["changes"]["events"][0]["id"], event.id)
+
+        # Après la marque haute du premier appel
+        with patch("django.utils.timezone.now", return_value=self._later(20)):
+            self.specimen.notes = "Taillé"
+            self.specimen.save()
+            supprime_id = self.autres[1].id
+            self.autres[1].delete()
+        delta = sync_garden(self.garden.id, snapshot["cursor"], now=self._later(30))
+        self.assertFalse(delta["full"])
+        self.assertEqual([row["id"] for row in delta["changes"]["specimens"]], [self.specimen.id])
+        self.assertEqual(set(delta["changes"]), {"specimens"})
+        self.assertEqual(delta["deleted"], {"specimens": [supprime_id]})
+        self.assertLess(len(json.dumps(delta, cls=DjangoJSONEncoder)), 2000)
+
+        unchanged = sync_garden(self.garden.id, delta["cursor"], now=self._later(40))
+        self.assertEqual((unchanged["changes"], unchanged["deleted"]), ({}, {}))
+
+    def test_cascade_deletes_are_scoped_to_garden(self):
+        from gardens.models import Garden
+
+        from .delta_sync import sync_garden
+        from .models import Event
+
+        Event.objects.create(specimen=self.autres[0], type_event="arrosage", date=date(2026, 6, 1))
+        autre_jardin = Garden.objects.create(nom="Autre")
+        ailleurs = Specimen.objects.create(organisme=self.organism, garden=autre_jardin, nom="Ailleurs")
+        Event.objects.create(specimen=ailleurs, type_event="arrosage", date=date(2026, 6, 1))
+        cursor = sync_garden(self.garden.id, now=self._later())["cursor"]
+        supprime_id = self.autres[0].id
+        with patch("django.utils.timezone.now", return_value=self._later(20)):
+            self.autres[0].delete()
+            ailleurs.delete()
+        delta = sync_garden(self.garden.id, cursor, now=self._later(30))
+        self.assertEqual(set(delta["deleted"]), {"specimens", "events"})
+        self.assertEqual(delta["deleted"]["specimens"], [supprime_id])
+        self.assertEqual(len(delta["deleted"]["events"]), 1)
+
+    def test_moved_specimen_leaves_old_garden_with_its_children(self):
+        from gardens.models import Garden
+
+        from .delta_sync import sync_garden
+        from .models import Event, SpecimenGroup, SpecimenGroupMember
+
+        event = Event.objects.create(specimen=self.autres[0], type_event="arrosage", date=date(2026, 6, 1))
+        groupe = SpecimenGroup.objects.create(type_groupe="male_female")
+        SpecimenGroupMember.objects.create(group=groupe, specimen=self.autres[0], role="pollinisateur")
+        autre_jardin = Garden.objects.create(nom="Autre")
+        cursors = {g: sync_garden(g, now=self._later())["cursor"] for g in (self.garden.id, autre_jardin.id)}
+        with patch("django.utils.timezone.now", return_value=self._later(20)):
+            specimen = Specimen.objects.get(pk=self.autres[0].pk)
+            specimen.garden = autre_jardin
+            specimen.save()
+        old = sync_garden(self.garden.id, cursors[self.garden.id], now=self._later(30))
+        self.assertEqual(old["deleted"], {"specimens": [specimen.id]})
+        new = sync_garden(autre_jardin.id, cursors[autre_jardin.id], now=self._later(30))
+        self.assertEqual([row["id"] for row in new["changes"]["specimens"]], [specimen.id])
+        self.assertEqual([row["id"] for row in new["changes"]["events"]], [event.id])
+        self.assertEqual([row["id"] for row in new["changes"]["specimen_groups"]], [groupe.id])
+
+        # Groupe supprimé : trace dans le seul jardin de ses membres
+        groupe_id = groupe.id
+        with patch("django.utils.timezone.now", return_value=self._later(40)):
+            groupe.delete()
+        self.assertEqual(
+            sync_garden(autre_jardin.id, new["cursor"], now=self._later(50))["deleted"], {"specimen_groups": [groupe_id]}
+        )
+        self.assertEqual(sync_garden(self.garden.id, old["cursor"], now=self._later(50))["deleted"], {})
+
+    def test_api_pages_with_cursor(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        url = f"/api/gardens/{self.garden.id}/sync/"
+        with patch("species.delta_sync.SYNC_SETTLE_SECONDS", -10), patch("species.delta_sync.SYNC_PAGE_SIZE", 3):
+            first = client.get(url).json()
+            self.assertTrue(first["has_more"])
+            second = client.get(url, {"cursor": first["cursor"]}).json()
+        self.assertFalse(second["has_more"])
+        ids = [row["id"] for page in (first, second) for row in page["changes"]["specimens"]]
+        self.assertEqual(sorted(ids), sorted([self.specimen.id] + [s.id for s in self.autres]))
+        self.assertEqual(client.get(url, {"cursor": "altéré"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class DashboardFeedTestCase(TestCase):
+    """Accueil précalculé (species.dashboard_feed) : lecture seule, invalidation ciblée, ETag."""
+
+    def setUp(self):
+        from .models import SpecimenFavorite
+
+        self.user, self.garden, self.organism, self.specimen = create_test_data()
+        SpecimenFavorite.objects.create(user=self.user, specimen=self.specimen)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_unchanged_feed_is_one_read_and_304(self):
+        first = self.client.get("/api/me/dashboard/")
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertLessEqual({"expected_events", "reminders", "weather_alerts"}, set(first.data))
+        with self.assertNumQueries(1):
+            again = self.client.get("/api/me/dashboard/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_reminder_marks_only_favoriters(self):
+        from .dashboard_feed import get_feed
+        from .models import DashboardFeed, Reminder
+
+        autre = User.objects.create_user(username="autre", password="x")
+        get_feed(self.user)
+        get_feed(autre)
+        Reminder.objects.create(specimen=self.specimen, type_rappel="arrosage", date_rappel=date.today(), titre="Arroser")
+        self.assertTrue(DashboardFeed.objects.get(user=self.user).reminders_stale)
+        self.assertFalse(DashboardFeed.objects.get(user=autre).reminders_stale)
+
+        response = self.client.get("/api/reminders/upcoming/")
+        self.assertEqual([r["titre"] for r in response.data], ["Arroser"])
+        self.assertFalse(response.data[0]["is_overdue"])
+
+    def test_date_roll_recomputes_overdue(self):
+        from .dashboard_feed import get_feed, refresh_all_feeds
+        from .models import DashboardFeed, Reminder
+
+        Reminder.objects.create(specimen=self.specimen, type_rappel="arrosage", date_rappel=date.today())
+        get_feed(self.user)
+        self.assertEqual(refresh_all_feeds(), 0)
+        self.assertEqual(refresh_all_feeds(today=date.today() + timedelta(days=1)), 1)
+        self.assertTrue(DashboardFeed.objects.get(user=self.user).payload["reminders"][0]["is_overdue"])
+
+    def test_rename_marks_favoriters_and_survives_refresh(self):
+        from unittest import mock
+
+        from . import dashboard_feed
+        from .models import DashboardFeed, Organism
+
+        dashboard_feed.get_feed(self.user)
+        organism = Organism.objects.get(pk=self.organism.pk)
+        organism.save()
+        self.assertFalse(DashboardFeed.objects.get(user=self.user).expected_stale)
+        organism.nom_commun = "Tomate renommée"
+        organism.save(update_fields=["nom_commun"])
+        self.assertTrue(DashboardFeed.objects.get(user=self.user).expected_stale)
+
+        # Renommage pendant le recalcul : l'indicateur levé entre-temps n'est pas effacé
+        compute = dashboard_feed.compute_upcoming_reminders
+
+        def rename_during_compute(user_id, today):
+            organism.nom_commun = "Tomate encore renommée"
+            organism.save(update_fields=["nom_commun"])
+            return compute(user_id, today)
+
+        with mock.patch.object(dashboard_feed, "compute_upcoming_reminders", rename_during_compute):
+            feed = dashboard_feed.get_feed(self.user)
+        self.assertEqual(feed.payload["reminders"], [])
+        stored = DashboardFeed.objects.get(user=self.user)
+        self.assertTrue(stored.expected_stale and stored.reminders_stale)
+        self.assertEqual(stored.etag, feed.etag)
+
+
+def _square(lng, lat, half_deg):
+    return {
+        "type": "Polygon",
+        "coordinates": [[
+            [lng - half_deg, lat - half_deg], [lng + half_deg, lat - half_deg],
+            [lng + half_deg, lat + half_deg], [lng - half_deg, lat + half_deg], [lng - half_deg, lat - half_deg],
+        ]],
+    }
+
+
+class GeometryTestCase(TestCase):
+    """Mesures des zones et zone des spécimens (species.geometry)."""
+
+    def setUp(self):
+        from gardens.models import Zone
+
+        self.user, self.garden, self.organism, self.specimen = create_test_data()
+        self.grande = Zone.objects.create(garden=self.garden, nom="Verger", boundary=_square(-73.6, 45.5, 0.001))
+        self.petite = Zone.objects.create(garden=self.garden, nom="Potager", boundary=_square(-73.6, 45.5, 0.0002))
+
+    def test_zone_save_uses_cached_transformer(self):
+        from gardens.models import Zone
+
+        from .geometry import get_transformer
+
+        self.assertAlmostEqual(self.grande.surface_m2, 156.0 * 222.6, delta=0.05 * 156.0 * 222.6)
+        self.assertAlmostEqual(self.grande.centroide_latitude, 45.5, places=4)
+        self.assertAlmostEqual(self.grande.perimetre_m, 2 * (156.0 + 222.6), delta=0.05 * 2 * (156.0 + 222.6))
+        misses = get_transformer.cache_info().misses
+        Zone.objects.create(garden=self.garden, nom="Bois", boundary=_square(-73.59, 45.5, 0.001))
+        self.assertEqual(get_transformer.cache_info().misses, misses)
+
+    def test_recompute_command_and_specimen_assignment(self):
+        from django.core.management import call_command
+
+        from gardens.models import Zone
+
+        Zone.objects.update(surface_m2=None, perimetre_m=None)
+        centre = Specimen.objects.create(
+            organisme=self.organism, garden=self.garden, nom="Centre", latitude=45.5, longitude=-73.6,
+        )
+        bord = Specimen.objects.create(
+            organisme=self.organism, garden=self.garden, nom="Bord", latitude=45.5008, longitude=-73.6,
+        )
+        dehors = Specimen.objects.create(
+            organisme=self.organism, garden=self.garden, nom="Dehors", latitude=45.6, longitude=-73.6,
+        )
+        out = StringIO()
+        call_command("recompute_zone_metrics", "--assign-specimens", stdout=out)
+        self.assertIn("Zones : 2 mise(s) à jour sur 2.", out.getvalue())
+        self.assertIsNotNone(Zone.objects.get(pk=self.grande.pk).surface_m2)
+        zones = dict(Specimen.objects.filter(pk__in=[centre.pk, bord.pk, dehors.pk]).values_list("nom", "zone_id"))
+        self.assertEqual(zones, {"Centre": self.petite.pk, "Bord": self.grande.pk, "Dehors": None})
+
+
+class StreamingExportTestCase(TestCase):
+    """Exports CSV en flux (values_list) et PDF page par page sans plafond de 100 lignes."""
+
+    def setUp(self):
+        self.user, self.garden, self.organism, self.specimen = create_test_data()
+        Organism.objects.bulk_create([
+            Organism(nom_commun=f"Export {i:03d}", nom_latin=f"Exportus {i:03d}", type_organisme="vivace",
+                     zone_rusticite=[{"zone": "5a", "source": "pfaf"}, {"zone": "4b", "source": "usda"}])
+            for i in range(150)
+        ])
+
+    def test_specimens_csv_is_streamed(self):
+        from .export_utils import export_specimens_csv
+
+        response = export_specimens_csv(Specimen.objects.all())
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode("utf-8").splitlines()
+        self.assertTrue(lines[0].startswith("\ufeffNom,Organisme"))
+        self.assertEqual(len(lines), 1 + Specimen.objects.count())
+        self.assertIn(self.specimen.nom, lines[1])
+
+    def test_generic_csv_exports_relations_by_label(self):
+        from .export_utils import export_queryset_csv
+
+        qs = Specimen.objects.filter(pk=self.specimen.pk)
+        lines = b"".join(export_queryset_csv(qs, [("nom", "Nom"), ("organisme", "Organisme")]).streaming_content)
+        self.assertEqual(lines.decode("utf-8").splitlines()[1], f"{self.specimen.nom},{self.specimen.organisme}")
+
+    def test_organisms_exports_have_no_row_cap(self):
+        import re
+
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from .export_utils import export_organisms_csv_simple, write_organisms_pdf
+
+        qs = Organism.objects.filter(nom_commun__startswith="Export ").order_by("nom_commun")
+        rows = b"".join(export_organisms_csv_simple(qs).streaming_content).decode("utf-8").splitlines()
+        self.assertEqual(len(rows), 151)
+        self.assertIn(",4b,", rows[1])  # zone la plus froide
+
+        pdf = BytesIO()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(write_organisms_pdf(qs, pdf), 150)
+        self.assertFalse(any("COUNT(" in q["sql"] for q in ctx.captured_queries))
+        self.assertGreaterEqual(len(re.findall(rb"/Type /Page\b(?!s)", pdf.getvalue())), 3)
+
+
+class ListQueryBudgetTestCase(TestCase):
+    """Listes /api/specimens/ et /api/organisms/ : nombre de requêtes indépendant de la taille de page."""
+
+    def setUp(self):
+        from catalog.models import Cultivar, CultivarPorteGreffe
+        from .models import OrganismFavorite, SpecimenFavorite
+
+        self.client = APIClient()
+        self.user, self.garden, self.organism, self.specimen = create_test_data()
+        self.client.force_authenticate(user=self.user)
+        cultivar = Cultivar.objects.create(organism=self.organism, slug_cultivar="malus-dolgo", nom="Dolgo")
+        CultivarPorteGreffe.objects.create(cultivar=cultivar, nom_porte_greffe="B9", hauteur_max_m=3.0, source="test")
+        organisms = Organism.objects.bulk_create([
+            Organism(nom_commun=f"Espèce {i:02d}", nom_latin=f"Species {i:02d}", type_organisme="vivace")
+            for i in range(20)
+        ])
+        specimens = Specimen.objects.bulk_create([
+            Specimen(organisme=self.organism, cultivar=cultivar, garden=self.garden, nom=f"Spécimen {i:02d}",
+                     statut="jeune")
+            for i in range(20)
+        ])
+        OrganismFavorite.objects.bulk_create([OrganismFavorite(user=self.user, organism=o) for o in organisms[::2]])
+        SpecimenFavorite.objects.bulk_create([SpecimenFavorite(user=self.user, specimen=s) for s in specimens[::2]])
+
+    def _queries(self, url, params):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries), response.data["results"]
+
+    def test_query_count_constant_with_page_size(self):
+        # /api/specimens/ : pagination fixe de 20 (21 spécimens → 1 seul en page 2)
+        for url, small_page, large_page in (
+            ("/api/specimens/", {"page": 2}, {"page": 1}),
+            ("/api/organisms/", {"page_size": 5}, {"page_size": 20}),
+        ):
+            small, small_rows = self._queries(url, small_page)
+            large, large_rows = self._queries(url, large_page)
+            self.assertGreater(len(large_rows), len(small_rows))
+            self.assertTrue(any(row["is_favori"] for row in large_rows), url)
+            self.assertEqual(small, large, url)
+            self.assertLessEqual(large, 10, url)
+
+
+class MissingPollinatorsTestCase(TestCase):
+    """warnings.compute_missing_pollinators : résolution en mémoire, nombre de requêtes constant."""
+
+    def setUp(self):
+        from catalog.models import Cultivar, CultivarPollinator
+
+        _, self.garden, self.organism, _ = create_test_data()
+        self.poirier = Organism.objects.create(
+            nom_commun="Poirier", nom_latin="Pyrus communis", type_organisme="arbre_fruitier",
+        )
+        self.dolgo = Cultivar.objects.create(organism=self.organism, slug_cultivar="malus-dolgo", nom="Dolgo")
+        self.chestnut = Cultivar.objects.create(organism=self.organism, slug_cultivar="malus-chestnut", nom="Chestnut")
+        CultivarPollinator.objects.create(cultivar=self.dolgo, companion_cultivar=self.chestnut)
+        CultivarPollinator.objects.create(cultivar=self.dolgo, companion_organism=self.poirier)
+
+    def _plant(self, nom, cultivar=None, organisme=None, statut="jeune"):
+        return Specimen.objects.create(
+            organisme=organisme or self.organism, cultivar=cultivar, garden=self.garden, nom=nom, statut=statut,
+        )
+
+    def test_reports_missing_companions(self):
+        from .warnings import compute_missing_pollinators
+
+        for i in range(5):
+            self._plant(f"Dolgo {i}", cultivar=self.dolgo)
+        self._plant("Dolgo mort", cultivar=self.dolgo, statut="mort")
+        with self.assertNumQueries(2):
+            result = compute_missing_pollinators(self.garden.id)
+        self.assertEqual(len(result), 5)
+        self.assertEqual(result[0]["cultivar_nom"], "Dolgo")
+        self.assertEqual(result[0]["pollinisateurs_manquants"], ["Chestnut", "Poirier"])
+
+    def test_companions_present_and_query_count_constant(self):
+        from .warnings import compute_missing_pollinators
+
+        for i in range(30):
+            self._plant(f"Dolgo {i}", cultivar=self.dolgo)
+        self._plant("Chestnut 1", cultivar=self.chestnut)
+        self._plant("Poirier 1", organisme=self.poirier)
+        with self.assertNumQueries(2):
+            self.assertEqual(compute_missing_pollinators(self.garden.id), [])
+
+
+class PhenologyAlertsTestCase(TestCase):
+    """phenology : moteur par lots (plusieurs jardins × plusieurs dates de référence)."""
+
+    def setUp(self):
+        from catalog.models import OrganismCalendrier
+
+        _, self.garden, self.organism, self.specimen = create_test_data()
+        OrganismCalendrier.objects.create(organisme=self.organism, type_periode="floraison", mois_debut=5, mois_fin=6)
+        OrganismCalendrier.objects.create(organisme=self.organism, type_periode="semis", mois_debut=5, mois_fin=5)
+
+    def test_upcoming_window_unless_confirmed(self):
+        from .models import Event
+        from .phenology import compute_phenology_alerts
+
+        alerts = compute_phenology_alerts(self.garden.id, reference_date=date(2026, 4, 24))
+        self.assertEqual(len(alerts), 1)
+        self.assertEqual(alerts[0]["type_periode"], "floraison")
+        self.assertEqual(alerts[0]["jours_restants"], 7)
+        self.assertEqual(compute_phenology_alerts(self.garden.id, reference_date=date(2026, 4, 10)), [])
+        Event.objects.create(specimen=self.specimen, type_event="floraison", date=date(2026, 4, 1))
+        self.assertEqual(compute_phenology_alerts(self.garden.id, reference_date=date(2026, 4, 24)), [])
+
+    def test_season_batch_constant_queries(self):
+        from .phenology import compute_phenology_alerts_batch
+
+        other = Garden.objects.create(nom="Autre jardin")
+        Specimen.objects.create(organisme=self.organism, garden=other, nom="Pomme 2", statut="etabli")
+        season = [date(2026, 4, 1) + timedelta(days=i) for i in range(60)]
+        with self.assertNumQueries(3):
+            result = compute_phenology_alerts_batch([self.garden.id, other.id], season)
+        self.assertEqual(len(result), 120)
+        self.assertEqual(result[(other.id, date(2026, 4, 17))][0]["jours_restants"], 14)
+        self.assertEqual(result[(other.id, date(2026, 4, 16))], [])
+        self.assertEqual(result[(self.garden.id, date(2026, 5, 1))][0]["jours_restants"], 0)
+
+
+class GardenCompanionsTestCase(TestCase):
+    """companion : matrice de compagnonnage par jardin (par spécimen et endpoint groupé)."""
+
+    def setUp(self):
+        from catalog.models import CompanionRelation
+
+        self.client = APIClient()
+        self.user, self.garden, self.organism, self.specimen = create_test_data()
+        self.specimen.latitude, self.specimen.longitude = 45.9000, -74.1000
+        self.specimen.save()
+        self.trefle = Organism.objects.create(nom_commun="Trèfle", nom_latin="Trifolium repens", type_organisme="couvre_sol")
+        self.noyer = Organism.objects.create(nom_commun="Noyer noir", nom_latin="Juglans nigra", type_organisme="arbre_noix")
+        CompanionRelation.objects.create(
+            organisme_source=self.trefle, organisme_cible=self.organism, type_relation="fixateur_azote", distance_optimale=20,
+        )
+        CompanionRelation.objects.create(
+            organisme_source=self.noyer, organisme_cible=self.organism, type_relation="allelopathie",
+        )
+        Specimen.objects.create(organisme=self.trefle, garden=self.garden, nom="Trèfle loin", latitude=45.9010, longitude=-74.1000)
+        self.trefle_proche = Specimen.objects.create(
+            organisme=self.trefle, garden=self.garden, nom="Trèfle proche", latitude=45.9001, longitude=-74.1000,
+        )
+        Specimen.objects.create(organisme=self.noyer, garden=self.garden, nom="Noyer mort", statut="mort")
+
+    def test_specimen_companions(self):
+        from .companion import compute_specimen_companions
+
+        with self.assertNumQueries(3):
+            data = compute_specimen_companions(self.specimen.id)
+        actif, = data["benefices_de"]["actifs"]
+        self.assertEqual(actif["specimen_id"], self.trefle_proche.id)
+        self.assertEqual(actif["status"], "ACTIF")
+        self.assertAlmostEqual(actif["distance_metres"], 11.1, places=1)
+        manquant, = data["benefices_de"]["manquants"]
+        self.assertEqual(manquant["organisme_nom"], "Noyer noir")
+        self.assertEqual(manquant["status"], "MANQUANT")
+        self.assertEqual(len(data["aide_a"]["actifs"]), 0)
+        aide, = compute_specimen_companions(self.trefle_proche.id)["aide_a"]["actifs"]
+        self.assertEqual(aide["specimen_id"], self.specimen.id)
+
+    def test_garden_bulk_endpoint(self):
+        self.client.force_authenticate(user=self.user)
+        resp = self.client.get(f"/api/gardens/{self.garden.id}/companions/")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(resp.data), 3)
+        by_id = {row["specimen_id"]: row for row in resp.data}
+        self.assertEqual(by_id[self.specimen.id]["benefices_de"]["actifs"][0]["specimen_nom"], "Trèfle proche")
+
+
+class CompanionGraphTestCase(TestCase):
+    """Graphe de compagnonnage en cache : sous-graphes à k sauts, filtres, ETag et invalidation."""
+
+    def setUp(self):
+        from catalog.models import CompanionRelation
+
+        self.orgs = {
+            nom: Organism.objects.create(nom_commun=nom, nom_latin=f"Genus {nom.lower()}", type_organisme="vivace")
+            for nom in ("Ail", "Carotte", "Fenouil", "Haricot")
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            for source, cible, type_relation, force in (
+                ("Ail", "Carotte", "repousse_nuisibles", 8),
+                ("Fenouil", "Carotte", "allelopathie", 3),
+                ("Fenouil", "Haricot", "allelopathie", 6),
+            ):
+                CompanionRelation.objects.create(
+                    organisme_source=self.orgs[source], organisme_cible=self.orgs[cible],
+                    type_relation=type_relation, force=force,
+                )
+
+    def _labels(self, subgraph):
+        return sorted(node["label"] for node in subgraph["nodes"])
+
+    def test_subgraph_queries(self):
+        from .companion_graph import get_companion_graph
+
+        graph = get_companion_graph()
+        ail = self.orgs["Ail"].pk
+        self.assertEqual(self._labels(graph.subgraph(ail, depth=1)), ["Ail", "Carotte"])
+        two_hops = graph.subgraph(ail, depth=2)
+        self.assertEqual(self._labels(two_hops), ["Ail", "Carotte", "Fenouil"])
+        self.assertEqual(len(two_hops["edges"]), 2)
+        self.assertEqual(self._labels(graph.subgraph(ail, depth=3, min_force=5)), ["Ail", "Carotte"])
+        self.assertEqual(
+            self._labels(graph.subgraph(types=["allelopathie"])), ["Carotte", "Fenouil", "Haricot"]
+        )
+        self.assertEqual(graph.subgraph(types=["allelopathie"], min_force=7), {"nodes": [], "edges": []})
+
+    def test_endpoint_etag_and_invalidation(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from catalog.models import CompanionRelation
+
+        admin = User.objects.create_superuser(username="admin-graph", password="x")
+        self.client.force_login(admin)
+        url = "/admin/species/companion-network/data/"
+        response = self.client.get(url, {"organism": self.orgs["Haricot"].pk, "depth": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count_nodes"], 3)
+        etag = response["ETag"]
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, {"organism": self.orgs["Haricot"].pk, "depth": 2},
+                                       HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(any("companionrelation" in q["sql"] for q in ctx.captured_queries))
+        self.assertEqual(self.client.get(url, {"depth": 9}).status_code, 400)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CompanionRelation.objects.create(
+                organisme_source=self.orgs["Haricot"], organisme_cible=self.orgs["Ail"],
+                type_relation="fixateur_azote", force=7,
+            )
+        response = self.client.get(url, {"organism": self.orgs["Haricot"].pk, "depth": 2},
+                                   HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count_nodes"], 4)
+        self.assertEqual(self.client.get("/admin/species/companion-network/").status_code, 200)
+
+    def test_only_renames_invalidate_graph(self):
+        ail = Organism.objects.get(pk=self.orgs["Ail"].pk)
+        with patch("species.companion_graph.invalidate_companion_graph") as invalidate:
+            ail.description = "Bulbe"
+            ail.save()
+            self.assertFalse(invalidate.called)
+            ail.nom_commun = "Ail cultivé"
+            ail.save()
+            ail.save()
+        self.assertEqual(invalidate.call_count, 1)
+
+
+class TerrainPayloadTestCase(TestCase):
+    """Vue terrain Cesium : spécimens en colonnes et courbes de niveau simplifiées (ETag, gzip)."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user, self.garden, self.organism, self.specimen = create_test_data()
+        Specimen.objects.filter(pk=self.specimen.pk).update(latitude=45.5, longitude=-73.6)
+        Specimen.objects.create(organisme=self.organism, garden=self.garden, nom="Pomme 2", statut="jeune")
+        self.client.force_authenticate(user=self.user)
+
+    def test_specimens_columns_decode_and_revalidate(self):
+        import base64
+        import gzip
+        import json
+
+        import numpy as np
+
+        url = f"/api/gardens/{self.garden.pk}/terrain/specimens/"
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        payload = json.loads(gzip.decompress(response.content))
+        self.assertEqual(payload["count"], 2)
+        latitudes = np.frombuffer(base64.b64decode(payload["typed"]["latitude"]["data"]), dtype="<f8")
+        self.assertEqual(latitudes[0], 45.5)
+        self.assertTrue(np.isnan(latitudes[1]))
+        noms = payload["dictionary"]["organisme_nom_commun"]
+        self.assertEqual(noms["values"], ["Pommier Dolgo"])
+        self.assertEqual(payload["columns"]["nom"], ["Pomme 1", "Pomme 2"])
+
+        etag = response["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Specimen.objects.create(organisme=self.organism, garden=self.garden, nom="Pomme 3")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["count"], 3)
+
+    def test_specimens_etag_follows_rootstocks_and_zones(self):
+        from catalog.models import Cultivar, CultivarPorteGreffe
+        from gardens.models import Zone
+
+        from .terrain_payload import specimens_etag
+
+        cultivar = Cultivar.objects.create(organism=self.organism, slug_cultivar="pommier-dolgo-dolgo", nom="Dolgo")
+        zone = Zone.objects.create(garden=self.garden, nom="Verger")
+        Specimen.objects.filter(pk=self.specimen.pk).update(cultivar=cultivar, zone=zone)
+        etags = [specimens_etag(self.garden.pk)]
+        porte_greffe = CultivarPorteGreffe.objects.create(cultivar=cultivar, nom_porte_greffe="B9", source="test")
+        etags.append(specimens_etag(self.garden.pk))
+        porte_greffe.delete()
+        etags.append(specimens_etag(self.garden.pk))
+        zone.nom = "Verger nord"
+        zone.save()
+        etags.append(specimens_etag(self.garden.pk))
+        zone.delete()
+        etags.append(specimens_etag(self.garden.pk))
+        # Chaque changement change l'empreinte (le retrait du porte-greffe ramène l'état initial)
+        self.assertTrue(all(before != after for before, after in zip(etags, etags[1:])))
+
+    def test_contours_simplified_by_zoom(self):
+        # Ligne presque droite de ~110 m, 200 sommets avec un bruit d'environ 1 m
+        coords = [[-73.6 + i * 0.000005, 45.5 + (0.00001 if i % 2 else 0)] for i in range(200)]
+        self.garden.contours_geojson = {"type": "FeatureCollection", "features": [
+            {"type": "Feature", "properties": {"elevation": 30}, "geometry": {"type": "LineString", "coordinates": coords}},
+        ]}
+        self.garden.save()
+        coarse = self.client.get(f"/api/gardens/{self.garden.pk}/terrain/contours/0/").json()
+        fine = self.client.get(f"/api/gardens/{self.garden.pk}/terrain/contours/4/").json()
+        coarse_points = len(coarse["features"][0]["geometry"]["coordinates"])
+        fine_points = len(fine["features"][0]["geometry"]["coordinates"])
+        self.assertLess(coarse_points, 10)
+        self.assertGreater(fine_points, coarse_points)
+        self.assertEqual(coarse["features"][0]["properties"], {"elevation": 30})
+        self.assertEqual(self.client.get(f"/api/gardens/{self.garden.pk}/terrain/contours/9/").json()["zoom"], 4)
+
+
+class GardenCacheTestCase(TestCase):
+    """garden_cache : clés versionnées par jardin et calcul unique sous concurrence."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+
+    def test_invalidation_bumps_version(self):
+        from .garden_cache import get_or_compute, invalidate_garden_cache
+
+        self.assertEqual(get_or_compute("warnings", 7, lambda: {"v": 1}), {"v": 1})
+        self.assertEqual(get_or_compute("warnings", 7, lambda: {"v": 2}), {"v": 1})
+        self.assertEqual(get_or_compute("warnings", 8, lambda: {"v": 3}), {"v": 3})
+        invalidate_garden_cache(7)
+        self.assertEqual(get_or_compute("warnings", 7, lambda: {"v": 4}), {"v": 4})
+        self.assertEqual(get_or_compute("warnings", 8, lambda: {"v": 5}), {"v": 3})
+
+    def test_concurrent_requests_compute_once(self):
+        import threading
+        import time
+
+        from .garden_cache import get_or_compute
+
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return {"total_count": 0}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(get_or_compute("warnings", 9, compute)))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"total_count": 0}] * 8)
+
+    def test_waits_for_lock_held_by_other_process(self):
+        import threading
+
+        from django.core.cache import cache
+
+        from .garden_cache import garden_cache_key, get_or_compute
+
+        # Verrou pris par un autre worker (cache.add) : pas de calcul ici, on attend son résultat
+        key = garden_cache_key("warnings", 10)
+        cache.add(f"{key}_lock", "autre-processus", timeout=60)
+        threading.Timer(0.2, lambda: cache.set(key, {"total_count": 3})).start()
+        self.assertEqual(get_or_compute("warnings", 10, lambda: self.fail("calcul en double")), {"total_count": 3})
+
+
+class LocalJSONServer:
+    """
+    Serveur HTTP local (thread) : route(path, params) → dict JSON ou (statut, dict).
+    Garde la liste des requêtes reçues.
+    """
+
+    def __init__(self, route):
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import parse_qs, urlparse
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                import json
+
+                url = urlparse(self.path)
+                params = parse_qs(url.query)
+                server.requests.append(params)
+                result = route(url.path, params)
+                # route peut renvoyer (statut, payload) pour simuler une erreur
+                status_code, payload = result if isinstance(result, tuple) else (200, result)
+                body = json.dumps(payload).encode()
+                self.send_response(status_code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.requests = []
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class FakeOpenMeteoServer(LocalJSONServer):
+    """Imite l'API forecast d'Open-Meteo (bloc daily)."""
+
+    def __init__(self, daily_for_params):
+        super().__init__(lambda path, params: {"daily": daily_for_params(params)})
+        self.url = f"{self.base_url}/v1/forecast"
+
+
+def _fake_forecast_daily(params):
+    """Prévision de 7 jours à partir d'aujourd'hui, forte pluie à J+1."""
+    today = date.today()
+    n = 7
+    return {
+        "time": [(today + timedelta(days=i)).isoformat() for i in range(n)],
+        "temperature_2m_max": [20.0] * n,
+        "temperature_2m_min": [10.0] * n,
+        "temperature_2m_mean": [15.0] * n,
+        "precipitation_sum": [0.0, 40.0] + [0.0] * (n - 2),
+        "rain_sum": [0.0, 40.0] + [0.0] * (n - 2),
+        "snowfall_sum": [0.0] * n,
+    }
+
+
+@override_settings(WEATHER_FETCH_ON_GARDEN_SAVE=False)
+class ForecastStoreTestCase(TestCase):
+    """Prévisions stockées par refresh_forecasts, lues par les vues sans appel réseau."""
+
+    def setUp(self):
+        self.user, self.garden, _, _ = create_test_data()
+        self.garden.latitude = 45.5
+        self.garden.longitude = -73.6
+        self.garden.save()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_refresh_then_views_read_store_only(self):
+        from django.core.management import call_command
+        from django.test import override_settings
+
+        from .models import ForecastSnapshot
+        from .weather_service import get_stored_forecast
+
+        with FakeOpenMeteoServer(_fake_forecast_daily) as fake, override_settings(OPEN_METEO_FORECAST_URL=fake.url):
+            call_command("refresh_forecasts", stdout=StringIO())
+            self.assertEqual(len(fake.requests), 1)
+            self.assertEqual(ForecastSnapshot.objects.filter(garden=self.garden).count(), 1)
+
+            with patch("requests.Session.request", side_effect=AssertionError("appel réseau depuis une vue")):
+                forecast = get_stored_forecast(self.garden, days=3)
+                response = self.client.get("/api/weather-alerts/")
+            self.assertEqual(len(fake.requests), 1)
+
+        self.assertEqual([d["date"] for d in forecast], [date.today() + timedelta(days=i) for i in (1, 2, 3)])
+        self.assertEqual(forecast[0]["precipitation_mm"], 40.0)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("heavy_rain_forecast", [a["type"] for a in response.data])
+
+    def test_dashboard_refresh_is_queued(self):
+        staff = User.objects.create_user(username="staff_meteo", password="x", is_staff=True)
+        self.client.force_login(staff)
+        with patch("requests.Session.request", side_effect=AssertionError("appel réseau depuis une vue")):
+            response = self.client.get("/admin/weather/?refresh=1")
+        self.assertEqual(response.status_code, 302)
+        runs = DataImportRun.objects.filter(status="queued").order_by("id")
+        self.assertEqual([r.source for r in runs], ["fetch_weather", "refresh_forecasts"])
+        self.assertEqual(runs[0].command_options, {"days": 14})
+
+    def test_stale_forecast_is_ignored(self):
+        from django.test import override_settings
+        from django.utils import timezone
+
+        from .models import ForecastSnapshot
+        from .weather_service import get_stored_forecast
+
+        ForecastSnapshot.objects.create(
+            garden=self.garden,
+            issued_at=timezone.now() - timedelta(hours=2),
+            days=[{"date": (date.today() + timedelta(days=1)).isoformat(), "precipitation_mm": 40.0}],
+        )
+        with override_settings(WEATHER_FORECAST_TTL_S=3 * 3600):
+            self.assertEqual(len(get_stored_forecast(self.garden)), 1)
+        with override_settings(WEATHER_FORECAST_TTL_S=3600):
+            self.assertEqual(get_stored_forecast(self.garden), [])
+
+
+@override_settings(WEATHER_FETCH_ON_GARDEN_SAVE=False)
+class WeatherIngestionTestCase(TestCase):
+    """fetch_weather : requêtes parallèles et upsert groupé par jardin sur (garden, date)."""
+
+    @staticmethod
+    def _daily_history(params):
+        past_days = int(params["past_days"][0])
+        lat = float(params["latitude"][0])
+        today = date.today()
+        times = [(today - timedelta(days=i)).isoformat() for i in range(past_days, -1, -1)]
+        n = len(times)
+        return {
+            "time": times + [(today + timedelta(days=1)).isoformat()],
+            "temperature_2m_max": [lat] * (n + 1),
+            "temperature_2m_min": [0.0] * (n + 1),
+            "temperature_2m_mean": [lat / 2] * (n + 1),
+            "precipitation_sum": [1.0] * (n + 1),
+            "rain_sum": [1.0] * (n + 1),
+            "snowfall_sum": [0.0] * (n + 1),
+            "et0_fao_evapotranspiration": [2.0] * (n + 1),
+        }
+
+    def test_concurrent_backfill_upserts(self):
+        from django.core.management import call_command
+        from django.test import override_settings
+
+        from .models import WeatherRecord
+
+        gardens = [
+            Garden.objects.create(nom=f"Jardin {i}", latitude=45.0 + i, longitude=-73.0)
+            for i in range(6)
+        ]
+        WeatherRecord.objects.create(garden=gardens[0], date=date.today(), temp_max=-99.0)
+        with FakeOpenMeteoServer(self._daily_history) as fake, override_settings(OPEN_METEO_FORECAST_URL=fake.url):
+            call_command("fetch_weather", days=92, workers=4, stdout=StringIO())
+            self.assertEqual(len(fake.requests), len(gardens))
+            call_command("fetch_weather", days=92, workers=4, stdout=StringIO())
+
+        for g in gardens:
+            self.assertEqual(WeatherRecord.objects.filter(garden=g).count(), 93)
+        today_record = WeatherRecord.objects.get(garden=gardens[0], date=date.today())
+        self.assertEqual(today_record.temp_max, 45.0)
+        self.assertFalse(WeatherRecord.objects.filter(date__gt=date.today()).exists())
+
+    def test_connection_pool_follows_workers(self):
+        from . import weather_service
+
+        with patch.object(weather_service, "_session", None), patch.object(weather_service, "_session_pool_size", 0):
+            session = weather_service._http_session()
+            self.assertEqual(session.get_adapter("https://example.org")._pool_maxsize, 1)
+            self.assertIs(weather_service._http_session(12), session)
+            self.assertEqual(session.get_adapter("https://example.org")._pool_maxsize, 12)
+            weather_service._http_session(4)
+            self.assertEqual(session.get_adapter("https://example.org")._pool_maxsize, 12)
+
+
+class FakeRadixSyncServer(LocalJSONServer):
+    """Imite l'API /sync/ de Radix Sylva (meta + ressources paginées par ?page=, lien next)."""
+
+    def __init__(self, data, page_size=20):
+        self.data = data
+
+        def route(path, params):
+            if path.endswith("/sync/meta/"):
+                return {"server_time": "2026-01-01T00:00:00Z"}
+            resource = path.rstrip("/").rsplit("/", 1)[-1]
+            rows = self.data.get(resource, [])
+            page = int(params.get("page", ["1"])[0])
+            chunk = rows[(page - 1) * page_size:page * page_size]
+            more = page * page_size < len(rows)
+            return {
+                "results": chunk,
+                "next": f"{self.base_url}{path}?page={page + 1}" if more else None,
+            }
+
+        super().__init__(route)
+        self.api_url = f"{self.base_url}/api/v1"
+
+
+def radix_sync_dataset(n_organisms, suffix=""):
+    """Jeu de données Radix : amendements, organismes (+ enfants), cultivars (+ pollinisateurs), compagnonnage."""
+    from django.forms.models import model_to_dict
+
+    from species.management.commands.sync_radixsylva import ORGANISM_SYNC_FIELDS
+
+    blank = model_to_dict(Organism(), fields=ORGANISM_SYNC_FIELDS)
+    organisms = []
+    for i in range(1, n_organisms + 1):
+        organisms.append({
+            **blank,
+            "id": i,
+            "nom_commun": f"Espèce {i}{suffix}",
+            "nom_latin": f"Genus species{i}",
+            "slug_latin": None,
+            "type_organisme": "vivace",
+            "date_ajout": "2020-01-01T00:00:00Z",
+            "noms": [
+                {"nom": f"Espèce {i}", "langue": "fr", "source": "vascan", "principal": True},
+                {"nom": f"Species {i}{suffix}", "langue": "en", "source": "vascan"},
+            ],
+            "proprietes": [{"type_sol": ["argileux"], "ph_min": 5.5, "ph_max": 7.0, "source": "pfaf"}],
+            "usages": [{"type_usage": "comestible_fruit", "parties": "fruits", "source": "pfaf"}],
+            "calendrier": [{"type_periode": "floraison", "mois_debut": 5, "mois_fin": 6, "source": "pfaf"}],
+            "amendements_recommandes": [{"amendment_id": 1, "priorite": 2}],
+        })
+    cultivars = [
+        {
+            "id": c, "organism_id": 1, "slug_cultivar": f"genus-species1-c{c}", "nom": f"C{c}",
+            "porte_greffes": [{"nom_porte_greffe": "B9", "source": "pepiniere", "disponible_chez": ["x"]}],
+            # Le cultivar 1 référence le cultivar 3, appliqué sur une page suivante
+            "pollinators": [{"companion_cultivar_id": 3 if c == 1 else None, "companion_organism_id": 2}],
+        }
+        for c in (1, 2, 3)
+    ]
+    return {
+        "amendments": [{
+            "id": 1, "nom": "Compost", "type_amendment": "organique", "azote_n": 1.0, "phosphore_p": None,
+            "potassium_k": None, "effet_ph": "", "bon_pour_sols": [], "bon_pour_types": [], "description": "",
+            "dose_recommandee": "", "periode_application": "", "biologique": True,
+            "date_ajout": "2019-05-01T00:00:00Z",
+        }],
+        "organisms": organisms,
+        "cultivars": cultivars,
+        "companions": [{
+            "id": 1, "organisme_source_id": 1, "organisme_cible_id": 2, "type_relation": "attire_pollinisateurs",
+        }],
+    }
+
+
+def run_radix_sync(data, page_size=20, **options):
+    """sync_radixsylva --full contre FakeRadixSyncServer servant data."""
+    from django.core.management import call_command
+    from django.test import override_settings
+
+    with FakeRadixSyncServer(data, page_size=page_size) as radix, override_settings(RADIX_SYLVA_API_URL=radix.api_url):
+        call_command("sync_radixsylva", full=True, stdout=StringIO(), **options)
+
+
+class RadixSyncBulkApplyTestCase(TestCase):
+    """sync_radixsylva : application par pages contre un stand-in local de l'API Radix."""
+
+    def _sync(self, data, page_size=20):
+        run_radix_sync(data, page_size=page_size, no_rebuild_search=True)
+
+    def test_full_sync_then_diff_leaves_unchanged_rows(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from catalog.models import CultivarPollinator, OrganismCalendrier, OrganismNom
+
+        self._sync(radix_sync_dataset(50), page_size=2)
+        self.assertEqual(Organism.objects.count(), 50)
+        self.assertEqual(OrganismNom.objects.count(), 100)
+        self.assertEqual(Organism.objects.get(pk=7).date_ajout.year, 2020)
+        self.assertEqual(Organism.objects.get(pk=7).slug_latin, "genus-species7")
+        self.assertTrue(CultivarPollinator.objects.filter(cultivar_id=1, companion_cultivar_id=3).exists())
+
+        calendrier_ids = set(OrganismCalendrier.objects.values_list("pk", flat=True))
+        fr_ids = set(OrganismNom.objects.filter(langue="fr").values_list("pk", flat=True))
+        with CaptureQueriesContext(connection) as ctx:
+            self._sync(radix_sync_dataset(50, suffix=" v2"), page_size=25)
+        self.assertLess(len(ctx.captured_queries), 100)
+        self.assertEqual(set(OrganismCalendrier.objects.values_list("pk", flat=True)), calendrier_ids)
+        self.assertEqual(set(OrganismNom.objects.filter(langue="fr").values_list("pk", flat=True)), fr_ids)
+        self.assertEqual(OrganismNom.objects.get(organism_id=3, langue="en").nom, "Species 3 v2")
+        self.assertEqual(OrganismNom.objects.count(), 100)
+        self.assertEqual(CultivarPollinator.objects.count(), 3)
+
+
+class SearchVectorDirtySetTestCase(TestCase):
+    """search_vector : seuls les organismes modifiés sont recalculés, en un lot au commit."""
+
+    def setUp(self):
+        from catalog.search_vectors import flush_dirty_search_vectors
+
+        # TestCase n'exécute pas les on_commit : vider ce que les tests précédents ont marqué
+        with patch("catalog.search_vectors.refresh_search_vectors"):
+            flush_dirty_search_vectors()
+
+    def test_saves_and_name_changes_flush_once_on_commit(self):
+        from catalog.models import OrganismNom
+        from catalog.search_vectors import pending_search_vector_ids
+
+        a = Organism.objects.create(nom_commun="Aulne", nom_latin="Alnus incana", type_organisme="arbre_ornement")
+        b = Organism.objects.create(nom_commun="Bouleau", nom_latin="Betula papyrifera", type_organisme="arbre_ornement")
+        with patch("catalog.search_vectors.refresh_search_vectors") as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                a.description = "Fixateur d'azote"
+                a.save()
+                nom = OrganismNom.objects.create(organism=b, nom="White birch", langue="en", source="test")
+                nom.delete()
+                self.assertEqual(pending_search_vector_ids(), {a.pk, b.pk})
+            refresh.assert_called_once()
+            self.assertEqual(set(refresh.call_args.args[0]), {a.pk, b.pk})
+        self.assertEqual(pending_search_vector_ids(), frozenset())
+
+    def test_radix_sync_marks_synced_organisms(self):
+        with patch("catalog.search_vectors.refresh_search_vectors") as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                run_radix_sync(radix_sync_dataset(5), page_size=2)
+        self.assertEqual(set().union(*(set(c.args[0]) for c in refresh.call_args_list)), {1, 2, 3, 4, 5})
+
+
+class OrganismSearchTestCase(TestCase):
+    """catalog.search : recherche classée, insensible aux accents, préfixes pour la saisie semi-automatique."""
+
+    def setUp(self):
+        from catalog.models import OrganismNom
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user(username="chercheur", password="x"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.erable = Organism.objects.create(
+                nom_commun="Érable à sucre", nom_latin="Acer saccharum", genus="Acer", type_organisme="arbre_bois"
+            )
+            self.pommier = Organism.objects.create(
+                nom_commun="Pommier", nom_latin="Malus domestica", genus="Malus", type_organisme="arbre_fruitier"
+            )
+            self.sorbier = Organism.objects.create(
+                nom_commun="Sorbier", nom_latin="Sorbus aucuparia", genus="Sorbus", type_organisme="arbre_ornement"
+            )
+            OrganismNom.objects.create(organism=self.sorbier, nom="Pommier des oiseleurs", langue="fr", source="test")
+            self.viorne = Organism.objects.create(
+                nom_commun="Viorne", nom_latin="Viburnum × juddii", genus="Viburnum", type_organisme="arbuste"
+            )
+
+    def _search(self, term):
+        response = self.client.get("/api/organisms/", {"search": term})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [o["id"] for o in response.data["results"]]
+
+    def test_accents_prefix_and_ranking(self):
+        self.assertEqual(self._search("erable"), [self.erable.pk])
+        self.assertEqual(self._search("ÉRAB"), [self.erable.pk])
+        self.assertEqual(self._search("Viorne juddii"), [self.viorne.pk])
+        self.assertEqual(self._search("pomm"), [self.pommier.pk, self.sorbier.pk])
+        self.assertEqual(self._search("xyz"), [])
+
+    def test_relevance_beats_alphabetical_order(self):
+        from catalog.models import OrganismNom
+
+        with self.captureOnCommitCallbacks(execute=True):
+            aronia = Organism.objects.create(
+                nom_commun="Aronie noire", nom_latin="Aronia melanocarpa", genus="Aronia", type_organisme="arbuste"
+            )
+            OrganismNom.objects.create(organism=aronia, nom="Sorbier noir", langue="fr", source="test")
+        # Par genre, Aronia passerait avant Sorbus ; le Sorbier correspond sur trois noms
+        self.assertEqual(self._search("sorb"), [self.sorbier.pk, aronia.pk])
+
+
+def _legacy_zone_usda_filter(qs, z):
+    """Ancien filtre zone_usda (LIKE sur le texte JSON), référence des tests et de scripts/benchmarks.py."""
+    from django.db.models import Q
+
+    q_zone = Q()
+    for i in range(1, min(z + 1, 14)):
+        for s in ("a", "b"):
+            q_zone |= Q(zone_rusticite__icontains=f'"zone": "{i}{s}"')
+        q_zone |= Q(zone_rusticite__icontains=f'"zone": "{i}"')
+    return qs.filter(q_zone)
+
+
+class ZoneRusticiteBoundsTestCase(TestCase):
+    """zone_rusticite_min / _max : tenus à jour au save, par sync_radixsylva et backfill_zone_rusticite."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user(username="zones", password="x"))
+        self.argousier = Organism.objects.create(
+            nom_commun="Argousier", type_organisme="arbuste",
+            zone_rusticite=[{"zone": "3b", "source": "hydroquebec"}, {"zone": "5", "source": "pfaf"}],
+        )
+        self.figuier = Organism.objects.create(
+            nom_commun="Figuier", type_organisme="arbre_fruitier", zone_rusticite=[{"zone": "7a", "source": "pfaf"}],
+        )
+        self.sans_zone = Organism.objects.create(nom_commun="Inconnu", type_organisme="vivace")
+
+    def _filter(self, zone):
+        response = self.client.get("/api/organisms/", {"zone_usda": zone, "page_size": 100})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {o["id"] for o in response.data["results"]}
+
+    def test_bounds_and_range_filter(self):
+        from .source_rules import SOURCE_PFAF, merge_zones_rusticite
+
+        self.assertEqual((self.argousier.zone_rusticite_min, self.argousier.zone_rusticite_max), (7, 10))
+        self.assertIsNone(self.sans_zone.zone_rusticite_min)
+        self.assertEqual(self._filter(3), {self.argousier.pk})
+        self.assertEqual(self._filter(7), {self.argousier.pk, self.figuier.pk})
+        self.assertEqual(self._filter(2), set())
+
+        self.figuier.zone_rusticite = merge_zones_rusticite(self.figuier.zone_rusticite, "6b", SOURCE_PFAF)
+        self.figuier.save(update_fields=["zone_rusticite"])
+        self.figuier.refresh_from_db()
+        self.assertEqual((self.figuier.zone_rusticite_min, self.figuier.zone_rusticite_max), (13, 13))
+        for z in (3, 6, 7):
+            self.assertEqual(self._filter(z), set(_legacy_zone_usda_filter(Organism.objects.all(), z)
+                                                  .values_list("pk", flat=True)))
+
+    def test_backfill_after_queryset_update(self):
+        from django.core.management import call_command
+
+        Organism.objects.filter(pk=self.sans_zone.pk).update(zone_rusticite=[{"zone": "2a", "source": "usda"}])
+        out = StringIO()
+        call_command("backfill_zone_rusticite", stdout=out)
+        self.assertIn("1 organisme", out.getvalue())
+        self.assertEqual(self._filter(2), {self.sans_zone.pk})
+
+
+class EnrichmentScoreTestCase(TestCase):
+    """update_enrichment_scores : note calculée en SQL, identique au calcul Python, incrémentale avec since."""
+
+    def setUp(self):
+        from catalog.models import OrganismCalendrier, OrganismPropriete, OrganismUsage
+
+        self.vide = Organism.objects.create(nom_commun="Vide", type_organisme="vivace", besoin_eau="", besoin_soleil="")
+        self.riche = Organism.objects.create(
+            nom_commun="Sureau", nom_latin="Sambucus canadensis", famille="Adoxaceae", genus="Sambucus",
+            type_organisme="arbuste_fruitier", zone_rusticite=[{"zone": "3a", "source": "hydroquebec"}],
+            sol_textures=["loameux"], hauteur_max=3.0, description="  ", indigene=True,
+        )
+        OrganismPropriete.objects.create(organisme=self.riche, type_sol=["loameux"])
+        OrganismUsage.objects.create(organisme=self.riche, type_usage="comestible_fruit")
+        OrganismCalendrier.objects.create(organisme=self.riche, type_periode="floraison")
+
+    def test_sql_score_matches_python_and_since(self):
+        from .enrichment_score import compute_organism_enrichment_score, update_enrichment_scores
+        from .models import BaseEnrichmentStats
+
+        with self.assertNumQueries(4):  # UPDATE, agrégat, lecture et écriture du singleton de stats
+            result = update_enrichment_scores()
+        organisms = list(Organism.objects.all())
+        for org in organisms:
+            self.assertEqual(org.enrichment_score_pct, compute_organism_enrichment_score(org), org.nom_commun)
+        self.assertEqual(result["total"], len(organisms))
+        expected_global = round(sum(o.enrichment_score_pct for o in organisms) / len(organisms))
+        self.assertEqual(BaseEnrichmentStats.objects.get().global_score_pct, expected_global)
+
+        checkpoint = timezone.now()
+        Organism.objects.update(enrichment_score_pct=None)
+        self.vide.famille = "Rosaceae"
+        self.vide.save()
+        result = update_enrichment_scores(since=checkpoint)
+        self.assertEqual(result["updated"], 1)
+        self.vide.refresh_from_db()
+        self.riche.refresh_from_db()
+        self.assertEqual(self.vide.enrichment_score_pct, compute_organism_enrichment_score(self.vide))
+        self.assertIsNone(self.riche.enrichment_score_pct)
+        self.assertEqual(update_enrichment_scores(organism_ids=[self.riche.pk])["updated"], 1)
+
+
+class OrganismResolverTestCase(TestCase):
+    """OrganismResolver : mêmes correspondances que find_or_match_organism, sans requête par ligne."""
+
+    def setUp(self):
+        self.bleuet = Organism.objects.create(
+            nom_commun="Bleuet en corymbe", nom_latin="Vaccinium corymbosum", type_organisme="arbuste_fruitier",
+        )
+        self.erable = Organism.objects.create(
+            nom_commun="Érable rouge", nom_latin="Acer rubrum", type_organisme="arbre_bois", vascan_id=4001,
+        )
+        self.noyer = Organism.objects.create(
+            nom_commun="Noyer noir", nom_latin="Juglans nigra", type_organisme="arbre_noix", tsn=19231,
+        )
+
+    def test_matches_like_find_or_match_organism(self):
+        from .source_rules import OrganismResolver, find_or_match_organism
+
+        with self.assertNumQueries(1):
+            resolver = OrganismResolver(Organism)
+        cases = [
+            dict(nom_latin="vaccinium CORYMBOSUM", nom_commun=""),
+            dict(nom_latin="Xyz abc", nom_commun="", vascan_id=4001),
+            dict(nom_latin="", nom_commun="", tsn=19231),
+            dict(nom_latin="Vaccinium corymbosum L.", nom_commun="Bleuet"),  # sans auteur : renomme la fiche
+        ]
+        for case in cases:
+            with self.subTest(**case):
+                # Renommage : lecture + UPDATE de la fiche + accueil des favoris à recalculer
+                with self.assertNumQueries(3 if case["nom_latin"].endswith("L.") else 1):
+                    found, created = resolver.find_or_match(create_missing=False, **case)
+                legacy, _ = find_or_match_organism(Organism, create_missing=False, **case)
+                self.assertFalse(created)
+                self.assertEqual(found.pk, legacy.pk)
+        # Nom commun sans accents, fuzzy (ponctuation, mots dans un autre ordre)
+        self.assertEqual(resolver.find_or_match("", "erable ROUGE", create_missing=False)[0].pk, self.erable.pk)
+        self.assertEqual(resolver.find_or_match("Juglans  nigra.", "", create_missing=False)[0].pk, self.noyer.pk)
+        self.assertEqual(resolver.find_or_match("rubrum acer", "", create_missing=False)[0].pk, self.erable.pk)
+        self.assertEqual(resolver.find_or_match("Quercus alba", "", create_missing=False), (None, False))
+
+    def test_creation_updates_indexes_and_slugs(self):
+        from .source_rules import OrganismResolver
+
+        resolver = OrganismResolver(Organism)
+        slug = resolver.unique_slug_latin("Quercus alba")
+        chene, created = resolver.find_or_match(
+            "Quercus alba", "Chêne blanc", {"slug_latin": slug, "type_organisme": "arbre_bois"},
+        )
+        self.assertTrue(created)
+        self.assertEqual(resolver.unique_slug_latin("Quercus alba"), f"{slug}-2")
+        with self.assertNumQueries(1):
+            again, created = resolver.find_or_match("Quercus alba", "Chêne blanc")
+        self.assertEqual((again.pk, created), (chene.pk, False))
+
+
+class EnrichmentFetchTestCase(TestCase):
+    """species.http_fetch (cache disque, relances) et commandes d'enrichissement contre un serveur local."""
+
+    def test_session_caches_and_retries(self):
+        import tempfile
+
+        from .http_fetch import EnrichmentSession, ResponseCache
+
+        def route(path, params):
+            if path == "/flaky" and len(fake.requests) == 1:
+                return 503, {"error": "busy"}
+            return {"path": path, "q": params.get("q")}
+
+        with tempfile.TemporaryDirectory() as tmp, LocalJSONServer(route) as fake:
+            session = EnrichmentSession(cache=ResponseCache(tmp), rate_limits={"127.0.0.1": 1000.0}, backoff=0)
+            self.assertEqual(session.get(f"{fake.base_url}/flaky").json()["path"], "/flaky")  # 503 relancée
+            self.assertEqual(len(fake.requests), 2)
+            for _ in range(2):
+                self.assertEqual(session.get(f"{fake.base_url}/a", params={"q": "x"}).json()["q"], ["x"])
+            session.get(f"{fake.base_url}/a", params={"q": "y"})
+            self.assertEqual(len(fake.requests), 4)
+            # La relance de l'adaptateur a pris son jeton et compte comme un appel
+            self.assertEqual(session.stats, {"requests": 4, "cache_hits": 1})
+
+    def test_import_vascan_concurrent_then_cached(self):
+        import tempfile
+
+        from django.core.management import call_command
+        from django.test import override_settings
+
+        taxa = {"Acer rubrum": 1001, "Acer saccharum": 1002, "Quercus alba": 1003}
+        for nom_latin in taxa:
+            Organism.objects.create(nom_commun=nom_latin, nom_latin=nom_latin, type_organisme="arbre_ornement")
+
+        def route(path, params):
+            q = params["q"][0]
+            if q not in taxa:  # organisme « non identifié » de la migration initiale
+                return {"results": [{"matches": []}]}
+            return {"results": [{"matches": [{
+                "taxonID": taxa[q], "scientificName": q, "vernacularNames": [],
+                "distribution": [{"locationID": "ISO 3166-2:CA-QC", "occurrenceStatus": "native"}],
+            }]}]}
+
+        with tempfile.TemporaryDirectory() as tmp, LocalJSONServer(route) as fake, override_settings(
+            ENRICHMENT_HTTP_CACHE_DIR=tmp
+        ), patch("species.management.commands.import_vascan.VASCAN_SEARCH_URL", f"{fake.base_url}/search.json"):
+            call_command("import_vascan", enrich=True, delay=0.01, workers=3, stdout=StringIO())
+            self.assertEqual(
+                dict(Organism.objects.filter(nom_latin__in=taxa).values_list("nom_latin", "vascan_id")), taxa
+            )
+            self.assertTrue(Organism.objects.get(nom_latin="Quercus alba").indigene)
+            requests_made = len(fake.requests)
+
+            # Seconde passe : réponses relues du cache disque, aucun appel
+            Organism.objects.filter(nom_latin__in=taxa).update(vascan_id=None)
+            call_command("import_vascan", enrich=True, delay=0.01, workers=3, stdout=StringIO())
+            self.assertEqual(len(fake.requests), requests_made)
+            self.assertEqual(Organism.objects.filter(vascan_id__isnull=True, nom_latin__in=taxa).count(), 0)
+
+    def test_import_wikidata_reports_fetch_errors(self):
+        from django.core.management import call_command
+
+        from .http_fetch import enrichment_session
+
+        for nom_latin in ("Acer rubrum", "Quercus alba"):
+            Organism.objects.create(nom_commun=nom_latin, nom_latin=nom_latin, type_organisme="arbre_ornement")
+
+        def fetch(session, name):
+            if name == "Quercus alba":
+                raise ConnectionError("délai dépassé")
+            return {"height": "25", "qid": "Q1"}
+
+        out = StringIO()
+        with patch("species.management.commands.import_wikidata.wikidata_fetch", side_effect=fetch), patch(
+            "species.management.commands.import_wikidata.enrichment_session", wraps=enrichment_session
+        ) as session:
+            call_command("import_wikidata", enrich=True, no_cache=True, workers=6, stdout=out)
+        self.assertEqual(session.call_args.kwargs["max_workers"], 6)
+        self.assertIn("Erreur Quercus alba: délai dépassé", out.getvalue())
+        self.assertIn("ignorés, 1 erreurs.", out.getvalue())
+        self.assertEqual(Organism.objects.get(nom_latin="Acer rubrum").hauteur_max, 25)
+
+
+class AdminJobsTestCase(TestCase):
+    """Tâches de fond (species.jobs) : mise en file par l'API, worker run_jobs, suivi par offset, annulation."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.staff = User.objects.create_user(username="staff", password="x", is_staff=True)
+
+    def test_run_command_enqueues_and_worker_runs_it(self):
+        from django.core.management import call_command
+
+        self.client.force_authenticate(user=User.objects.create_user(username="user", password="x"))
+        self.assertEqual(
+            self.client.post("/api/admin/run-command/", {"command": "rebuild_search_vectors"}, format="json").status_code,
+            status.HTTP_403_FORBIDDEN,
+        )
+        self.client.force_authenticate(user=self.staff)
+        resp = self.client.post("/api/admin/run-command/", {"command": "rebuild_search_vectors"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_202_ACCEPTED)
+        job_id = resp.data["job_id"]
+        self.assertEqual(DataImportRun.objects.get(pk=job_id).status, "queued")
+
+        call_command("run_jobs", processes=0, once=True, stdout=StringIO())
+        job = self.client.get(f"/api/admin/jobs/{job_id}/").data
+        self.assertEqual(job["status"], "success")
+        self.assertTrue(job["success"])
+        self.assertIn("Index de recherche mis à jour", job["output"])
+        # Déjà tout lu : rien de plus depuis offset
+        self.assertEqual(self.client.get(f"/api/admin/jobs/{job_id}/", {"offset": job["offset"]}).data["output"], "")
+
+    def test_cancel_queued_and_running_jobs(self):
+        from species import jobs
+
+        self.client.force_authenticate(user=self.staff)
+        queued = jobs.enqueue_command("rebuild_search_vectors", {}, user=self.staff)
+        self.assertEqual(self.client.post(f"/api/admin/jobs/{queued.pk}/cancel/").data["status"], "cancelled")
+        self.assertIsNone(jobs.claim_next_job("test"))
+
+        running = jobs.enqueue_command("rebuild_search_vectors", {}, user=self.staff)
+        self.assertEqual(jobs.claim_next_job("test"), running.pk)
+        self.assertTrue(self.client.post(f"/api/admin/jobs/{running.pk}/cancel/").data["cancel_requested"])
+        output = jobs.JobOutput(running.pk)
+        with patch.object(jobs, "OUTPUT_FLUSH_INTERVAL", 0):
+            with self.assertRaises(jobs.JobCancelled):
+                output.write("ligne 1\n")
+
+    def test_import_job_writes_pipeline_stats_in_its_run(self):
+        import tempfile
+
+        from species import jobs
+
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8") as f:
+            f.write("Version francaise,Traduction latin,Traduction Anglais\n")
+            f.write("Chêne blanc,Quercus alba,White oak\n")
+        try:
+            job = jobs.enqueue_command("import_arbres_en_ligne", {"file": f.name}, user=self.staff, stats={"from": "api"})
+            jobs.claim_next_job("test")
+            self.assertEqual(jobs.run_job(job.pk), "success")
+        finally:
+            os.unlink(f.name)
+        run = DataImportRun.objects.get(source="import_arbres_en_ligne")
+        self.assertEqual((run.pk, run.trigger, run.status), (job.pk, "api", "success"))
+        self.assertEqual((run.stats["from"], run.stats["created"], run.stats["batches"]), ("api", 1, 1))
+
+
+class ImportPipelineTestCase(TestCase):
+    """Import en flux par lots (species.import_pipeline) : import_pfaf, lots en erreur."""
+
+    def test_pfaf_import_by_batches(self):
+        import tempfile
+
+        from django.core.management import call_command
+
+        erable = Organism.objects.create(
+            nom_commun="Érable rouge", nom_latin="Acer rubrum", type_organisme="arbre_ornement", famille="Sapindaceae",
+        )
+        count_before = Organism.objects.count()
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8") as f:
+            f.write("Latin Name,Common Name,Family,Hardiness,Height\n")
+            f.write("Acer rubrum L.,Red maple,Aceraceae,3,25\n")      # existant : renomme, complète les vides
+            f.write("Quercus alba,White oak,Fagaceae,4,30\n")
+            f.write(",,,,\n")                                        # ignorée
+            f.write("Quercus alba,White oak,Fagaceae,5,\n")          # même lot : retrouve la fiche en attente
+            f.write("Corylus avellana,Hazel,Betulaceae,4,5\n")
+        try:
+            call_command("import_pfaf", file=f.name, batch_size=2, stdout=StringIO())
+        finally:
+            os.unlink(f.name)
+
+        erable.refresh_from_db()
+        self.assertEqual(erable.nom_latin, "Acer rubrum L.")
+        self.assertEqual(erable.famille, "Sapindaceae")  # fill_gaps
+        self.assertEqual(erable.hauteur_max, 25)
+        self.assertEqual(erable.zone_rusticite_min, 6)
+        self.assertEqual(erable.data_sources["pfaf"]["common_name"], "Red maple")
+        chene = Organism.objects.get(nom_latin="Quercus alba")
+        self.assertEqual((chene.slug_latin, chene.genus), ("quercus-alba", "Quercus"))
+        self.assertEqual([z["zone"] for z in chene.zone_rusticite], ["5"])  # même source : remplacée
+        self.assertTrue(Organism.objects.filter(nom_latin="Corylus avellana", nom_commun="Hazel").exists())
+        self.assertEqual(Organism.objects.count(), count_before + 2)
+
+        run = DataImportRun.objects.get(source="pfaf")
+        self.assertEqual(run.status, "success")
+        self.assertEqual(
+            {k: run.stats[k] for k in ("rows", "created", "updated", "skipped", "errors", "batches")},
+            {"rows": 5, "created": 2, "updated": 2, "skipped": 1, "errors": 0, "batches": 2},
+        )
+        self.assertIn("rows_per_s", run.stats)
+
+    def test_seed_import_by_batches(self):
+        import tempfile
+
+        from django.core.management import call_command
+
+        from catalog.models import SeedCollection, SeedSupplier
+
+        fournisseur = SeedSupplier.objects.create(nom="Semences du Nord")
+        tomate = Organism.objects.create(nom_commun="Tomate", nom_latin="Solanum lycopersicum", type_organisme="annuelle")
+        existante = SeedCollection.objects.create(organisme=tomate, variete="Cerise", lot_reference="L1", quantite=5)
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8") as f:
+            f.write("Latin Name,Common Name,Variety,Lot,Quantity\n")
+            f.write("Solanum lycopersicum,Tomate,Cerise,L1,50\n")   # existante : mise à jour
+            f.write("Solanum lycopersicum,Tomate,Rose,L2,10\n")
+            f.write(",,,,\n")                                        # ignorée
+            f.write("Solanum lycopersicum,Tomate,Rose,L2,20\n")     # même lot : reprend la collection en attente
+            f.write("Phaseolus vulgaris,Haricot,,,100\n")
+        out = StringIO()
+        try:
+            call_command("import_seeds", file=f.name, supplier=fournisseur.pk, update_existing=True,
+                         batch_size=2, stdout=out)
+        finally:
+            os.unlink(f.name)
+
+        existante.refresh_from_db()
+        self.assertEqual((existante.quantite, existante.fournisseur_id), (50, fournisseur.pk))
+        self.assertEqual(existante.data_sources["import"]["quantity"], "50")
+        rose = SeedCollection.objects.get(organisme=tomate, variete="Rose")
+        self.assertEqual(rose.quantite, 20)
+        self.assertTrue(SeedCollection.objects.filter(organisme__nom_latin="Phaseolus vulgaris").exists())
+        self.assertEqual(SeedCollection.objects.count(), 3)
+        self.assertIn("Organismes créés: 1", out.getvalue())
+        run = DataImportRun.objects.get(source="seeds")
+        self.assertEqual(
+            {k: run.stats[k] for k in ("rows", "created", "updated", "skipped", "errors")},
+            {"rows": 5, "created": 2, "updated": 2, "skipped": 1, "errors": 0},
+        )
+
+    def test_usda_chars_csv_by_batches(self):
+        import tempfile
+
+        from django.core.management import call_command
+
+        from catalog.models import OrganismCalendrier
+
+        chene = Organism.objects.create(nom_commun="Chêne rouge", nom_latin="Quercus rubra", type_organisme="arbre_bois")
+        erable = Organism.objects.create(
+            nom_commun="Érable rouge", nom_latin="Acer rubrum", type_organisme="arbre_ornement", hauteur_max=20,
+        )
+        OrganismCalendrier.objects.create(organisme=erable, type_periode="floraison", mois_debut=4, mois_fin=4, source="usda_plants")
+        count_before = Organism.objects.count()
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8") as f:
+            f.write("symbol,scientific_name,height,spread,bloom_period\n")
+            f.write("QURU,Quercus rubra L.,80 feet,40 ft,May-June\n")    # sans auteur : nom corrigé
+            f.write("ACRU,Acer rubrum,90 feet,30 ft,March\n")           # hauteur déjà connue, calendrier existant
+            f.write("XXYY,Inconnu absent,10 ft,,\n")                     # jamais créé
+        out = StringIO()
+        try:
+            call_command("import_usda_chars", file=f.name, batch_size=2, stdout=out)
+        finally:
+            os.unlink(f.name)
+
+        chene.refresh_from_db()
+        erable.refresh_from_db()
+        self.assertEqual((chene.nom_latin, chene.hauteur_max, chene.largeur_max), ("Quercus rubra L.", 24.38, 12.19))
+        self.assertEqual((erable.hauteur_max, erable.largeur_max), (20, 9.14))
+        self.assertEqual(chene.data_sources["usda_plants"]["bloom"], "May-June")
+        self.assertEqual(
+            list(OrganismCalendrier.objects.filter(source="usda_plants").order_by("organisme__nom_commun")
+                 .values_list("organisme_id", "mois_debut", "mois_fin")),
+            [(chene.pk, 5, 6), (erable.pk, 4, 4)],
+        )
+        self.assertEqual(Organism.objects.count(), count_before)
+        self.assertIn("enrichis=2, ignorés=1, erreurs=0, 1 entrées calendrier", out.getvalue())
+        run = DataImportRun.objects.get(source="import_usda_chars")
+        self.assertEqual((run.status, run.stats["batches"]), ("success", 2))
+
+    def test_arbres_en_ligne_by_batches(self):
+        import tempfile
+
+        from django.core.management import call_command
+
+        from catalog.models import OrganismNom
+
+        erable = Organism.objects.create(
+            nom_commun="Érable rouge", nom_latin="Acer rubrum", slug_latin="acer-rubrum", type_organisme="arbre_ornement",
+        )
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8") as f:
+            f.write("Version francaise,Traduction latin,Traduction Anglais\n")
+            f.write("Érable rouge,Acer rubrum,Red maple\n")
+            f.write("Chêne blanc,Quercus alba,White oak\n")
+            f.write(",,\n")
+            f.write("Chêne blanc,Quercus alba,White oak tree\n")   # lot suivant : même fiche, nom EN mis à jour
+        try:
+            call_command("import_arbres_en_ligne", file=f.name, batch_size=2, stdout=StringIO())
+        finally:
+            os.unlink(f.name)
+
+        chene = Organism.objects.get(slug_latin="quercus-alba")
+        self.assertEqual(
+            dict(OrganismNom.objects.filter(organism=chene, source="arbres_en_ligne").values_list("langue", "nom")),
+            {"fr": "Chêne blanc", "en": "White oak tree"},
+        )
+        self.assertEqual(OrganismNom.objects.filter(organism=erable, source="arbres_en_ligne").count(), 2)
+        run = DataImportRun.objects.get(source="import_arbres_en_ligne")
+        self.assertEqual(
+            {k: run.stats[k] for k in ("rows", "created", "skipped", "batches")},
+            {"rows": 4, "created": 1, "skipped": 3, "batches": 2},
+        )
+
+    def test_arbres_quebec_by_batches(self):
+        import tempfile
+
+        from django.core.management import call_command
+
+        from .source_rules import SOURCE_VILLE_QUEBEC
+
+        erable = Organism.objects.create(
+            nom_commun="Érable rouge", nom_latin="Acer rubrum L.", type_organisme="arbre_ornement",
+            data_sources={"pfaf": {"id": 1}},
+        )
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8") as f:
+            f.write("NOM_LATIN,NOM_FRANCAIS\n")
+            f.write("Acer rubrum,Érable rouge\n")
+            f.write("Acer rubrum,Érable rouge\n")          # doublon
+            f.write(",Sans nom\n")
+            f.write("Quercus alba,Chêne blanc\n")
+            f.write("Malus pumila 'Dolgo',Pommetier Dolgo\n")
+        try:
+            call_command("import_arbres_quebec", file=f.name, batch_size=2, stdout=StringIO())
+        finally:
+            os.unlink(f.name)
+
+        erable.refresh_from_db()
+        self.assertEqual(set(erable.data_sources), {"pfaf", SOURCE_VILLE_QUEBEC})
+        self.assertEqual(erable.genus, "Acer")
+        chene = Organism.objects.get(nom_latin="Quercus alba")
+        self.assertEqual((chene.nom_commun, chene.genus), ("Chêne blanc", "Quercus"))
+        self.assertTrue(chene.data_sources[SOURCE_VILLE_QUEBEC]["inventaire"])
+        self.assertIn(SOURCE_VILLE_QUEBEC, Organism.objects.get(cultivars__nom="Dolgo").data_sources)
+        run = DataImportRun.objects.get(source="import_arbres_quebec")
+        self.assertEqual(
+            {k: run.stats[k] for k in ("rows", "created", "updated", "batches")},
+            {"rows": 3, "created": 2, "updated": 1, "batches": 2},
+        )
+
+    def test_hydroquebec_file_by_batches(self):
+        import json
+        import tempfile
+
+        from django.core.management import call_command
+
+        amelanchier = Organism.objects.create(
+            nom_commun="Amélanchier", nom_latin="Amelanchier canadensis", type_organisme="arbuste",
+            famille="Rosaceae", zone_rusticite=[{"zone": "4", "source": "pfaf"}],
+        )
+        arbres = [
+            {"nomLatin": "Amelanchier canadensis", "nomFrancais": "Amélanchier du Canada", "zoneRusticite": "3",
+             "famille": "", "numeroFiche": 1},
+            {"nomLatin": "Quercus alba", "nomFrancais": "Chêne blanc", "zoneRusticite": "4a",
+             "famille": "Fagaceae", "numeroFiche": 2, "hauteur": 20},
+            {"nomLatin": "", "nomFrancais": "Sans nom latin"},
+        ]
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+            json.dump(arbres, f)
+        try:
+            call_command("import_hydroquebec", file=f.name, limit=0, merge="fill_gaps", batch_size=2, stdout=StringIO())
+        finally:
+            os.unlink(f.name)
+
+        amelanchier.refresh_from_db()
+        self.assertEqual(amelanchier.famille, "Rosaceae")   # fill_gaps : champ rempli conservé
+        self.assertEqual({z["source"] for z in amelanchier.zone_rusticite}, {"pfaf", "hydroquebec"})
+        self.assertEqual(amelanchier.data_sources["hydroquebec"]["numeroFiche"], 1)
+        chene = Organism.objects.get(nom_latin="Quercus alba")
+        self.assertEqual((chene.famille, chene.hauteur_max, chene.genus), ("Fagaceae", 20, "Quercus"))
+        self.assertIsNotNone(chene.zone_rusticite_min)
+        run = DataImportRun.objects.get(source="import_hydroquebec")
+        self.assertEqual(
+            {k: run.stats[k] for k in ("rows", "created", "updated", "skipped", "batches")},
+            {"rows": 3, "created": 1, "updated": 1, "skipped": 1, "batches": 1},
+        )
+
+    def test_failing_batch_is_replayed_row_by_row(self):
+        from .import_pipeline import ImportPipeline
+
+        from .source_rules import OrganismResolver
+
+        class Pipeline(ImportPipeline):
+            source = "seeds"
+
+            def __init__(self, **kwargs):
+                super().__init__(**kwargs)
+                self.resolver = OrganismResolver(Organism)
+
+            def write_batch(self, records):
+                for nom in records:
+                    self.resolver.find_or_match(nom, nom, defaults={"type_organisme": "vivace"})
+                    if nom == "erreur":
+                        raise ValueError(nom)
+                return {"created": len(records)}
+
+        pipeline = Pipeline(batch_size=3)
+        noms = ["Aaxq", "Bbxq", "Ccxq", "Ddxq"]
+        stats = pipeline.run(iter(noms[:2] + ["erreur"] + noms[2:]))
+        self.assertEqual((stats["created"], stats["errors"], stats["batches"]), (4, 1, 2))
+        self.assertEqual(
+            sorted(Organism.objects.filter(nom_commun__in=noms).values_list("nom_commun", flat=True)), noms
+        )
+        self.assertEqual(DataImportRun.objects.get(source="seeds").stats["errors"], 1)
+        # Index du resolver défaits avec les écritures annulées, sans rechargement du catalogue
+        self.assertEqual(pipeline.resolver.resolve("erreur", "erreur"), (None, None))
+        self.assertEqual(pipeline.resolver.resolve("Aaxq", "")[0], Organism.objects.get(nom_commun="Aaxq").pk)
+
+
 class SpecimenByNfcAPITestCase(TestCase):
     """Tests lookup NFC / code_identification."""
 
@@ -188,10 +2023,9 @@ class MissingSpeciesRequestAPITestCase(TestCase):
         )
         self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
 
-    @patch("species.management.commands.sync_radixsylva.schedule_rebuild_search_vectors_async")
     @patch("species.management.commands.sync_radixsylva.fetch_and_apply_organism")
     @patch("species.api_views.requests.post")
-    def test_success_returns_organism_and_saves(self, mock_post, mock_fetch, _mock_sched):
+    def test_success_returns_organism_and_saves(self, mock_post, mock_fetch):
         mock_post.return_value.status_code = 200
         mock_post.return_value.json.return_value = {
             "organism_id": 4242,
@@ -230,10 +2064,9 @@ class MissingSpeciesRequestAPITestCase(TestCase):
         self.assertEqual(rec.search_query, "sapin")
         mock_fetch.assert_called_once()
 
-    @patch("species.management.commands.sync_radixsylva.schedule_rebuild_search_vectors_async")
     @patch("species.management.commands.sync_radixsylva.fetch_and_apply_organism")
     @patch("species.api_views.requests.post")
-    def test_sync_failure_returns_201_with_sync_error(self, mock_post, mock_fetch, _mock_sched):
+    def test_sync_failure_returns_201_with_sync_error(self, mock_post, mock_fetch):
         mock_post.return_value.status_code = 200
         mock_post.return_value.json.return_value = {"organism_id": 4242, "organism": {}}
         mock_fetch.return_value = (False, "HTTP 500")
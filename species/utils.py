@@ -29,6 +29,22 @@ def _haversine_m(lat1, lon1, lat2, lon2):
     return R * c
 
 
+def haversine_matrix_m(lats_a, lngs_a, lats_b, lngs_b):
+    """
+    Haversine vectorisé (NumPy) : matrice len(a) × len(b) des distances en mètres.
+    Les coordonnées manquantes (None/NaN) donnent NaN.
+    """
+    import numpy as np
+
+    R = 6371000
+    phi1 = np.radians(np.asarray(lats_a, dtype=float))[:, None]
+    lam1 = np.radians(np.asarray(lngs_a, dtype=float))[:, None]
+    phi2 = np.radians(np.asarray(lats_b, dtype=float))[None, :]
+    lam2 = np.radians(np.asarray(lngs_b, dtype=float))[None, :]
+    a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin((lam2 - lam1) / 2) ** 2
+    return 2 * R * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
 def get_pollination_distance_max_m(organism, user):
     """
     Retourne la distance max de pollinisation en mètres pour un organisme.
@@ -17,79 +17,108 @@ from django.conf import settings
 from django.http import HttpResponse, JsonResponse, HttpResponseForbidden
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import condition, require_http_methods
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from django.db.models import Count, Q
 from django.utils import timezone
 
 from gardens.models import UserPreference
-from .models import BaseEnrichmentStats, CompanionRelation, Cultivar, CultivarPorteGreffe, Garden, Organism, OrganismNom, Specimen, SprinklerZone, DataImportRun
+from .import_pipeline import caller_import_run
+from .models import BaseEnrichmentStats, CompanionRelation, Cultivar, Garden, Organism, OrganismNom, Specimen, SprinklerZone, DataImportRun
 from .weather_service import (
-    fetch_forecast,
     fetch_weather_for_garden,
     geocode_address,
     get_forecast_alerts,
+    get_stored_forecasts,
     get_watering_alert,
 )
 
 
+def _companion_graph_params(request):
+    """Paramètres de sous-graphe (organism, depth, type multiple, min_force) ; ValueError si invalides."""
+    from .companion_graph import MAX_DEPTH
+
+    organism = request.GET.get("organism") or None
+    depth = int(request.GET.get("depth") or 1)
+    if not 1 <= depth <= MAX_DEPTH:
+        raise ValueError(f"depth doit être entre 1 et {MAX_DEPTH}")
+    min_force = request.GET.get("min_force") or None
+    return {
+        "center": int(organism) if organism is not None else None,
+        "depth": depth,
+        "types": [t for t in request.GET.getlist("type") if t],
+        "min_force": int(min_force) if min_force is not None else None,
+    }
+
+
+def _companion_graph_etag(request):
+    from .companion_graph import subgraph_etag
+
+    try:
+        return subgraph_etag(**_companion_graph_params(request))
+    except ValueError:
+        return None
+
+
 @staff_member_required
 def companion_network_view(request):
     """
     Visualisation graphique des réseaux de compagnonnage.
-    Graphe interactif (vis-network) des relations entre organismes.
+    Graphe interactif (vis-network) des relations entre organismes, chargé depuis
+    companion_network_data_view (filtres : organisme et voisinage, types, force minimale).
     """
-    relations = CompanionRelation.objects.select_related(
-        "organisme_source", "organisme_cible"
-    ).all()
-
-    # Construire les nœuds (organismes uniques)
-    nodes_map = {}
-    for rel in relations:
-        for org in (rel.organisme_source, rel.organisme_cible):
-            if org.id not in nodes_map:
-                nodes_map[org.id] = {
-                    "id": org.id,
-                    "label": org.nom_commun,
-                    "title": f"{org.nom_commun} ({org.nom_latin})" if org.nom_latin else org.nom_commun,
-                    "color": "#2d5a27",  # Vert forêt
-                }
-
-    nodes = list(nodes_map.values())
-
-    # Construire les arêtes (relations)
-    edges = []
-    for rel in relations:
-        is_positive = any(
-            w in rel.type_relation
-            for w in ("positif", "fixateur", "attire", "mycorhize", "abri", "support", "accumulateur", "repousse", "coupe")
-        )
-        edges.append({
-            "from": rel.organisme_source_id,
-            "to": rel.organisme_cible_id,
-            "label": rel.get_type_relation_display()[:30],
-            "title": f"{rel.organisme_source.nom_commun} → {rel.organisme_cible.nom_commun}\n{rel.get_type_relation_display()}\nForce: {rel.force}" + (f"\n{rel.description}" if rel.description else ""),
-            "color": {"color": "#2d5a27"} if is_positive else {"color": "#8b2500"},
-            "width": max(1, rel.force // 2),
-        })
+    from .companion_graph import get_companion_graph
 
+    graph = get_companion_graph()
+    organism_id = request.GET.get("organism") or ""
     context = {
-        "nodes_json": json.dumps(nodes),
-        "edges_json": json.dumps(edges),
-        "count_nodes": len(nodes),
-        "count_edges": len(edges),
+        "count_nodes": len(graph.nodes),
+        "count_edges": len(graph.edges),
+        "type_relation_choices": CompanionRelation.TYPE_RELATION_CHOICES,
+        "organisms": sorted(graph.nodes.values(), key=lambda n: (n["label"] or "").lower()),
+        "selected_organism": int(organism_id) if organism_id.isdigit() else None,
+        "data_url": reverse("companion_network_data"),
     }
     return render(request, "species/companion_network.html", context)
 
 
+@staff_member_required
+@condition(etag_func=_companion_graph_etag)
+def companion_network_data_view(request):
+    """
+    GET JSON {nodes, edges} du graphe de compagnonnage (format vis-network), servi depuis le graphe en cache.
+    ?organism=<id>&depth=1..3 : voisinage ; ?type=<type_relation> (répétable) ; ?min_force=<n>.
+    If-None-Match : 304 tant que ni les relations ni les paramètres n'ont changé.
+    """
+    from .companion_graph import get_companion_graph
+
+    try:
+        params = _companion_graph_params(request)
+    except ValueError as e:
+        return JsonResponse({"detail": f"Paramètre invalide : {e}"}, status=400)
+    data = get_companion_graph().subgraph(**params)
+    data["count_nodes"] = len(data["nodes"])
+    data["count_edges"] = len(data["edges"])
+    return JsonResponse(data)
+
+
 @staff_member_required
 def weather_dashboard_view(request):
     """Tableau de bord météo : températures, pluie, alertes arrosage, zones sprinkler."""
     if request.GET.get("refresh"):
-        for g in Garden.objects.filter(latitude__isnull=False, longitude__isnull=False):
-            fetch_weather_for_garden(g, days_back=14)
-        messages.success(request, "Données météo actualisées.")
+        # Appels Open-Meteo par le worker (run_jobs), pas dans la requête
+        from .jobs import enqueue_command
+
+        runs = [
+            enqueue_command("fetch_weather", {"days": 14}, trigger="gestion_donnees", user=request.user),
+            enqueue_command("refresh_forecasts", {}, trigger="gestion_donnees", user=request.user),
+        ]
+        messages.success(
+            request,
+            "Actualisation météo mise en file (tâches " + ", ".join(str(r.pk) for r in runs) + ").",
+        )
+        return redirect("weather_dashboard")
 
     if request.GET.get("clear_sprinkler_pause"):
         request.session.pop("sprinkler_force_zone_id", None)
@@ -99,6 +128,9 @@ def weather_dashboard_view(request):
     today = date.today()
     start = today - timedelta(days=14)
 
+    # Prévisions stockées (refresh_forecasts) : pas d'appel réseau à l'affichage
+    forecasts = get_stored_forecasts(gardens, days=7)
+
     enriched = []
     for g in gardens:
         g.sprinkler_zones_actives = list(g.sprinkler_zones.filter(actif=True))
@@ -115,7 +147,7 @@ def weather_dashboard_view(request):
         g.total_neige_cm = round(sum(r.snowfall_cm or 0 for r in records), 1)
 
         # Prévision + alertes
-        g.forecast = fetch_forecast(g, days=7)
+        g.forecast = forecasts[g.pk]
         g.forecast_alerts = get_forecast_alerts(g, g.forecast)
 
         enriched.append(g)
@@ -511,13 +543,15 @@ def gestion_donnees_view(request):
                     )
                     out, err = StringIO(), StringIO()
                     try:
-                        call_command(
-                            "import_hydroquebec",
-                            file=str(full_path),
-                            limit=0,
-                            stdout=out,
-                            stderr=err,
-                        )
+                        # Statistiques du pipeline écrites dans ce run (pas de second DataImportRun)
+                        with caller_import_run(run):
+                            call_command(
+                                "import_hydroquebec",
+                                file=str(full_path),
+                                limit=0,
+                                stdout=out,
+                                stderr=err,
+                            )
                         output = (out.getvalue() + "\n" + err.getvalue()).strip()
                         _append_log(request, f"Import Hydro-Québec (fichier local: {local_file})", output, True)
                         run.status = "success"
@@ -606,41 +640,13 @@ def gestion_donnees_view(request):
             _options_with_score = dict(options)
             _options_with_score["global_score_before"] = _global_before
 
-            run = DataImportRun.objects.create(
-                source=command,
-                status="running",
-                trigger="gestion_donnees",
-                user=request.user,
-                stats=_options_with_score,
+            # Exécution par le worker (run_jobs) : la page suit la tâche sans bloquer la requête
+            from .jobs import enqueue_command
+
+            run = enqueue_command(
+                command, cmd_kwargs, trigger="gestion_donnees", user=request.user, stats=_options_with_score
             )
-            out, err = StringIO(), StringIO()
-            try:
-                call_command(command, stdout=out, stderr=err, **cmd_kwargs)
-                output = (out.getvalue() + "\n" + err.getvalue()).strip()
-                _append_log(request, command, output, True)
-                run.status = "success"
-                run.finished_at = timezone.now()
-                run.output_snippet = (output or "")[:2000]
-                _enrichment_after = BaseEnrichmentStats.objects.first()
-                run.stats["global_score_after"] = _enrichment_after.global_score_pct if _enrichment_after else None
-                run.save()
-                messages.success(request, f"Commande « {command} » exécutée.")
-            except SystemExit:
-                output = (out.getvalue() + "\n" + err.getvalue()).strip()
-                _append_log(request, command, output, False)
-                run.status = "failure"
-                run.finished_at = timezone.now()
-                run.output_snippet = (output or "Commande terminée avec erreur")[:2000]
-                run.save()
-                messages.error(request, "La commande a échoué (options manquantes ou erreur).")
-            except Exception as e:
-                output = (out.getvalue() + "\n" + err.getvalue()).strip() or str(e)
-                _append_log(request, command, output, False)
-                run.status = "failure"
-                run.finished_at = timezone.now()
-                run.output_snippet = (output or str(e))[:2000]
-                run.save()
-                messages.error(request, f"Erreur : {e}")
+            messages.success(request, f"Commande « {command} » mise en file (tâche {run.pk}). Suivi ci-dessous.")
             return redirect("gestion_donnees")
 
         messages.warning(request, "Action non reconnue.")
@@ -701,6 +707,11 @@ def gestion_donnees_view(request):
 
     # Historique des imports (50 derniers)
     import_history = list(DataImportRun.objects.all()[:50])
+    # Tâches de fond en attente ou en cours (suivi en direct sur la page)
+    active_jobs = list(
+        DataImportRun.objects.filter(Q(status="queued") | Q(status="running", heartbeat_at__isnull=False))
+        .order_by("started_at")
+    )
 
     log = request.session.get(SESSION_LOG_KEY, [])
 
@@ -718,7 +729,7 @@ def gestion_donnees_view(request):
 
     command_help = {
         "sync_radixsylva": "Met à jour le cache botanique depuis l’API Radix Sylva (sync/*). Cocher « full » pour tout retélécharger.",
-        "rebuild_search_vectors": "Recalcule search_vector (PostgreSQL uniquement). Utile après un gros sync.",
+        "rebuild_search_vectors": "Recalcule search_vector de tous les organismes (PostgreSQL uniquement). Les saves, imports et syncs mettent déjà à jour les organismes modifiés.",
         "wipe_db_and_media": "Vide la base et les médias (attention). no_input forcé.",
     }
     commands_with_opts = [
@@ -808,6 +819,7 @@ def gestion_donnees_view(request):
         "data_source_keys": data_source_keys,
         "last_runs_by_source": last_runs_by_source,
         "import_history": import_history,
+        "active_jobs": active_jobs,
         "log": reversed(list(log)),  # plus récent en premier à l'affichage
         "commands_with_opts": commands_with_opts,
         "data_source_links": DATA_SOURCE_LINKS,
@@ -882,7 +894,8 @@ def cesium_terrain_view(request):
     """
     Page HTML Cesium 3D pour la vue terrain (app mobile WebView).
     Authentification : session (navigateur) ou JWT via ?access_token= (WebView mobile).
-    Requiert ?garden_id=<id> pour charger les données du jardin (boundary, contours, terrain_stats).
+    Requiert ?garden_id=<id> pour charger les données du jardin (boundary, terrain_stats) ;
+    spécimens et courbes de niveau sont demandés ensuite à l'API (species.terrain_payload).
     """
     access_token = request.GET.get("access_token")
     if access_token:
@@ -913,69 +926,14 @@ def cesium_terrain_view(request):
         "latitude": getattr(garden, "latitude", None),
         "longitude": getattr(garden, "longitude", None),
         "boundary": garden.boundary,
-        "contours_geojson": garden.contours_geojson,
+        # Courbes de niveau : niveaux simplifiés demandés selon le zoom (terrainFetchContours)
+        "has_contours": bool((garden.contours_geojson or {}).get("features")),
         "terrain_stats": garden.terrain_stats,
         "distance_unit": getattr(garden, "distance_unit", "m") or "m",
     }
     garden_json = json.dumps(garden_data)
 
-    # Spécimens du jardin pour la vue 3D (navigateur : pas de LOAD_SPECIMENS depuis l'app)
-    from django.db.models import Prefetch
-
-    specimens_qs = (
-        Specimen.objects.filter(garden_id=garden.id)
-        .select_related("organisme", "cultivar", "zone")
-        .prefetch_related(
-            Prefetch("cultivar__porte_greffes", queryset=CultivarPorteGreffe.objects.order_by("-hauteur_max_m"))
-        )
-        .order_by("nom")
-    )
-    statut_labels = dict(Specimen.STATUT_CHOICES)
-    source_labels = dict(Specimen.SOURCE_CHOICES)
-    specimens_list = []
-    for s in specimens_qs:
-        rayon = None
-        porte_greffe_nom = None
-        if getattr(s, "cultivar", None):
-            for pg in s.cultivar.porte_greffes.all():
-                if pg.hauteur_max_m and rayon is None:
-                    rayon = round(float(pg.hauteur_max_m) * 0.60, 1)
-                if pg.nom_porte_greffe:
-                    porte_greffe_nom = pg.nom_porte_greffe
-                break
-        ot = getattr(s.organisme, "type_organisme", None) or ""
-        fruits = ot in ("arbre_fruitier", "arbuste_fruitier", "arbuste_baies")
-        noix = ot == "arbre_noix"
-        specimens_list.append({
-            "id": s.id,
-            "nom": s.nom or "",
-            "latitude": getattr(s, "latitude", None),
-            "longitude": getattr(s, "longitude", None),
-            "statut": s.statut or "",
-            "statut_display": statut_labels.get(s.statut, s.statut or ""),
-            "health": getattr(s, "sante", None),
-            "sante": getattr(s, "sante", None),
-            "organisme_nom_latin": s.organisme.nom_latin if s.organisme else "",
-            "organisme_nom_commun": getattr(s.organisme, "nom_commun", "") if s.organisme else "",
-            "cultivar_nom": s.cultivar.nom if s.cultivar else "",
-            "porte_greffe_nom": porte_greffe_nom or "",
-            "date_plantation": s.date_plantation.isoformat() if getattr(s, "date_plantation", None) else "",
-            "zone_nom": s.zone.nom if getattr(s, "zone", None) and s.zone else "",
-            "zone_jardin": getattr(s, "zone_jardin", "") or "",
-            "code_identification": getattr(s, "code_identification", "") or "",
-            "source": getattr(s, "source", "") or "",
-            "source_display": source_labels.get(getattr(s, "source", ""), "") or "",
-            "pepiniere_fournisseur": getattr(s, "pepiniere_fournisseur", "") or "",
-            "notes": getattr(s, "notes", "") or "",
-            "hauteur_actuelle": getattr(s, "hauteur_actuelle", None),
-            "age_plantation": getattr(s, "age_plantation", None),
-            "premiere_fructification": getattr(s, "premiere_fructification", None),
-            "rayon_adulte_m": rayon,
-            "emoji": "🌱",
-            "fruits": fruits,
-            "noix": noix,
-        })
-    specimens_json = json.dumps(specimens_list)
+    # Spécimens et courbes de niveau : chargés par terrain_data.js (API terrain/, ETag + gzip)
 
     cesium_token = getattr(settings, "CESIUM_ION_ACCESS_TOKEN", "") or ""
     lidar_asset_id = getattr(settings, "CESIUM_LIDAR_ASSET_ID", None)
@@ -988,7 +946,6 @@ def cesium_terrain_view(request):
             "cesium_token": cesium_token,
             "cesium_lidar_asset_id": lidar_asset_id,
             "garden_json": garden_json,
-            "specimens_json": specimens_json,
             "terrain_user_is_staff": request.user.is_staff,
         },
     )
@@ -1,6 +1,7 @@
 """
 Warnings par jardin : rappels en retard, pollinisateurs manquants, alertes phénologiques.
 """
+from collections import Counter, defaultdict
 from datetime import date
 
 from catalog.models import CultivarPollinator
@@ -55,43 +56,53 @@ def compute_missing_pollinators(garden_id):
     présent dans le jardin. Sinon, alerte avec pollinisateurs_manquants.
     Returns: list of { specimen_id, specimen_nom, cultivar_nom, pollinisateurs_manquants: [nom, ...] }.
     Limite 10.
+
+    Deux requêtes quel que soit le nombre de spécimens : les (cultivar_id, organisme_id)
+    du jardin sont chargés une fois en multiensembles (Counter), puis chaque règle
+    CultivarPollinator est résolue en mémoire — O(spécimens + règles).
     """
-    specimens = (
+    rows = list(
         Specimen.objects.filter(garden_id=garden_id)
-        .exclude(statut__in=('mort', 'enleve'))
-        .filter(cultivar_id__isnull=False)
-        .select_related('cultivar', 'organisme')
-        .prefetch_related('cultivar__pollinator_companions')
+        .values_list('id', 'nom', 'statut', 'cultivar_id', 'cultivar__nom', 'organisme_id')
     )
+    cultivar_counts = Counter(r[3] for r in rows if r[3] is not None)
+    organism_counts = Counter(r[5] for r in rows)
+    candidates = [
+        r for r in rows
+        if r[3] is not None and r[2] not in ('mort', 'enleve')
+    ]
+    if not candidates:
+        return []
+
+    rules_by_cultivar = defaultdict(list)
+    for poll in (
+        CultivarPollinator.objects.filter(cultivar_id__in={r[3] for r in candidates})
+        .select_related('companion_cultivar', 'companion_organism')
+        .order_by('id')
+    ):
+        rules_by_cultivar[poll.cultivar_id].append(poll)
+
     result = []
-    for specimen in specimens:
-        if not specimen.cultivar:
-            continue
-        companions = list(specimen.cultivar.pollinator_companions.select_related('companion_cultivar', 'companion_organism').all())
+    for specimen_id, nom, _statut, cultivar_id, cultivar_nom, organisme_id in candidates:
+        companions = rules_by_cultivar.get(cultivar_id)
         if not companions:
             continue
         missing = []
         for poll in companions:
-            # Compatible = un spécimen dans le même jardin avec cultivar=companion_cultivar ou organisme=companion_organism
+            # Compatible = un autre spécimen du jardin avec cultivar=companion_cultivar ou organisme=companion_organism
             if poll.companion_cultivar_id:
-                has_companion = Specimen.objects.filter(
-                    garden_id=garden_id,
-                    cultivar_id=poll.companion_cultivar_id,
-                ).exclude(pk=specimen.pk).exists()
+                n = cultivar_counts[poll.companion_cultivar_id] - (cultivar_id == poll.companion_cultivar_id)
             else:
-                has_companion = Specimen.objects.filter(
-                    garden_id=garden_id,
-                    organisme_id=poll.companion_organism_id,
-                ).exclude(pk=specimen.pk).exists()
-            if not has_companion:
+                n = organism_counts[poll.companion_organism_id] - (organisme_id == poll.companion_organism_id)
+            if n <= 0:
                 name = _pollinator_companion_name(poll)
                 if name and name not in missing:
                     missing.append(name)
         if missing:
             result.append({
-                'specimen_id': specimen.id,
-                'specimen_nom': specimen.nom,
-                'cultivar_nom': specimen.cultivar.nom,
+                'specimen_id': specimen_id,
+                'specimen_nom': nom,
+                'cultivar_nom': cultivar_nom,
                 'pollinisateurs_manquants': missing,
             })
         if len(result) >= 10:
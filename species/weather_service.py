@@ -1,13 +1,21 @@
 """
 Service météo via Open-Meteo (gratuit, sans clé API).
 Fournit températures, précipitations et géocodage pour les jardins.
+
+Les prévisions sont stockées (ForecastSnapshot, une par jardin et par émission) par la
+commande refresh_forecasts ; les vues lisent get_stored_forecast(s) sans appel réseau.
 """
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, timedelta
 
 import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.utils import timezone
 
-from gardens.models import Garden, WeatherRecord
+from gardens.models import ForecastSnapshot, Garden, WeatherRecord
 
 logger = logging.getLogger(__name__)
 
@@ -18,18 +26,63 @@ NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
 # Historical archive for older dates
 ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
 
+# Prévisions stockées : nombre de jours demandés, validité par défaut, rétention
+FORECAST_STORE_DAYS = 16
+FORECAST_TTL_S_DEFAULT = 6 * 3600
+FORECAST_RETENTION_DAYS = 7
 
-def fetch_weather_for_garden(garden: Garden, days_back: int = 14) -> int:
+
+def _forecast_url() -> str:
+    return getattr(settings, "OPEN_METEO_FORECAST_URL", "") or FORECAST_URL
+
+
+def forecast_ttl() -> timedelta:
+    """Durée pendant laquelle une prévision stockée est considérée fraîche."""
+    return timedelta(seconds=getattr(settings, "WEATHER_FORECAST_TTL_S", FORECAST_TTL_S_DEFAULT))
+
+
+WEATHER_DAILY_FIELDS = [
+    "temperature_2m_max",
+    "temperature_2m_min",
+    "temperature_2m_mean",
+    "precipitation_sum",
+    "rain_sum",
+    "snowfall_sum",
+    "et0_fao_evapotranspiration",
+]
+WEATHER_RECORD_FIELDS = [
+    "temp_max", "temp_min", "temp_mean", "precipitation_mm", "rain_mm", "snowfall_cm", "et0_mm",
+]
+# Ingestion multi-jardins : requêtes HTTP simultanées au plus (pool de connexions de la session)
+WEATHER_MAX_WORKERS = 8
+
+_session = None
+_session_pool_size = 0
+_session_lock = threading.Lock()
+
+
+def _http_session(pool_size: int = 1) -> requests.Session:
     """
-    Récupère les données météo pour un jardin et les enregistre.
-    Utilise past_days du Forecast API pour les derniers jours.
-    Retourne le nombre d'enregistrements créés/mis à jour.
+    Session HTTP partagée (connexions keep-alive réutilisées). Le pool de connexions est agrandi
+    au nombre de workers demandé (fetch_weather --workers) : pas de connexion jetée faute de place.
+    """
+    global _session, _session_pool_size
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+        if pool_size > _session_pool_size:
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+            _session_pool_size = pool_size
+        return _session
+
+
+def _request_daily_history(garden: Garden, days_back: int) -> dict | None:
+    """
+    Appel Open-Meteo (past_days du Forecast API) pour un jardin.
+    Retourne le bloc "daily" de la réponse, ou None en cas d'erreur.
     """
-    if not garden.a_coordonnees():
-        logger.warning(f"Jardin {garden} sans coordonnées, skip météo")
-        return 0
-
-    today = date.today()
     # Open-Meteo past_days: 0 = today only, 1 = today + yesterday, etc. Max 92
     past_days = min(max(0, days_back), 92)
 
@@ -39,32 +92,32 @@ def fetch_weather_for_garden(garden: Garden, days_back: int = 14) -> int:
         "timezone": garden.timezone,
         "past_days": past_days,
         "forecast_days": 1,  # include today
-        "daily": [
-            "temperature_2m_max",
-            "temperature_2m_min",
-            "temperature_2m_mean",
-            "precipitation_sum",
-            "rain_sum",
-            "snowfall_sum",
-            "et0_fao_evapotranspiration",
-        ],
+        "daily": WEATHER_DAILY_FIELDS,
     }
 
     try:
-        resp = requests.get(FORECAST_URL, params=params, timeout=15)
+        resp = _http_session().get(_forecast_url(), params=params, timeout=15)
         resp.raise_for_status()
         data = resp.json()
-    except requests.RequestException as e:
+    except (requests.RequestException, ValueError) as e:
         logger.exception(f"Erreur API météo pour {garden}: {e}")
-        return 0
+        return None
+    return data.get("daily", {})
 
-    daily = data.get("daily", {})
+
+def _store_daily_history(garden: Garden, daily: dict) -> int:
+    """
+    Enregistre les jours passés (et aujourd'hui) d'un bloc daily Open-Meteo.
+    Un seul INSERT … ON CONFLICT (garden, date) DO UPDATE pour tout le jardin.
+    Retourne le nombre de jours enregistrés.
+    """
     times = daily.get("time", [])
     if not times:
         logger.warning(f"Pas de données daily pour {garden}")
         return 0
 
-    created = 0
+    today = date.today()
+    records = []
     for i, time_str in enumerate(times):
         try:
             day = date.fromisoformat(time_str)
@@ -72,32 +125,43 @@ def fetch_weather_for_garden(garden: Garden, days_back: int = 14) -> int:
             continue
         if day > today:  # skip forecast days
             continue
-
-        temp_max = _safe_float(daily.get("temperature_2m_max"), i)
-        temp_min = _safe_float(daily.get("temperature_2m_min"), i)
-        temp_mean = _safe_float(daily.get("temperature_2m_mean"), i)
-        precip = _safe_float(daily.get("precipitation_sum"), i) or 0.0
-        rain = _safe_float(daily.get("rain_sum"), i)
-        snow = _safe_float(daily.get("snowfall_sum"), i)
-        et0 = _safe_float(daily.get("et0_fao_evapotranspiration"), i)
-
-        wr, is_new = WeatherRecord.objects.update_or_create(
+        records.append(WeatherRecord(
             garden=garden,
             date=day,
-            defaults={
-                "temp_max": temp_max,
-                "temp_min": temp_min,
-                "temp_mean": temp_mean,
-                "precipitation_mm": precip,
-                "rain_mm": rain,
-                "snowfall_cm": snow,
-                "et0_mm": et0,
-            },
+            temp_max=_safe_float(daily.get("temperature_2m_max"), i),
+            temp_min=_safe_float(daily.get("temperature_2m_min"), i),
+            temp_mean=_safe_float(daily.get("temperature_2m_mean"), i),
+            precipitation_mm=_safe_float(daily.get("precipitation_sum"), i) or 0.0,
+            rain_mm=_safe_float(daily.get("rain_sum"), i),
+            snowfall_cm=_safe_float(daily.get("snowfall_sum"), i),
+            et0_mm=_safe_float(daily.get("et0_fao_evapotranspiration"), i),
+        ))
+    if records:
+        WeatherRecord.objects.bulk_create(
+            records,
+            update_conflicts=True,
+            unique_fields=["garden", "date"],
+            update_fields=WEATHER_RECORD_FIELDS,
         )
-        if is_new:
-            created += 1
+        from .dashboard_feed import mark_weather_stale
+        mark_weather_stale()
+    return len(records)
 
-    return created
+
+def fetch_weather_for_garden(garden: Garden, days_back: int = 14) -> int:
+    """
+    Récupère les données météo pour un jardin et les enregistre.
+    Utilise past_days du Forecast API pour les derniers jours.
+    Retourne le nombre d'enregistrements créés/mis à jour.
+    """
+    if not garden.a_coordonnees():
+        logger.warning(f"Jardin {garden} sans coordonnées, skip météo")
+        return 0
+
+    daily = _request_daily_history(garden, days_back)
+    if daily is None:
+        return 0
+    return _store_daily_history(garden, daily)
 
 
 def _timezone_from_coords(lat: float, lon: float) -> str:
@@ -229,8 +293,9 @@ def _safe_float(arr, index):
 
 def fetch_forecast(garden: Garden, days: int = 7) -> list[dict]:
     """
-    Récupère la prévision météo (J+1 à J+N).
+    Récupère la prévision météo (J+1 à J+N) auprès d'Open-Meteo (appel réseau bloquant).
     Retourne une liste de dicts {date, temp_min, temp_max, temp_mean, precipitation_mm, rain_mm, snowfall_cm}.
+    Réservé à refresh_forecast_store : les vues utilisent get_stored_forecast.
     """
     if not garden.a_coordonnees():
         return []
@@ -247,7 +312,7 @@ def fetch_forecast(garden: Garden, days: int = 7) -> list[dict]:
     }
 
     try:
-        resp = requests.get(FORECAST_URL, params=params, timeout=15)
+        resp = _http_session().get(_forecast_url(), params=params, timeout=15)
         resp.raise_for_status()
         data = resp.json()
     except requests.RequestException as e:
@@ -278,6 +343,77 @@ def fetch_forecast(garden: Garden, days: int = 7) -> list[dict]:
     return result
 
 
+def refresh_forecast_store(gardens=None, days: int = FORECAST_STORE_DAYS) -> dict:
+    """
+    Récupère et enregistre une nouvelle prévision (ForecastSnapshot) par jardin géolocalisé,
+    puis supprime les prévisions de plus de FORECAST_RETENTION_DAYS jours.
+    Retourne {garden_id: nb_jours_prévus} (0 si l'API a échoué : l'ancienne prévision reste servie tant qu'elle est fraîche).
+    """
+    if gardens is None:
+        gardens = Garden.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    result = {}
+    for g in gardens:
+        forecast = fetch_forecast(g, days=days)
+        result[g.id] = len(forecast)
+        if not forecast:
+            continue
+        ForecastSnapshot.objects.create(
+            garden=g,
+            issued_at=timezone.now(),
+            days=[{**d, "date": d["date"].isoformat()} for d in forecast],
+        )
+    ForecastSnapshot.objects.filter(
+        issued_at__lt=timezone.now() - timedelta(days=FORECAST_RETENTION_DAYS)
+    ).delete()
+    if any(result.values()):
+        from .dashboard_feed import mark_weather_stale
+        mark_weather_stale()
+    return result
+
+
+def _snapshot_days(snapshot, days: int, today: date) -> list[dict]:
+    """Jours futurs (J+1…J+days) d'une prévision stockée, au format de fetch_forecast."""
+    result = []
+    for d in snapshot.days or []:
+        try:
+            day = date.fromisoformat(d.get("date"))
+        except (ValueError, TypeError):
+            continue
+        if day <= today:
+            continue
+        result.append({**d, "date": day})
+        if len(result) >= days:
+            break
+    return result
+
+
+def get_stored_forecasts(gardens, days: int = 7) -> dict:
+    """
+    Dernière prévision fraîche (moins de WEATHER_FORECAST_TTL_S) de chaque jardin, sans appel réseau.
+    Une seule requête. Retourne {garden_id: [jour, ...]} ([] si aucune prévision fraîche).
+    """
+    garden_ids = [g.pk if isinstance(g, Garden) else g for g in gardens]
+    result = {gid: [] for gid in garden_ids}
+    if not garden_ids:
+        return result
+    today = date.today()
+    seen = set()
+    for snapshot in ForecastSnapshot.objects.filter(
+        garden_id__in=garden_ids,
+        issued_at__gte=timezone.now() - forecast_ttl(),
+    ).order_by("garden_id", "-issued_at"):
+        if snapshot.garden_id in seen:
+            continue
+        seen.add(snapshot.garden_id)
+        result[snapshot.garden_id] = _snapshot_days(snapshot, days, today)
+    return result
+
+
+def get_stored_forecast(garden: Garden, days: int = 7) -> list[dict]:
+    """Prévision stockée du jardin (même format que fetch_forecast), [] si absente ou périmée."""
+    return get_stored_forecasts([garden], days=days)[garden.pk]
+
+
 def get_forecast_alerts(garden: Garden, forecast: list[dict]) -> list[dict]:
     """
     Analyse la prévision et retourne une liste d'alertes.
@@ -415,7 +551,7 @@ def should_pause_sprinkler(sprinkler_zone) -> tuple[bool, str]:
     if not garden.a_coordonnees():
         return False, ""
 
-    forecast = fetch_forecast(garden, days=3)
+    forecast = get_stored_forecast(garden, days=3)
     pluie_seuil = garden.seuil_pluie_forte_mm
     for d in forecast[:2]:
         precip = d.get("precipitation_mm") or 0
@@ -424,19 +560,36 @@ def should_pause_sprinkler(sprinkler_zone) -> tuple[bool, str]:
     return False, ""
 
 
-def fetch_weather_all_gardens(days_back: int = 14) -> dict:
+def fetch_weather_all_gardens(days_back: int = 14, max_workers: int = WEATHER_MAX_WORKERS) -> dict:
     """
     Récupère la météo pour tous les jardins avec coordonnées.
-    Retourne {garden_id: nb_records_created}
+    Les appels HTTP partent en parallèle (au plus max_workers, session partagée) ; les écritures
+    restent dans le thread appelant, une insertion groupée par jardin dès que sa réponse arrive.
+    Retourne {garden_id: nombre de jours enregistrés (créés ou mis à jour, upsert)} pour chaque
+    jardin géolocalisé ; 0 si l'appel a échoué ou n'a renvoyé aucun jour.
     """
-    gardens = Garden.objects.filter(
+    gardens = list(Garden.objects.filter(
         latitude__isnull=False,
         longitude__isnull=False,
-    )
-    result = {}
-    for g in gardens:
-        n = fetch_weather_for_garden(g, days_back=days_back)
-        result[g.id] = n
+    ))
+    result = {g.id: 0 for g in gardens}
+    if not gardens:
+        return result
+    max_workers = max(1, min(max_workers, len(gardens)))
+    if max_workers == 1:
+        for g in gardens:
+            result[g.id] = fetch_weather_for_garden(g, days_back=days_back)
+        return result
+
+    # Pool dimensionné avant le départ des threads (un mount pendant les requêtes serait sans effet pour elles)
+    _http_session(max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="weather") as pool:
+        futures = {pool.submit(_request_daily_history, g, days_back): g for g in gardens}
+        for future in as_completed(futures):
+            g = futures[future]
+            daily = future.result()
+            if daily is not None:
+                result[g.id] = _store_daily_history(g, daily)
     return result
 
 